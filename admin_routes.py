@@ -10,6 +10,11 @@ from functools import wraps
 from models import db, User, Team, Season
 from sqlalchemy import text
 from season_context import SeasonContext
+from season_stats import SeasonStatsStore
+from season_archive import SeasonArchiveStore
+from lineage_index import LineageIndex
+from db_routing import read_engine
+from page_queries import PageQueries, ROUND_INFO_COLUMNS
 from access_control import require_admin, require_super_admin, restrict_committee_admin_from_super_routes, debug_user_access
 import secrets
 import string
@@ -35,40 +40,17 @@ def admin_dashboard():
         # Get current season info
         current_season = SeasonContext.get_current_season()
         
-        # Get season statistics manually since get_season_statistics() function may not exist
+        # Season statistics and user role statistics on one connection
         season_stats = None
-        if current_season:
-            try:
-                with db.engine.connect() as conn:
-                    stats_result = conn.execute(text("""
-                        SELECT 
-                            :season_id as season_id,
-                            :season_name as season_name,
-                            (SELECT COUNT(*) FROM team WHERE season_id = :season_id) as total_teams,
-                            (SELECT COUNT(*) FROM team WHERE season_id = :season_id AND is_continuing_team = true) as continuing_teams,
-                            (SELECT COUNT(*) FROM team WHERE season_id = :season_id AND is_continuing_team = false) as new_teams,
-                            (SELECT COUNT(*) FROM round WHERE season_id = :season_id) as total_rounds,
-                            (SELECT COUNT(*) FROM round WHERE season_id = :season_id AND is_active = true) as active_rounds,
-                            (SELECT COUNT(*) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as total_bids
-                    """), {'season_id': current_season['id'], 'season_name': current_season['name']})
-                    season_stats = stats_result.fetchone()
-            except Exception as e:
-                current_app.logger.error(f"Error getting season statistics: {e}")
-                season_stats = None
-        
-        # Get user role statistics
-        with db.engine.connect() as conn:
-            role_result = conn.execute(text("""
-                SELECT user_role as role, COUNT(*) as count 
-                FROM "user" 
-                GROUP BY user_role 
-                ORDER BY CASE user_role 
-                    WHEN 'super_admin' THEN 1 
-                    WHEN 'committee_admin' THEN 2 
-                    WHEN 'team_user' THEN 3 
-                    ELSE 4 END
-            """))
-            role_stats = role_result.fetchall()
+        with PageQueries.open() as q:
+            if current_season:
+                try:
+                    season_stats = q.one('admin.season_stats', season_id=current_season['id'],
+                                         season_name=current_season['name'])
+                except Exception as e:
+                    current_app.logger.error(f"Error getting season statistics: {e}")
+                    q.conn.rollback()
+            role_stats = q.all('admin.role_stats')
         
         # Get recent activity (placeholder for now)
         recent_activity = []
@@ -180,6 +162,31 @@ def activate_season(season_id):
     
     return redirect(url_for('admin.season_management'))
 
+@admin_bp.route('/seasons/<int:season_id>/complete', methods=['POST'])
+@require_super_admin
+def complete_season(season_id):
+    """Mark a season completed and freeze it into the history archive"""
+    try:
+        with db.engine.connect() as conn:
+            conn.execute(text("""
+                UPDATE season 
+                SET is_active = false, status = 'completed', updated_at = :updated_at 
+                WHERE id = :season_id
+            """), {'updated_at': datetime.utcnow(), 'season_id': season_id})
+            conn.commit()
+        
+        if SeasonArchiveStore.archive_season(season_id, force=True):
+            LineageIndex.refresh_season(season_id)
+            flash('Season completed and archived.', 'success')
+        else:
+            flash('Season completed, but archiving failed. Run migrations/archive_completed_seasons.py to retry.', 'warning')
+        
+    except Exception as e:
+        current_app.logger.error(f"Error completing season: {e}")
+        flash('Error completing season.', 'error')
+    
+    return redirect(url_for('admin.season_management'))
+
 @admin_bp.route('/users')
 @require_admin
 def user_management():
@@ -335,7 +342,7 @@ def create_admin_invite():
 def season_details(season_id):
     """Detailed view of a specific season with comprehensive statistics"""
     try:
-        with db.engine.connect() as conn:
+        with read_engine().connect() as conn:
             # Get season basic info
             season_result = conn.execute(text("""
                 SELECT id, name, short_name, is_active, status, created_at, updated_at
@@ -347,70 +354,11 @@ def season_details(season_id):
                 flash('Season not found.', 'error')
                 return redirect(url_for('admin.season_management'))
             
-            # Get comprehensive season statistics
-            stats_result = conn.execute(text("""
-                SELECT 
-                    -- Team statistics
-                    (SELECT COUNT(*) FROM team WHERE season_id = :season_id) as total_teams,
-                    (SELECT COUNT(*) FROM team WHERE season_id = :season_id AND is_continuing_team = true) as continuing_teams,
-                    (SELECT COUNT(*) FROM team WHERE season_id = :season_id AND is_continuing_team = false) as new_teams,
-                    
-                    -- Round statistics
-                    (SELECT COUNT(*) FROM round WHERE season_id = :season_id) as total_rounds,
-                    (SELECT COUNT(*) FROM round WHERE season_id = :season_id AND is_active = true) as active_rounds,
-                    (SELECT COUNT(*) FROM round WHERE season_id = :season_id AND status = 'completed') as completed_rounds,
-                    
-                    -- Bid statistics
-                    (SELECT COUNT(*) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as total_bids,
-                    (SELECT COUNT(DISTINCT b.team_id) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as teams_with_bids,
-                    (SELECT COUNT(DISTINCT b.player_id) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as players_bid_on,
-                    (SELECT COALESCE(AVG(b.amount), 0) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as avg_bid_amount,
-                    (SELECT COALESCE(MAX(b.amount), 0) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as max_bid_amount,
-                    (SELECT COALESCE(MIN(b.amount), 0) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as min_bid_amount
-            """), {'season_id': season_id})
-            season_stats = stats_result.fetchone()
-            
-            # Get teams with detailed info
-            teams_result = conn.execute(text("""
-                SELECT 
-                    t.id, t.name, t.balance, t.is_continuing_team, 
-                    u.username as owner_username,
-                    (SELECT COUNT(*) FROM bid b JOIN round r ON b.round_id = r.id WHERE b.team_id = t.id AND r.season_id = :season_id) as bid_count,
-                    (SELECT COALESCE(SUM(b.amount), 0) FROM bid b JOIN round r ON b.round_id = r.id WHERE b.team_id = t.id AND r.season_id = :season_id) as total_spent
-                FROM team t
-                JOIN "user" u ON t.user_id = u.id
-                WHERE t.season_id = :season_id
-                ORDER BY t.name
-            """), {'season_id': season_id})
-            teams = teams_result.fetchall()
-            
-            # Get rounds with detailed info
-            rounds_result = conn.execute(text("""
-                SELECT 
-                    r.id, r.position, r.is_active, r.status, r.start_time, r.end_time,
-                    (SELECT COUNT(*) FROM bid WHERE round_id = r.id) as bid_count,
-                    (SELECT COUNT(DISTINCT team_id) FROM bid WHERE round_id = r.id) as participating_teams,
-                    (SELECT COUNT(DISTINCT player_id) FROM bid WHERE round_id = r.id) as players_in_round
-                FROM round r
-                WHERE r.season_id = :season_id
-                ORDER BY r.start_time DESC
-            """), {'season_id': season_id})
-            rounds = rounds_result.fetchall()
-            
-            # Get top bids for this season
-            top_bids_result = conn.execute(text("""
-                SELECT 
-                    p.name as player_name, p.position, p.team_name as original_team,
-                    b.amount, t.name as bidding_team, r.position as round_position
-                FROM bid b
-                JOIN player p ON b.player_id = p.id
-                JOIN team t ON b.team_id = t.id
-                JOIN round r ON b.round_id = r.id
-                WHERE r.season_id = :season_id
-                ORDER BY b.amount DESC
-                LIMIT 10
-            """), {'season_id': season_id})
-            top_bids = top_bids_result.fetchall()
+            # Season, team and round aggregates come from the season stats store
+            season_stats = SeasonStatsStore.get_season_overview(conn, season_id)
+            teams = SeasonStatsStore.get_season_teams(conn, season_id)
+            rounds = SeasonStatsStore.get_season_rounds(conn, season_id)
+            top_bids = SeasonStatsStore.get_leaderboards(conn, season_id)['top_bids']
             
             return render_template('admin/season_details.html',
                                  season=season,
@@ -429,107 +377,19 @@ def season_details(season_id):
 def round_details(season_id, round_id):
     """Detailed view of a specific round with all information"""
     try:
-        with db.engine.connect() as conn:
-            # Get round basic info with season verification
-            round_result = conn.execute(text("""
-                SELECT r.id, r.position, r.is_active, r.status, r.start_time, r.end_time, r.duration,
-                       r.max_bids_per_team, s.name as season_name, s.short_name as season_short_name
-                FROM round r
-                JOIN season s ON r.season_id = s.id
-                WHERE r.id = :round_id AND r.season_id = :season_id
-            """), {'round_id': round_id, 'season_id': season_id})
-            round_info = round_result.fetchone()
+        with PageQueries.open() as q:
+            # Round info with its statistics in one row, verified against the season
+            header = q.one('admin.round_header', round_id=round_id, season_id=season_id)
             
-            if not round_info:
+            if not header:
                 flash('Round not found in this season.', 'error')
                 return redirect(url_for('admin.season_details', season_id=season_id))
+            round_info, round_stats = header[:ROUND_INFO_COLUMNS], header[ROUND_INFO_COLUMNS:]
             
-            # Get all bids in this round with player and team details
-            bids_result = conn.execute(text("""
-                SELECT 
-                    b.id, b.amount, b.is_hidden, b.timestamp,
-                    p.name as player_name, p.position, p.team_name as original_team,
-                    p.overall_rating, p.nationality,
-                    t.name as bidding_team, u.username as team_owner,
-                    CASE 
-                        WHEN EXISTS (SELECT 1 FROM tiebreaker tb WHERE tb.round_id = b.round_id AND tb.player_id = b.player_id) 
-                        THEN 'Tiebreaker'
-                        WHEN p.team_id = b.team_id 
-                        THEN 'Won'
-                        ELSE 'Lost'
-                    END as bid_status
-                FROM bid b
-                JOIN player p ON b.player_id = p.id
-                JOIN team t ON b.team_id = t.id
-                JOIN "user" u ON t.user_id = u.id
-                WHERE b.round_id = :round_id
-                ORDER BY b.amount DESC, b.timestamp ASC
-            """), {'round_id': round_id})
-            bids = bids_result.fetchall()
-            
-            # Get tiebreakers for this round
-            tiebreakers_result = conn.execute(text("""
-                SELECT 
-                    tb.id, tb.original_amount, tb.resolved, tb.timestamp,
-                    p.name as player_name, p.position,
-                    COUNT(ttb.team_id) as teams_count,
-                    STRING_AGG(t.name, ', ') as team_names
-                FROM tiebreaker tb
-                JOIN player p ON tb.player_id = p.id
-                LEFT JOIN team_tiebreaker ttb ON tb.id = ttb.tiebreaker_id
-                LEFT JOIN team t ON ttb.team_id = t.id
-                WHERE tb.round_id = :round_id
-                GROUP BY tb.id, tb.original_amount, tb.resolved, tb.timestamp, p.name, p.position
-                ORDER BY tb.timestamp
-            """), {'round_id': round_id})
-            tiebreakers = tiebreakers_result.fetchall()
-            
-            # Get players acquired in this round (final winners)
-            acquisitions_result = conn.execute(text("""
-                SELECT DISTINCT
-                    p.name as player_name, p.position, p.team_name as original_team,
-                    p.overall_rating, p.nationality, p.acquisition_value,
-                    t.name as new_team, u.username as team_owner
-                FROM player p
-                JOIN team t ON p.team_id = t.id
-                JOIN "user" u ON t.user_id = u.id
-                WHERE p.round_id = :round_id
-                ORDER BY p.acquisition_value DESC
-            """), {'round_id': round_id})
-            acquisitions = acquisitions_result.fetchall()
-            
-            # Get round statistics
-            stats_result = conn.execute(text("""
-                SELECT 
-                    (SELECT COUNT(*) FROM bid WHERE round_id = :round_id) as total_bids,
-                    (SELECT COUNT(DISTINCT team_id) FROM bid WHERE round_id = :round_id) as participating_teams,
-                    (SELECT COUNT(DISTINCT player_id) FROM bid WHERE round_id = :round_id) as players_bid_on,
-                    (SELECT COALESCE(AVG(amount), 0) FROM bid WHERE round_id = :round_id) as avg_bid,
-                    (SELECT COALESCE(MAX(amount), 0) FROM bid WHERE round_id = :round_id) as max_bid,
-                    (SELECT COALESCE(MIN(amount), 0) FROM bid WHERE round_id = :round_id) as min_bid,
-                    (SELECT COUNT(*) FROM tiebreaker WHERE round_id = :round_id) as tiebreaker_count,
-                    (SELECT COUNT(*) FROM player WHERE round_id = :round_id) as players_acquired,
-                    (SELECT COALESCE(SUM(acquisition_value), 0) FROM player WHERE round_id = :round_id) as total_spent
-            """), {'round_id': round_id})
-            round_stats = stats_result.fetchone()
-            
-            # Get bid distribution by team
-            team_bids_result = conn.execute(text("""
-                SELECT 
-                    t.name as team_name, 
-                    COUNT(b.id) as bid_count,
-                    COALESCE(AVG(b.amount), 0) as avg_bid,
-                    COALESCE(SUM(CASE WHEN p.team_id = t.id THEN 1 ELSE 0 END), 0) as players_won,
-                    COALESCE(SUM(CASE WHEN p.team_id = t.id THEN p.acquisition_value ELSE 0 END), 0) as total_spent
-                FROM team t
-                LEFT JOIN bid b ON t.id = b.team_id AND b.round_id = :round_id
-                LEFT JOIN player p ON b.player_id = p.id AND p.round_id = :round_id
-                WHERE t.season_id = :season_id
-                GROUP BY t.id, t.name
-                HAVING COUNT(b.id) > 0
-                ORDER BY bid_count DESC, total_spent DESC
-            """), {'round_id': round_id, 'season_id': season_id})
-            team_bids = team_bids_result.fetchall()
+            bids = q.all('admin.round_bids', round_id=round_id)
+            tiebreakers = q.all('admin.round_tiebreakers', round_id=round_id)
+            acquisitions = q.all('admin.round_acquisitions', round_id=round_id)
+            team_bids = q.all('admin.round_team_bids', round_id=round_id, season_id=season_id)
             
             return render_template('admin/round_details.html',
                                  round_info=round_info,
@@ -550,7 +410,7 @@ def round_details(season_id, round_id):
 def team_details(season_id, team_id):
     """Comprehensive team details with all statistics and player information"""
     try:
-        with db.engine.connect() as conn:
+        with read_engine().connect() as conn:
             # Get team basic info with season verification
             team_result = conn.execute(text("""
                 SELECT t.id, t.name, t.balance, t.is_continuing_team, t.team_lineage_id,
@@ -569,27 +429,7 @@ def team_details(season_id, team_id):
                 return redirect(url_for('admin.season_details', season_id=season_id))
             
             # Get team statistics
-            stats_result = conn.execute(text("""
-                SELECT 
-                    -- Bidding statistics
-                    (SELECT COUNT(*) FROM bid b JOIN round r ON b.round_id = r.id WHERE b.team_id = :team_id AND r.season_id = :season_id) as total_bids,
-                    (SELECT COUNT(DISTINCT b.round_id) FROM bid b JOIN round r ON b.round_id = r.id WHERE b.team_id = :team_id AND r.season_id = :season_id) as rounds_participated,
-                    (SELECT COALESCE(AVG(b.amount), 0) FROM bid b JOIN round r ON b.round_id = r.id WHERE b.team_id = :team_id AND r.season_id = :season_id) as avg_bid,
-                    (SELECT COALESCE(MAX(b.amount), 0) FROM bid b JOIN round r ON b.round_id = r.id WHERE b.team_id = :team_id AND r.season_id = :season_id) as max_bid,
-                    (SELECT COALESCE(MIN(b.amount), 0) FROM bid b JOIN round r ON b.round_id = r.id WHERE b.team_id = :team_id AND r.season_id = :season_id) as min_bid,
-                    
-                    -- Player acquisition statistics
-                    (SELECT COUNT(*) FROM player p JOIN round r ON p.round_id = r.id WHERE p.team_id = :team_id AND r.season_id = :season_id) as players_acquired,
-                    (SELECT COALESCE(SUM(p.acquisition_value), 0) FROM player p JOIN round r ON p.round_id = r.id WHERE p.team_id = :team_id AND r.season_id = :season_id) as total_spent,
-                    (SELECT COALESCE(AVG(p.acquisition_value), 0) FROM player p JOIN round r ON p.round_id = r.id WHERE p.team_id = :team_id AND r.season_id = :season_id) as avg_player_cost,
-                    
-                    -- Tiebreaker statistics
-                    (SELECT COUNT(*) FROM team_tiebreaker tt JOIN tiebreaker tb ON tt.tiebreaker_id = tb.id JOIN round r ON tb.round_id = r.id WHERE tt.team_id = :team_id AND r.season_id = :season_id) as tiebreakers_involved,
-                    
-                    -- Current balance (already calculated)
-                    :current_balance as remaining_balance
-            """), {'team_id': team_id, 'season_id': season_id, 'current_balance': team_info[2]})
-            team_stats = stats_result.fetchone()
+            team_stats = SeasonStatsStore.get_team_stats(conn, season_id, team_id, team_info[2])
             
             # Get all players acquired by this team
             players_result = conn.execute(text("""
@@ -696,7 +536,7 @@ def team_details(season_id, team_id):
 def season_player_stats(season_id):
     """Display comprehensive player statistics and awards for a season"""
     try:
-        with db.engine.connect() as conn:
+        with read_engine().connect() as conn:
             # Get season info
             season_result = conn.execute(text("""
                 SELECT id, name, short_name, created_at, updated_at
@@ -708,148 +548,16 @@ def season_player_stats(season_id):
                 flash('Season not found.', 'error')
                 return redirect(url_for('admin.seasons'))
             
-            # Top goalscorers (Golden Boot)
-            top_scorers = conn.execute(text("""
-                SELECT 
-                    p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
-                    p.nationality, p.acquisition_value, p.finishing, p.offensive_awareness,
-                    t.name as current_team, u.username as owner
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                JOIN team t ON p.team_id = t.id
-                JOIN "user" u ON t.user_id = u.id
-                WHERE r.season_id = :season_id AND p.finishing IS NOT NULL
-                ORDER BY p.finishing DESC, p.offensive_awareness DESC
-                LIMIT 20
-            """), {'season_id': season_id})
-            golden_boot_candidates = top_scorers.fetchall()
-            
-            # Best goalkeepers (Golden Glove)
-            top_keepers = conn.execute(text("""
-                SELECT 
-                    p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
-                    p.nationality, p.acquisition_value, p.defensive_awareness, p.physical_contact,
-                    t.name as current_team, u.username as owner
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                JOIN team t ON p.team_id = t.id
-                JOIN "user" u ON t.user_id = u.id
-                WHERE r.season_id = :season_id AND p.position = 'GK'
-                ORDER BY p.overall_rating DESC, p.defensive_awareness DESC
-                LIMIT 10
-            """), {'season_id': season_id})
-            golden_glove_candidates = top_keepers.fetchall()
-            
-            # Best overall players (Golden Ball)
-            top_players = conn.execute(text("""
-                SELECT 
-                    p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
-                    p.nationality, p.acquisition_value, p.playing_style,
-                    t.name as current_team, u.username as owner,
-                    p.offensive_awareness, p.ball_control, p.dribbling, p.finishing,
-                    p.speed, p.physical_contact, p.defensive_awareness, p.tackling
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                JOIN team t ON p.team_id = t.id
-                JOIN "user" u ON t.user_id = u.id
-                WHERE r.season_id = :season_id
-                ORDER BY p.overall_rating DESC, p.acquisition_value DESC
-                LIMIT 50
-            """), {'season_id': season_id})
-            golden_ball_candidates = top_players.fetchall()
-            
-            # Most expensive signings
-            most_expensive = conn.execute(text("""
-                SELECT 
-                    p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
-                    p.nationality, p.acquisition_value, p.playing_style,
-                    t.name as current_team, u.username as owner,
-                    r.position as round_position
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                JOIN team t ON p.team_id = t.id
-                JOIN "user" u ON t.user_id = u.id
-                WHERE r.season_id = :season_id
-                ORDER BY p.acquisition_value DESC
-                LIMIT 20
-            """), {'season_id': season_id})
-            expensive_signings = most_expensive.fetchall()
-            
-            # Best value signings (high rating, low cost)
-            best_value = conn.execute(text("""
-                SELECT 
-                    p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
-                    p.nationality, p.acquisition_value, p.playing_style,
-                    t.name as current_team, u.username as owner,
-                    CASE WHEN p.acquisition_value > 0 THEN p.overall_rating::float / p.acquisition_value ELSE 0 END as value_ratio
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                JOIN team t ON p.team_id = t.id
-                JOIN "user" u ON t.user_id = u.id
-                WHERE r.season_id = :season_id AND p.acquisition_value > 0 AND p.overall_rating > 70
-                ORDER BY (p.overall_rating::float / p.acquisition_value) DESC, p.overall_rating DESC
-                LIMIT 20
-            """), {'season_id': season_id})
-            value_signings = best_value.fetchall()
-            
-            # Position-wise statistics
-            position_stats = conn.execute(text("""
-                SELECT 
-                    p.position,
-                    COUNT(*) as player_count,
-                    AVG(p.overall_rating) as avg_rating,
-                    MAX(p.overall_rating) as max_rating,
-                    MIN(p.overall_rating) as min_rating,
-                    AVG(p.acquisition_value) as avg_cost,
-                    MAX(p.acquisition_value) as max_cost,
-                    SUM(p.acquisition_value) as total_spent
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                WHERE r.season_id = :season_id AND p.position IS NOT NULL
-                GROUP BY p.position
-                ORDER BY total_spent DESC
-            """), {'season_id': season_id})
-            position_breakdown = position_stats.fetchall()
-            
-            # Nationality statistics
-            nationality_stats = conn.execute(text("""
-                SELECT 
-                    COALESCE(p.nationality, 'Unknown') as nationality,
-                    COUNT(*) as player_count,
-                    AVG(p.overall_rating) as avg_rating,
-                    SUM(p.acquisition_value) as total_spent,
-                    AVG(p.acquisition_value) as avg_cost
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                WHERE r.season_id = :season_id
-                GROUP BY p.nationality
-                HAVING COUNT(*) >= 3  -- Only show nationalities with 3+ players
-                ORDER BY player_count DESC, total_spent DESC
-                LIMIT 20
-            """), {'season_id': season_id})
-            nationality_breakdown = nationality_stats.fetchall()
-            
-            # Technical vs Physical players
-            player_styles = conn.execute(text("""
-                SELECT 
-                    p.id, p.name, p.position, p.overall_rating,
-                    p.offensive_awareness, p.ball_control, p.dribbling, p.finishing,
-                    p.speed, p.physical_contact, p.defensive_awareness, p.tackling,
-                    t.name as current_team,
-                    -- Technical score (average of technical attributes)
-                    (COALESCE(p.offensive_awareness, 0) + COALESCE(p.ball_control, 0) + 
-                     COALESCE(p.dribbling, 0) + COALESCE(p.finishing, 0)) / 4.0 as technical_score,
-                    -- Physical score (average of physical attributes)
-                    (COALESCE(p.speed, 0) + COALESCE(p.physical_contact, 0) + 
-                     COALESCE(p.defensive_awareness, 0) + COALESCE(p.tackling, 0)) / 4.0 as physical_score
-                FROM player p
-                JOIN round r ON p.round_id = r.id
-                JOIN team t ON p.team_id = t.id
-                WHERE r.season_id = :season_id AND p.overall_rating > 75
-                ORDER BY p.overall_rating DESC
-                LIMIT 30
-            """), {'season_id': season_id})
-            player_attributes = player_styles.fetchall()
+            # Award candidates and breakdowns are precomputed when rounds finalize
+            leaderboards = SeasonStatsStore.get_leaderboards(conn, season_id)
+            golden_boot_candidates = leaderboards['golden_boot_candidates']
+            golden_glove_candidates = leaderboards['golden_glove_candidates']
+            golden_ball_candidates = leaderboards['golden_ball_candidates']
+            expensive_signings = leaderboards['expensive_signings']
+            value_signings = leaderboards['value_signings']
+            position_breakdown = leaderboards['position_breakdown']
+            nationality_breakdown = leaderboards['nationality_breakdown']
+            player_attributes = leaderboards['player_attributes']
             
             return render_template('admin/season_player_stats.html',
                                  season=season,
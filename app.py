@@ -1,4 +1,6 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, send_from_directory, session, make_response, Response, current_app
+# Imported first so the startup profile covers every other import
+from startup_profile import mark as mark_startup, init_startup_profile
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, send_from_directory, session, make_response, Response, current_app, abort
 from werkzeug.utils import secure_filename
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from models import db, User, Team, Player, Round, Bid, Tiebreaker, TeamTiebreaker, PasswordResetRequest, AuctionSettings, BulkBidTiebreaker, BulkBidRound, BulkBid, TeamBulkTiebreaker
@@ -8,13 +10,12 @@ from werkzeug.security import generate_password_hash
 import json
 from datetime import datetime, timedelta, timezone
 import sqlite3
-import pandas as pd
 import io
 from flask_migrate import Migrate
 import os
 import base64
 import uuid
-from sqlalchemy import func, text
+from sqlalchemy import func, text, case
 import time
 from team_management_routes import team_management
 try:
@@ -24,10 +25,6 @@ try:
     ADMIN_ROUTES_AVAILABLE = True
 except ImportError:
     ADMIN_ROUTES_AVAILABLE = False
-from bs4 import BeautifulSoup
-import re
-from github_service import github_service
-from imagekit_service import imagekit_service
 
 # Import compression for ultra-fast responses
 try:
@@ -37,6 +34,27 @@ except ImportError:
     COMPRESSION_AVAILABLE = False
 
 from season_context import SeasonContext, season_aware, get_current_season_id, get_user_current_team
+from season_stats import SeasonStatsStore
+from standings_store import StandingsStore
+from round_finalizer import run_pass
+from result_documents import ResultDocuments, RESULT_CACHE_CONTROLS, FILE_CACHE_CONTROL, conditional_page, templates_stamp
+from bulk_round_counters import BulkRoundCounters
+from team_rosters import TeamRosters
+from auction_pool import AuctionPool, parse_rule
+from round_rollback import RoundRollback
+from purges import Purges
+from db_routing import init_db_routing
+from green_db import init_green_db
+from realtime import init_realtime, socketio, RealtimeEvents
+from assets import init_assets
+from fragment_cache import init_fragment_cache
+from page_queries import init_page_queries
+from offload import init_offload, run_in_process
+from cpu_jobs import HEADER_FORMAT, XLSX_MIMETYPE, Sheet, build_workbook, encode_event, improve_accessibility
+from availability_index import (
+    MARK_STARRED, availability_index, init_availability_index, load_players, round_scope, team_marks,
+)
+from remember_me import COOKIE_NAME as REMEMBER_COOKIE, REMEMBER_DAYS, issue_remember_token, load_user_from_remember_token
 from template_helpers import get_current_season, get_user_team_in_season, format_season_name, is_continuing_team, get_team_lineage_display
 
 # Import performance optimizations (optional)
@@ -82,6 +100,8 @@ except ImportError:
     
     PERFORMANCE_OPTIMIZATIONS_AVAILABLE = False
 
+mark_startup('imports')
+
 app = Flask(__name__)
 app.config.from_object(Config)
 
@@ -111,11 +131,20 @@ app.register_blueprint(registration_bp)
 app.register_blueprint(history_bp)
 
 
+init_green_db(app)
 db.init_app(app)
+init_db_routing(app)
+init_realtime(app)
+init_assets(app)
+init_fragment_cache(app)
+init_page_queries(app)
+init_offload(app)
+init_availability_index(app)
 migrate = Migrate(app, db)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
+mark_startup('extensions')
 
 # Season-aware template context processor
 @app.context_processor
@@ -156,6 +185,10 @@ if 'neon.tech' in app.config.get('SQLALCHEMY_DATABASE_URI', ''):
 # Storage service helper functions
 def get_best_logo_storage_service():
     """Get the best available logo storage service based on configuration and availability"""
+    # Deferred: the storage SDKs are only needed when a logo is uploaded
+    from github_service import github_service
+    from imagekit_service import imagekit_service
+    
     preferred = app.config.get('PREFERRED_LOGO_STORAGE', 'imagekit')
     
     if preferred == 'imagekit' and imagekit_service.is_configured():
@@ -238,8 +271,15 @@ def check_and_init_database():
         # We'll continue running - the app might still work for some functions
         pass
 
-# Perform runtime database check
-check_and_init_database()
+@app.cli.command('prepare-db')
+def prepare_db_command():
+    """Release step: deferred initialization and one-off DDL, kept off the import path"""
+    check_and_init_database()
+    
+    from ultra_performance import optimize_database_queries
+    with app.app_context():
+        optimize_database_queries(db)
+    print("Database prepared")
 
 # Add a before_request handler to prevent browser back button for authenticated users
 @app.before_request
@@ -257,76 +297,18 @@ def before_request():
 # Add an after_request handler to set cache control headers and improve accessibility
 @app.after_request
 def add_header(response):
-    # Prevent caching for authenticated users
-    if current_user.is_authenticated:
+    # Prevent caching for authenticated users, except finished results that set their own policy
+    if current_user.is_authenticated and response.headers.get('Cache-Control') not in RESULT_CACHE_CONTROLS:
         response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate, post-check=0, pre-check=0"
         response.headers["Pragma"] = "no-cache"
         response.headers["Expires"] = "0"
     
     # Add accessibility improvements for HTML responses
-    if response.content_type.startswith('text/html'):
+    if response.status_code != 304 and response.content_type.startswith('text/html'):
         try:
             html = response.get_data(as_text=True)
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # 1. Ensure all images have alt text
-            for img in soup.find_all('img'):
-                if not img.get('alt'):
-                    img['alt'] = ''  # Empty alt for decorative images
-            
-            # 2. Ensure all buttons have accessible labels
-            for button in soup.find_all('button'):
-                if not button.get('aria-label') and not button.text.strip():
-                    # If button has an SVG icon, add descriptive label
-                    if button.find('svg'):
-                        button['aria-label'] = 'Button'
-            
-            # 3. Add skip to content link for keyboard users if not present
-            if not soup.find(id='skip-to-content'):
-                skip_link = soup.new_tag('a')
-                skip_link['id'] = 'skip-to-content'
-                skip_link['href'] = '#main-content'
-                skip_link['class'] = 'sr-only focus:not-sr-only focus:absolute focus:top-0 focus:left-0 focus:z-50 focus:p-4 focus:bg-white focus:text-primary'
-                skip_link.string = 'Skip to main content'
-                
-                # Add to beginning of body
-                if soup.body:
-                    soup.body.insert(0, skip_link)
-            
-            # 4. Add focus styles to interactive elements without them
-            for elem in soup.select('a, button, input, select, textarea, [tabindex]:not([tabindex="-1"])'):
-                # Fix: Handle the case where class might be a string
-                elem_classes = elem.get('class', [])
-                if isinstance(elem_classes, str):
-                    elem_classes = elem_classes.split()
-                
-                if not any(cls.startswith('focus:') for cls in elem_classes):
-                    elem_classes.append('focus-outline')
-                    elem['class'] = elem_classes
-            
-            # 5. Ensure all form elements have associated labels
-            for input_elem in soup.find_all(['input', 'select', 'textarea']):
-                input_id = input_elem.get('id')
-                if input_id and not soup.find('label', attrs={'for': input_id}):
-                    # Try to find label within parent elements
-                    parent = input_elem.parent
-                    for i in range(3):  # Check up to 3 levels up
-                        if parent and parent.name == 'label':
-                            if not parent.get('for'):
-                                parent['for'] = input_id
-                            break
-                        if parent:
-                            parent = parent.parent
-            
-            # 6. Add role="main" to main content container if not present
-            main_content = soup.find(class_=re.compile('(main|container)'))
-            if main_content and not main_content.get('role'):
-                main_content['role'] = 'main'
-                if not main_content.get('id'):
-                    main_content['id'] = 'main-content'
-            
-            # Update response data with improved HTML
-            response.set_data(str(soup))
+            # The BeautifulSoup pass is pure Python, so it runs in an offload worker process
+            response.set_data(run_in_process(improve_accessibility, html))
             
         except Exception as e:
             # Log error but don't break the response
@@ -343,11 +325,10 @@ def check_remember_token():
     if current_user.is_authenticated:
         return
     
-    # Check for remember token in cookies
-    remember_token = request.cookies.get('remember_token')
+    # Check for remember token in cookies; forged or expired tokens are rejected without a query
+    remember_token = request.cookies.get(REMEMBER_COOKIE)
     if remember_token:
-        # Try to find user by token
-        user = User.get_by_remember_token(remember_token)
+        user = load_user_from_remember_token(remember_token)
         if user:
             # Log the user in
             login_user(user, remember=False)
@@ -446,19 +427,19 @@ def login():
         
         # If remember me is checked, generate and store a secure token
         if remember:
-            # Generate a new remember token
-            token = user.generate_remember_token(days=30)
+            # Sign a new token version; only the version is stored
+            token = issue_remember_token(user, days=REMEMBER_DAYS)
             # Save the changes to the database
             db.session.commit()
             
             # Set a persistent cookie with the token (30 days)
             from datetime import datetime, timedelta, timezone
             
-            max_age_seconds = 30 * 24 * 60 * 60  # 30 days in seconds
+            max_age_seconds = REMEMBER_DAYS * 24 * 60 * 60  # 30 days in seconds
             expires = datetime.now(timezone.utc) + timedelta(seconds=max_age_seconds)
             
             response.set_cookie(
-                'remember_token', 
+                REMEMBER_COOKIE, 
                 token, 
                 max_age=max_age_seconds,  # Primary method for persistence
                 expires=expires,          # Backup for older browsers
@@ -997,7 +978,7 @@ def edit_profile():
                 logout_user()
                 response = make_response(redirect(url_for('login')))
                 # Clear remember token cookie
-                response.set_cookie('remember_token', '', expires=0, httponly=True, samesite='Lax')
+                response.set_cookie(REMEMBER_COOKIE, '', expires=0, httponly=True, samesite='Lax')
                 return response
             else:
                 success_message = 'Profile updated successfully!'
@@ -1175,6 +1156,7 @@ def start_round():
             }, synchronize_session=False)
         
         db.session.commit()
+        RealtimeEvents.round_started(round)
         
         return jsonify({
             'success': True,
@@ -1220,6 +1202,7 @@ def update_round_timer(round_id):
     # Update the stored duration for backward compatibility
     round.duration = round.calculated_duration
     db.session.commit()
+    RealtimeEvents.round_timer_updated(round)
     
     return jsonify({
         'message': 'Round timer extended successfully',
@@ -1272,14 +1255,14 @@ def check_round_status(round_id):
         if isinstance(result, dict):
             status = result.get('status')
             if status == 'tiebreaker_needed' and not current_user.is_admin and current_user.team:
-                tiebreaker_id = result.get('tiebreaker_id')
-                # Optimized tiebreaker check
+                # Several ties can open at once; send the team to the first one it is in
                 team_in_tiebreaker = TeamTiebreaker.query.filter(
-                    TeamTiebreaker.tiebreaker_id == tiebreaker_id,
+                    TeamTiebreaker.tiebreaker_id.in_(result.get('tiebreaker_ids', [])),
                     TeamTiebreaker.team_id == current_user.team.id
-                ).first()
+                ).order_by(TeamTiebreaker.tiebreaker_id).first()
                 
                 if team_in_tiebreaker:
+                    tiebreaker_id = team_in_tiebreaker.tiebreaker_id
                     return jsonify({
                         'active': False,
                         'message': 'Round ended, tiebreaker needed',
@@ -1323,120 +1306,37 @@ def check_round_status(round_id):
     return jsonify(data)
 
 def finalize_round_internal(round_id):
-    """Internal function to finalize a round, can be called programmatically"""
-    round = Round.query.get(round_id)
-    if not round or not round.is_active:
+    """Internal function to finalize a round, can be called programmatically.
+
+    Runs one resumable pass (see round_finalizer): every bid that does not
+    hang on a tie is allocated and every independent tie gets its tiebreaker
+    at once.  Calling it again after a tiebreaker resolves picks up from the
+    round's checkpoint.
+    """
+    result = run_pass(round_id)
+    if result is None:
         return False
-    
-    # Check for existing tiebreakers that need resolution
-    existing_tiebreakers = Tiebreaker.query.filter_by(round_id=round_id, resolved=False).all()
-    if existing_tiebreakers:
-        # Cannot finalize until tiebreakers are resolved
-        return {"status": "tiebreaker_pending", "tiebreakers": [t.id for t in existing_tiebreakers]}
-    
-    # Get all bids for this round
-    all_bids = Bid.query.filter_by(round_id=round_id).all()
-    
-    # Count bids per team
-    team_bid_counts = {}
-    for bid in all_bids:
-        team_bid_counts[bid.team_id] = team_bid_counts.get(bid.team_id, 0) + 1
-    
-    # Only consider teams that placed exactly the required number of bids
-    valid_team_ids = [team_id for team_id, count in team_bid_counts.items() 
-                      if count == round.max_bids_per_team]
-    
-    # Filter bids to only include those from valid teams
-    valid_bids = [bid for bid in all_bids if bid.team_id in valid_team_ids]
-    
-    # Start processing only the valid bids
-    return process_bids_with_tiebreaker_check(round_id, valid_bids)
 
-def process_bids_with_tiebreaker_check(round_id, bids):
-    """Process bids in descending order, checking for ties and creating tiebreakers if needed"""
-    round = Round.query.get(round_id)
-    allocated_teams = set()
-    allocated_players = set()
-    
-    # Continue processing while there are bids
-    while bids:
-        # Sort bids in descending order
-        bids.sort(key=lambda x: x.amount, reverse=True)
-        
-        # Get highest bid amount
-        highest_bid_amount = bids[0].amount
-        
-        # Find all bids with the highest amount (could be just one or multiple if tied)
-        highest_bids = [bid for bid in bids if bid.amount == highest_bid_amount]
-        
-        # If there's a tie and multiple teams bidding for the same player
-        if len(highest_bids) > 1 and len(set(bid.player_id for bid in highest_bids)) == 1:
-            player_id = highest_bids[0].player_id
-            tied_team_ids = [bid.team_id for bid in highest_bids]
-            
-            # Create a tiebreaker for this tie
-            tiebreaker = Tiebreaker(
-                round_id=round_id,
-                player_id=player_id,
-                original_amount=highest_bid_amount,
-                resolved=False
-            )
-            db.session.add(tiebreaker)
-            db.session.commit()
-            
-            # Add all tied teams to the tiebreaker
-            for team_id in tied_team_ids:
-                team_tiebreaker = TeamTiebreaker(
-                    tiebreaker_id=tiebreaker.id,
-                    team_id=team_id,
-                    new_amount=None  # Will be set during tiebreaker resolution
-                )
-                db.session.add(team_tiebreaker)
-            
-            db.session.commit()
-            
-            # Return status indicating tiebreaker needed
-            round.status = "processing"  # Update round status to processing
-            db.session.commit()
-            return {"status": "tiebreaker_needed", "tiebreaker_id": tiebreaker.id}
-        
-        # No tie for highest bid, proceed with allocation
-        highest_bid = highest_bids[0]
-        
-        # Only allocate if both team and player haven't been allocated yet
-        if highest_bid.team_id not in allocated_teams and highest_bid.player_id not in allocated_players:
-            team = Team.query.get(highest_bid.team_id)
-            player = Player.query.get(highest_bid.player_id)
-            
-            # Check if adding this player would exceed team's player limit
-            team_player_count = Player.query.filter_by(team_id=team.id).count()
-            if team_player_count >= Config.MAX_PLAYERS_PER_TEAM:
-                # Skip this bid as team is already at max capacity
-                bids.remove(highest_bid)
-                continue
-            
-            team.balance -= highest_bid.amount
-            player.team_id = team.id
-            player.acquisition_value = highest_bid.amount  # Set acquisition value to winning bid amount
-            
-            allocated_teams.add(team.id)
-            allocated_players.add(player.id)
-            
-            # Remove all bids for this player and this team
-            bids = [bid for bid in bids if bid.player_id != highest_bid.player_id and bid.team_id != highest_bid.team_id]
-        else:
-            # This highest bid cannot be allocated (team or player already used)
-            # Remove it and continue with next highest
-            bids.remove(highest_bid)
-    
-    # All bids processed successfully
-    round.is_active = False
-    round.status = "completed"
-    db.session.commit()
-    
-    # Notifications have been removed
-            
-    return {"status": "success"}
+    if result.balances:
+        RealtimeEvents.balances_changed(result.balances)
+    for tiebreaker_id, team_ids in result.new_tiebreakers:
+        RealtimeEvents.tiebreaker_created(tiebreaker_id, round_id, team_ids)
+
+    if result.completed:
+        # Fold this round into the season statistics summaries
+        SeasonStatsStore.refresh_round(round_id)
+        StandingsStore.refresh_round(round_id)
+        ResultDocuments.compile_round(round_id)
+        RealtimeEvents.round_finalized(round_id, "success")
+        return {"status": "success"}
+
+    if result.new_tiebreakers:
+        new_ids = [tiebreaker_id for tiebreaker_id, _ in result.new_tiebreakers]
+        RealtimeEvents.round_finalized(round_id, "tiebreaker_needed", tiebreaker_id=new_ids[0])
+        return {"status": "tiebreaker_needed", "tiebreaker_id": new_ids[0], "tiebreaker_ids": new_ids}
+
+    # Cannot finalize until the open tiebreakers are resolved
+    return {"status": "tiebreaker_pending", "tiebreakers": result.open_tiebreakers}
 
 @app.route('/finalize_round/<int:round_id>', methods=['POST'])
 @login_required
@@ -1456,10 +1356,10 @@ def finalize_round(round_id):
         if status == "success":
             return jsonify({'message': 'Round finalized successfully'})
         elif status == "tiebreaker_needed":
-            tiebreaker_id = result.get("tiebreaker_id")
             return jsonify({
                 'message': 'Tiebreaker needed',
-                'tiebreaker_id': tiebreaker_id
+                'tiebreaker_id': result.get("tiebreaker_id"),
+                'tiebreaker_ids': result.get("tiebreaker_ids")
             }), 202  # Accepted but processing
         elif status == "tiebreaker_pending":
             tiebreakers = result.get("tiebreakers")
@@ -1470,6 +1370,15 @@ def finalize_round(round_id):
     
     return jsonify({'error': 'Failed to finalize round'}), 500
 
+def publish_bid_counts(round_id, team_id):
+    """Push a round's bid counts (never amounts) after a bid is placed or deleted"""
+    total_bids, teams_bid, team_bids = db.session.query(
+        func.count(Bid.id),
+        func.count(func.distinct(Bid.team_id)),
+        func.coalesce(func.sum(case((Bid.team_id == team_id, 1), else_=0)), 0)
+    ).filter(Bid.round_id == round_id).one()
+    RealtimeEvents.bid_count_changed(round_id, team_id, team_bids, total_bids, teams_bid)
+
 @app.route('/place_bid', methods=['POST'])
 @login_required
 def place_bid():
@@ -1521,7 +1430,9 @@ def place_bid():
         amount=amount
     )
     db.session.add(bid)
+    TeamRosters.record_bid(team.id, 1)
     db.session.commit()
+    publish_bid_counts(round_id, team.id)
     
     return jsonify({'message': 'Bid placed successfully', 'bid': bid.to_dict()})
 
@@ -1559,8 +1470,13 @@ def delete_bid(bid_id):
         # Allow deletion for cleanup of stale bids
         print(f"Allowing deletion of stale bid {bid_id} from inactive round {round_id}")
     
+    if bid.round.is_active:
+        TeamRosters.record_bid(bid.team_id, -1)
+    else:
+        TeamRosters.record_finished_bid(bid.team_id, -1)
     db.session.delete(bid)
     db.session.commit()
+    publish_bid_counts(round_id, current_user.team.id)
     
     return jsonify({'message': 'Bid deleted successfully', 'bid_id': bid_id, 'player_id': player_id, 'round_id': round_id})
 
@@ -1588,7 +1504,7 @@ def logout():
     response = make_response(redirect(url_for('index')))
     
     # Remove the remember_token cookie
-    response.delete_cookie('remember_token')
+    response.delete_cookie(REMEMBER_COOKIE)
     
     # Tell service worker to clear cache
     response.headers['Clear-Site-Data'] = '"cache", "cookies"'
@@ -1668,6 +1584,15 @@ def submit_tiebreaker_bid():
     if team_tiebreaker.new_amount is not None:
         return jsonify({'error': 'You have already submitted a bid for this tiebreaker. Only one bid per team is allowed in normal tiebreakers.'}), 400
     
+    # The new amount replaces this bid's, so it must not equal another of the team's bids in the round
+    if Bid.query.filter(
+        Bid.round_id == tiebreaker.round_id,
+        Bid.team_id == current_user.team.id,
+        Bid.player_id != tiebreaker.player_id,
+        Bid.amount == new_amount
+    ).first():
+        return jsonify({'error': f'You already have another bid of {new_amount} in this round; choose a different amount'}), 400
+    
     # Update the team's tiebreaker bid
     team_tiebreaker.new_amount = new_amount
     db.session.commit()
@@ -1675,13 +1600,19 @@ def submit_tiebreaker_bid():
     # Check if all teams have submitted new bids
     all_team_tiebreakers = TeamTiebreaker.query.filter_by(tiebreaker_id=tiebreaker_id).all()
     all_submitted = all(tt.new_amount is not None for tt in all_team_tiebreakers)
+    RealtimeEvents.tiebreaker_updated(
+        tiebreaker.id,
+        sum(1 for tt in all_team_tiebreakers if tt.new_amount is not None),
+        len(all_team_tiebreakers),
+        all_submitted
+    )
     
     if all_submitted:
         # All teams have submitted, resolve the tiebreaker
         tiebreaker.resolved = True
-        db.session.commit()
         
-        # Update the original bids with new amounts
+        # Update the original bids with new amounts in the same commit, so the
+        # next finalization pass never sees the tie resolved at its old amounts
         round_id = tiebreaker.round_id
         player_id = tiebreaker.player_id
         
@@ -1718,57 +1649,23 @@ def round_results(round_id):
         flash('Round is still active', 'warning')
         return redirect(url_for('team_round'))
     
-    # Get all players that were allocated in this round
-    allocated_players = Player.query.filter_by(round_id=round_id).filter(Player.team_id.isnot(None)).all()
-    
-    # Get all bids for this round to show the bidding history
-    all_bids = Bid.query.filter_by(round_id=round_id).all()
-    
-    # Create a structure to show results per player
-    player_results = []
-    for player in allocated_players:
-        # Get the winning bid
-        winning_bid = next((bid for bid in all_bids if bid.player_id == player.id and bid.team_id == player.team_id), None)
-        
-        # Get all bids for this player
-        player_bids = [bid for bid in all_bids if bid.player_id == player.id]
-        player_bids.sort(key=lambda x: x.amount, reverse=True)
-        
-        player_results.append({
-            'player': player,
-            'winning_team': player.team,
-            'winning_bid': winning_bid.amount if winning_bid else player.acquisition_value,
-            'all_bids': player_bids,
-            'was_tiebreaker': len([b for b in player_bids if b.amount == winning_bid.amount]) > 1 if winning_bid else False
-        })
-    
-    # Check if user's team participated in this round
-    user_participated = False
-    user_results = []
-    if current_user.team:
-        user_bids = [bid for bid in all_bids if bid.team_id == current_user.team.id]
-        user_participated = len(user_bids) > 0
-        
-        for bid in user_bids:
-            player = Player.query.get(bid.player_id)
-            result_type = 'won' if player and player.team_id == current_user.team.id else 'lost'
-            user_results.append({
-                'player': player,
-                'bid_amount': bid.amount,
-                'result': result_type,
-                'winning_team': player.team.name if player and player.team else 'Unknown',
-                'winning_amount': player.acquisition_value if player else 0
-            })
+    # Winners, bid ladders and the team's own outcomes come from the compiled results
+    results = ResultDocuments.view_round(round)
+    team_id = current_user.team.id if current_user.team else None
+    user_results = results.team_results(team_id) if team_id else []
     
     # Get active rounds to show navigation button
     active_rounds = Round.query.filter_by(is_active=True).all()
     
-    return render_template('round_results.html', 
-                          round=round,
-                          player_results=player_results,
-                          user_participated=user_participated,
-                          user_results=user_results,
-                          active_rounds=active_rounds)
+    return conditional_page(
+        results.etag and [results.etag, current_user.id, team_id, [r.id for r in active_rounds],
+                          templates_stamp('round_results.html')],
+        lambda: render_template('round_results.html',
+                                round=round,
+                                player_results=results.player_results(),
+                                user_participated=bool(user_results),
+                                user_results=user_results,
+                                active_rounds=active_rounds))
 
 @app.route('/check_tiebreaker_status/<int:tiebreaker_id>')
 @login_required
@@ -2076,114 +1973,65 @@ def admin_export_players():
         return redirect(url_for('dashboard'))
     
     try:
-        # Create a BytesIO object to store the Excel file
-        output = io.BytesIO()
+        # Get all players
+        players = Player.query.all()
         
-        # Create Excel writer object
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            # Get all players
-            players = Player.query.all()
-            
-            # Create a dictionary to store DataFrames for each position
-            position_dfs = {}
-            
-            # Process each player
-            for player in players:
-                # Create a dictionary with all player attributes
-                player_data = {
-                    'Name': player.name,
-                    'Position': player.position,
-                    'Overall Rating': player.overall_rating,
-                    'Team': player.team.name if player.team else 'Free Agent',
-                    'Nationality': player.nationality,
-                    'Playing Style': player.playing_style,
-                    'Offensive Awareness': player.offensive_awareness,
-                    'Ball Control': player.ball_control,
-                    'Dribbling': player.dribbling,
-                    'Tight Possession': player.tight_possession,
-                    'Low Pass': player.low_pass,
-                    'Lofted Pass': player.lofted_pass,
-                    'Finishing': player.finishing,
-                    'Heading': player.heading,
-                    'Set Piece Taking': player.set_piece_taking,
-                    'Curl': player.curl,
-                    'Speed': player.speed,
-                    'Acceleration': player.acceleration,
-                    'Kicking Power': player.kicking_power,
-                    'Jumping': player.jumping,
-                    'Physical Contact': player.physical_contact,
-                    'Balance': player.balance,
-                    'Stamina': player.stamina,
-                    'Defensive Awareness': player.defensive_awareness,
-                    'Tackling': player.tackling,
-                    'Aggression': player.aggression,
-                    'Defensive Engagement': player.defensive_engagement,
-                    'GK Awareness': player.gk_awareness,
-                    'GK Catching': player.gk_catching,
-                    'GK Parrying': player.gk_parrying,
-                    'GK Reflexes': player.gk_reflexes,
-                    'GK Reach': player.gk_reach
-                }
-                
-                # Add player data to the appropriate position DataFrame
-                if player.position not in position_dfs:
-                    position_dfs[player.position] = []
-                position_dfs[player.position].append(player_data)
-            
-            # Create and write each position sheet
-            for position, players_data in position_dfs.items():
-                df = pd.DataFrame(players_data)
-                df = df.sort_values('Overall Rating', ascending=False)
-                df.to_excel(writer, sheet_name=position, index=False)
-                
-                # Get the worksheet object
-                worksheet = writer.sheets[position]
-                
-                # Format the header row
-                header_format = writer.book.add_format({
-                    'bold': True,
-                    'bg_color': '#D3D3D3',
-                    'border': 1
-                })
-                
-                # Apply the format to the header row
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                
-                # Auto-adjust columns width
-                for idx, col in enumerate(df.columns):
-                    max_length = max(
-                        df[col].astype(str).apply(len).max(),
-                        len(col)
-                    )
-                    worksheet.set_column(idx, idx, max_length + 2)
-            
-            # Create an "All Players" sheet
-            all_players_data = []
-            for players_data in position_dfs.values():
-                all_players_data.extend(players_data)
-            
-            df_all = pd.DataFrame(all_players_data)
-            df_all = df_all.sort_values(['Position', 'Overall Rating'], ascending=[True, False])
-            df_all.to_excel(writer, sheet_name='All Players', index=False)
-            
-            # Format the "All Players" sheet
-            worksheet = writer.sheets['All Players']
-            for col_num, value in enumerate(df_all.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-            
-            for idx, col in enumerate(df_all.columns):
-                max_length = max(
-                    df_all[col].astype(str).apply(len).max(),
-                    len(col)
-                )
-                worksheet.set_column(idx, idx, max_length + 2)
+        # Rows for each position sheet
+        position_rows = {}
         
-        # Prepare the response
-        output.seek(0)
+        # Process each player
+        for player in players:
+            # Create a dictionary with all player attributes
+            player_data = {
+                'Name': player.name,
+                'Position': player.position,
+                'Overall Rating': player.overall_rating,
+                'Team': player.team.name if player.team else 'Free Agent',
+                'Nationality': player.nationality,
+                'Playing Style': player.playing_style,
+                'Offensive Awareness': player.offensive_awareness,
+                'Ball Control': player.ball_control,
+                'Dribbling': player.dribbling,
+                'Tight Possession': player.tight_possession,
+                'Low Pass': player.low_pass,
+                'Lofted Pass': player.lofted_pass,
+                'Finishing': player.finishing,
+                'Heading': player.heading,
+                'Set Piece Taking': player.set_piece_taking,
+                'Curl': player.curl,
+                'Speed': player.speed,
+                'Acceleration': player.acceleration,
+                'Kicking Power': player.kicking_power,
+                'Jumping': player.jumping,
+                'Physical Contact': player.physical_contact,
+                'Balance': player.balance,
+                'Stamina': player.stamina,
+                'Defensive Awareness': player.defensive_awareness,
+                'Tackling': player.tackling,
+                'Aggression': player.aggression,
+                'Defensive Engagement': player.defensive_engagement,
+                'GK Awareness': player.gk_awareness,
+                'GK Catching': player.gk_catching,
+                'GK Parrying': player.gk_parrying,
+                'GK Reflexes': player.gk_reflexes,
+                'GK Reach': player.gk_reach
+            }
+            
+            # Add player data to the appropriate position sheet
+            position_rows.setdefault(player.position, []).append(player_data)
+        
+        # A sheet per position, best first, then every player by position
+        sheets = [Sheet(position, rows, sort_by='Overall Rating', ascending=False, header_format=HEADER_FORMAT)
+                  for position, rows in position_rows.items()]
+        sheets.append(Sheet('All Players', [row for rows in position_rows.values() for row in rows],
+                            sort_by=['Position', 'Overall Rating'], ascending=[True, False],
+                            header_format=HEADER_FORMAT))
+        
+        # pandas/xlsxwriter run in an offload worker process, off the hub
+        output = io.BytesIO(run_in_process(build_workbook, sheets))
         return send_file(
             output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            mimetype=XLSX_MIMETYPE,
             as_attachment=True,
             download_name='players_export.xlsx'
         )
@@ -2228,6 +2076,7 @@ def admin_edit_player(player_id):
     
     player = Player.query.get_or_404(player_id)
     data = request.json
+    previous = (player.team_id, player.position, player.acquisition_value)
     
     player.name = data.get('name', player.name)
     player.position = data.get('position', player.position)
@@ -2249,6 +2098,13 @@ def admin_edit_player(player_id):
     # Set the team_id
     player.team_id = new_team_id
     
+    # Admin edits move players without charging or refunding anyone
+    if previous != (player.team_id, player.position, player.acquisition_value):
+        if previous[0] is not None:
+            TeamRosters.remove_player(previous[0], previous[1], previous[2], refunded=0)
+        if player.team_id is not None:
+            TeamRosters.add_player(player.team_id, player.position, player.acquisition_value, spent=0)
+    
     db.session.commit()
     
     return jsonify({'message': 'Player updated successfully'})
@@ -2268,6 +2124,10 @@ def admin_delete_player(player_id):
             return jsonify({'error': 'Cannot delete player that is part of an active round'}), 400
     
     # Delete associated bids
+    affected_teams = {team_id for team_id, in db.session.query(Bid.team_id).filter_by(player_id=player_id)}
+    if player.team_id is not None:
+        affected_teams.add(player.team_id)
+    TeamRosters.invalidate(affected_teams)
     Bid.query.filter_by(player_id=player_id).delete()
     
     # Delete associated tiebreakers
@@ -2291,13 +2151,6 @@ def export_team_squad(team_id):
         flash('You do not have permission to export this team data')
         return redirect(url_for('dashboard'))
     
-    try:
-        import pandas as pd
-        import io
-    except ImportError:
-        flash('Required libraries not available')
-        return redirect(url_for('admin_teams' if current_user.is_admin else 'dashboard'))
-    
     # Get team players
     players = Player.query.filter_by(team_id=team_id).all()
     
@@ -2316,40 +2169,21 @@ def export_team_squad(team_id):
         flash('No players found for this team')
         return redirect(url_for('admin_teams' if current_user.is_admin else 'dashboard'))
     
-    df = pd.DataFrame(players_data)
-    
-    # Create an Excel file with position sheets
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # All players sheet
-        df.to_excel(writer, sheet_name='All Players', index=False)
-        
-        # Position sheets
-        for position in Config.POSITIONS:
-            position_df = df[df['Position'] == position]
-            if not position_df.empty:
-                position_df.to_excel(writer, sheet_name=position, index=False)
-        
-        # Format the header
-        workbook = writer.book
-        header_format = workbook.add_format({
-            'bold': True,
-            'bg_color': '#D9EAD3',
-            'border': 1
-        })
-        
-        # Apply formatting to all sheets
-        for sheet_name in writer.sheets:
-            worksheet = writer.sheets[sheet_name]
-            for col_num, value in enumerate(df.columns.values):
-                worksheet.write(0, col_num, value, header_format)
-                worksheet.set_column(col_num, col_num, max(len(value) + 2, 12))
+    # All players, then a sheet per position
+    squad_format = dict(HEADER_FORMAT, bg_color='#D9EAD3')
+    sheets = [Sheet('All Players', players_data, header_format=squad_format, width='header')]
+    sheets.extend(Sheet(position, [row for row in players_data if row['Position'] == position],
+                        header_format=squad_format, width='header') for position in Config.POSITIONS)
     
-    output.seek(0)
+    try:
+        output = io.BytesIO(run_in_process(build_workbook, sheets))
+    except ImportError:
+        flash('Required libraries not available')
+        return redirect(url_for('admin_teams' if current_user.is_admin else 'dashboard'))
     
     return send_file(
         output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        mimetype=XLSX_MIMETYPE,
         as_attachment=True,
         download_name=f'{team.name}_Squad.xlsx'
     )
@@ -2383,59 +2217,18 @@ def admin_round_detail(round_id):
     
     round = Round.query.get_or_404(round_id)
     
-    # Get all teams to track bids across teams
-    teams = Team.query.all()
-    
-    # Get all bids for this round
-    bids = Bid.query.filter_by(round_id=round_id).all()
+    # Finished rounds render from their compiled results; active ones are built per request
+    results = ResultDocuments.view_round(round)
+    teams = [results.team(team_id) for team_id in sorted(results.teams)]
     
-    # Get cancelled teams (teams that didn't place exactly the required number of bids)
-    team_bid_counts = {}
-    for bid in bids:
-        team_bid_counts[bid.team_id] = team_bid_counts.get(bid.team_id, 0) + 1
-    
-    cancelled_teams = []
-    for team_id, count in team_bid_counts.items():
-        if count != round.max_bids_per_team:
-            team = Team.query.get(team_id)
-            cancelled_teams.append({
-                'team': team,
-                'bid_count': count,
-                'required_count': round.max_bids_per_team
-            })
-    
-    # Organize bids by player and team
-    bids_by_player = {}
-    for player in round.players:
-        bids_by_player[player.id] = {
-            'player': player,
-            'winning_bid': None,
-            'bids': [],
-            'team_bids': {team.id: None for team in teams}
-        }
-    
-    # Fill in the bid data
-    for bid in bids:
-        if bid.player_id in bids_by_player:
-            bids_by_player[bid.player_id]['bids'].append(bid)
-            bids_by_player[bid.player_id]['team_bids'][bid.team_id] = bid
-            
-            # Check if this is the winning bid
-            player = Player.query.get(bid.player_id)
-            if player.team_id == bid.team_id:
-                bids_by_player[bid.player_id]['winning_bid'] = bid
-                
-                # Ensure acquisition value is set if not already (for backward compatibility)
-                if player.acquisition_value is None:
-                    player.acquisition_value = bid.amount
-                    db.session.commit()
-    
-    return render_template('admin_round_detail.html',
-                          round=round,
-                          teams=teams,
-                          bids_by_player=bids_by_player,
-                          cancelled_teams=cancelled_teams,
-                          config=Config)
+    return conditional_page(
+        results.etag and [results.etag, current_user.id, templates_stamp('admin_round_detail.html')],
+        lambda: render_template('admin_round_detail.html',
+                                round=round,
+                                teams=teams,
+                                bids_by_player=results.bids_by_player(),
+                                cancelled_teams=results.cancelled_teams(),
+                                config=Config))
 
 @app.route('/admin/export_round/<int:round_id>')
 @login_required
@@ -2445,102 +2238,67 @@ def admin_export_round(round_id):
         return redirect(url_for('dashboard'))
     
     round = Round.query.get_or_404(round_id)
+    results = ResultDocuments.view_round(round)
+    
+    # A finished round's workbook never changes, so a browser that has it keeps it
+    if results.etag and request.if_none_match.contains(f'{results.etag}-xlsx'):
+        response = Response(status=304)
+        response.set_etag(f'{results.etag}-xlsx')
+        response.headers['Cache-Control'] = FILE_CACHE_CONTROL
+        return response
     
     try:
-        # Create a BytesIO object to store the Excel file
-        output = io.BytesIO()
+        bids_by_player = results.bids_by_player()
         
-        # Create Excel writer object
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            # Get winning bids data
-            export_data = []
-            
-            for player in round.players:
-                # Find the winning bid for this player if it exists
-                winning_bid = None
-                for bid in player.bids:
-                    if bid.team_id == player.team_id:
-                        winning_bid = bid
-                        break
-                
-                if winning_bid:
-                    export_data.append({
-                        'Player': player.name,
-                        'Position': player.position,
-                        'Team': winning_bid.team.name,
-                        'Bid Amount': winning_bid.amount,
-                        'Overall Rating': player.overall_rating,
-                        'Nationality': player.nationality,
-                        'Playing Style': player.playing_style,
-                        'player_id': player.player_id,
-                        'team_id': player.team_id,
-                        'is_auction_eligible': player.is_auction_eligible
-                    })
-            
-            # Create dataframe and export to Excel
-            if export_data:
-                df = pd.DataFrame(export_data)
-                df.to_excel(writer, sheet_name='Winning Bids', index=False)
-                
-                # Format the worksheet
-                worksheet = writer.sheets['Winning Bids']
-                
-                # Add header format
-                header_format = writer.book.add_format({
-                    'bold': True,
-                    'bg_color': '#D3D3D3',
-                    'border': 1
+        # Get winning bids data
+        export_data = []
+        
+        for data in bids_by_player.values():
+            player, winning_bid = data['player'], data['winning_bid']
+            if winning_bid:
+                export_data.append({
+                    'Player': player['name'],
+                    'Position': player['position'],
+                    'Team': winning_bid['team']['name'],
+                    'Bid Amount': winning_bid['amount'],
+                    'Overall Rating': player['overall_rating'],
+                    'Nationality': player['nationality'],
+                    'Playing Style': player['playing_style'],
+                    'player_id': player['player_id'],
+                    'team_id': player['team_id'],
+                    'is_auction_eligible': player['is_auction_eligible']
                 })
-                
-                # Apply the format to the header row
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                
-                # Auto-adjust column width
-                for idx, col in enumerate(df.columns):
-                    max_length = max(
-                        df[col].astype(str).apply(len).max(),
-                        len(col)
-                    )
-                    worksheet.set_column(idx, idx, max_length + 2)
-                
-                # Create a sheet for all bids
-                all_bids_data = []
-                for player in round.players:
-                    for bid in player.bids:
-                        all_bids_data.append({
-                            'Player': player.name,
-                            'Position': player.position,
-                            'Team': bid.team.name,
-                            'Bid Amount': bid.amount,
-                            'Timestamp': bid.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                            'Status': 'Won' if bid.team_id == player.team_id else 'Lost'
-                        })
-                
-                if all_bids_data:
-                    df_all = pd.DataFrame(all_bids_data)
-                    df_all.to_excel(writer, sheet_name='All Bids', index=False)
-                    
-                    # Format the All Bids worksheet
-                    worksheet = writer.sheets['All Bids']
-                    for col_num, value in enumerate(df_all.columns.values):
-                        worksheet.write(0, col_num, value, header_format)
-                    
-                    for idx, col in enumerate(df_all.columns):
-                        max_length = max(
-                            df_all[col].astype(str).apply(len).max(),
-                            len(col)
-                        )
-                        worksheet.set_column(idx, idx, max_length + 2)
-            
-        # Prepare the response
-        output.seek(0)
-        return send_file(
+        
+        # A sheet for all bids, written only alongside the winning bids
+        all_bids_data = []
+        if export_data:
+            for data in bids_by_player.values():
+                player = data['player']
+                for bid in data['bids']:
+                    all_bids_data.append({
+                        'Player': player['name'],
+                        'Position': player['position'],
+                        'Team': bid['team']['name'],
+                        'Bid Amount': bid['amount'],
+                        'Timestamp': bid['timestamp'].strftime('%Y-%m-%d %H:%M:%S') if bid['timestamp'] else '',
+                        'Status': 'Won' if bid['team_id'] == player['team_id'] else 'Lost'
+                    })
+        
+        sheets = [Sheet('Winning Bids', export_data, header_format=HEADER_FORMAT),
+                  Sheet('All Bids', all_bids_data, header_format=HEADER_FORMAT)]
+        
+        # pandas/xlsxwriter run in an offload worker process, off the hub
+        output = io.BytesIO(run_in_process(build_workbook, sheets))
+        response = send_file(
             output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            mimetype=XLSX_MIMETYPE,
             as_attachment=True,
             download_name=f'round_{round_id}_{round.position}_results.xlsx'
         )
+        if results.etag:
+            response.set_etag(f'{results.etag}-xlsx')
+            response.headers['Cache-Control'] = FILE_CACHE_CONTROL
+        return response
     
     except ImportError:
         flash('Required packages (pandas, xlsxwriter) are not installed')
@@ -2560,66 +2318,20 @@ def admin_delete_round(round_id):
     if round.is_active:
         return jsonify({'error': 'Cannot delete an active round. Please finalize it first.'}), 400
     
+    # ?dry_run=1 reports what the deletion would release and refund without writing
+    if request.args.get('dry_run') == '1':
+        report = RoundRollback.round_report(round_id)
+        return jsonify(dict(report._asdict(), dry_run=True))
+    
     try:
-        # Get all players allocated in this round
-        players_in_round = Player.query.filter_by(round_id=round_id).all()
-        allocated_players = []
-        refunded_amount = 0
-        
-        # Step 1: Handle player allocations and refunds
-        for player in players_in_round:
-            # Check if player has a winning bid in this round
-            winning_bid = Bid.query.filter_by(
-                player_id=player.id, 
-                round_id=round_id, 
-                team_id=player.team_id
-            ).first()
-            
-            if winning_bid:
-                allocated_players.append(player)
-                
-                # Refund the team
-                team = Team.query.get(player.team_id)
-                if team and player.acquisition_value:
-                    team.balance += player.acquisition_value
-                    refunded_amount += player.acquisition_value
-            
-            # Reset player's team and round association (remove foreign key reference)
-            player.team_id = None
-            player.acquisition_value = None
-            player.round_id = None
-        
-        # Step 2: Clean up all tiebreaker-related records (handle nested foreign keys)
-        tiebreakers = Tiebreaker.query.filter_by(round_id=round_id).all()
-        for tiebreaker in tiebreakers:
-            # First delete team_tiebreaker records that reference this tiebreaker
-            TeamTiebreaker.query.filter_by(tiebreaker_id=tiebreaker.id).delete()
-        
-        # Now delete the tiebreaker records themselves
-        Tiebreaker.query.filter_by(round_id=round_id).delete()
-        
-        # Step 3: Delete all bids for this round
-        bid_count = Bid.query.filter_by(round_id=round_id).count()
-        Bid.query.filter_by(round_id=round_id).delete()
-        
-        # Step 4: Ensure all players are released from this round (safety check)
-        remaining_players = Player.query.filter_by(round_id=round_id).all()
-        for player in remaining_players:
-            player.round_id = None
-        
-        # Step 5: Now safely delete the round
-        db.session.delete(round)
-        
-        # Commit all changes
+        # Release and refund every allocation, then delete the bids, tiebreakers and round set-wise
+        season_id = round.season_id
+        report = RoundRollback.rollback_round(round_id)
         db.session.commit()
         
-        return jsonify({
-            'message': 'Round deleted successfully',
-            'released_players': len(allocated_players),
-            'refunded_amount': refunded_amount,
-            'deleted_bids': bid_count,
-            'deleted_tiebreakers': len(tiebreakers)
-        })
+        SeasonStatsStore.remove_round(round_id, season_id)
+        
+        return jsonify(dict(report._asdict(), message='Round deleted successfully'))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to delete round: {str(e)}'}), 500
@@ -2631,52 +2343,18 @@ def admin_teams():
         flash('You do not have permission to access this page')
         return redirect(url_for('dashboard'))
     
-    # Get all teams with their data
-    teams = Team.query.all()
-    teams_data = []
-    
-    for team in teams:
-        # Get players for this team
-        players = Player.query.filter_by(team_id=team.id).all()
-        
-        # Calculate position counts
-        position_counts = {position: 0 for position in Config.POSITIONS}
-        for player in players:
-            if player.position in position_counts:
-                position_counts[player.position] += 1
-        
-        # Calculate total team value
-        total_team_value = sum(player.acquisition_value for player in players if player.acquisition_value)
-        
-        # Get players by position
-        players_by_position = {}
-        for position in Config.POSITIONS:
-            players_by_position[position] = [p for p in players if p.position == position]
-        
-        # Get bid counts
-        active_bids_count = Bid.query.join(Player).filter(
-            Bid.team_id == team.id,
-            Player.round_id != None,
-            Player.team_id != team.id
-        ).count()
-        
-        completed_bids_count = Bid.query.filter_by(team_id=team.id).count()
-        
-        # Get username if associated with a user
-        has_user = team.user_id is not None
-        username = team.user.username if has_user else ""
-        
-        teams_data.append({
-            'team': team,
-            'total_players': len(players),
-            'position_counts': position_counts,
-            'total_team_value': total_team_value,
-            'players_by_position': players_by_position,
-            'active_bids_count': active_bids_count,
-            'completed_bids_count': completed_bids_count,
-            'has_user': has_user,
-            'username': username
-        })
+    # Squad and bid totals of every team in one query
+    teams_data = TeamRosters.team_rows()
+    
+    # Get players by position for the detail panels
+    players_by_team = {}
+    for player in Player.query.filter(Player.team_id.isnot(None)).order_by(Player.id):
+        players_by_team.setdefault(player.team_id, []).append(player)
+    for team_data in teams_data:
+        players = players_by_team.get(team_data['team'].id, [])
+        team_data['players_by_position'] = {
+            position: [p for p in players if p.position == position] for position in Config.POSITIONS
+        }
     
     return render_template('admin_teams.html', teams=teams_data, config=Config)
 
@@ -2686,48 +2364,11 @@ def admin_teams_update():
     if not current_user.is_admin or not request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Get all teams with their data
-    teams = Team.query.all()
+    # Squad and bid totals of every team in one query
     teams_data = []
-    
-    for team in teams:
-        # Get players for this team
-        players = Player.query.filter_by(team_id=team.id).all()
-        
-        # Calculate position counts
-        position_counts = {position: 0 for position in Config.POSITIONS}
-        for player in players:
-            if player.position in position_counts:
-                position_counts[player.position] += 1
-        
-        # Calculate total team value
-        total_team_value = sum(player.acquisition_value for player in players if player.acquisition_value)
-        
-        # Get bid counts
-        active_bids_count = Bid.query.join(Player).filter(
-            Bid.team_id == team.id,
-            Player.round_id != None,
-            Player.team_id != team.id
-        ).count()
-        
-        completed_bids_count = Bid.query.filter_by(team_id=team.id).count()
-        
-        # Get username if associated with a user
-        has_user = team.user_id is not None
-        username = team.user.username if has_user else ""
-        
-        teams_data.append({
-            'id': team.id,
-            'name': team.name,
-            'balance': team.balance,
-            'total_players': len(players),
-            'position_counts': position_counts,
-            'total_team_value': total_team_value,
-            'active_bids_count': active_bids_count,
-            'completed_bids_count': completed_bids_count,
-            'has_user': has_user,
-            'username': username
-        })
+    for row in TeamRosters.team_rows():
+        team = row.pop('team')
+        teams_data.append(dict(row, id=team.id, name=team.name, balance=team.balance))
     
     # Render the teams list as HTML
     teams_html = render_template('partials/teams_list.html', 
@@ -2735,7 +2376,7 @@ def admin_teams_update():
                                config=Config)
     
     return jsonify({
-        'teams_count': len(teams),
+        'teams_count': len(teams_data),
         'teams_html': teams_html
     })
 
@@ -2859,16 +2500,9 @@ def delete_user(user_id):
         return redirect(url_for('admin_users'))
     
     try:
-        # Delete associated password reset requests first
-        PasswordResetRequest.query.filter_by(user_id=user.id).delete()
-        
-        # Delete the user's team if it exists
-        if user.team:
-            db.session.delete(user.team)
-        
-        # Delete the user
+        # Delete the user with their team, its bids and their password reset requests
         username = user.username  # Store username before deletion
-        db.session.delete(user)
+        Purges.delete_user(user.id)
         db.session.commit()
         
         # Handle AJAX requests
@@ -2998,6 +2632,7 @@ def admin_add_team():
     if logo_storage_type == 'github' and github_logo_sha:
         try:
             # Re-upload with correct team ID
+            from github_service import github_service
             logo_file.seek(0)
             github_result = github_service.upload_team_logo(
                 team.id,
@@ -3237,40 +2872,25 @@ def admin_delete_team(team_id):
     if not current_user.is_admin:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    team = Team.query.get_or_404(team_id)
+    # Existence only: Purges.delete_team deletes with core statements, so no Team is loaded into the session
+    if not db.session.query(Team.query.filter_by(id=team_id).exists()).scalar():
+        abort(404)
     
     # Check if team has players
-    players = Player.query.filter_by(team_id=team_id).all()
-    if players:
+    if db.session.query(Player.query.filter_by(team_id=team_id).exists()).scalar():
         return jsonify({'error': 'Cannot delete team with players. Please remove all players first.'}), 400
     
     # Check if team has active bids
     active_bids = Bid.query.join(Player).filter(
         Bid.team_id == team_id,
         Player.round_id != None
-    ).all()
+    ).exists()
     
-    if active_bids:
+    if db.session.query(active_bids).scalar():
         return jsonify({'error': 'Cannot delete team with active bids'}), 400
     
-    # Check if team is associated with a user
-    if team.user_id:
-        # Option 1: Prevent deletion if team has a user
-        # return jsonify({'error': 'Cannot delete team that is associated with a user'}), 400
-        
-        # Option 2: Remove the team association from the user
-        user = User.query.get(team.user_id)
-        if user:
-            user.team_id = None
-    
-    # Delete bids made by this team
-    Bid.query.filter_by(team_id=team_id).delete()
-    
-    # Delete team tiebreakers
-    TeamTiebreaker.query.filter_by(team_id=team_id).delete()
-    
-    # Delete the team
-    db.session.delete(team)
+    # Delete the team with its bids, tiebreaker entries and stars (its user keeps their account)
+    Purges.delete_team(team_id)
     db.session.commit()
     
     return jsonify({'message': 'Team deleted successfully'})
@@ -3314,34 +2934,23 @@ def team_players_data():
     current_position = request.args.get('position', '')
     current_playing_style = request.args.get('playing_style', '')
     
-    # Query players based on filters
-    query = Player.query.filter_by(is_auction_eligible=True)  # Only show eligible players
-    
-    # Apply search filter if provided
-    if search_query:
-        query = query.filter(Player.name.ilike(f'%{search_query}%'))
-    
-    # Apply position filter if provided
-    if current_position:
-        if current_position in Config.POSITION_GROUPS:
-            # Filter by position group
-            query = query.filter(Player.position_group == current_position)
-        else:
-            # Filter by normal position
-            query = query.filter(Player.position == current_position)
-    
-    # Apply playing style filter if provided
-    if current_playing_style:
-        query = query.filter(Player.playing_style == current_playing_style)
+    # Filter eligible players in the availability index
+    filters = {'search': search_query, 'playing_style': current_playing_style}
+    if current_position in Config.POSITION_GROUPS:
+        filters['position_group'] = current_position
+    else:
+        filters['position'] = current_position
     
     # Get starred players for the current user
-    starred_player_ids = []
+    starred_player_ids = set()
     if current_user.team:
-        starred_players = StarredPlayer.query.filter_by(team_id=current_user.team.id).all()
-        starred_player_ids = [sp.player_id for sp in starred_players]
+        flags, _ = team_marks(current_user.team.id)
+        starred_player_ids = {player_id for player_id, flag in flags.items() if flag & MARK_STARRED}
     
-    # Paginate results
-    players_pagination = query.order_by(Player.overall_rating.desc()).paginate(page=page, per_page=per_page)
+    # Paginate the index; only the page's players are loaded in full
+    players_pagination = availability_index.snapshot().paginate(
+        'eligible', page, per_page, load=load_players, **filters
+    )
     
     return render_template('team_players_data.html',
                           players=players_pagination.items,
@@ -3427,13 +3036,12 @@ def team_profile():
     team = current_user.team
     
     # Calculate team statistics
-    total_spent = sum(player.acquisition_value or 0 for player in team.players)
+    roster = TeamRosters.get(team.id)
+    total_spent = roster['total_spent']
     remaining_balance = team.balance
     
     # Count players by position
-    position_counts = {}
-    for position in Config.POSITIONS:
-        position_counts[position] = sum(1 for player in team.players if player.position == position)
+    position_counts = roster['position_counts']
     
     # Get team match statistics from TeamStats if available
     team_stats = TeamStats.query.filter_by(team_id=team.id).first()
@@ -3460,7 +3068,7 @@ def team_profile():
         })
     
     # Squad Builder Achievement - if has 15+ players
-    if len(team.players) >= 15:
+    if roster['total_players'] >= 15:
         achievements.append({
             'name': 'Squad Builder',
             'description': 'Built a squad of 15+ players',
@@ -3492,10 +3100,10 @@ def team_profile():
     manager_name = current_user.username
     
     # Count total bids placed
-    total_bids = Bid.query.filter_by(team_id=team.id).count()
+    total_bids = roster['active_bids_count'] + roster['completed_bids_count']
     
     # Count won bids (players acquired)
-    won_bids = len(team.players)
+    won_bids = roster['total_players']
     
     return render_template('team_profile.html',
                          team=team,
@@ -3618,12 +3226,14 @@ def team_bids():
     Display a team's bidding history and statistics.
     This page shows current and past bids for the current user's team.
     """
+    team_id = current_user.team.id
+    
     # Get active rounds for the "Place New Bid" button
     active_rounds = Round.query.filter_by(is_active=True).all()
     
     # Get tiebreakers for this team
     team_tiebreakers = TeamTiebreaker.query.join(Tiebreaker).filter(
-        TeamTiebreaker.team_id == current_user.team.id,
+        TeamTiebreaker.team_id == team_id,
         Tiebreaker.resolved == False
     ).all()
     
@@ -3631,15 +3241,60 @@ def team_bids():
     team_bulk_tiebreakers = TeamBulkTiebreaker.query.join(
         BulkBidTiebreaker, TeamBulkTiebreaker.tiebreaker_id == BulkBidTiebreaker.id
     ).filter(
-        TeamBulkTiebreaker.team_id == current_user.team.id,
+        TeamBulkTiebreaker.team_id == team_id,
         TeamBulkTiebreaker.is_active == True,
         BulkBidTiebreaker.resolved == False
     ).all()
     
-    return render_template('team_bids.html',
-                          active_rounds=active_rounds,
-                          team_tiebreakers=team_tiebreakers,
-                          team_bulk_tiebreakers=team_bulk_tiebreakers)
+    # Bids in active rounds are pending; finished rounds answer from their compiled results
+    bids = db.session.query(
+        Bid.round_id, Bid.player_id, Bid.amount, Bid.timestamp, Round.is_active,
+        Round.position.label('round_position'), Player.name.label('player_name'),
+        Player.position.label('player_position')
+    ).join(Round, Round.id == Bid.round_id).join(Player, Player.id == Bid.player_id).filter(
+        Bid.team_id == team_id
+    ).order_by(Bid.timestamp.desc(), Bid.id.desc()).all()
+    results = ResultDocuments.get_rounds([bid.round_id for bid in bids if not bid.is_active])
+    
+    bid_rows = []
+    for bid in bids:
+        row = {
+            'player_name': bid.player_name, 'player_position': bid.player_position,
+            'round_position': bid.round_position, 'amount': bid.amount, 'timestamp': bid.timestamp,
+            'status': 'active', 'winning_amount': 0, 'winning_team_name': '',
+        }
+        player = results[bid.round_id].players_by_id.get(bid.player_id) if bid.round_id in results else None
+        if player is not None:
+            winner = player['winner_team_id']
+            if winner == team_id:
+                row['status'] = 'won'
+            elif team_id in player['tiebreaker_team_ids']:
+                row['status'] = 'tied'
+            else:
+                row['status'] = 'lost'
+            if player['won_by_bid']:
+                row['winning_amount'] = player['winning_bid']
+                row['winning_team_name'] = results[bid.round_id].teams.get(winner, 'Unknown')
+        elif not bid.is_active:
+            row['status'] = 'lost'
+        bid_rows.append(row)
+    bid_counts = {
+        'active': sum(1 for row in bid_rows if row['status'] == 'active'),
+        'won': sum(1 for row in bid_rows if row['status'] == 'won'),
+        'lost': sum(1 for row in bid_rows if row['status'] in ('lost', 'tied')),
+    }
+    
+    return conditional_page(
+        [current_user.id, team_id, sorted(result.etag for result in results.values()),
+         [(bid.round_id, bid.player_id, bid.amount, bid.is_active) for bid in bids],
+         [r.id for r in active_rounds], [tt.id for tt in team_tiebreakers],
+         [tt.id for tt in team_bulk_tiebreakers], templates_stamp('team_bids.html')],
+        lambda: render_template('team_bids.html',
+                                active_rounds=active_rounds,
+                                team_tiebreakers=team_tiebreakers,
+                                team_bulk_tiebreakers=team_bulk_tiebreakers,
+                                bid_rows=bid_rows,
+                                bid_counts=bid_counts))
 @app.route('/team_round')
 @login_required
 def team_round():
@@ -3723,11 +3378,19 @@ def team_round():
         # Get Config for minimum bid amount
         from config import Config
         
-        # OPTIMIZED: Only fetch starred players if we have any
-        starred_player_ids = []
-        if team_data.starred_players_count > 0:
-            starred_players = StarredPlayer.query.filter_by(team_id=current_user.team.id).all()
-            starred_player_ids = [sp.player_id for sp in starred_players]
+        # Unallocated players of each round from the availability index, annotated
+        # with the team's starred flags and bids from one query
+        starred_player_ids = set()
+        round_players = {}
+        round_bids = {}
+        if active_rounds:
+            flags, bids = team_marks(current_user.team.id, round_ids=[r.id for r in active_rounds])
+            starred_player_ids = {player_id for player_id, flag in flags.items() if flag & MARK_STARRED}
+            snapshot = availability_index.snapshot()
+            for r in active_rounds:
+                round_players[r.id] = snapshot.players(round_scope(r.id))
+                round_bids[r.id] = {player_id: {'id': bid[0], 'amount': bid[1]}
+                                    for (round_id, player_id), bid in bids.items() if round_id == r.id}
         
         return render_template('team_round.html',
                               active_rounds=active_rounds,
@@ -3735,7 +3398,9 @@ def team_round():
                               Config=Config,
                               auction_settings=AuctionSettings,
                               completed_rounds_count=team_data.completed_rounds_count,
-                              starred_player_ids=starred_player_ids)
+                              starred_player_ids=starred_player_ids,
+                              round_players=round_players,
+                              round_bids=round_bids)
 
 # Password reset routes
 @app.route('/reset_password_request', methods=['GET', 'POST'])
@@ -4112,62 +3777,21 @@ def team_bulk_round():
     team_player_count = team_stats.player_count if team_stats.player_count else 0
     available_slots = max_players_per_team - team_player_count - bid_count
     
-    # Get all available players with pagination and filters
-    players_query = Player.query.filter(
-        Player.team_id == None,
-        Player.is_auction_eligible == True
-    )
-    
-    # Apply position filter if specified
-    if position_filter:
-        players_query = players_query.filter(Player.position == position_filter)
-    
-    # Apply search filter if specified
-    if search_query:
-        players_query = players_query.filter(
-            Player.name.ilike(f'%{search_query}%')
-        )
-    
-    # Order by overall rating (highest first) and paginate
-    players_pagination = players_query.order_by(
-        Player.overall_rating.desc().nullslast(),
-        Player.name.asc()
-    ).paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
+    # Page through available players in the availability index
+    snapshot = availability_index.snapshot()
+    players_pagination = snapshot.paginate(
+        'available', page, per_page, error_out=False, position=position_filter, search=search_query
     )
     
     # Group paginated players by position for display
     players_by_position = {}
     for player in players_pagination.items:
-        if player.position not in players_by_position:
-            players_by_position[player.position] = []
-        
-        # Convert player to dict for consistency with template
-        player_dict = {
-            'id': player.id,
-            'name': player.name,
-            'position': player.position,
-            'team_name': player.team_name,
-            'overall_rating': player.overall_rating,
-            'playing_style': player.playing_style
-        }
-        players_by_position[player.position].append(player_dict)
+        players_by_position.setdefault(player.position, []).append(player)
     
     # Get position counts for sidebar/filter display
     position_counts = {}
     if not position_filter and not search_query:
-        # Only calculate position counts if no filters applied (for performance)
-        position_count_query = db.session.query(
-            Player.position,
-            func.count(Player.id).label('count')
-        ).filter(
-            Player.team_id == None,
-            Player.is_auction_eligible == True
-        ).group_by(Player.position).all()
-        
-        position_counts = {position: count for position, count in position_count_query}
+        position_counts = snapshot.position_counts('available')
     
     # Get existing bids for this team in this round with minimal data
     team_bids = db.session.query(
@@ -4189,6 +3813,7 @@ def team_bulk_round():
                           players_pagination=players_pagination,
                           position_counts=position_counts,
                           team_bids=team_bids,
+                          bid_ids_by_player={bid.player_id: bid.id for bid in team_bids},
                           available_slots=available_slots,
                           current_page=page,
                           per_page=per_page,
@@ -4196,6 +3821,14 @@ def team_bulk_round():
                           search_query=search_query,
                           config=Config)
 
+def publish_bulk_bid_counts(round_id, team_id):
+    """Push a bulk round's bid counts after a bulk bid is placed or deleted"""
+    total_bids, team_bids = db.session.query(
+        func.count(BulkBid.id),
+        func.coalesce(func.sum(case((BulkBid.team_id == team_id, 1), else_=0)), 0)
+    ).filter(BulkBid.round_id == round_id).one()
+    RealtimeEvents.bulk_bid_count_changed(round_id, team_id, team_bids, total_bids)
+
 @app.route('/place_bulk_bid', methods=['POST'])
 @login_required
 def place_bulk_bid():
@@ -4257,7 +3890,10 @@ def place_bulk_bid():
     )
     
     db.session.add(new_bid)
+    db.session.flush()
+    BulkRoundCounters.record_bid(bulk_round.id, player.id, current_user.team.id, 1)
     db.session.commit()
+    publish_bulk_bid_counts(bulk_round.id, current_user.team.id)
     
     return jsonify({
         'success': True, 
@@ -4282,9 +3918,13 @@ def delete_bulk_bid(bid_id):
     
     # Store player_id before deleting the bid
     player_id = bid.player_id
+    round_id = bid.round_id
     
     db.session.delete(bid)
+    db.session.flush()
+    BulkRoundCounters.record_bid(round_id, player_id, current_user.team.id, -1)
     db.session.commit()
+    publish_bulk_bid_counts(round_id, current_user.team.id)
     
     return jsonify({
         'success': True, 
@@ -4432,6 +4072,9 @@ def place_bulk_tiebreaker_bid():
     
     db.session.commit()
     
+    active_count = TeamBulkTiebreaker.query.filter_by(tiebreaker_id=tiebreaker.id, is_active=True).count()
+    RealtimeEvents.bulk_tiebreaker_raised(tiebreaker.id, amount, current_user.team.id, active_count)
+    
     return jsonify({
         'success': True, 
         'message': 'Bid placed successfully.', 
@@ -4520,8 +4163,18 @@ def withdraw_from_bulk_tiebreaker():
             
             # Deduct amount from team balance
             winning_team.balance -= final_value
+            TeamRosters.add_player(winning_team.id, player.position, final_value)
         
+        BulkRoundCounters.touch(tiebreaker.bulk_round_id, [tiebreaker.player_id])
         db.session.commit()
+        ResultDocuments.compile_bulk_round(tiebreaker.bulk_round_id)
+        
+        RealtimeEvents.bulk_tiebreaker_resolved(tiebreaker.id, tiebreaker.winner_team_id)
+        if bulk_bid:
+            RealtimeEvents.balances_changed({winning_team.id: winning_team.balance})
+    else:
+        RealtimeEvents.bulk_tiebreaker_raised(tiebreaker.id, tiebreaker.current_amount,
+                                              highest_bidder_id, len(remaining_active_teams))
     
     return jsonify({'success': True, 'message': 'Withdrawn from tiebreaker successfully.'})
 
@@ -4561,7 +4214,10 @@ def admin_start_bulk_round():
     )
     
     db.session.add(new_round)
+    db.session.flush()
+    BulkRoundCounters.start_round(new_round.id)
     db.session.commit()
+    RealtimeEvents.bulk_round_started(new_round)
     
     flash('Bulk bid round started successfully.', 'success')
     return redirect(url_for('admin_bulk_round', round_id=new_round.id))
@@ -4575,6 +4231,27 @@ def admin_bulk_round(round_id):
     
     bulk_round = BulkBidRound.query.get_or_404(round_id)
     
+    # Read before the bids so the monitor's first delta covers anything placed while rendering
+    monitor_version = BulkRoundCounters.current_version(round_id)
+    
+    # Once every tiebreaker has resolved the page renders from the compiled results
+    results = None if bulk_round.is_active else ResultDocuments.get_bulk_round(round_id)
+    if results is not None:
+        bids_by_team = {}
+        for player in results.players:
+            for bid in player['bids']:
+                team = bids_by_team.setdefault(bid['team_id'], {'team': bid['team'], 'bids': []})
+                team['bids'].append(dict(bid, player=player, player_id=player['id']))
+        return conditional_page(
+            [results.etag, current_user.id, monitor_version, templates_stamp('admin_bulk_round.html')],
+            lambda: render_template('admin_bulk_round.html',
+                                    bulk_round=bulk_round,
+                                    bids_by_player=results.bids_by_player(),
+                                    bids_by_team=bids_by_team,
+                                    teams=[results.team(team_id) for team_id in sorted(results.teams)],
+                                    tiebreakers=[],
+                                    monitor_version=monitor_version))
+    
     # Get all bids in this round
     bids = BulkBid.query.filter_by(round_id=round_id).all()
     
@@ -4608,15 +4285,23 @@ def admin_bulk_round(round_id):
                           bulk_round=bulk_round,
                           bids_by_player=bids_by_player,
                           bids_by_team=bids_by_team,
-                          tiebreakers=tiebreakers)
+                          tiebreakers=tiebreakers,
+                          monitor_version=monitor_version)
 
 @app.route('/admin/bulk_round_update/<int:round_id>')
 @login_required
 def admin_bulk_round_update(round_id):
+    """Live counters for the admin monitor.
+
+    Pass ``since=<version>`` from the previous response to receive only the
+    players and teams that changed after it; ``full`` is True when the
+    response replaces the client's state instead.
+    """
     if not current_user.is_admin or not request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return jsonify({'error': 'Unauthorized'}), 403
     
     bulk_round = BulkBidRound.query.get_or_404(round_id)
+    since = request.args.get('since', type=int)
     
     # Get status information
     if bulk_round.is_active:
@@ -4631,104 +4316,84 @@ def admin_bulk_round_update(round_id):
             'active': False
         }
     
-    # Get all bids in this round
-    bids = BulkBid.query.filter_by(round_id=round_id).all()
-    
-    # Group bids by player
-    bids_by_player = {}
-    for bid in bids:
-        if bid.player_id not in bids_by_player:
-            bids_by_player[bid.player_id] = {
-                'player': bid.player,
-                'bids': []
-            }
-        bids_by_player[bid.player_id]['bids'].append(bid)
-    
-    # Group bids by team
-    bids_by_team = {}
-    for bid in bids:
-        if bid.team_id not in bids_by_team:
-            bids_by_team[bid.team_id] = {
-                'team': bid.team,
-                'bids': []
-            }
-        bids_by_team[bid.team_id]['bids'].append(bid)
-    
-    # Get all active tiebreakers
-    tiebreakers = BulkBidTiebreaker.query.filter_by(
-        bulk_round_id=round_id,
-        resolved=False
+    changes = BulkRoundCounters.changes(round_id, since)
+    
+    # Unresolved tiebreakers with their active team counts in one query
+    active_teams = db.session.query(
+        TeamBulkTiebreaker.tiebreaker_id,
+        func.count(TeamBulkTiebreaker.id).label('team_count')
+    ).filter(TeamBulkTiebreaker.is_active == True).group_by(TeamBulkTiebreaker.tiebreaker_id).subquery()
+    tiebreakers = db.session.query(
+        BulkBidTiebreaker.id, BulkBidTiebreaker.player_id, BulkBidTiebreaker.current_amount,
+        Player.name, Player.position, func.coalesce(active_teams.c.team_count, 0)
+    ).join(Player, Player.id == BulkBidTiebreaker.player_id).outerjoin(
+        active_teams, active_teams.c.tiebreaker_id == BulkBidTiebreaker.id
+    ).filter(
+        BulkBidTiebreaker.bulk_round_id == round_id,
+        BulkBidTiebreaker.resolved == False
     ).all()
     
-    # Serialize the data for JSON response
-    tiebreaker_data = []
-    for t in tiebreakers:
-        team_count = TeamBulkTiebreaker.query.filter_by(tiebreaker_id=t.id, is_active=True).count()
-        tiebreaker_data.append({
-            'id': t.id,
-            'player_id': t.player_id,
-            'player_name': t.player.name,
-            'position': t.player.position,
-            'current_amount': t.current_amount,
-            'team_count': team_count
-        })
-    
-    # Serialize player data
+    tiebreaker_data = [{
+        'id': t[0],
+        'player_id': t[1],
+        'player_name': t[3],
+        'position': t[4],
+        'current_amount': t[2],
+        'team_count': t[5]
+    } for t in tiebreakers]
+    tiebreaker_players = {t[1] for t in tiebreakers}
+    
+    # Serialize changed players
     player_data = {}
-    for player_id, data in bids_by_player.items():
-        player = data['player']
-        status = ''
-        
-        if player.team_id:
-            status = 'assigned'
-        elif player_id in [t.player_id for t in tiebreakers]:
-            status = 'in_tiebreaker'
-        elif len(data['bids']) == 1:
-            status = 'single_bid'
+    for row in changes['players']:
+        if row.team_id:
+            player_status = 'assigned'
+        elif row.player_id in tiebreaker_players:
+            player_status = 'in_tiebreaker'
+        elif row.bid_count == 1:
+            player_status = 'single_bid'
         else:
-            status = 'multiple_bids'
-            
-        player_data[player_id] = {
-            'id': player.id,
-            'name': player.name,
-            'position': player.position,
-            'overall_rating': player.overall_rating,
-            'bid_count': len(data['bids']),
-            'status': status
+            player_status = 'multiple_bids'
+        
+        player_data[row.player_id] = {
+            'id': row.player_id,
+            'name': row.name,
+            'position': row.position,
+            'overall_rating': row.overall_rating,
+            'bid_count': row.bid_count,
+            'status': player_status
         }
     
-    # Serialize team data
+    # Serialize changed teams with their bids
     team_data = {}
-    for team_id, data in bids_by_team.items():
-        team = data['team']
+    for row in changes['teams']:
         bid_list = []
-        
-        for bid in data['bids']:
-            bid_status = ''
-            if bid.player.team_id and bid.player.team_id != team.id:
+        for bid in changes['team_bids'].get(row.team_id, []):
+            if bid.player_team_id and bid.player_team_id != row.team_id:
                 bid_status = 'lost'
-            elif bid.is_resolved and bid.player.team_id == team.id:
+            elif bid.is_resolved and bid.player_team_id == row.team_id:
                 bid_status = 'won'
-            elif bid.player_id in [t.player_id for t in tiebreakers]:
+            elif bid.player_id in tiebreaker_players:
                 bid_status = 'in_tiebreaker'
             else:
                 bid_status = 'pending'
-                
+            
             bid_list.append({
                 'id': bid.id,
                 'player_id': bid.player_id,
-                'player_name': bid.player.name,
-                'position': bid.player.position,
+                'player_name': bid.name,
+                'position': bid.position,
                 'status': bid_status
             })
         
-        team_data[team_id] = {
-            'id': team.id,
-            'name': team.name,
-            'bid_count': len(data['bids']),
+        team_data[row.team_id] = {
+            'id': row.team_id,
+            'name': row.name,
+            'bid_count': row.bid_count,
             'bids': bid_list
         }
     
+    counters = changes['counters']
     return jsonify({
         'status': status,
         'round_info': {
@@ -4737,12 +4402,18 @@ def admin_bulk_round_update(round_id):
             'start_time': bulk_round.start_time.strftime('%Y-%m-%d %H:%M:%S'),
             'status': bulk_round.status
         },
+        'version': changes['version'],
+        'full': changes['full'],
         'tiebreakers': tiebreaker_data,
-        'bid_count': len(bids),
-        'player_count': len(bids_by_player),
-        'team_count': len(bids_by_team),
+        'bid_count': counters['bids'],
+        'player_count': counters['players'],
+        'team_count': counters['teams'],
+        'contested_players': counters['contested_players'],
+        'projected_tiebreakers': counters['projected_tiebreakers'],
         'players': player_data,
-        'teams': team_data
+        'teams': team_data,
+        'removed_players': changes['removed_players'],
+        'removed_teams': changes['removed_teams']
     })
 
 @app.route('/admin/update_bulk_round_timer/<int:round_id>', methods=['POST'])
@@ -4766,6 +4437,7 @@ def admin_update_bulk_round_timer(round_id):
     
     bulk_round.duration = bulk_round.duration + duration
     db.session.commit()
+    RealtimeEvents.bulk_round_timer_updated(bulk_round)
     
     return jsonify({'success': True, 'new_duration': bulk_round.duration})
 
@@ -4797,6 +4469,10 @@ def admin_finalize_bulk_round(round_id):
             players_with_bids[bid.player_id] = []
         players_with_bids[bid.player_id].append(bid)
     
+    # Collected for the push notifications sent once the round is completed
+    new_balances = {}
+    created_tiebreakers = {}
+    
     # Process each player
     for player_id, player_bids in players_with_bids.items():
         if len(player_bids) == 1:
@@ -4811,11 +4487,13 @@ def admin_finalize_bulk_round(round_id):
             # Assign player to team
             player.team_id = bid.team_id
             player.acquisition_value = bulk_round.base_price
+            TeamRosters.add_player(team.id, player.position, bulk_round.base_price)
             
             # Mark bid as resolved
             bid.is_resolved = True
             
             db.session.commit()
+            new_balances[team.id] = team.balance
         elif len(player_bids) > 1:
             # Multiple teams bid for this player, create a tiebreaker
             player = Player.query.get(player_id)
@@ -4841,11 +4519,19 @@ def admin_finalize_bulk_round(round_id):
                 bid.has_tie = True
             
             db.session.commit()
+            created_tiebreakers[tiebreaker.id] = [bid.team_id for bid in player_bids]
     
-    # Set the round as completed
+    # Set the round as completed; every player's status changed, so rebuild the monitor counters
     bulk_round.status = "completed"
+    BulkRoundCounters.invalidate(round_id)
     db.session.commit()
     
+    # Settled already when nothing tied; otherwise the last tiebreaker to resolve compiles it
+    ResultDocuments.compile_bulk_round(round_id)
+    
+    RealtimeEvents.bulk_round_finalized(round_id, created_tiebreakers)
+    RealtimeEvents.balances_changed(new_balances)
+    
     flash('Bulk bid round finalized successfully.', 'success')
     return redirect(url_for('admin_bulk_round', round_id=round_id))
 
@@ -5027,21 +4713,19 @@ def admin_bulk_tiebreakers_stream():
                     } for round_id, round_data in tiebreakers_by_round.items()
                 ]
                 
-                # Create a hash of the data to detect changes
-                import hashlib
-                data_str = json.dumps(response_data, sort_keys=True)
-                data_hash = hashlib.md5(data_str.encode()).hexdigest()
+                # Encode once, in an offload worker process: the payload grows with every open
+                # tiebreaker, and its hash detects changes
+                data_hash, data_str = run_in_process(encode_event, response_data)
                 
                 # Only send update if data has changed
                 if data_hash != last_data_hash:
                     last_data_hash = data_hash
                     
-                    event_data = json.dumps({
-                        'tiebreakers_count': len(tiebreakers),
-                        'rounds_count': len(tiebreakers_by_round),
-                        'tiebreakers_by_round': response_data,
-                        'timestamp': datetime.utcnow().isoformat()
-                    })
+                    # The encoded payload is spliced in rather than encoded a second time
+                    event_data = (f'{{"tiebreakers_count": {len(tiebreakers)}, '
+                                  f'"rounds_count": {len(tiebreakers_by_round)}, '
+                                  f'"tiebreakers_by_round": {data_str}, '
+                                  f'"timestamp": "{datetime.utcnow().isoformat()}"}}')
                     
                     yield f"data: {event_data}\n\n"
                 
@@ -5190,11 +4874,16 @@ def admin_resolve_bulk_tiebreaker(tiebreaker_id):
             
             # Deduct amount from team balance
             winning_team.balance -= final_value
+            TeamRosters.add_player(winning_team.id, player.position, final_value)
             
             # Mark as resolved
             tiebreaker.resolved = True
             
+            BulkRoundCounters.touch(tiebreaker.bulk_round_id, [tiebreaker.player_id])
             db.session.commit()
+            ResultDocuments.compile_bulk_round(tiebreaker.bulk_round_id)
+            RealtimeEvents.bulk_tiebreaker_resolved(tiebreaker.id, winning_team.id)
+            RealtimeEvents.balances_changed({winning_team.id: winning_team.balance})
             flash(f'Tiebreaker resolved. Player {player.name} assigned to {winning_team.name} for £{player.acquisition_value}.', 'success')
         else:
             flash('Could not find the original bid. Tiebreaker not resolved.', 'error')
@@ -5227,11 +4916,16 @@ def admin_resolve_bulk_tiebreaker(tiebreaker_id):
                 
                 # Deduct amount from team balance
                 team.balance -= tiebreaker.current_amount
+                TeamRosters.add_player(team.id, player.position, tiebreaker.current_amount)
                 
                 # Mark as resolved
                 tiebreaker.resolved = True
                 
+                BulkRoundCounters.touch(tiebreaker.bulk_round_id, [tiebreaker.player_id])
                 db.session.commit()
+                ResultDocuments.compile_bulk_round(tiebreaker.bulk_round_id)
+                RealtimeEvents.bulk_tiebreaker_resolved(tiebreaker.id, team.id)
+                RealtimeEvents.balances_changed({team.id: team.balance})
                 flash(f'Tiebreaker resolved with no bids. Player {player.name} randomly assigned to {team.name} for £{tiebreaker.current_amount}.', 'success')
             else:
                 flash('Could not find the original bid. Tiebreaker not resolved.', 'error')
@@ -5329,15 +5023,13 @@ def team_bulk_tiebreaker_stream(tiebreaker_id):
                     'timestamp': datetime.utcnow().isoformat()
                 }
                 
-                # Create hash to detect changes
-                import hashlib
-                data_str = json.dumps(current_data, sort_keys=True)
-                data_hash = hashlib.md5(data_str.encode()).hexdigest()
+                # Create hash to detect changes; the same encoding is what gets sent
+                data_hash, data_str = encode_event(current_data)
                 
                 # Only send update if data has changed
                 if data_hash != last_data_hash:
                     last_data_hash = data_hash
-                    yield f"data: {json.dumps(current_data)}\n\n"
+                    yield f"data: {data_str}\n\n"
                 
                 # Sleep for a short interval before checking again
                 time.sleep(0.5)  # Check every 500ms for very fast updates
@@ -5394,62 +5086,17 @@ def admin_delete_bulk_round(round_id):
     if bulk_round.is_active:
         return jsonify({'error': 'Cannot delete an active bulk round. Please finalize it first.'}), 400
     
+    # ?dry_run=1 reports what the deletion would release and refund without writing
+    if request.args.get('dry_run') == '1':
+        report = RoundRollback.bulk_round_report(round_id)
+        return jsonify(dict(report._asdict(), dry_run=True, success=True))
+    
     try:
-        released_players = 0
-        refunded_amount = 0
-        
-        # Find all bids in this round
-        bulk_bids = BulkBid.query.filter_by(round_id=round_id).all()
-        
-        # Group bids by player
-        bid_players = {}
-        for bid in bulk_bids:
-            if bid.player_id not in bid_players:
-                bid_players[bid.player_id] = []
-            bid_players[bid.player_id].append(bid)
-        
-        # Find all players that were allocated through this round
-        for player_id, bids in bid_players.items():
-            player = Player.query.get(player_id)
-            if player and player.team_id:
-                # Check if any of the bids matches the player's team
-                team_match = False
-                for bid in bids:
-                    if bid.team_id == player.team_id:
-                        team_match = True
-                        break
-                
-                if team_match:
-                    # Found a player allocated through this round
-                    # Refund the team
-                    team = Team.query.get(player.team_id)
-                    if team and player.acquisition_value:
-                        team.balance += player.acquisition_value
-                        refunded_amount += player.acquisition_value
-                    
-                    # Reset player's team and acquisition value
-                    player.team_id = None
-                    player.acquisition_value = None
-                    released_players += 1
-        
-        # Delete all tiebreakers for this round
-        tiebreakers = BulkBidTiebreaker.query.filter_by(bulk_round_id=round_id).all()
-        for tiebreaker in tiebreakers:
-            TeamBulkTiebreaker.query.filter_by(tiebreaker_id=tiebreaker.id).delete()
-        BulkBidTiebreaker.query.filter_by(bulk_round_id=round_id).delete()
-        
-        # Delete all bids for this round
-        BulkBid.query.filter_by(round_id=round_id).delete()
-        
-        # Delete the round
-        db.session.delete(bulk_round)
+        # Release and refund every allocation, then delete the bids, tiebreakers and round set-wise
+        report = RoundRollback.rollback_bulk_round(round_id)
         db.session.commit()
         
-        return jsonify({
-            'message': 'Bulk bid round deleted successfully',
-            'released_players': released_players,
-            'refunded_amount': refunded_amount
-        })
+        return jsonify(dict(report._asdict(), success=True, message='Bulk bid round deleted successfully'))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to delete bulk round: {str(e)}'}), 500
@@ -5511,6 +5158,7 @@ def team_compare():
     """
     # Get all teams for the selection dropdowns
     teams = Team.query.all()
+    teams_by_id = {team.id: team for team in teams}
     
     # Get team IDs from query parameters
     team1_id = request.args.get('team1', type=int)
@@ -5528,18 +5176,30 @@ def team_compare():
     
     if team1_id and team2_id and team1_id != team2_id:
         # Get the teams
-        team1 = Team.query.get_or_404(team1_id)
-        team2 = Team.query.get_or_404(team2_id)
-        
-        # Get players for both teams
-        team1_players = Player.query.filter_by(team_id=team1_id).all()
-        team2_players = Player.query.filter_by(team_id=team2_id).all()
+        team1 = teams_by_id.get(team1_id)
+        team2 = teams_by_id.get(team2_id)
+        if team1 is None or team2 is None:
+            abort(404)
+        
+        # Squad size, rating and spend per position for both teams in one grouped query
+        squads = {team1_id: {}, team2_id: {}}
+        for team_id, position, count, rating_total, spent in db.session.query(
+            Player.team_id,
+            Player.position,
+            func.count(Player.id),
+            func.sum(func.coalesce(Player.overall_rating, 0)),
+            func.sum(func.coalesce(Player.acquisition_value, 0))
+        ).filter(
+            Player.team_id.in_([team1_id, team2_id])
+        ).group_by(Player.team_id, Player.position):
+            squads[team_id][position] = (count, rating_total or 0, spent or 0)
         
         # Calculate team statistics
-        def calculate_team_stats(team, players):
-            total_spent = sum(p.acquisition_value or 0 for p in players)
-            player_count = len(players)
-            avg_rating = sum(p.overall_rating or 0 for p in players) / player_count if player_count > 0 else 0
+        def calculate_team_stats(team, squad):
+            total_spent = sum(spent for _, _, spent in squad.values())
+            player_count = sum(count for count, _, _ in squad.values())
+            rating_total = sum(rating for _, rating, _ in squad.values())
+            avg_rating = rating_total / player_count if player_count > 0 else 0
             avg_player_cost = total_spent / player_count if player_count > 0 else 0
             
             return {
@@ -5550,65 +5210,37 @@ def team_compare():
                 'avg_player_cost': avg_player_cost
             }
         
-        team1_stats = calculate_team_stats(team1, team1_players)
-        team2_stats = calculate_team_stats(team2, team2_players)
+        team1_stats = calculate_team_stats(team1, squads[team1_id])
+        team2_stats = calculate_team_stats(team2, squads[team2_id])
         
         # Calculate position breakdown for both teams
-        for position in Config.POSITIONS:
-            # Team 1 position stats
-            position_players1 = [p for p in team1_players if p.position == position]
-            team1_positions[position] = {
-                'count': len(position_players1),
-                'avg_rating': sum(p.overall_rating or 0 for p in position_players1) / len(position_players1) if position_players1 else 0
-            }
-            
-            # Team 2 position stats
-            position_players2 = [p for p in team2_players if p.position == position]
-            team2_positions[position] = {
-                'count': len(position_players2),
-                'avg_rating': sum(p.overall_rating or 0 for p in position_players2) / len(position_players2) if position_players2 else 0
+        def position_breakdown(squad, position):
+            count, rating_total, _ = squad.get(position, (0, 0, 0))
+            return {
+                'count': count,
+                'avg_rating': rating_total / count if count else 0
             }
         
-        # Get head-to-head auction results
-        # Find players where both teams bid
-        from sqlalchemy import and_, or_
-        
-        # Get all completed rounds
-        completed_rounds = Round.query.filter_by(is_active=False).all()
-        
-        for round in completed_rounds:
-            # Get bids from both teams in this round
-            team1_bids = Bid.query.filter_by(team_id=team1_id, round_id=round.id).all()
-            team2_bids = Bid.query.filter_by(team_id=team2_id, round_id=round.id).all()
-            
-            # Find common players both teams bid on
-            team1_player_ids = {bid.player_id for bid in team1_bids}
-            team2_player_ids = {bid.player_id for bid in team2_bids}
-            common_player_ids = team1_player_ids.intersection(team2_player_ids)
+        for position in Config.POSITIONS:
+            team1_positions[position] = position_breakdown(squads[team1_id], position)
+            team2_positions[position] = position_breakdown(squads[team2_id], position)
+        
+        # Head-to-head auction results: players one team won in a completed
+        # round the other also bid in, precomputed when each round finalizes
+        for result in StandingsStore.get_head_to_head(team1_id, team2_id):
+            winner = team1 if result.winner_team_id == team1_id else team2
+            h2h_results.append({
+                'player_name': result.player_name,
+                'position': result.position,
+                'winner_id': winner.id,
+                'winner_name': winner.name,
+                'winning_bid': result.winning_bid
+            })
             
-            for player_id in common_player_ids:
-                player = Player.query.get(player_id)
-                if player and player.team_id in [team1_id, team2_id]:
-                    # This player was won by one of these two teams
-                    team1_bid = next((b for b in team1_bids if b.player_id == player_id), None)
-                    team2_bid = next((b for b in team2_bids if b.player_id == player_id), None)
-                    
-                    winner_id = player.team_id
-                    winner_name = team1.name if winner_id == team1_id else team2.name
-                    winning_bid = team1_bid.amount if winner_id == team1_id else team2_bid.amount
-                    
-                    h2h_results.append({
-                        'player_name': player.name,
-                        'position': player.position,
-                        'winner_id': winner_id,
-                        'winner_name': winner_name,
-                        'winning_bid': winning_bid
-                    })
-                    
-                    if winner_id == team1_id:
-                        h2h_stats['team1_wins'] += 1
-                    else:
-                        h2h_stats['team2_wins'] += 1
+            if winner is team1:
+                h2h_stats['team1_wins'] += 1
+            else:
+                h2h_stats['team2_wins'] += 1
     
     return render_template('team_compare.html',
                           teams=teams,
@@ -5629,29 +5261,8 @@ def all_teams():
     List all teams with basic statistics for regular users.
     This allows users to navigate to specific team squads.
     """
-    # Get all teams with their data
-    teams = Team.query.all()
-    teams_data = []
-    
-    for team in teams:
-        # Get players for this team
-        players = Player.query.filter_by(team_id=team.id).all()
-        
-        # Calculate position counts
-        position_counts = {position: 0 for position in Config.POSITIONS}
-        for player in players:
-            if player.position in position_counts:
-                position_counts[player.position] += 1
-        
-        # Calculate total team value
-        total_team_value = sum(player.acquisition_value or 0 for player in players)
-        
-        teams_data.append({
-            'team': team,
-            'total_players': len(players),
-            'position_counts': position_counts,
-            'total_team_value': total_team_value
-        })
+    # Squad totals of every team in one query
+    teams_data = TeamRosters.team_rows()
     
     return render_template('team_list.html', teams=teams_data, config=Config)
 
@@ -5740,6 +5351,7 @@ def admin_player_selection():
                           position_stats=position_stats,
                           total_players=total_players,
                           total_eligible=total_eligible,
+                          last_change=AuctionPool.latest_change(),
                           current_position=position_filter,
                           current_search=search_query,
                           current_eligibility=eligibility_filter,
@@ -5771,6 +5383,58 @@ def admin_update_player_eligibility():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/admin/player_eligibility/preview', methods=['POST'])
+@login_required
+def admin_preview_player_eligibility():
+    """Count what a batch eligibility rule would change, without writing"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        rule = parse_rule(data.get('rule'))
+        preview = AuctionPool.preview(rule, data.get('mode', 'add'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **preview})
+
+@app.route('/admin/player_eligibility/apply', methods=['POST'])
+@login_required
+def admin_apply_player_eligibility():
+    """Add players to, remove them from or replace the auction pool by rule in one UPDATE"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        rule = parse_rule(data.get('rule'))
+        change = AuctionPool.apply(rule, data.get('mode', 'add'), current_user.id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    described = AuctionPool.describe(change)
+    message = f"{described['enabled']} players added to and {described['disabled']} removed from the auction list"
+    return jsonify({'success': True, 'message': message, 'change': described})
+
+@app.route('/admin/player_eligibility/undo/<int:change_id>', methods=['POST'])
+@login_required
+def admin_undo_player_eligibility(change_id):
+    """Revert the most recent batch eligibility change"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    try:
+        change = AuctionPool.undo(change_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, 'message': 'Change undone', 'change': AuctionPool.describe(change)})
+
 @app.route('/admin/export_player_selection')
 @login_required
 def admin_export_player_selection():
@@ -5779,46 +5443,24 @@ def admin_export_player_selection():
         return redirect(url_for('dashboard'))
     
     try:
-        # Create a BytesIO object to store the Excel file
-        output = io.BytesIO()
-        
-        # Create Excel writer object
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            # Prepare data for each position
-            for position in Config.POSITIONS:
-                players = Player.query.filter_by(position=position, is_auction_eligible=True).order_by(Player.overall_rating.desc()).all()
-                
-                # Convert to DataFrame
-                data = []
-                for player in players:
-                    data.append({
-                        'Name': player.name,
-                        'Position': player.position,
-                        'Rating': player.overall_rating,
-                        'Nationality': player.nationality,
-                        'Team': player.team_name
-                    })
-                
-                if not data:
-                    continue  # Skip if no players in this position
-                
-                df = pd.DataFrame(data)
-                
-                # Write to sheet
-                df.to_excel(writer, sheet_name=position, index=False)
-                
-                # Auto-adjust columns width
-                worksheet = writer.sheets[position]
-                for i, col in enumerate(df.columns):
-                    column_width = max(df[col].astype(str).map(len).max(), len(col)) + 2
-                    worksheet.set_column(i, i, column_width)
-        
-        # Prepare the response
-        output.seek(0)
+        # Prepare data for each position; positions without players get no sheet
+        sheets = []
+        for position in Config.POSITIONS:
+            players = Player.query.filter_by(position=position, is_auction_eligible=True).order_by(Player.overall_rating.desc()).all()
+            sheets.append(Sheet(position, [{
+                'Name': player.name,
+                'Position': player.position,
+                'Rating': player.overall_rating,
+                'Nationality': player.nationality,
+                'Team': player.team_name
+            } for player in players]))
+        
+        # pandas/xlsxwriter run in an offload worker process, off the hub
+        output = io.BytesIO(run_in_process(build_workbook, sheets))
         
         return send_file(
             output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            mimetype=XLSX_MIMETYPE,
             as_attachment=True,
             download_name=f'player_selection_{datetime.now().strftime("%Y%m%d")}.xlsx'
         )
@@ -5832,43 +5474,54 @@ def admin_divide_position_groups():
     if not current_user.is_admin:
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     
-    position = request.json.get('position')
-    if not position or position not in Config.POSITIONS:
+    # Deferred: NumPy is only needed when groups are divided
+    from position_groups import apply_position_groups, plan_position_groups, plan_summary
+    
+    data = request.json or {}
+    position = data.get('position') or 'all'
+    preview = bool(data.get('preview'))
+    
+    # Positions without groups in Config.POSITION_GROUPS get the default count
+    if position == 'all':
+        positions = list(Config.POSITIONS)
+    elif position in Config.POSITIONS:
+        positions = [position]
+    else:
         return jsonify({'success': False, 'error': 'Invalid position'}), 400
     
+    groups = data.get('groups')
+    if groups is not None:
+        try:
+            groups = int(groups)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Invalid number of groups'}), 400
+        if groups < 2:
+            return jsonify({'success': False, 'error': 'Number of groups must be at least 2'}), 400
+    
     try:
-        # Get all eligible players for this position
-        players = Player.query.filter_by(position=position, is_auction_eligible=True).all()
+        plan = plan_position_groups(positions, groups)
         
-        if not players:
+        if not plan:
             return jsonify({
                 'success': False, 
                 'error': f'No eligible players found for position {position}'
             }), 404
         
-        # Sort players by overall rating (from highest to lowest)
-        players.sort(key=lambda x: x.overall_rating if x.overall_rating else 0, reverse=True)
+        if not preview:
+            apply_position_groups(plan)
         
-        # Divide players into two equally skilled groups
-        group1 = []
-        group2 = []
-        
-        # Snake draft pattern to ensure fairness
-        for i, player in enumerate(players):
-            if i % 4 in [0, 3]:  # 1st and 4th players go to group 1
-                player.position_group = f"{position}-1"
-                group1.append(player)
-            else:  # 2nd and 3rd players go to group 2
-                player.position_group = f"{position}-2"
-                group2.append(player)
-        
-        db.session.commit()
+        players_count = sum(position_plan['players'] for position_plan in plan.values())
+        if len(plan) == 1:
+            name, position_plan = next(iter(plan.items()))
+            message = f"{players_count} {name} players into {len(position_plan['groups'])} groups"
+        else:
+            message = f'{players_count} players across {len(plan)} positions'
         
         return jsonify({
             'success': True,
-            'message': f'Divided {len(players)} {position} players into two groups',
-            'group1_count': len(group1),
-            'group2_count': len(group2)
+            'preview': preview,
+            'message': f'Preview: would divide {message}' if preview else f'Divided {message}',
+            'positions': plan_summary(plan)
         })
     except Exception as e:
         db.session.rollback()
@@ -5894,12 +5547,18 @@ def admin_swap_position_group():
                 'error': 'Player is not assigned to any position group'
             }), 400
         
-        # Swap the group (e.g., from CF-1 to CF-2 or vice versa)
+        # Move the player to the next group (e.g., from CF-1 to CF-2, and from the last group back to 1)
         position_base = player.position_group.split('-')[0]
-        group_num = player.position_group.split('-')[1]
+        group_num = int(player.position_group.split('-')[1])
         
-        # Toggle group number
-        new_group_num = '2' if group_num == '1' else '1'
+        from position_groups import DEFAULT_GROUP_COUNT, group_counts  # Deferred: imports NumPy
+        existing_groups = db.session.query(Player.position_group).filter(
+            Player.position == position_base,
+            Player.position_group.isnot(None)
+        ).distinct().count()
+        group_count = max(group_counts().get(position_base, DEFAULT_GROUP_COUNT), existing_groups, group_num)
+        
+        new_group_num = group_num % group_count + 1
         player.position_group = f"{position_base}-{new_group_num}"
         
         db.session.commit()
@@ -6549,39 +6208,14 @@ def admin_delete_all_players():
         if active_bulk_rounds:
             return jsonify({'error': 'Cannot delete players while there are active bulk rounds. Please finalize or delete all active bulk rounds first.'})
         
-        # Count players before deletion
-        player_count = Player.query.count()
-        
-        # Delete all related bids first to avoid foreign key constraints
-        Bid.query.delete()
-        db.session.commit()
-        
-        # Delete tiebreakers that reference players
-        TeamTiebreaker.query.delete()
-        db.session.commit()
-        
-        Tiebreaker.query.delete()
-        db.session.commit()
-        
-        # Delete bulk bids and tiebreakers
-        TeamBulkTiebreaker.query.delete()
-        db.session.commit()
-        
-        BulkBidTiebreaker.query.delete()
-        db.session.commit()
-        
-        BulkBid.query.delete()
-        db.session.commit()
-        
-        # Delete starred players references
-        StarredPlayer.query.delete()
-        db.session.commit()
-        
-        # Finally delete all players
-        Player.query.delete()
-        db.session.commit()
+        # Delete in chunks in the background so the worker keeps serving requests
+        job = Purges.start_players({'all': True}, current_user.id)
+        if job.total == 0:
+            return jsonify({'success': 'There are no players to delete'})
+        Purges.launch(job.id)
         
-        return jsonify({'success': f'Successfully deleted {player_count} players and all related bids and tiebreakers'})
+        return jsonify({'success': f'Deleting {job.total} players and all related bids and tiebreakers',
+                        'job': Purges.describe(job)}), 202
     
     except Exception as e:
         db.session.rollback()
@@ -6703,6 +6337,7 @@ def admin_restore_backup():
             # Clear existing data (in proper order to avoid foreign key constraints)
             # Note: This is a destructive operation!
             Bid.query.delete()
+            TeamRosters.reset()
             db.session.commit()
             
             TeamTiebreaker.query.delete()
@@ -6718,6 +6353,7 @@ def admin_restore_backup():
             db.session.commit()
             
             BulkBid.query.delete()
+            BulkRoundCounters.invalidate()
             db.session.commit()
             
             StarredPlayer.query.delete()
@@ -6901,75 +6537,57 @@ def admin_export_filtered_players():
         query = query.filter(Player.overall_rating <= int(max_rating))
     
     try:
-        # Get players and create a dataframe
+        # Get players and create the rows
         players = query.all()
         
-        # Create in-memory Excel file
-        output = io.BytesIO()
-        
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            # Convert player data to DataFrame
-            players_data = []
-            for player in players:
-                player_dict = {
-                    'ID': player.id,
-                    'Name': player.name,
-                    'Position': player.position,
-                    'Team': player.team_name,
-                    'Nationality': player.nationality,
-                    'Rating': player.overall_rating,
-                    'Playing Style': player.playing_style,
-                    'Player ID': player.player_id,
-                    'Offensive Awareness': player.offensive_awareness,
-                    'Ball Control': player.ball_control,
-                    'Dribbling': player.dribbling,
-                    'Tight Possession': player.tight_possession,
-                    'Low Pass': player.low_pass,
-                    'Lofted Pass': player.lofted_pass,
-                    'Finishing': player.finishing,
-                    'Heading': player.heading,
-                    'Set Piece Taking': player.set_piece_taking,
-                    'Curl': player.curl,
-                    'Speed': player.speed,
-                    'Acceleration': player.acceleration,
-                    'Kicking Power': player.kicking_power,
-                    'Jumping': player.jumping,
-                    'Physical Contact': player.physical_contact,
-                    'Balance': player.balance,
-                    'Stamina': player.stamina,
-                    'Defensive Awareness': player.defensive_awareness,
-                    'Tackling': player.tackling,
-                    'Aggression': player.aggression,
-                    'Defensive Engagement': player.defensive_engagement,
-                }
-                # Add goalkeeper stats if applicable
-                if player.position == 'GK':
-                    player_dict.update({
-                        'GK Awareness': player.gk_awareness,
-                        'GK Catching': player.gk_catching,
-                        'GK Parrying': player.gk_parrying,
-                        'GK Reflexes': player.gk_reflexes,
-                        'GK Reach': player.gk_reach
-                    })
-                
-                players_data.append(player_dict)
-            
-            # Create DataFrame and write to Excel
-            df = pd.DataFrame(players_data)
-            df.to_excel(writer, sheet_name='Players', index=False)
+        # Convert player data to rows
+        players_data = []
+        for player in players:
+            player_dict = {
+                'ID': player.id,
+                'Name': player.name,
+                'Position': player.position,
+                'Team': player.team_name,
+                'Nationality': player.nationality,
+                'Rating': player.overall_rating,
+                'Playing Style': player.playing_style,
+                'Player ID': player.player_id,
+                'Offensive Awareness': player.offensive_awareness,
+                'Ball Control': player.ball_control,
+                'Dribbling': player.dribbling,
+                'Tight Possession': player.tight_possession,
+                'Low Pass': player.low_pass,
+                'Lofted Pass': player.lofted_pass,
+                'Finishing': player.finishing,
+                'Heading': player.heading,
+                'Set Piece Taking': player.set_piece_taking,
+                'Curl': player.curl,
+                'Speed': player.speed,
+                'Acceleration': player.acceleration,
+                'Kicking Power': player.kicking_power,
+                'Jumping': player.jumping,
+                'Physical Contact': player.physical_contact,
+                'Balance': player.balance,
+                'Stamina': player.stamina,
+                'Defensive Awareness': player.defensive_awareness,
+                'Tackling': player.tackling,
+                'Aggression': player.aggression,
+                'Defensive Engagement': player.defensive_engagement,
+            }
+            # Add goalkeeper stats if applicable
+            if player.position == 'GK':
+                player_dict.update({
+                    'GK Awareness': player.gk_awareness,
+                    'GK Catching': player.gk_catching,
+                    'GK Parrying': player.gk_parrying,
+                    'GK Reflexes': player.gk_reflexes,
+                    'GK Reach': player.gk_reach
+                })
             
-            # Get the worksheet and set column widths
-            worksheet = writer.sheets['Players']
-            for i, col in enumerate(df.columns):
-                # Set column width based on maximum length of column data
-                max_len = max([
-                    len(str(col)),  # Column header
-                    df[col].astype(str).str.len().max()  # Column data
-                ]) + 2  # Add padding
-                worksheet.set_column(i, i, max_len)
-        
-        # Reset file pointer
-        output.seek(0)
+            players_data.append(player_dict)
+        
+        # pandas/xlsxwriter run in an offload worker process, off the hub
+        output = io.BytesIO(run_in_process(build_workbook, [Sheet('Players', players_data)]))
         
         # Create response
         filter_text = f"_{position}" if position else ""
@@ -6980,7 +6598,7 @@ def admin_export_filtered_players():
             output,
             as_attachment=True,
             download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            mimetype=XLSX_MIMETYPE
         )
     
     except Exception as e:
@@ -7001,17 +6619,14 @@ def admin_delete_filtered_players():
     if not position and not min_rating and not max_rating:
         return jsonify({'error': 'At least one filter must be specified for deletion'})
     
-    # Build query with filters
-    query = Player.query
-    
-    if position:
-        query = query.filter(Player.position == position)
-    
-    if min_rating:
-        query = query.filter(Player.overall_rating >= int(min_rating))
-    
-    if max_rating:
-        query = query.filter(Player.overall_rating <= int(max_rating))
+    try:
+        criteria = {
+            'position': position or None,
+            'min_rating': int(min_rating) if min_rating else None,
+            'max_rating': int(max_rating) if max_rating else None,
+        }
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Ratings must be whole numbers'}), 400
     
     try:
         # Check for active rounds first
@@ -7024,61 +6639,35 @@ def admin_delete_filtered_players():
         if active_bulk_rounds:
             return jsonify({'error': 'Cannot delete players while there are active bulk rounds. Please finalize or delete all active bulk rounds first.'})
         
-        # Get players to delete
-        players = query.all()
-        player_count = len(players)
-        
-        if player_count == 0:
+        # Delete in chunks in the background so the worker keeps serving requests
+        job = Purges.start_players(criteria, current_user.id)
+        if job.total == 0:
             return jsonify({'success': 'No players match the filter criteria'})
+        Purges.launch(job.id)
         
-        # Get player IDs
-        player_ids = [player.id for player in players]
-        
-        # Delete related data first (to avoid foreign key constraint errors)
-        Bid.query.filter(Bid.player_id.in_(player_ids)).delete(synchronize_session=False)
-        db.session.commit()
-        
-        StarredPlayer.query.filter(StarredPlayer.player_id.in_(player_ids)).delete(synchronize_session=False)
-        db.session.commit()
-        
-        # Find tiebreakers related to these players
-        tiebreakers = Tiebreaker.query.filter(Tiebreaker.player_id.in_(player_ids)).all()
-        tiebreaker_ids = [t.id for t in tiebreakers]
-        
-        if tiebreaker_ids:
-            TeamTiebreaker.query.filter(TeamTiebreaker.tiebreaker_id.in_(tiebreaker_ids)).delete(synchronize_session=False)
-            db.session.commit()
-            
-            Tiebreaker.query.filter(Tiebreaker.id.in_(tiebreaker_ids)).delete(synchronize_session=False)
-            db.session.commit()
-        
-        # Find bulk tiebreakers related to these players
-        bulk_tiebreakers = BulkBidTiebreaker.query.filter(BulkBidTiebreaker.player_id.in_(player_ids)).all()
-        bulk_tiebreaker_ids = [t.id for t in bulk_tiebreakers]
-        
-        if bulk_tiebreaker_ids:
-            TeamBulkTiebreaker.query.filter(TeamBulkTiebreaker.tiebreaker_id.in_(bulk_tiebreaker_ids)).delete(synchronize_session=False)
-            db.session.commit()
-            
-            BulkBidTiebreaker.query.filter(BulkBidTiebreaker.id.in_(bulk_tiebreaker_ids)).delete(synchronize_session=False)
-            db.session.commit()
-        
-        # Delete bulk bids
-        BulkBid.query.filter(BulkBid.player_id.in_(player_ids)).delete(synchronize_session=False)
-        db.session.commit()
-        
-        # Finally delete the players
-        query.delete(synchronize_session=False)
-        db.session.commit()
-        
-        return jsonify({'success': f'Successfully deleted {player_count} players and related data'})
+        return jsonify({'success': f'Deleting {job.total} players and related data', 'job': Purges.describe(job)}), 202
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Error deleting players: {str(e)}'}), 500
 
+@app.route('/admin/purge_jobs/<int:job_id>')
+@login_required
+def admin_purge_job(job_id):
+    """Progress of a background player deletion"""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    job = Purges.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Purge job not found'}), 404
+    return jsonify(Purges.describe(job))
+
+
+init_startup_profile(app)
+mark_startup('routes')
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
-    app.run(debug=True) 
\ No newline at end of file
+    socketio.run(app, debug=True) 
\ No newline at end of file
@@ -0,0 +1,373 @@
+"""
+Static Asset Pipeline
+=====================
+``flask assets build`` turns the stylesheets and scripts every page loads from
+``base.html`` into a handful of minified, content-hashed files under
+``static/dist`` and records them in ``static/dist/assets.json``:
+
+* ``BUNDLES`` are concatenated in the order listed, which is the cascade order
+  the page relied on when they were separate tags.
+* ``VENDOR`` files (animate.css, Font Awesome, the Socket.IO client) are
+  downloaded into ``static/vendor`` once, together with the fonts and images
+  their CSS refers to, so they are served by us instead of three CDNs.
+* Tailwind is compiled with the standalone CLI (``TAILWIND_BIN`` or
+  ``tailwindcss`` on the PATH) against the templates, using the same
+  ``static/js/tailwind.config.js`` the Play CDN reads.
+* Every output gets ``.gz`` (and ``.br`` when ``brotli`` is installed)
+  siblings, and ``/static/dist/`` serves the precompressed file matching
+  ``Accept-Encoding`` with an immutable one-year cache header.
+
+Templates ask for ``asset_urls('css/head.css')``.  Without a manifest (local
+development, or a step that failed during the build) the same call returns the
+source files or the CDN URLs, so pages render either way.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import subprocess
+import urllib.request
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = 'dist'
+VENDOR_DIR = 'vendor'
+MANIFEST_NAME = 'assets.json'
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Logical name -> source files relative to static/, in load order
+BUNDLES = {
+    'css/head.css': ['css/a11y.css', 'css/pwa-safe-areas.css'],
+    # Loaded after the inline styles; mobile-isolation and mobile-header-fix must stay last
+    'css/nav.css': ['css/mobile-nav-improved.css', 'css/mobile-isolation.css', 'css/mobile-header-fix.css'],
+    'js/base.js': ['js/tooltips.js', 'js/pwa.js', 'js/smoothscroll.js', 'js/scrollTo.js',
+                   'js/safe-area-utils.js', 'js/mobile-nav-colabs.js'],
+    'js/realtime.js': ['vendor/socket.io.min.js', 'js/auction_socket.js'],
+    'css/animate.css': ['vendor/animate.min.css'],
+    'css/fontawesome.css': ['vendor/fontawesome/css/all.min.css'],
+    'css/tailwind.css': ['vendor/tailwind.css'],
+}
+
+# Vendored file relative to static/ -> pinned upstream URL
+VENDOR = {
+    'vendor/animate.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/animate.css/4.1.1/animate.min.css',
+    'vendor/fontawesome/css/all.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.1.1/css/all.min.css',
+    'vendor/socket.io.min.js': 'https://cdn.socket.io/4.7.5/socket.io.min.js',
+}
+
+# Compiled from the templates rather than downloaded
+TAILWIND_OUTPUT = 'vendor/tailwind.css'
+TAILWIND_INPUT = 'css/tailwind.input.css'
+TAILWIND_CONFIG = 'js/tailwind.config.js'
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.ttf', '.eot', '.json', '.map'}
+
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+_manifest = {}
+
+
+# --- Minification ---------------------------------------------------------
+
+def minify_css(source):
+    """Drop comments and insignificant whitespace, leaving strings untouched"""
+    out = []
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if char in '"\'':
+            end = i + 1
+            while end < length and source[end] != char:
+                end += 2 if source[end] == '\\' else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+        elif char.isspace():
+            while i < length and source[i].isspace():
+                i += 1
+            # Whitespace only matters between two tokens, e.g. "a .b" or "1px solid"
+            if out and out[-1][-1:] not in '{};,>' and i < length and source[i] not in '{};,>':
+                out.append(' ')
+        else:
+            if char in '{};,>' and out and out[-1] == ' ':
+                out.pop()
+            if char == '}' and out and out[-1] == ';':
+                out.pop()
+            out.append(char)
+            i += 1
+    return ''.join(out).strip()
+
+
+def minify_js(source):
+    """Conservative line-based minification: indentation, blank lines and comment-only lines
+
+    Nothing inside a line is rewritten, so strings, regex literals and ASI
+    behave exactly as in the source file.
+    """
+    lines = []
+    in_block_comment = False
+    for line in source.splitlines():
+        stripped = line.strip()
+        if in_block_comment:
+            in_block_comment = not stripped.endswith('*/')
+            continue
+        if stripped.startswith('/*') and not stripped.startswith('/*!'):
+            in_block_comment = not stripped.endswith('*/')
+            continue
+        if not stripped or stripped.startswith('//'):
+            continue
+        lines.append(stripped)
+    return '\n'.join(lines)
+
+
+# --- Build ------------------------------------------------------------------
+
+def _read(path):
+    with open(os.path.join(STATIC_DIR, path), encoding='utf-8') as f:
+        return f.read()
+
+
+def _is_local_reference(ref):
+    return not (ref.startswith(('data:', '#', '/')) or '://' in ref)
+
+
+def _css_references(path):
+    """Local files a stylesheet refers to, relative to static/"""
+    refs = []
+    for _quote, ref in _CSS_URL.findall(_read(path)):
+        ref = ref.split('?', 1)[0].split('#', 1)[0]
+        if _is_local_reference(ref):
+            refs.append(posixpath.normpath(posixpath.join(posixpath.dirname(path), ref)))
+    return refs
+
+
+def _download(url, path):
+    target = os.path.join(STATIC_DIR, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    with open(target, 'wb') as f:
+        f.write(data)
+
+
+def vendor_assets(refresh=False):
+    """Download the pinned CDN files and whatever their CSS refers to; returns failures"""
+    failed = []
+    for path, url in VENDOR.items():
+        try:
+            if refresh or not os.path.exists(os.path.join(STATIC_DIR, path)):
+                _download(url, path)
+            if path.endswith('.css'):
+                base_path, base_url = posixpath.dirname(path), posixpath.dirname(url)
+                for ref in _css_references(path):
+                    if refresh or not os.path.exists(os.path.join(STATIC_DIR, ref)):
+                        _download(f"{base_url}/{posixpath.relpath(ref, base_path)}", ref)
+        except OSError as e:
+            logger.warning(f"Could not vendor {url}: {e}")
+            failed.append(path)
+    return failed
+
+
+def compile_tailwind(binary=None):
+    """Compile Tailwind for the classes used in templates and scripts; returns False if skipped"""
+    binary = binary or shutil.which('tailwindcss')
+    if not binary:
+        return False
+    output = os.path.join(STATIC_DIR, TAILWIND_OUTPUT)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    result = subprocess.run(
+        [binary, '--config', os.path.join(STATIC_DIR, TAILWIND_CONFIG),
+         '--input', os.path.join(STATIC_DIR, TAILWIND_INPUT), '--output', output, '--minify'],
+        cwd=os.path.dirname(STATIC_DIR), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        logger.warning(f"Tailwind build failed: {result.stderr.strip()}")
+        return False
+    return True
+
+
+def _fingerprint(path, data):
+    root, ext = posixpath.splitext(path)
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return posixpath.join(DIST_DIR, f"{root}.{digest}{ext}")
+
+
+def _write(dist_path, data):
+    target = os.path.join(STATIC_DIR, dist_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+    if posixpath.splitext(dist_path)[1] in COMPRESSIBLE_EXTENSIONS:
+        # mtime=0 keeps the .gz byte-identical between builds of the same input
+        with open(target + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if BROTLI_AVAILABLE:
+            with open(target + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+
+
+def _rewrite_css_urls(source, source_path, bundle_path, files):
+    """Point relative url()s at the fingerprinted copies, relative to where the bundle is written"""
+    bundle_dir = posixpath.dirname(posixpath.join(DIST_DIR, bundle_path))
+
+    def replace(match):
+        ref = match.group(2)
+        if not _is_local_reference(ref):
+            return match.group(0)
+        clean = ref.split('?', 1)[0].split('#', 1)[0]
+        suffix = ref[len(clean):]
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(source_path), clean))
+        if target not in files:
+            return match.group(0)
+        return f"url({posixpath.relpath(files[target], bundle_dir)}{suffix})"
+
+    return _CSS_URL.sub(replace, source)
+
+
+def build_bundle(name, sources, files):
+    """Minified contents of one bundle"""
+    if name.endswith('.css'):
+        parts = []
+        for path in sources:
+            source = _rewrite_css_urls(_read(path), path, name, files)
+            parts.append(source if path.endswith('.min.css') else minify_css(source))
+        return '\n'.join(parts).encode('utf-8')
+    parts = [_read(path) if path.endswith('.min.js') else minify_js(_read(path)) for path in sources]
+    # A file ending without a semicolon must not run into the next one
+    return ';\n'.join(parts).encode('utf-8')
+
+
+def build_assets(vendor=True, refresh_vendor=False, tailwind_bin=None):
+    """Build static/dist and its manifest; returns the manifest"""
+    if vendor:
+        vendor_assets(refresh=refresh_vendor)
+    compile_tailwind(tailwind_bin)
+
+    dist_root = os.path.join(STATIC_DIR, DIST_DIR)
+    shutil.rmtree(dist_root, ignore_errors=True)
+
+    # Fonts and images referenced from CSS are fingerprinted first so the bundles can point at them
+    files = {}
+    for name, sources in BUNDLES.items():
+        if not name.endswith('.css'):
+            continue
+        for path in sources:
+            if not os.path.exists(os.path.join(STATIC_DIR, path)):
+                continue
+            for ref in _css_references(path):
+                ref_file = os.path.join(STATIC_DIR, ref)
+                if ref not in files and os.path.exists(ref_file):
+                    with open(ref_file, 'rb') as f:
+                        data = f.read()
+                    files[ref] = _fingerprint(ref, data)
+                    _write(files[ref], data)
+
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        missing = [path for path in sources if not os.path.exists(os.path.join(STATIC_DIR, path))]
+        if missing:
+            # Left out of the manifest so templates keep using the sources or the CDN
+            logger.warning(f"Skipping bundle {name}, missing {', '.join(missing)}")
+            continue
+        data = build_bundle(name, sources, files)
+        manifest[name] = _fingerprint(name, data)
+        _write(manifest[name], data)
+
+    with open(os.path.join(dist_root, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# --- Runtime ----------------------------------------------------------------
+
+def load_manifest():
+    """(Re)read static/dist/assets.json; an absent manifest means serve the sources"""
+    global _manifest
+    try:
+        with open(os.path.join(STATIC_DIR, DIST_DIR, MANIFEST_NAME)) as f:
+            _manifest = json.load(f)
+    except (OSError, ValueError):
+        _manifest = {}
+    return _manifest
+
+
+def asset_built(name):
+    return name in _manifest
+
+
+def asset_url(name):
+    """URL of a built asset, or of the static file itself when there is no build"""
+    return url_for('static', filename=_manifest.get(name, name))
+
+
+def asset_urls(name):
+    """URLs to load for a bundle: the built file, else its sources (or their CDN URLs)"""
+    if name in _manifest:
+        return [url_for('static', filename=_manifest[name])]
+    urls = []
+    for path in BUNDLES.get(name, [name]):
+        if path in VENDOR and not os.path.exists(os.path.join(STATIC_DIR, path)):
+            urls.append(VENDOR[path])
+        else:
+            urls.append(url_for('static', filename=path))
+    return urls
+
+
+def serve_dist_file(filename):
+    """Serve a fingerprinted file, precompressed when the client accepts it"""
+    directory = os.path.join(STATIC_DIR, DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = None
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(directory, filename + suffix)):
+            response = send_from_directory(directory, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(directory, filename, mimetype=mimetype)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+assets_cli = AppGroup('assets', help='Build the fingerprinted static asset bundles')
+
+
+@assets_cli.command('build')
+@click.option('--no-vendor', is_flag=True, help='Do not download missing CDN files')
+@click.option('--refresh-vendor', is_flag=True, help='Download the CDN files again')
+def build_command(no_vendor, refresh_vendor):
+    """Bundle, minify, fingerprint and precompress static assets"""
+    manifest = build_assets(vendor=not no_vendor, refresh_vendor=refresh_vendor,
+                            tailwind_bin=current_app.config.get('TAILWIND_BIN'))
+    for name in BUNDLES:
+        click.echo(f"  {name:<20} {manifest.get(name, 'not built (falls back to sources/CDN)')}")
+    click.echo(f"Wrote {len(manifest)} of {len(BUNDLES)} bundles to static/{DIST_DIR}")
+
+
+def init_assets(app):
+    """Register the template helpers, the /static/dist route and the CLI"""
+    load_manifest()
+    app.add_url_rule(f'{app.static_url_path}/{DIST_DIR}/<path:filename>', 'dist_asset', serve_dist_file)
+    app.jinja_env.globals.update(asset_url=asset_url, asset_urls=asset_urls, asset_built=asset_built)
+    app.cli.add_command(assets_cli)
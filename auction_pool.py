@@ -0,0 +1,243 @@
+"""
+Auction Pool
+============
+Batch changes to ``Player.is_auction_eligible``, so the admin curates the
+auction pool with a rule instead of one request per player toggle.
+
+A rule is a JSON object whose criteria all have to match:
+
+    player_ids          explicit list of player ids
+    positions           list of positions
+    min_rating          lowest ``overall_rating`` (inclusive)
+    max_rating          highest ``overall_rating`` (inclusive)
+    nationality         exact nationality
+    playing_style       exact playing style
+    free_agents_only    only players without a team
+    top_per_position    the N best-rated players of each position among
+                        those matching the other criteria
+
+and a mode says what happens to the players it matches: ``add`` puts them
+in the pool, ``remove`` takes them out and ``replace`` makes the pool
+exactly the matched players.
+
+``preview`` counts, per position, what a rule would change without writing
+anything.  ``apply`` makes the change with one ``UPDATE ... RETURNING`` and
+records the players it flipped in ``eligibility_change``; ``undo`` flips
+them back with one more ``UPDATE``.  Only the latest change still in effect
+can be undone, so an undo never fights a later change over the same
+players.  Both writes go through the ORM, so the availability index version
+moves with them.
+"""
+
+import json
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import Boolean, and_, case, false, func, not_, or_, select, update
+
+from config import Config
+from models import db, EligibilityChange, Player
+
+logger = logging.getLogger(__name__)
+
+MODES = ('add', 'remove', 'replace')
+
+EligibilityRule = namedtuple('EligibilityRule', [
+    'player_ids', 'positions', 'min_rating', 'max_rating', 'nationality', 'playing_style',
+    'free_agents_only', 'top_per_position',
+])
+
+_INT_LIST_FIELDS = ('player_ids',)
+_INT_FIELDS = ('min_rating', 'max_rating', 'top_per_position')
+_TEXT_FIELDS = ('nationality', 'playing_style')
+
+
+def parse_rule(data):
+    """Validate a rule object into an ``EligibilityRule``; raises ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError('A rule must be an object')
+    unknown = set(data) - set(EligibilityRule._fields)
+    if unknown:
+        raise ValueError(f"Unknown rule fields: {', '.join(sorted(unknown))}")
+
+    values = dict.fromkeys(EligibilityRule._fields)
+    values['free_agents_only'] = bool(data.get('free_agents_only', False))
+    try:
+        for field in _INT_LIST_FIELDS:
+            if data.get(field) is not None:
+                values[field] = sorted({int(value) for value in data[field]})
+        for field in _INT_FIELDS:
+            if data.get(field) not in (None, ''):
+                values[field] = int(data[field])
+    except (TypeError, ValueError):
+        raise ValueError('Player ids, ratings and top_per_position must be whole numbers')
+    for field in _TEXT_FIELDS:
+        if data.get(field):
+            values[field] = str(data[field]).strip()
+
+    if data.get('positions'):
+        positions = data['positions']
+        if isinstance(positions, str) or not all(position in Config.POSITIONS for position in positions):
+            raise ValueError(f"Positions must be a list drawn from {', '.join(Config.POSITIONS)}")
+        values['positions'] = sorted(set(positions))
+
+    if values['top_per_position'] is not None and values['top_per_position'] < 1:
+        raise ValueError('top_per_position must be at least 1')
+    rule = EligibilityRule(**values)
+    if not any(value for field, value in rule._asdict().items() if field != 'free_agents_only') \
+            and not rule.free_agents_only:
+        raise ValueError('A rule needs at least one criterion')
+    return rule
+
+
+def _matches(rule):
+    """SQL condition true for the players the rule selects and false (never NULL) for the rest"""
+    conditions = []
+    if rule.player_ids is not None:
+        conditions.append(Player.id.in_(rule.player_ids))
+    if rule.positions:
+        conditions.append(Player.position.in_(rule.positions))
+    if rule.min_rating is not None:
+        conditions.append(Player.overall_rating >= rule.min_rating)
+    if rule.max_rating is not None:
+        conditions.append(Player.overall_rating <= rule.max_rating)
+    if rule.nationality:
+        conditions.append(Player.nationality == rule.nationality)
+    if rule.playing_style:
+        conditions.append(Player.playing_style == rule.playing_style)
+    if rule.free_agents_only:
+        conditions.append(Player.team_id.is_(None))
+
+    if rule.top_per_position is None:
+        # A NULL rating or nationality must count as "not matched", including under NOT
+        return func.coalesce(and_(*conditions), false(), type_=Boolean)
+
+    # Rank the players the other criteria keep, best rating first, within each position
+    ranked = select(
+        Player.id,
+        func.row_number().over(
+            partition_by=Player.position,
+            order_by=(Player.overall_rating.desc().nulls_last(), Player.name, Player.id),
+        ).label('rank'),
+    ).where(*conditions).subquery()
+    return Player.id.in_(select(ranked.c.id).where(ranked.c.rank <= rule.top_per_position))
+
+
+def _target(mode, matched):
+    """Eligibility each player ends up with under ``mode``"""
+    current = Player.is_auction_eligible.is_(True)
+    if mode == 'add':
+        return or_(current, matched)
+    if mode == 'remove':
+        return and_(current, not_(matched))
+    return matched
+
+
+class AuctionPool:
+    """Previews, applies and undoes batch eligibility changes"""
+
+    @staticmethod
+    def preview(rule, mode):
+        """Per-position counts of what ``apply`` would do, without writing.
+
+        Returns ``{'positions': {position: counts}, 'totals': counts}`` where
+        counts has ``matched``, ``enabled``, ``disabled`` and ``pool`` (the
+        eligible players afterwards).
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode must be one of {', '.join(MODES)}")
+        matched = _matches(rule)
+        target = _target(mode, matched)
+        current = Player.is_auction_eligible.is_(True)
+
+        def count(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        rows = db.session.execute(select(
+            Player.position,
+            count(matched),
+            count(and_(target, not_(current))),
+            count(and_(current, not_(target))),
+            count(target),
+        ).group_by(Player.position)).all()
+
+        positions = {}
+        totals = {'matched': 0, 'enabled': 0, 'disabled': 0, 'pool': 0}
+        for position, *values in rows:
+            counts = dict(zip(('matched', 'enabled', 'disabled', 'pool'), (int(value) for value in values)))
+            positions[position] = counts
+            for key, value in counts.items():
+                totals[key] += value
+        return {'positions': positions, 'totals': totals}
+
+    @staticmethod
+    def apply(rule, mode, user_id=None):
+        """Change the pool with one set-based UPDATE and record the diff; returns the ``EligibilityChange``"""
+        if mode not in MODES:
+            raise ValueError(f"Mode must be one of {', '.join(MODES)}")
+        matched = _matches(rule)
+        current = Player.is_auction_eligible.is_(True)
+        if mode == 'add':
+            changed, value = and_(matched, not_(current)), True
+        elif mode == 'remove':
+            changed, value = and_(matched, current), False
+        else:
+            changed = or_(and_(matched, not_(current)), and_(current, not_(matched)))
+            value = case((matched, True), else_=False)
+
+        flipped = db.session.execute(
+            update(Player).where(changed).values(is_auction_eligible=value).returning(
+                Player.id, Player.is_auction_eligible),
+            execution_options={'synchronize_session': False},
+        ).all()
+        change = EligibilityChange(
+            created_by=user_id,
+            mode=mode,
+            rule=json.dumps(rule._asdict(), sort_keys=True),
+            enabled_ids=json.dumps(sorted(player_id for player_id, eligible in flipped if eligible)),
+            disabled_ids=json.dumps(sorted(player_id for player_id, eligible in flipped if not eligible)),
+        )
+        db.session.add(change)
+        db.session.commit()
+        logger.info(f"Eligibility change {change.id} ({mode}): {len(flipped)} players flipped")
+        return change
+
+    @staticmethod
+    def undo(change_id):
+        """Flip a change's players back; only the latest change still in effect can be undone"""
+        change = db.session.get(EligibilityChange, change_id)
+        if change is None or change.undone_at is not None:
+            raise ValueError('That change does not exist or has already been undone')
+        if AuctionPool.latest_change().id != change.id:
+            raise ValueError('Only the most recent change can be undone')
+
+        enabled, disabled = json.loads(change.enabled_ids), json.loads(change.disabled_ids)
+        if enabled or disabled:
+            db.session.execute(
+                update(Player).where(Player.id.in_(enabled + disabled)).values(
+                    is_auction_eligible=case((Player.id.in_(disabled), True), else_=False)),
+                execution_options={'synchronize_session': False},
+            )
+        change.undone_at = datetime.utcnow()
+        db.session.commit()
+        return change
+
+    @staticmethod
+    def latest_change():
+        """The change an undo would revert, or None"""
+        return EligibilityChange.query.filter(EligibilityChange.undone_at.is_(None)).order_by(
+            EligibilityChange.id.desc()).first()
+
+    @staticmethod
+    def describe(change):
+        """A change as JSON for the admin page"""
+        return {
+            'id': change.id,
+            'mode': change.mode,
+            'rule': {key: value for key, value in json.loads(change.rule).items() if value not in (None, False)},
+            'enabled': len(json.loads(change.enabled_ids)),
+            'disabled': len(json.loads(change.disabled_ids)),
+            'created_at': change.created_at.isoformat() if change.created_at else None,
+            'undone': change.undone_at is not None,
+        }
@@ -0,0 +1,274 @@
+"""
+Player Availability Index
+=========================
+A process-local, versioned index of the players the bidding pages list, so
+paging and filtering ``team_bulk_round``, ``team_round`` and
+``team_players_data`` happens in memory instead of re-running the
+``team_id IS NULL AND is_auction_eligible`` query with its position, group
+and name filters on every request.
+
+The index holds a small entry per player that is auction eligible or in a
+round, already sorted the way the pages show them (rating, highest first,
+then name).  Three scopes are served from it:
+
+    eligible          every eligible player (the player browser)
+    available         eligible players without a team (bulk rounds)
+    round:<id>        unallocated players of a regular round
+
+Filtered lists are memoized per scope and filter for the life of a snapshot.
+
+Freshness comes from ``availability_index_version``, a single counter row
+bumped in the same transaction as any change to a player's allocation,
+eligibility or listed fields.  Session hooks catch ORM flushes and bulk
+``update``/``delete``/``insert`` statements on players and bump the counter
+once per transaction; raw SQL that writes the player table must call
+``bump_version()``.  Each request reads the counter (one primary-key lookup)
+and rebuilds the snapshot when it moved.  A session reading the index after
+writing players in its open transaction gets a private snapshot of its own
+view, so uncommitted changes are never published to other requests.
+
+Per-team annotations come from ``team_marks()``: one query for the team's
+starred players and its bids in the rounds on screen, returned as a flag per
+player id plus the bid rows the templates link to.
+"""
+
+import logging
+import threading
+from collections import namedtuple
+from itertools import chain
+
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import event, inspect, select, text, bindparam, or_
+from sqlalchemy.orm import Session
+
+from models import db, Player
+
+logger = logging.getLogger(__name__)
+
+PlayerEntry = namedtuple('PlayerEntry', [
+    'id', 'name', 'position', 'position_group', 'team_name', 'overall_rating', 'playing_style',
+    'team_id', 'round_id', 'is_auction_eligible',
+])
+
+# Player columns that decide whether and where a player is listed
+INDEXED_COLUMNS = tuple(field for field in PlayerEntry._fields if field != 'id')
+
+# team_marks() flags
+MARK_BID = 1
+MARK_STARRED = 2
+
+BUMP_VERSION = text("UPDATE availability_index_version SET version = version + 1 WHERE id = 1")
+CREATE_VERSION = text("INSERT INTO availability_index_version (id, version) VALUES (1, 1)")
+READ_VERSION = text("SELECT version FROM availability_index_version WHERE id = 1")
+
+# session.info key holding the transaction that already bumped the version
+BUMPED_KEY = 'availability_index_bumped'
+
+
+def round_scope(round_id):
+    return f'round:{round_id}'
+
+
+class AvailabilitySnapshot:
+    """Entries and scope lists built at one version; never mutated once published"""
+
+    def __init__(self, version, entries):
+        self.version = version
+        self.entries = {entry.id: entry for entry in entries}
+        self.search_names = {entry.id: (entry.name or '').lower() for entry in entries}
+        self.scopes = {'eligible': [], 'available': []}
+        for entry in entries:
+            if entry.is_auction_eligible:
+                self.scopes['eligible'].append(entry.id)
+                if entry.team_id is None:
+                    self.scopes['available'].append(entry.id)
+            if entry.round_id is not None and entry.team_id is None:
+                self.scopes.setdefault(round_scope(entry.round_id), []).append(entry.id)
+        self._filtered = {}
+
+    def player_ids(self, scope, position=None, position_group=None, playing_style=None, search=None):
+        """Ids in display order for a scope and its filters"""
+        key = (scope, position or None, position_group or None, playing_style or None)
+        ids = self._filtered.get(key)
+        if ids is None:
+            _, position, position_group, playing_style = key
+            ids = [
+                player_id for player_id in self.scopes.get(scope, ())
+                if (position is None or self.entries[player_id].position == position)
+                and (position_group is None or self.entries[player_id].position_group == position_group)
+                and (playing_style is None or self.entries[player_id].playing_style == playing_style)
+            ]
+            self._filtered[key] = ids
+        if search:
+            needle = search.lower()
+            ids = [player_id for player_id in ids if needle in self.search_names[player_id]]
+        return ids
+
+    def players(self, scope, **filters):
+        """Index entries in display order for a scope and its filters"""
+        return [self.entries[player_id] for player_id in self.player_ids(scope, **filters)]
+
+    def position_counts(self, scope):
+        """{position: players} within a scope"""
+        counts = {}
+        for player_id in self.scopes.get(scope, ()):
+            position = self.entries[player_id].position
+            counts[position] = counts.get(position, 0) + 1
+        return counts
+
+    def paginate(self, scope, page, per_page, error_out=True, load=None, **filters):
+        """A Flask-SQLAlchemy style pagination over a scope.
+
+        Items are index entries, or whatever ``load(ids)`` returns for the
+        page's ids, in the same order.
+        """
+        if load is None:
+            load = lambda page_ids: [self.entries[player_id] for player_id in page_ids]
+        return IndexPagination(page=page, per_page=per_page, max_per_page=None, error_out=error_out,
+                               ids=self.player_ids(scope, **filters), load=load)
+
+
+class PlayerAvailabilityIndex:
+    """Thread-safe holder of the current snapshot, rebuilt when the version moves"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def snapshot(self):
+        """The snapshot for the current database version"""
+        version = db.session.execute(READ_VERSION).scalar() or 0
+        if _bumped_in_transaction(db.session()):
+            return self._build(version)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._build(version)
+                self._snapshot = snapshot
+                self.rebuilds += 1
+        return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+    def _build(self, version):
+        rows = db.session.execute(
+            select(*[getattr(Player, field) for field in PlayerEntry._fields])
+            .where(or_(Player.is_auction_eligible.is_(True), Player.round_id.isnot(None)))
+            .order_by(Player.overall_rating.desc().nullslast(), Player.name.asc(), Player.id.asc())
+        ).all()
+        logger.debug(f"Player availability index rebuilt at version {version} with {len(rows)} players")
+        return AvailabilitySnapshot(version, [PlayerEntry(*row) for row in rows])
+
+
+class IndexPagination(Pagination):
+    """Pagination over an id list already filtered and ordered by the index"""
+
+    def _query_items(self):
+        start = self._query_offset
+        return self._query_args['load'](self._query_args['ids'][start:start + self.per_page])
+
+    def _query_count(self):
+        return len(self._query_args['ids'])
+
+
+def load_players(player_ids):
+    """Player rows for ``player_ids`` in the order given"""
+    if not player_ids:
+        return []
+    players = {player.id: player for player in Player.query.filter(Player.id.in_(player_ids))}
+    return [players[player_id] for player_id in player_ids if player_id in players]
+
+
+def team_marks(team_id, round_ids=(), bulk_round_id=None):
+    """Starred and already-bid flags for a team, in one query.
+
+    Returns ``(flags, bids)``: ``flags`` maps player id to ``MARK_BID`` /
+    ``MARK_STARRED`` bits; ``bids`` maps ``(round_id, player_id)`` to the
+    ``(bid_id, amount)`` of the team's regular bid, or ``('bulk', player_id)``
+    to the id of its bulk bid.
+    """
+    parts = ["SELECT 'starred' AS kind, NULL AS round_id, player_id, NULL AS bid_id, NULL AS amount "
+             "FROM starred_player WHERE team_id = :team_id"]
+    params = {'team_id': team_id}
+    expanding = []
+    if round_ids:
+        parts.append("SELECT 'bid', round_id, player_id, id, amount FROM bid "
+                     "WHERE team_id = :team_id AND round_id IN :round_ids")
+        params['round_ids'] = list(round_ids)
+        expanding.append(bindparam('round_ids', expanding=True))
+    if bulk_round_id is not None:
+        parts.append("SELECT 'bulk', round_id, player_id, id, NULL FROM bulk_bid "
+                     "WHERE team_id = :team_id AND round_id = :bulk_round_id")
+        params['bulk_round_id'] = bulk_round_id
+    query = text(" UNION ALL ".join(parts))
+    if expanding:
+        query = query.bindparams(*expanding)
+
+    flags, bids = {}, {}
+    for kind, round_id, player_id, bid_id, amount in db.session.execute(query, params):
+        if kind == 'starred':
+            flags[player_id] = flags.get(player_id, 0) | MARK_STARRED
+            continue
+        flags[player_id] = flags.get(player_id, 0) | MARK_BID
+        if kind == 'bulk':
+            bids[('bulk', player_id)] = bid_id
+        else:
+            bids[(round_id, player_id)] = (bid_id, amount)
+    return flags, bids
+
+
+# ----------------------------------------------------------------------
+# Version bumps
+# ----------------------------------------------------------------------
+
+def bump_version(connection):
+    """Advance the index version inside the transaction of ``connection``"""
+    if connection.execute(BUMP_VERSION).rowcount == 0:
+        connection.execute(CREATE_VERSION)
+
+
+def _bumped_in_transaction(session):
+    transaction = session.get_transaction()
+    return transaction is not None and session.info.get(BUMPED_KEY) is transaction
+
+
+def _bump_once(session):
+    if not _bumped_in_transaction(session):
+        bump_version(session.connection())
+        session.info[BUMPED_KEY] = session.get_transaction()
+
+
+def _listing_changed(obj):
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in INDEXED_COLUMNS)
+
+
+def _after_flush(session, flush_context):
+    # new, dirty and deleted still describe the flush that just ran
+    if (any(isinstance(obj, Player) for obj in chain(session.new, session.deleted))
+            or any(isinstance(obj, Player) and _listing_changed(obj) for obj in session.dirty)):
+        _bump_once(session)
+
+
+def _do_orm_execute(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is Player:
+        _bump_once(orm_execute_state.session)
+
+
+availability_index = PlayerAvailabilityIndex()
+
+
+def init_availability_index(app):
+    """Bump the index version whenever a session writes players"""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'do_orm_execute', _do_orm_execute)
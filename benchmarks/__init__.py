@@ -0,0 +1,8 @@
+"""
+Benchmark Suite
+===============
+Seeds a synthetic auction season and drives scripted user journeys through
+the Flask test client to measure throughput, latency and queries per request.
+
+Run with:  python -m benchmarks.run_benchmarks --help
+"""
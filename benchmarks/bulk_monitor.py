@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Bulk Round Monitor Benchmark
+============================
+Times the admin bulk-round monitor poll (``/admin/bulk_round_update``) on an
+active round holding thousands of bulk bids:
+
+* ``full``: a poll without ``since``, as on the first load,
+* ``idle_delta``: a poll with the current version while nothing changed,
+* ``delta_after_withdrawal``: a poll right after a team deleted one of its
+  bids through ``/delete_bulk_bid``.
+
+Seeded teams hold more bids than the 25-player squad limit lets them place,
+so the changing bid is a withdrawal rather than a new bid; both go through
+the same counter update.
+
+Each scenario reports mean milliseconds, queries and response bytes.
+
+Examples:
+    python -m benchmarks.bulk_monitor
+    python -m benchmarks.bulk_monitor --bids-per-team 200 --polls 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, QueryCounter, create_bench_app, load_baseline, login_as,
+    refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'bulk_monitor'
+HEADERS = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Time the admin bulk round monitor poll')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--teams', type=int, default=30, help='Teams bidding in the round')
+    parser.add_argument('--bids-per-team', type=int, default=100, help='Bulk bids seeded per team')
+    parser.add_argument('--polls', type=int, default=20, help='Polls per scenario')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+    from models import BulkBid, Team
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=args.teams, players=max(2000, args.bids_per_team * 20),
+                                       rounds=2, bulk_rounds=1, bulk_bids_per_team=args.bids_per_team)
+        round_id = seeded['active_bulk_round_id']
+        bid_count = BulkBid.query.filter_by(round_id=round_id).count()
+        team_users = {team.id: team.user_id for team in Team.query}
+        engine = db.engine
+    url = f'/admin/bulk_round_update/{round_id}'
+
+    admin = app.test_client()
+    login_as(admin, seeded['admin_id'])
+    version = admin.get(url, headers=HEADERS).get_json()['version']
+
+    def withdraw(poll):
+        """Delete one seeded bid as its team"""
+        with app.app_context():
+            bid = BulkBid.query.filter_by(round_id=round_id).order_by(BulkBid.id).first()
+            bid_id, team_id = bid.id, bid.team_id
+        team = app.test_client()
+        login_as(team, team_users[team_id])
+        response = team.delete(f'/delete_bulk_bid/{bid_id}')
+        if response.status_code != 200:
+            raise RuntimeError(f'Deleting bulk bid {bid_id} failed: HTTP {response.status_code}')
+
+    scenarios = {
+        'full': (None, lambda: url),
+        'idle_delta': (None, lambda: f'{url}?since={version}'),
+        'delta_after_withdrawal': (withdraw, lambda: f'{url}?since={version}'),
+    }
+
+    counter = QueryCounter()
+    counter.install(engine)
+    results = {}
+    try:
+        for name, (prepare, target) in scenarios.items():
+            total_seconds, total_queries, total_bytes = 0.0, 0, 0
+            for poll in range(args.polls):
+                if prepare:
+                    prepare(poll)
+                counter.reset()
+                started = time.perf_counter()
+                response = admin.get(target(), headers=HEADERS)
+                total_seconds += time.perf_counter() - started
+                total_queries += counter.count
+                total_bytes += len(response.data)
+                if response.status_code != 200:
+                    print(f"❌ {name}: HTTP {response.status_code}")
+                    return 1
+                version = response.get_json().get('version', version)
+            results[name] = {
+                'mean_ms': round(total_seconds / args.polls * 1000, 2),
+                'queries': round(total_queries / args.polls, 1),
+                'bytes': total_bytes // args.polls,
+            }
+    finally:
+        counter.remove(engine)
+
+    print(f"Bulk round monitor on {bid_count} bids from {args.teams} teams ({args.polls} polls each)")
+    print(f"{'scenario':<24} {'mean ms':>9} {'queries':>8} {'bytes':>9}")
+    for name, row in results.items():
+        print(f"{name:<24} {row['mean_ms']:>9.2f} {row['queries']:>8} {row['bytes']:>9}")
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        regressions = []
+        for name, row in results.items():
+            previous = baseline['results'].get(name)
+            if not previous:
+                continue
+            if row['mean_ms'] > previous['mean_ms'] * (1 + DEFAULT_LATENCY_TOLERANCE):
+                regressions.append(f"{name}: {row['mean_ms']:.2f}ms vs baseline {previous['mean_ms']:.2f}ms")
+            if row['queries'] > previous['queries']:
+                regressions.append(f"{name}: {row['queries']} queries vs baseline {previous['queries']}")
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ Monitor polls within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
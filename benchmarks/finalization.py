@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Round Finalization Benchmark
+============================
+Finalizes regular rounds built to tie a lot and reports what it costs to get
+each one from the admin's finalize click to ``completed``.
+
+Every round pairs the teams up and gives each pair its own contested player
+at a pair-specific amount, so a round has ``teams / 2`` independent ties.
+Each team also bids on players nobody else wants, below every tie.  The admin
+finalizes through ``/finalize_round``; every open tiebreaker is then answered
+by its teams through ``/submit_tiebreaker_bid`` (one wave), and waves repeat
+until the round completes.
+
+Reported per round: mean milliseconds and queries for the whole journey,
+tiebreaker waves (how many times teams had to wait on each other) and
+tiebreakers opened.  A run fails if a contested player is left unallocated
+or a team was charged more than the players it won are worth.  Only
+endpoints and tables that predate the resumable finalizer are used, so the
+script can be run against an older checkout.
+
+Examples:
+    python -m benchmarks.finalization
+    python -m benchmarks.finalization --teams 40 --rounds 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, QueryCounter, create_bench_app, load_baseline, login_as,
+    refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'finalization'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Time finalizing rounds with many independent ties')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--teams', type=int, default=30, help='Teams bidding, paired into one tie each')
+    parser.add_argument('--rounds', type=int, default=5, help='Rounds to finalize')
+    parser.add_argument('--bids-per-team', type=int, default=4, help='Bids each team places per round')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def seed_tied_round(team_ids, bids_per_team, number):
+    """An active round where each pair of teams ties on its own player"""
+    from models import db, Player, Round, Bid
+
+    round_ = Round(position='CF', is_active=True, status='active', max_bids_per_team=bids_per_team)
+    db.session.add(round_)
+    pairs = [team_ids[i:i + 2] for i in range(0, len(team_ids) - 1, 2)]
+    contested = [Player(name=f'Contested {number}-{i}', position='CF', round=round_) for i in range(len(pairs))]
+    private = [Player(name=f'Private {number}-{team_id}-{j}', position='CF', round=round_)
+               for team_id in team_ids for j in range(bids_per_team - 1)]
+    db.session.add_all(contested + private)
+    db.session.flush()
+
+    bids = []
+    for i, (pair, player) in enumerate(zip(pairs, contested)):
+        bids.extend(Bid(team_id=team_id, player_id=player.id, round_id=round_.id, amount=300 - i * 5)
+                    for team_id in pair)
+    for index, team_id in enumerate(team_ids):
+        own = private[index * (bids_per_team - 1):(index + 1) * (bids_per_team - 1)]
+        bids.extend(Bid(team_id=team_id, player_id=player.id, round_id=round_.id, amount=50 - j)
+                    for j, player in enumerate(own))
+    db.session.add_all(bids)
+    db.session.commit()
+    return round_.id
+
+
+def finalize_with_waves(app, admin, team_clients, round_id):
+    """Finalize a round, answering every open tiebreaker in waves.  Returns (waves, tiebreakers)."""
+    from models import db, Round, Tiebreaker, TeamTiebreaker
+
+    response = admin.post(f'/finalize_round/{round_id}')
+    if response.status_code >= 400:
+        raise RuntimeError(f"finalize_round {round_id}: HTTP {response.status_code}")
+
+    waves, answered = 0, set()
+    while True:
+        with app.app_context():
+            round_ = db.session.get(Round, round_id)
+            if not round_.is_active:
+                return waves, len(answered)
+            open_ties = db.session.query(Tiebreaker.id, Tiebreaker.original_amount, TeamTiebreaker.team_id).join(
+                TeamTiebreaker, TeamTiebreaker.tiebreaker_id == Tiebreaker.id
+            ).filter(Tiebreaker.round_id == round_id, Tiebreaker.resolved.is_(False)).order_by(
+                Tiebreaker.id, TeamTiebreaker.team_id).all()
+        if not open_ties:
+            raise RuntimeError(f"round {round_id} is still active with no open tiebreaker")
+
+        waves += 1
+        for offset, (tiebreaker_id, original_amount, team_id) in enumerate(open_ties):
+            answered.add(tiebreaker_id)
+            response = team_clients[team_id].post('/submit_tiebreaker_bid', json={
+                'tiebreaker_id': tiebreaker_id, 'amount': original_amount + 1 + offset,
+            })
+            if response.status_code >= 400:
+                raise RuntimeError(f"tiebreaker {tiebreaker_id} team {team_id}: HTTP {response.status_code}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+    from sqlalchemy import func
+    from models import Player, Team
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=args.teams, players=500, rounds=2, bulk_rounds=1,
+                                       bids_per_team=1, bulk_bids_per_team=1)
+        team_users = {team.id: team.user_id for team in Team.query.order_by(Team.id)}
+        round_ids = [seed_tied_round(seeded['team_ids'], args.bids_per_team, number)
+                     for number in range(args.rounds)]
+        balances_before = {team.id: team.balance for team in Team.query}
+        engine = db.engine
+
+    admin = app.test_client()
+    login_as(admin, seeded['admin_id'])
+    team_clients = {}
+    for team_id, user_id in team_users.items():
+        team_clients[team_id] = app.test_client()
+        login_as(team_clients[team_id], user_id)
+
+    counter = QueryCounter()
+    counter.install(engine)
+    total_seconds, total_queries, total_waves, total_tiebreakers = 0.0, 0, 0, 0
+    try:
+        for round_id in round_ids:
+            counter.reset()
+            started = time.perf_counter()
+            try:
+                waves, tiebreakers = finalize_with_waves(app, admin, team_clients, round_id)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return 1
+            total_seconds += time.perf_counter() - started
+            total_queries += counter.count
+            total_waves += waves
+            total_tiebreakers += tiebreakers
+    finally:
+        counter.remove(engine)
+
+    with app.app_context():
+        unallocated = Player.query.filter(Player.round_id.in_(round_ids), Player.team_id.is_(None),
+                                          Player.name.like('Contested %')).count()
+        won = dict(db.session.query(Player.team_id, func.sum(Player.acquisition_value)).filter(
+            Player.round_id.in_(round_ids)).group_by(Player.team_id).all())
+        overcharged = sum(1 for team in Team.query
+                          if balances_before[team.id] - team.balance != (won.get(team.id) or 0))
+
+    rounds = len(round_ids)
+    results = {
+        'finalize_round': {
+            'mean_ms': round(total_seconds / rounds * 1000, 2),
+            'queries': round(total_queries / rounds, 1),
+            'waves': round(total_waves / rounds, 1),
+            'tiebreakers': round(total_tiebreakers / rounds, 1),
+        }
+    }
+
+    print(f"Finalized {rounds} rounds of {args.teams} teams x {args.bids_per_team} bids, "
+          f"{args.teams // 2} ties each")
+    print(f"{'journey':<16} {'mean ms':>9} {'queries':>8} {'waves':>6} {'ties':>5}")
+    for name, row in results.items():
+        print(f"{name:<16} {row['mean_ms']:>9.2f} {row['queries']:>8} {row['waves']:>6} {row['tiebreakers']:>5}")
+    if unallocated or overcharged:
+        print(f"\n❌ {unallocated} contested players unallocated, {overcharged} teams charged for players they did not win")
+        return 1
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        regressions = []
+        for name, row in results.items():
+            previous = baseline['results'].get(name)
+            if not previous:
+                continue
+            if row['mean_ms'] > previous['mean_ms'] * (1 + DEFAULT_LATENCY_TOLERANCE):
+                regressions.append(f"{name}: {row['mean_ms']:.2f}ms vs baseline {previous['mean_ms']:.2f}ms")
+            for metric in ('queries', 'waves'):
+                if row[metric] > previous[metric]:
+                    regressions.append(f"{name}: {row[metric]} {metric} vs baseline {previous[metric]}")
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ Round finalization within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
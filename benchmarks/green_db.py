@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Green Database Benchmark
+========================
+Measures concurrent-request throughput of the eventlet worker against a
+deliberately slow PostgreSQL, with psycopg2 blocking and with the green wait
+callback (``green_db.py``).
+
+Each mode runs in a fresh interpreter that monkey patches with eventlet the
+way gunicorn's eventlet worker does, serves the app with ``eventlet.wsgi``
+and fires ``--requests`` requests from ``--concurrency`` green clients at a
+benchmark-only route that runs ``SELECT pg_sleep(--delay-ms)`` through the
+ORM session, standing in for a slow or distant database.  Alongside them a
+single client polls a route that never touches the database, which shows
+whether the rest of the site stays responsive while queries wait.
+
+Reported per mode: requests per second, p50/p99 latency of the slow route
+and p99 latency of the database-free route.  Blocking mode serves one query
+at a time, so its throughput is about ``1000 / delay-ms``; green mode should
+scale with ``min(concurrency, pool size)``.
+
+Needs eventlet and a PostgreSQL database (nothing is written to it).
+
+Examples:
+    python -m benchmarks.green_db --database-url postgresql://localhost/auction_bench
+    python -m benchmarks.green_db --concurrency 50 --delay-ms 100 --pool-size 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import DEFAULT_LATENCY_TOLERANCE, REPO_ROOT, load_baseline, save_baseline
+
+BASELINE_NAME = 'green_db'
+
+MODES = ('blocking', 'green')
+
+RUN_SCRIPT = """
+import eventlet
+eventlet.monkey_patch()
+
+import json, sys, time
+from benchmarks.harness import create_bench_app, percentile
+
+options = json.loads(sys.argv[1])
+
+from config import Config
+# A local benchmark database usually has no TLS
+Config.SQLALCHEMY_ENGINE_OPTIONS.setdefault('connect_args', {})['sslmode'] = options['sslmode']
+app, db = create_bench_app(options['database_url'])
+from sqlalchemy import text
+from green_db import get_status
+
+
+@app.route('/bench/slow_query')
+def bench_slow_query():
+    db.session.execute(text('SELECT pg_sleep(:seconds)'), {'seconds': options['delay_ms'] / 1000})
+    return 'ok'
+
+
+@app.route('/bench/no_query')
+def bench_no_query():
+    return 'ok'
+
+
+from eventlet import wsgi
+from eventlet.green.urllib.request import urlopen
+
+listener = eventlet.listen(('127.0.0.1', 0))
+port = listener.getsockname()[1]
+eventlet.spawn(wsgi.server, listener, app, log_output=False)
+base = f'http://127.0.0.1:{port}'
+urlopen(base + '/bench/slow_query').read()
+
+slow, quick, running = [], [], [True]
+
+def fetch(path, into):
+    started = time.perf_counter()
+    urlopen(base + path).read()
+    into.append((time.perf_counter() - started) * 1000)
+
+def poll_quick():
+    while running[0]:
+        fetch('/bench/no_query', quick)
+        eventlet.sleep(0.01)
+
+poller = eventlet.spawn(poll_quick)
+pool = eventlet.GreenPool(options['concurrency'])
+started = time.perf_counter()
+for _ in range(options['requests']):
+    pool.spawn_n(fetch, '/bench/slow_query', slow)
+pool.waitall()
+elapsed = time.perf_counter() - started
+running[0] = False
+poller.wait()
+
+print(json.dumps({
+    'requests_per_s': round(len(slow) / elapsed, 1),
+    'slow_p50_ms': round(percentile(slow, 50), 1),
+    'slow_p99_ms': round(percentile(slow, 99), 1),
+    'no_query_p99_ms': round(percentile(quick, 99), 1),
+    'green': get_status()['green'],
+}))
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent throughput with blocking and green psycopg2')
+    parser.add_argument('--database-url', help='PostgreSQL database (default: BENCH_DATABASE_URL)')
+    parser.add_argument('--concurrency', type=int, default=20, help='Simultaneous clients')
+    parser.add_argument('--requests', type=int, default=200, help='Requests to the slow route per mode')
+    parser.add_argument('--delay-ms', type=int, default=50, help='Server-side delay of every query')
+    parser.add_argument('--pool-size', type=int, default=10, help='DB_POOL_SIZE for the run')
+    parser.add_argument('--max-overflow', type=int, default=20, help='DB_MAX_OVERFLOW for the run')
+    parser.add_argument('--sslmode', default='prefer', help='sslmode for the benchmark connection')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def run_mode(mode, args, database_url):
+    env = dict(os.environ)
+    env.update(DATABASE_URL=database_url, DB_CONCURRENCY=mode, DB_POOL_SIZE=str(args.pool_size),
+               DB_MAX_OVERFLOW=str(args.max_overflow))
+    env['PYTHONPATH'] = REPO_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    options = {'database_url': database_url, 'concurrency': args.concurrency, 'requests': args.requests,
+               'delay_ms': args.delay_ms, 'sslmode': args.sslmode}
+    result = subprocess.run([sys.executable, '-c', RUN_SCRIPT, json.dumps(options)], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f'{mode} run failed')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or ''
+    if not database_url.startswith(('postgresql', 'postgres')):
+        print('❌ Needs a PostgreSQL --database-url (pg_sleep stands in for a slow database)')
+        return 2
+
+    results = {}
+    for mode in MODES:
+        try:
+            results[mode] = run_mode(mode, args, database_url)
+        except RuntimeError as e:
+            print(f"❌ {mode}: {e}")
+            return 1
+
+    print(f"{args.requests} requests from {args.concurrency} clients, {args.delay_ms}ms per query, "
+          f"pool {args.pool_size}+{args.max_overflow}")
+    print(f"{'mode':<10} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'no-query p99':>13}")
+    for mode, row in results.items():
+        print(f"{mode:<10} {row['requests_per_s']:>8} {row['slow_p50_ms']:>9} {row['slow_p99_ms']:>9} "
+              f"{row['no_query_p99_ms']:>13}")
+    if not results['green']['green'] or results['blocking']['green']:
+        print('\n❌ The wait callback was not installed as configured')
+        return 1
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        previous = baseline['results'].get('green')
+        row = results['green']
+        if previous and row['requests_per_s'] < previous['requests_per_s'] * (1 - DEFAULT_LATENCY_TOLERANCE):
+            print(f"\n❌ Green throughput {row['requests_per_s']} req/s vs baseline {previous['requests_per_s']}")
+            return 1
+        print("\n✅ Green throughput within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
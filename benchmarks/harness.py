@@ -0,0 +1,201 @@
+"""
+Benchmark Harness
+=================
+Application bootstrap, query counting, latency recording and baseline
+comparison shared by every benchmark in this package.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+DEFAULT_DATABASE_URL = 'sqlite:///' + os.path.join(REPO_ROOT, 'instance', 'benchmark.db')
+
+# A regression is flagged when p95 latency grows by more than this ratio
+# or when an endpoint issues more queries per request than the baseline.
+DEFAULT_LATENCY_TOLERANCE = 0.25
+DEFAULT_QUERY_TOLERANCE = 0
+
+
+def refuse_to_seed(database_url, force_flag=None):
+    """True, after saying why, when ``database_url`` does not look like a scratch database.
+
+    Seeding drops every table, so only SQLite and URLs with 'bench' in them are
+    seeded; ``force_flag`` names the command-line option that overrides this.
+    """
+    if database_url.startswith('sqlite') or 'bench' in database_url:
+        return False
+    hint = f" (use {force_flag} to override)" if force_flag else ''
+    print(f"❌ Refusing to seed a database without 'bench' in its URL{hint}")
+    return True
+
+
+def create_bench_app(database_url=None):
+    """Import the application bound to a benchmark database.
+
+    The database URL has to be in the environment before ``config`` is
+    imported because ``Config`` resolves it at class-definition time.
+    """
+    database_url = database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+    if database_url.startswith('sqlite:///'):
+        os.makedirs(os.path.dirname(database_url[len('sqlite:///'):]) or '.', exist_ok=True)
+
+    os.environ['DATABASE_URL'] = database_url
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    from config import Config
+    if database_url.startswith('sqlite'):
+        # The Postgres connect_args (sslmode, keepalives) are rejected by sqlite3
+        Config.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    from app import app
+    from models import db
+
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app, db
+
+
+class QueryCounter:
+    """Counts SQL statements issued against an engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def install(self, engine):
+        from sqlalchemy import event
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+
+    def remove(self, engine):
+        from sqlalchemy import event
+        event.remove(engine, 'before_cursor_execute', self._before_cursor_execute)
+
+    def reset(self):
+        self.count = 0
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of an unsorted sequence"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * (pct / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class BenchmarkRecorder:
+    """Collects per-endpoint samples of latency and query counts"""
+
+    def __init__(self, query_counter=None):
+        self.query_counter = query_counter
+        self.samples = {}
+        self.errors = {}
+        self.wall_time = 0.0
+
+    @contextmanager
+    def measure(self, label):
+        if self.query_counter:
+            self.query_counter.reset()
+        start = time.perf_counter()
+        yield
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        queries = self.query_counter.count if self.query_counter else 0
+        self.samples.setdefault(label, []).append((elapsed_ms, queries))
+        self.wall_time += elapsed_ms / 1000
+
+    def record_error(self, label, status_code):
+        self.errors.setdefault(label, {})
+        self.errors[label][status_code] = self.errors[label].get(status_code, 0) + 1
+
+    def summary(self):
+        """Summarise samples as {label: {requests, rps, p50_ms, ...}}"""
+        results = {}
+        for label, samples in sorted(self.samples.items()):
+            latencies = [s[0] for s in samples]
+            queries = [s[1] for s in samples]
+            total_seconds = sum(latencies) / 1000
+            results[label] = {
+                'requests': len(samples),
+                'rps': round(len(samples) / total_seconds, 2) if total_seconds else 0.0,
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'max_ms': round(max(latencies), 2),
+                'queries_per_request': round(sum(queries) / len(queries), 2),
+                'max_queries': max(queries),
+                'errors': self.errors.get(label, {}),
+            }
+        return results
+
+
+def format_report(results, title='Benchmark results'):
+    """Render a summary dictionary as a fixed-width text table"""
+    lines = [title, '=' * len(title)]
+    header = f"{'endpoint':<40} {'reqs':>6} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'q/req':>7}"
+    lines.append(header)
+    lines.append('-' * len(header))
+    for label, row in results.items():
+        lines.append(
+            f"{label:<40} {row['requests']:>6} {row['rps']:>9.1f} {row['p50_ms']:>9.2f} "
+            f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['queries_per_request']:>7.1f}"
+        )
+        if row.get('errors'):
+            lines.append(f"    errors: {row['errors']}")
+    return '\n'.join(lines)
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def load_baseline(name):
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(name, results, metadata=None):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    payload = {'metadata': metadata or {}, 'results': results}
+    with open(baseline_path(name), 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return baseline_path(name)
+
+
+def compare_to_baseline(results, baseline, latency_tolerance=DEFAULT_LATENCY_TOLERANCE,
+                        query_tolerance=DEFAULT_QUERY_TOLERANCE):
+    """Return a list of human readable regressions against a stored baseline"""
+    regressions = []
+    baseline_results = (baseline or {}).get('results', {})
+    for label, row in results.items():
+        previous = baseline_results.get(label)
+        if not previous:
+            continue
+        if previous['p95_ms'] and row['p95_ms'] > previous['p95_ms'] * (1 + latency_tolerance):
+            regressions.append(
+                f"{label}: p95 {row['p95_ms']:.2f}ms vs baseline {previous['p95_ms']:.2f}ms"
+            )
+        if row['queries_per_request'] > previous['queries_per_request'] + query_tolerance:
+            regressions.append(
+                f"{label}: {row['queries_per_request']:.1f} queries/request vs baseline "
+                f"{previous['queries_per_request']:.1f}"
+            )
+    return regressions
+
+
+def login_as(client, user_id):
+    """Authenticate a test client session the way Flask-Login does"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
@@ -0,0 +1,145 @@
+"""
+Scripted User Journeys
+======================
+Each journey replays what a browser does during an auction: team pages
+polling for round state, teams placing and withdrawing bids, the admin
+dashboards polling, exports, and the admin finalizing the active round.
+"""
+
+import random
+
+from benchmarks.harness import login_as
+
+XHR_HEADERS = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+class JourneyContext:
+    """Holds the seeded ids and one logged-in test client per user"""
+
+    def __init__(self, app, seeded, seed=7):
+        self.app = app
+        self.seeded = seeded
+        self.rng = random.Random(seed)
+        self._clients = {}
+
+    def client_for(self, user_id):
+        if user_id not in self._clients:
+            client = self.app.test_client()
+            login_as(client, user_id)
+            self._clients[user_id] = client
+        return self._clients[user_id]
+
+    @property
+    def admin(self):
+        return self.client_for(self.seeded['admin_id'])
+
+    def team_clients(self, limit=None):
+        """Team clients paired with their team id, skipping teams in open tiebreakers"""
+        pairs = list(zip(self.seeded['user_ids'], self.seeded['team_ids']))[:-2]
+        if limit:
+            pairs = pairs[:limit]
+        return [(self.client_for(user_id), team_id) for user_id, team_id in pairs]
+
+
+def _call(recorder, label, client, method, path, **kwargs):
+    with recorder.measure(label):
+        response = client.open(path, method=method, **kwargs)
+    if response.status_code >= 400:
+        recorder.record_error(label, response.status_code)
+    return response
+
+
+def team_polling(ctx, recorder, iterations=5):
+    """Team dashboard, round page and the timers they poll every few seconds"""
+    active_round = ctx.seeded['active_round_id']
+    active_bulk_round = ctx.seeded['active_bulk_round_id']
+    for _ in range(iterations):
+        for client, _team_id in ctx.team_clients(limit=10):
+            _call(recorder, 'team_dashboard_update', client, 'GET', '/team_dashboard_update')
+            _call(recorder, 'check_round_status', client, 'GET', f'/check_round_status/{active_round}')
+            _call(recorder, 'check_bulk_round_status', client, 'GET',
+                  f'/check_bulk_round_status/{active_bulk_round}')
+            _call(recorder, 'team_round', client, 'GET', '/team_round')
+
+
+def team_browsing(ctx, recorder, iterations=2):
+    """Pages a team opens between rounds"""
+    for _ in range(iterations):
+        for client, team_id in ctx.team_clients(limit=5):
+            _call(recorder, 'dashboard', client, 'GET', '/dashboard')
+            _call(recorder, 'team_players_data', client, 'GET', '/team_players_data')
+            _call(recorder, 'team_bulk_round', client, 'GET', '/team_bulk_round')
+            _call(recorder, 'team_bids', client, 'GET', '/team_bids')
+            _call(recorder, 'team_squad', client, 'GET', f'/team_squad/{team_id}')
+            _call(recorder, 'all_teams', client, 'GET', '/teams')
+
+
+def bidding(ctx, recorder, bids_per_team=5):
+    """Every team fills its bid slots on the active round, then withdraws one"""
+    round_id = ctx.seeded['active_round_id']
+    players = list(ctx.seeded['available_player_ids'])
+    for index, (client, _team_id) in enumerate(ctx.team_clients()):
+        placed = []
+        targets = ctx.rng.sample(players, min(bids_per_team, len(players)))
+        amounts = ctx.rng.sample(range(20, 500), len(targets))
+        for player_id, amount in zip(targets, amounts):
+            response = _call(recorder, 'place_bid', client, 'POST', '/place_bid',
+                             json={'round_id': round_id, 'player_id': player_id, 'amount': amount})
+            if response.status_code == 200:
+                placed.append(response.get_json()['bid']['id'])
+        if placed and index % 3 == 0:
+            _call(recorder, 'delete_bid', client, 'DELETE', f'/delete_bid/{placed[-1]}')
+
+
+def admin_polling(ctx, recorder, iterations=5):
+    """Admin dashboards refreshed by their XHR polling loops"""
+    bulk_round_id = ctx.seeded['active_bulk_round_id']
+    for _ in range(iterations):
+        _call(recorder, 'admin_dashboard_update', ctx.admin, 'GET', '/admin/dashboard_update',
+              headers=XHR_HEADERS)
+        _call(recorder, 'admin_rounds_update', ctx.admin, 'GET', '/admin/rounds_update',
+              headers=XHR_HEADERS)
+        _call(recorder, 'admin_teams_update', ctx.admin, 'GET', '/admin/teams_update',
+              headers=XHR_HEADERS)
+        _call(recorder, 'admin_bulk_round_update', ctx.admin, 'GET',
+              f'/admin/bulk_round_update/{bulk_round_id}', headers=XHR_HEADERS)
+        _call(recorder, 'admin_bulk_tiebreakers_update', ctx.admin, 'GET',
+              '/admin/bulk_tiebreakers_update', headers=XHR_HEADERS)
+
+
+def admin_pages(ctx, recorder, iterations=2):
+    """Full admin page loads"""
+    for _ in range(iterations):
+        _call(recorder, 'admin_teams', ctx.admin, 'GET', '/admin/teams')
+        _call(recorder, 'admin_rounds', ctx.admin, 'GET', '/admin/rounds')
+        _call(recorder, 'admin_bulk_rounds', ctx.admin, 'GET', '/admin/bulk_rounds')
+        for round_id in ctx.seeded['completed_round_ids'][:3]:
+            _call(recorder, 'admin_round_detail', ctx.admin, 'GET', f'/admin/round/{round_id}')
+            _call(recorder, 'round_results', ctx.admin, 'GET', f'/round_results/{round_id}')
+
+
+def exports(ctx, recorder, iterations=1):
+    """Spreadsheet exports for rounds and squads"""
+    for _ in range(iterations):
+        for round_id in ctx.seeded['completed_round_ids'][:3]:
+            _call(recorder, 'admin_export_round', ctx.admin, 'GET', f'/admin/export_round/{round_id}')
+        for team_id in ctx.seeded['team_ids'][:3]:
+            _call(recorder, 'export_team_squad', ctx.admin, 'GET', f'/export_team_squad/{team_id}')
+
+
+def finalize(ctx, recorder):
+    """Admin finalizes the active round once every team has bid"""
+    round_id = ctx.seeded['active_round_id']
+    _call(recorder, 'finalize_round', ctx.admin, 'POST', f'/finalize_round/{round_id}')
+
+
+# Read-only journeys first; bidding and finalize mutate the active round.
+JOURNEYS = [
+    ('team_polling', team_polling),
+    ('team_browsing', team_browsing),
+    ('admin_polling', admin_polling),
+    ('admin_pages', admin_pages),
+    ('exports', exports),
+    ('bidding', bidding),
+    ('finalize', finalize),
+]
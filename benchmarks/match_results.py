@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Match Results Benchmark
+=======================
+Enters a full league season's fixtures and results and reports the cost.
+
+The league has ``--teams`` teams of ``--members`` team members each; every
+team meets every other home and away, and every member plays one matchup in
+each of their team's matches.
+
+Two ways of entering the season are measured:
+
+* ``bulk`` (default): ``/matches/generate_fixtures`` creates the fixtures
+  and ``/matches/import_results`` uploads every result as one JSON file.
+* ``per-match`` (``--per-match``): the pre-existing admin pages, one request
+  per match (``/matches/new``), one per matchup to add it and one to score
+  it, then ``/matches/<id>/complete``.  It only uses endpoints that predate
+  the bulk import, so it can be run against an older checkout;
+  ``--per-match-limit`` caps how many matches are entered this way and the
+  season cost is extrapolated from them.
+
+Reported: milliseconds and queries per step, and matches per second.  A run
+fails if a completed match is missing from the team stats.
+
+Examples:
+    python -m benchmarks.match_results
+    python -m benchmarks.match_results --per-match --per-match-limit 20
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, QueryCounter, create_bench_app, load_baseline, login_as,
+    refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'match_results'
+
+CATEGORIES = (('red', 1), ('black', 2), ('blue', 3), ('white', 4))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Time entering a full season of fixtures and results')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--teams', type=int, default=20, help='Teams in the league')
+    parser.add_argument('--members', type=int, default=5, help='Team members per team (matchups per match)')
+    parser.add_argument('--per-match', action='store_true', help='Enter results through the one-match-at-a-time pages')
+    parser.add_argument('--per-match-limit', type=int, default=20, help='Matches entered in --per-match mode')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def seed_league(team_ids, members):
+    """Categories, team members and zeroed stats rows; returns {team_id: [member ids]}"""
+    from models import db, Category, TeamMember, TeamStats, PlayerStats
+
+    categories = [Category(name=name, color=name, priority=priority) for name, priority in CATEGORIES]
+    db.session.add_all(categories)
+    db.session.flush()
+    squads = {}
+    for team_id in team_ids:
+        squad = [TeamMember(name=f'Member {team_id}-{i}', team_id=team_id,
+                            category_id=categories[i % len(categories)].id) for i in range(members)]
+        db.session.add_all(squad)
+        db.session.flush()
+        squads[team_id] = [member.id for member in squad]
+        db.session.add(TeamStats(team_id=team_id))
+        db.session.add_all([PlayerStats(team_member_id=member.id) for member in squad])
+    db.session.commit()
+    return squads
+
+
+def goals(match_number, slot):
+    """Deterministic scores so both modes enter the same results"""
+    return (match_number + slot) % 4, (match_number * 3 + slot) % 3
+
+
+def timed(client, counter, method, *args, **kwargs):
+    counter.reset()
+    started = time.perf_counter()
+    # The per-match pages print a line per stats row; keep them off the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = getattr(client, method)(*args, **kwargs)
+    return response, time.perf_counter() - started, counter.count
+
+
+def run_bulk(admin, counter, squads, names):
+    from models import Match
+
+    results = {}
+    response, seconds, queries = timed(admin, counter, 'post', '/team_management/matches/generate_fixtures',
+                                       data={'double_round_robin': 'on', 'days_between': '7'})
+    if response.status_code >= 400:
+        raise RuntimeError(f"generate_fixtures: HTTP {response.status_code}")
+    results['generate_fixtures'] = {'ms': round(seconds * 1000, 2), 'queries': queries}
+
+    entries = [{
+        'round_number': match.round_number, 'match_number': match.match_number,
+        'matchups': [
+            dict(zip(('home_goals', 'away_goals'), goals(match.match_number, slot)),
+                 home_player=names[home], away_player=names[away])
+            for slot, (home, away) in enumerate(zip(squads[match.home_team_id], squads[match.away_team_id]))
+        ],
+    } for match in Match.query.order_by(Match.id)]
+    upload = (io.BytesIO(json.dumps(entries).encode()), 'season.json')
+    response, seconds, queries = timed(admin, counter, 'post', '/team_management/matches/import_results',
+                                       data={'results_file': upload}, content_type='multipart/form-data')
+    if response.status_code >= 400:
+        raise RuntimeError(f"import_results: HTTP {response.status_code}")
+    results['import_results'] = {
+        'ms': round(seconds * 1000, 2), 'queries': queries,
+        'matches_per_s': round(len(entries) / seconds, 1),
+    }
+    return results, len(entries)
+
+
+def run_per_match(admin, counter, squads, limit):
+    from models import PlayerMatchup
+
+    team_ids = sorted(squads)
+    fixtures = [(home, away) for home in team_ids for away in team_ids if home != away][:limit]
+    per_round = max(len(team_ids) // 2, 1)
+    total_seconds, total_queries = 0.0, 0
+    for index, (home, away) in enumerate(fixtures):
+        round_number, match_number = index // per_round + 1, index % per_round + 1
+        response, seconds, queries = timed(admin, counter, 'post', '/team_management/matches/new', data={
+            'home_team_id': home, 'away_team_id': away, 'round_number': round_number,
+            'match_number': match_number, 'match_date': datetime.utcnow().strftime('%Y-%m-%d'),
+        })
+        total_seconds, total_queries = total_seconds + seconds, total_queries + queries
+        match_id = int(response.headers['Location'].rstrip('/').rsplit('/', 1)[-1])
+
+        for home_player, away_player in zip(squads[home], squads[away]):
+            _, seconds, queries = timed(admin, counter, 'post', f'/team_management/matches/{match_id}/matchups/new',
+                                        data={'home_player_id': home_player, 'away_player_id': away_player})
+            total_seconds, total_queries = total_seconds + seconds, total_queries + queries
+        matchup_ids = [matchup_id for (matchup_id,) in
+                       PlayerMatchup.query.with_entities(PlayerMatchup.id).filter_by(match_id=match_id)
+                       .order_by(PlayerMatchup.id)]
+        for slot, matchup_id in enumerate(matchup_ids):
+            home_goals, away_goals = goals(match_number, slot)
+            _, seconds, queries = timed(admin, counter, 'post', f'/team_management/player_matchups/{matchup_id}/update',
+                                        data={'home_goals': home_goals, 'away_goals': away_goals})
+            total_seconds, total_queries = total_seconds + seconds, total_queries + queries
+        _, seconds, queries = timed(admin, counter, 'post', f'/team_management/matches/{match_id}/complete')
+        total_seconds, total_queries = total_seconds + seconds, total_queries + queries
+
+    matches = len(fixtures)
+    season = len(team_ids) * (len(team_ids) - 1)
+    return {'per_match': {
+        'ms': round(total_seconds / matches * 1000, 2),
+        'queries': round(total_queries / matches, 1),
+        'matches_per_s': round(matches / total_seconds, 1),
+        'season_s_estimate': round(total_seconds / matches * season, 1),
+    }}, matches
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+    from models import Match, TeamMember, TeamStats
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=args.teams, players=200, rounds=1, bulk_rounds=1,
+                                       bids_per_team=1, bulk_bids_per_team=1)
+        squads = seed_league(seeded['team_ids'], args.members)
+        names = {member.id: member.name for member in TeamMember.query}
+        engine = db.engine
+
+    admin = app.test_client()
+    login_as(admin, seeded['admin_id'])
+
+    counter = QueryCounter()
+    counter.install(engine)
+    try:
+        with app.app_context():
+            if args.per_match:
+                results, matches = run_per_match(admin, counter, squads, args.per_match_limit)
+            else:
+                results, matches = run_bulk(admin, counter, squads, names)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        counter.remove(engine)
+
+    with app.app_context():
+        completed = Match.query.filter_by(is_completed=True).count()
+        played = db.session.query(db.func.coalesce(db.func.sum(TeamStats.played), 0)).scalar()
+
+    print(f"Entered {matches} matches of {args.teams} teams x {args.members} members "
+          f"({'per-match pages' if args.per_match else 'bulk fixtures and import'})")
+    print(f"{'step':<18} {'ms':>10} {'queries':>9} {'matches/s':>10}")
+    for name, row in results.items():
+        print(f"{name:<18} {row['ms']:>10.2f} {row['queries']:>9} {row.get('matches_per_s', ''):>10}")
+    if args.per_match:
+        print(f"\nA full season of {args.teams * (args.teams - 1)} matches would take "
+              f"~{results['per_match']['season_s_estimate']}s this way")
+    if completed != matches or played != 2 * matches:
+        print(f"\n❌ {completed} of {matches} matches completed, {played} team results recorded")
+        return 1
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        regressions = []
+        for name, row in results.items():
+            previous = baseline['results'].get(name)
+            if not previous:
+                continue
+            if row['ms'] > previous['ms'] * (1 + DEFAULT_LATENCY_TOLERANCE):
+                regressions.append(f"{name}: {row['ms']:.2f}ms vs baseline {previous['ms']:.2f}ms")
+            if row['queries'] > previous['queries']:
+                regressions.append(f"{name}: {row['queries']} queries vs baseline {previous['queries']}")
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ Match results within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
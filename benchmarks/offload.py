@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+CPU Offload Benchmark
+=====================
+Shows whether lightweight requests stay fast while an admin export runs.
+
+A probe client requests a small JSON route (``/api/player/<id>``) back to
+back for ``--seconds`` in each of three phases:
+
+* ``idle``: nothing else runs.
+* ``export inline``: another client downloads ``/admin/export_players`` in a
+  loop with ``CPU_OFFLOAD=off``, so pandas/xlsxwriter run in the serving
+  process.
+* ``export offloaded``: the same with ``CPU_OFFLOAD=on``, so the workbook is
+  built in an offload worker process (``offload.py``).
+
+Clients run on threads against the app in this process, standing in for
+green threads in the eventlet worker.  Threads still get the GIL every few
+milliseconds, so the inline phase understates the stall: under eventlet an
+inline export blocks every other request for its full duration.
+
+Reported per phase: probe p50/p99 and requests served, exports completed and
+their mean time, and the process pool's queue depth and wait.  A run fails if
+the offloaded probe p99 grows past the baseline by more than the tolerance.
+
+Examples:
+    python -m benchmarks.offload
+    python -m benchmarks.offload --players 10000 --seconds 10
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, create_bench_app, load_baseline, login_as, percentile,
+    refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'offload'
+
+PHASES = (('idle', None), ('export inline', 'off'), ('export offloaded', 'on'))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Lightweight-route latency while an export runs')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--players', type=int, default=5000, help='Players in the export')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each phase')
+    parser.add_argument('--processes', type=int, default=2, help='OFFLOAD_PROCESSES for the offloaded phase')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def run_phase(app, admin_id, player_id, seconds, offload_mode):
+    import offload
+
+    probe_ms, export_ms, failures = [], [], []
+    stop = threading.Event()
+
+    def client():
+        client = app.test_client()
+        login_as(client, admin_id)
+        return client
+
+    def probe():
+        probe_client = client()
+        while not stop.is_set():
+            started = time.perf_counter()
+            response = probe_client.get(f'/api/player/{player_id}')
+            probe_ms.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failures.append(f"probe: HTTP {response.status_code}")
+
+    def export():
+        export_client = client()
+        while not stop.is_set():
+            started = time.perf_counter()
+            response = export_client.get('/admin/export_players')
+            export_ms.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failures.append(f"export: HTTP {response.status_code}")
+
+    threads = [threading.Thread(target=probe)]
+    if offload_mode:
+        offload.configure(offload_mode, processes=offload.process_pool.size)
+        threads.append(threading.Thread(target=export))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    pool = offload.process_pool.stats()
+    return {
+        'probe_p50_ms': round(percentile(probe_ms, 50), 2),
+        'probe_p99_ms': round(percentile(probe_ms, 99), 2),
+        'probe_requests': len(probe_ms),
+        'exports': len(export_ms),
+        'export_ms': round(sum(export_ms) / len(export_ms), 1) if export_ms else 0.0,
+        'peak_queued': pool['peak_queued'],
+        'p99_wait_ms': pool['p99_wait_ms'],
+    }, failures
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+    import offload
+    from models import Player
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=20, players=args.players, rounds=1, bulk_rounds=1,
+                                       bids_per_team=1, bulk_bids_per_team=1)
+        player_id = Player.query.with_entities(Player.id).order_by(Player.id).first()[0]
+
+    offload.configure('off', processes=args.processes)
+    results = {}
+    try:
+        # Warm up: pandas imported here and in the worker processes before anything is timed
+        warm = app.test_client()
+        login_as(warm, seeded['admin_id'])
+        warm.get('/admin/export_players')
+        offload.configure('on', processes=args.processes)
+        warm.get('/admin/export_players')
+
+        for name, mode in PHASES:
+            results[name], failures = run_phase(app, seeded['admin_id'], player_id, args.seconds, mode)
+            if failures:
+                print(f"❌ {name}: {failures[0]}")
+                return 1
+    finally:
+        offload.process_pool.close()
+
+    print(f"Probe /api/player/<id> for {args.seconds:g}s per phase; export of {args.players} players")
+    print(f"{'phase':<18} {'p50 ms':>8} {'p99 ms':>8} {'probes':>7} {'exports':>8} {'export ms':>10} "
+          f"{'peak queued':>12} {'p99 wait ms':>12}")
+    for name, row in results.items():
+        print(f"{name:<18} {row['probe_p50_ms']:>8} {row['probe_p99_ms']:>8} {row['probe_requests']:>7} "
+              f"{row['exports']:>8} {row['export_ms']:>10} {row['peak_queued']:>12} {row['p99_wait_ms']:>12}")
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        previous = baseline['results'].get('export offloaded')
+        row = results['export offloaded']
+        if previous and row['probe_p99_ms'] > previous['probe_p99_ms'] * (1 + DEFAULT_LATENCY_TOLERANCE):
+            print(f"\n❌ Probe p99 during an offloaded export {row['probe_p99_ms']}ms "
+                  f"vs baseline {previous['probe_p99_ms']}ms")
+            return 1
+        print("\n✅ Probe latency during exports within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Position Group Benchmark
+========================
+Divides a 10,000-player pool into position groups two ways and compares
+time, queries and balance:
+
+* ``snake``: what ``/admin/divide_position_groups`` used to do, one request
+  per position: a 1-2-2-1 snake over ``overall_rating`` with the players
+  loaded as ORM objects and flushed as one UPDATE per player.
+* ``partition``: one call to the endpoint for every position, which runs the
+  NumPy partitioner and writes one UPDATE per group.
+
+Balance is the difference between the largest and smallest group sum, for
+``overall_rating`` and averaged over the secondary attributes, summed over
+positions.
+
+Examples:
+    python -m benchmarks.position_groups
+    python -m benchmarks.position_groups --players 20000 --groups 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, QueryCounter, create_bench_app, load_baseline, login_as,
+    refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'position_groups'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Time and compare position group division')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--players', type=int, default=10000, help='Eligible players to seed')
+    parser.add_argument('--groups', type=int, help='Groups per position (default: Config.POSITION_GROUPS)')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def snake_divide(position):
+    """The previous per-position division, kept here as the reference"""
+    from models import db, Player
+    players = Player.query.filter_by(position=position, is_auction_eligible=True).all()
+    players.sort(key=lambda x: x.overall_rating if x.overall_rating else 0, reverse=True)
+    for i, player in enumerate(players):
+        player.position_group = f"{position}-1" if i % 4 in [0, 3] else f"{position}-2"
+    db.session.commit()
+
+
+def spreads(positions):
+    """(rating spread, mean attribute spread) of the stored groups, summed over positions"""
+    import numpy as np
+    from models import db, Player
+    from position_groups import DEFAULT_SECONDARY_ATTRIBUTES, SECONDARY_ATTRIBUTES
+
+    rating_total, attribute_total = 0.0, 0.0
+    for position in positions:
+        names = SECONDARY_ATTRIBUTES.get(position, DEFAULT_SECONDARY_ATTRIBUTES)
+        rows = db.session.query(
+            Player.position_group, Player.overall_rating, *[getattr(Player, name) for name in names]
+        ).filter(Player.position == position, Player.is_auction_eligible.is_(True)).all()
+        groups = sorted({row[0] for row in rows})
+        sums = np.array([[sum(row[c] or 0 for row in rows if row[0] == group) for c in range(1, len(names) + 2)]
+                         for group in groups], dtype=float)
+        spread = sums.max(axis=0) - sums.min(axis=0)
+        rating_total += spread[0]
+        attribute_total += spread[1:].mean()
+    return int(rating_total), round(float(attribute_total), 1)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+    from config import Config
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=10, players=args.players, rounds=2, bulk_rounds=1)
+        engine = db.engine
+    positions = list(Config.POSITIONS)
+
+    counter = QueryCounter()
+    counter.install(engine)
+    results = {}
+    try:
+        with app.app_context():
+            counter.reset()
+            started = time.perf_counter()
+            for position in positions:
+                snake_divide(position)
+            elapsed = time.perf_counter() - started
+            rating_spread, attribute_spread = spreads(positions)
+        results['snake'] = {'ms': round(elapsed * 1000, 1), 'queries': counter.count,
+                            'rating_spread': rating_spread, 'attribute_spread': attribute_spread}
+
+        client = app.test_client()
+        login_as(client, seeded['admin_id'])
+        payload = {'position': 'all'}
+        if args.groups:
+            payload['groups'] = args.groups
+        for label, preview in (('partition_preview', True), ('partition', False)):
+            counter.reset()
+            started = time.perf_counter()
+            response = client.post('/admin/divide_position_groups', json=dict(payload, preview=preview))
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                print(f"❌ {label}: HTTP {response.status_code} {response.get_json()}")
+                return 1
+            results[label] = {'ms': round(elapsed * 1000, 1), 'queries': counter.count}
+        with app.app_context():
+            rating_spread, attribute_spread = spreads(positions)
+        results['partition'].update(rating_spread=rating_spread, attribute_spread=attribute_spread)
+    finally:
+        counter.remove(engine)
+
+    divided = sum(position['players'] for position in response.get_json()['positions'].values())
+    print(f"Position groups for {divided} eligible players in {len(positions)} positions")
+    print(f"{'method':<20} {'ms':>9} {'queries':>8} {'rating spread':>14} {'attr spread':>12}")
+    for label, row in results.items():
+        print(f"{label:<20} {row['ms']:>9.1f} {row['queries']:>8} "
+              f"{row.get('rating_spread', ''):>14} {row.get('attribute_spread', ''):>12}")
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        previous = baseline['results'].get('partition')
+        row = results['partition']
+        regressions = []
+        if previous and row['ms'] > previous['ms'] * (1 + DEFAULT_LATENCY_TOLERANCE):
+            regressions.append(f"partition: {row['ms']:.1f}ms vs baseline {previous['ms']:.1f}ms")
+        if previous and row['queries'] > previous['queries']:
+            regressions.append(f"partition: {row['queries']} queries vs baseline {previous['queries']}")
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ Partition time and queries within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
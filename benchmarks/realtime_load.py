@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Realtime Load Test
+==================
+Replays one minute of an active round for every seeded team twice: once with
+the browsers polling (dashboard every 3s, round status every 2s) and once with
+the /auction Socket.IO channel pushing changes and the pages fetching only
+when an event arrives.  Both runs apply the same bids and timer extension and
+report CPU time and database queries per minute.
+
+Examples:
+    python -m benchmarks.realtime_load
+    python -m benchmarks.realtime_load --teams 30 --output realtime.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.harness import DEFAULT_DATABASE_URL, QueryCounter, create_bench_app, login_as, refuse_to_seed
+
+SIMULATED_SECONDS = 60
+DASHBOARD_POLL_SECONDS = 3
+ROUND_STATUS_POLL_SECONDS = 2
+# Pages keep a slow resync while the socket is connected (team_round.html)
+PUSH_RESYNC_SECONDS = 60
+
+# Events after which a page fetches once instead of waiting for its next poll
+DASHBOARD_EVENTS = {'round_started', 'round_finalized', 'tiebreaker_created', 'bulk_round_started',
+                    'bulk_round_finalized', 'bulk_tiebreakers_created', 'balance_changed'}
+ROUND_PAGE_EVENTS = {'round_timer_updated', 'round_finalized', 'tiebreaker_created'}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Compare polling and push load for an active round')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--teams', type=int, default=30)
+    parser.add_argument('--players', type=int, default=1500)
+    parser.add_argument('--bids-per-team', type=int, default=3, help='Bids each team places during the minute')
+    parser.add_argument('--output', help='Write the results as JSON to this path')
+    return parser.parse_args(argv)
+
+
+def _schedule(seeded, bids_per_team):
+    """Scripted writes as (second, kind, args), identical for both modes"""
+    import random
+    rng = random.Random(11)
+    players = list(seeded['available_player_ids'])
+    actions = []
+    pairs = list(zip(seeded['user_ids'], seeded['team_ids']))
+    for user_id, team_id in pairs:
+        targets = rng.sample(players, min(bids_per_team, len(players)))
+        amounts = rng.sample(range(20, 500), len(targets))
+        for player_id, amount in zip(targets, amounts):
+            actions.append((rng.randrange(SIMULATED_SECONDS), 'bid', (user_id, player_id, amount)))
+    actions.append((SIMULATED_SECONDS // 2, 'extend', ()))
+    actions.sort(key=lambda action: action[0])
+    return actions
+
+
+def run_mode(app, engine, seeded, mode, bids_per_team):
+    """Simulate the minute; returns CPU seconds, queries, requests and pushed events per minute, and failures
+
+    Runs outside any app context, so each request gets its own and Flask-Login
+    loads the user of the client that sent it.
+    """
+    from realtime import NAMESPACE, socketio
+
+    round_id = seeded['active_round_id']
+    users = list(zip(seeded['user_ids'], seeded['team_ids']))
+    clients = {}
+    for user_id, _team_id in users:
+        client = app.test_client()
+        login_as(client, user_id)
+        clients[user_id] = client
+    admin = app.test_client()
+    login_as(admin, seeded['admin_id'])
+
+    sockets = {}
+    counter = QueryCounter()
+    counter.install(engine)
+    stats = {'requests': 0, 'pushed': 0}
+    failures = []
+
+    def check(response, label):
+        if not 200 <= response.status_code < 300:
+            failures.append(f"{label}: HTTP {response.status_code}")
+
+    def get(client, path):
+        stats['requests'] += 1
+        check(client.get(path, headers={'X-Requested-With': 'XMLHttpRequest'}), path)
+
+    try:
+        if mode == 'push':
+            for user_id, _team_id in users:
+                sock = socketio.test_client(app, namespace=NAMESPACE, flask_test_client=clients[user_id])
+                sock.emit('subscribe', {'round_id': round_id}, namespace=NAMESPACE)
+                sockets[user_id] = sock
+                # Initial page load state
+                get(clients[user_id], '/team_dashboard_update')
+                get(clients[user_id], f'/check_round_status/{round_id}')
+
+        actions = _schedule(seeded, bids_per_team)
+        counter.reset()
+        cpu_start = time.process_time()
+
+        for second in range(SIMULATED_SECONDS):
+            for _at, kind, args in [a for a in actions if a[0] == second]:
+                stats['requests'] += 1
+                if kind == 'bid':
+                    user_id, player_id, amount = args
+                    check(clients[user_id].post('/place_bid', json={'round_id': round_id, 'player_id': player_id,
+                                                                    'amount': amount}),
+                          f'/place_bid as user {user_id}')
+                else:
+                    check(admin.post(f'/update_round_timer/{round_id}', json={'duration': 300}),
+                          '/update_round_timer')
+
+            if mode == 'poll':
+                for user_id, _team_id in users:
+                    if second % DASHBOARD_POLL_SECONDS == 0:
+                        get(clients[user_id], '/team_dashboard_update')
+                    if second % ROUND_STATUS_POLL_SECONDS == 0:
+                        get(clients[user_id], f'/check_round_status/{round_id}')
+            else:
+                for user_id, sock in sockets.items():
+                    events = {message['name'] for message in sock.get_received(NAMESPACE)}
+                    stats['pushed'] += len(events)
+                    if events & DASHBOARD_EVENTS:
+                        get(clients[user_id], '/team_dashboard_update')
+                    if events & ROUND_PAGE_EVENTS or (second and second % PUSH_RESYNC_SECONDS == 0):
+                        get(clients[user_id], f'/check_round_status/{round_id}')
+
+        cpu_seconds = time.process_time() - cpu_start
+        queries = counter.count
+    finally:
+        counter.remove(engine)
+        for sock in sockets.values():
+            sock.disconnect(namespace=NAMESPACE)
+
+    minutes = SIMULATED_SECONDS / 60
+    return {
+        'cpu_seconds_per_minute': round(cpu_seconds / minutes, 3),
+        'queries_per_minute': round(queries / minutes),
+        'requests_per_minute': round(stats['requests'] / minutes),
+        'events_pushed_per_minute': round(stats['pushed'] / minutes),
+    }, failures
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+
+    results = {}
+    for mode in ('poll', 'push'):
+        with app.app_context():
+            # A fresh season per mode so both apply the same bids to the same state
+            seeded = seed_synthetic_season(teams=args.teams, players=args.players, rounds=5, bulk_rounds=1)
+            engine = db.engine
+        results[mode], failures = run_mode(app, engine, seeded, mode, args.bids_per_team)
+        if failures:
+            print(f"❌ {mode}: {len(failures)} failed request(s), first: {failures[0]}")
+            return 1
+
+    print(f"Realtime load: {args.teams} teams, {SIMULATED_SECONDS}s of an active round")
+    print(f"{'mode':<6} {'cpu s/min':>10} {'queries/min':>12} {'requests/min':>13} {'pushed/min':>11}")
+    for mode, row in results.items():
+        print(f"{mode:<6} {row['cpu_seconds_per_minute']:>10.3f} {row['queries_per_minute']:>12} "
+              f"{row['requests_per_minute']:>13} {row['events_pushed_per_minute']:>11}")
+    poll, push = results['poll'], results['push']
+    if push['queries_per_minute']:
+        print(f"\nPush issues {poll['queries_per_minute'] / push['queries_per_minute']:.1f}x fewer queries "
+              f"and uses {poll['cpu_seconds_per_minute'] / max(push['cpu_seconds_per_minute'], 0.001):.1f}x "
+              f"less CPU per minute")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'teams': args.teams, 'results': results}, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
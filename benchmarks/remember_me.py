@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Remember-Me Benchmark
+=====================
+Counts the SQL statements that cookie handling adds to requests that are
+not logged into a session:
+
+* anonymous visitors without a cookie,
+* anonymous visitors with a forged or stale ``remember_token`` cookie,
+* a returning user's first request with a valid cookie, and
+* the same user's next request, which rides on the session.
+
+The cookie is obtained through the real login form with "remember me"
+ticked, so the script measures whatever token scheme the tree implements.
+
+Examples:
+    python -m benchmarks.remember_me
+    python -m benchmarks.remember_me --requests 200 --save-baseline
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, QueryCounter, create_bench_app, load_baseline, refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'remember_me'
+
+# A page every visitor can load, so the counts are the cookie handling plus request hooks
+PATH = '/offline'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Count queries spent on remember-me cookies')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def remembered_cookie(app, username, password):
+    client = app.test_client()
+    response = client.post('/login', data={'username': username, 'password': password, 'remember': 'on'})
+    cookie = client.get_cookie('remember_token')
+    if response.status_code != 302 or cookie is None:
+        raise RuntimeError('Login with "remember me" did not set a remember_token cookie')
+    return cookie.value
+
+
+def measure(engine, scenario, requests):
+    """Mean queries and milliseconds per request for one scenario"""
+    counter = QueryCounter()
+    counter.install(engine)
+    total_queries, total_seconds = 0, 0.0
+    try:
+        for _ in range(requests):
+            client = scenario()
+            counter.reset()
+            started = time.perf_counter()
+            client.get(PATH)
+            total_seconds += time.perf_counter() - started
+            total_queries += counter.count
+    finally:
+        counter.remove(engine)
+    return {
+        'queries_per_request': round(total_queries / requests, 2),
+        'mean_ms': round(total_seconds / requests * 1000, 3),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import BENCH_PASSWORD, seed_synthetic_season
+    from models import User
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=10, players=200, rounds=2, bulk_rounds=1)
+        username = db.session.get(User, seeded['user_ids'][0]).username
+        engine = db.engine
+    # Requests run outside an app context so none of them finds the user in a shared session
+    token = remembered_cookie(app, username, BENCH_PASSWORD)
+
+    def anonymous():
+        return app.test_client()
+
+    def forged_cookie():
+        client = app.test_client()
+        client.set_cookie('remember_token', 'x' * 43)
+        return client
+
+    def first_use():
+        client = app.test_client()
+        client.set_cookie('remember_token', token)
+        return client
+
+    def session_after_first_use():
+        client = first_use()
+        client.get(PATH)
+        return client
+
+    scenarios = {
+        'anonymous': anonymous,
+        'forged_cookie': forged_cookie,
+        'cookie_first_use': first_use,
+        'session_after_cookie': session_after_first_use,
+    }
+    results = {name: measure(engine, scenario, args.requests) for name, scenario in scenarios.items()}
+
+    print(f"Remember-me cookie cost on {PATH} ({args.requests} requests each)")
+    print(f"{'scenario':<22} {'queries/req':>12} {'mean ms':>9}")
+    for name, row in results.items():
+        print(f"{name:<22} {row['queries_per_request']:>12} {row['mean_ms']:>9.3f}")
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        regressions = [name for name, row in results.items()
+                       if name in baseline['results']
+                       and row['queries_per_request'] > baseline['results'][name]['queries_per_request']]
+        if regressions:
+            print(f"\n❌ More queries than the baseline: {', '.join(regressions)}")
+            return 1
+        print("\n✅ No scenario issues more queries than the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Auction Replay
+==============
+Re-runs the recorded history of an auction through the allocation code and
+checks that it comes out the same.  The source is a database snapshot (any
+SQLAlchemy URL or a SQLite file) or a JSON file from ``/admin/create_backup``.
+It is copied into an isolated replay database and never written to.
+
+Every finished ``Round`` and ``BulkBidRound`` is rewound: its allocations are
+refunded, its tiebreakers removed and tied bids put back to the amount they
+tied on.  The rounds are then replayed in start order through the real
+endpoints:
+
+* ``/finalize_round`` for regular rounds, with every tiebreaker it raises
+  answered through ``/submit_tiebreaker_bid`` with the amounts each team
+  entered at the time,
+* ``/admin/finalize_bulk_round`` for bulk rounds, with bulk tiebreakers
+  re-driven from the recorded raises and withdrawals, falling back to
+  ``/admin/resolve_bulk_tiebreaker`` where the admin closed them.
+
+The resulting allocations, balances, round statuses and tiebreakers are
+diffed against what was recorded, and the timings give rounds per second,
+so an engine change can be verified and measured in one run.
+
+Without ``--source`` a synthetic season is seeded.  The seeder writes its
+outcomes without running the engine, so its bids are replayed once to record
+a history and the run becomes a determinism check against that.
+
+JSON backups only carry players, teams, users, rounds and bids: bulk rounds
+cannot be replayed from them, their bids already hold tiebreaker amounts, and
+players won in bulk rounds stay on their teams throughout, so squads can hit
+``MAX_PLAYERS_PER_TEAM`` earlier than they did.  Prefer a database snapshot.
+
+Examples:
+    python -m benchmarks.replay
+    python -m benchmarks.replay --source postgresql://localhost/auction_snapshot
+    python -m benchmarks.replay --source efootball_auction_backup_20250101.json --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.harness import (
+    DEFAULT_LATENCY_TOLERANCE, REPO_ROOT, QueryCounter, create_bench_app, load_baseline, login_as,
+    save_baseline,
+)
+
+BASELINE_NAME = 'replay'
+REPLAY_DATABASE_URL = 'sqlite:///' + os.path.join(REPO_ROOT, 'instance', 'replay.db')
+
+# Tables in a /admin/create_backup file, in an order that satisfies foreign keys
+BACKUP_TABLES = [('users', 'user'), ('teams', 'team'), ('rounds', 'round'),
+                 ('players', 'player'), ('bids', 'bid')]
+
+DIFF_CATEGORIES = ['allocations', 'balances', 'rounds', 'tiebreakers', 'bulk_tiebreakers']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded rounds and diff the outcomes')
+    parser.add_argument('--source', help='Snapshot URL, SQLite file or JSON backup (default: a synthetic season)')
+    parser.add_argument('--database-url', default=REPLAY_DATABASE_URL,
+                        help='Scratch database the replay runs in; it is dropped and recreated')
+    parser.add_argument('--repeat', type=int, default=1, help='Replay the history this many times')
+    parser.add_argument('--show', type=int, default=10, help='Differences to print per category')
+    parser.add_argument('--teams', type=int, default=20, help='Synthetic season only')
+    parser.add_argument('--players', type=int, default=2000, help='Synthetic season only')
+    parser.add_argument('--rounds', type=int, default=15, help='Synthetic season only')
+    parser.add_argument('--bulk-rounds', type=int, default=4, help='Synthetic season only')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def _source_url(source):
+    return source if '://' in source else 'sqlite:///' + os.path.abspath(source)
+
+
+def _insert_rows(table, rows):
+    from models import db
+    for start in range(0, len(rows), 2000):
+        db.session.execute(table.insert(), rows[start:start + 2000])
+
+
+def _backup_row(table, row):
+    """Keep the columns the replay schema knows, parsing the ISO timestamps backups write"""
+    from sqlalchemy import DateTime
+    values = {}
+    for name, value in row.items():
+        column = table.columns.get(name)
+        if column is None:
+            continue
+        if isinstance(value, str) and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        values[name] = value
+    return values
+
+
+def load_snapshot(source):
+    """Recreate the replay schema and copy the source into it, ids included"""
+    from sqlalchemy import create_engine, inspect, select
+    from models import db
+
+    db.drop_all()
+    db.create_all()
+
+    if source.endswith('.json'):
+        with open(source) as f:
+            data = json.load(f).get('data', {})
+        for key, name in BACKUP_TABLES:
+            table = db.metadata.tables[name]
+            _insert_rows(table, [_backup_row(table, row) for row in data.get(key, [])])
+    else:
+        engine = create_engine(_source_url(source))
+        try:
+            inspector = inspect(engine)
+            present = set(inspector.get_table_names())
+            with engine.connect() as conn:
+                for table in db.metadata.sorted_tables:
+                    if table.name not in present:
+                        continue
+                    # Snapshots taken before a migration lack its columns; the model defaults fill in
+                    names = {column['name'] for column in inspector.get_columns(table.name)}
+                    columns = [column for column in table.columns if column.name in names]
+                    _insert_rows(table, [dict(row._mapping) for row in conn.execute(select(*columns))])
+        finally:
+            engine.dispose()
+    db.session.commit()
+
+
+def replay_admin_id():
+    """An admin to finalize rounds as, created if the snapshot has none"""
+    import secrets
+    from models import db, User
+
+    admin = User.query.filter_by(is_admin=True).order_by(User.id).first()
+    if admin is None:
+        admin = User(username='replay_admin', is_admin=True, is_approved=True, user_role='super_admin')
+        admin.set_password(secrets.token_urlsafe(16))
+        db.session.add(admin)
+        db.session.commit()
+    return admin.id
+
+
+def _round_order(round_row):
+    kind, round_id, start_time = round_row[:3]
+    return (start_time or datetime.min, kind == 'bulk', round_id)
+
+
+def capture_outcome():
+    """Allocations, balances, round statuses and tiebreakers of the bound database.
+
+    Allocations are attributed to the latest finished round holding the
+    winning bid, which is how a rewind knows what to undo.
+    """
+    from sqlalchemy import and_, select
+    from models import (
+        db, Player, Team, Round, Bid, Tiebreaker, TeamTiebreaker,
+        BulkBidRound, BulkBid, BulkBidTiebreaker, TeamBulkTiebreaker,
+    )
+
+    rounds = [('round',) + tuple(row) for row in db.session.execute(
+        select(Round.id, Round.start_time, Round.is_active, Round.status))]
+    rounds += [('bulk',) + tuple(row) for row in db.session.execute(
+        select(BulkBidRound.id, BulkBidRound.start_time, BulkBidRound.is_active, BulkBidRound.status))]
+    rounds.sort(key=_round_order)
+    # Rounds still taking bids have no outcome yet
+    finished = [(kind, round_id) for kind, round_id, _, is_active, status in rounds
+                if not (is_active and status == 'active')]
+    position = {key: index for index, key in enumerate(finished)}
+
+    sources = {}
+    winning_bids = select(Player.id, Bid.round_id).join(Bid, and_(
+        Bid.player_id == Player.id, Bid.team_id == Player.team_id, Bid.amount == Player.acquisition_value))
+    for player_id, round_id in db.session.execute(winning_bids):
+        sources.setdefault(player_id, []).append(('round', round_id))
+    resolved_bulk_bids = select(Player.id, BulkBid.round_id).join(BulkBid, and_(
+        BulkBid.player_id == Player.id, BulkBid.team_id == Player.team_id)).where(BulkBid.is_resolved.is_(True))
+    for player_id, round_id in db.session.execute(resolved_bulk_bids):
+        sources.setdefault(player_id, []).append(('bulk', round_id))
+
+    allocations = {}
+    for player_id, team_id, value in db.session.execute(
+            select(Player.id, Player.team_id, Player.acquisition_value).where(Player.team_id.isnot(None))):
+        candidates = [key for key in sources.get(player_id, []) if key in position]
+        allocations[player_id] = (team_id, value, max(candidates, key=position.get) if candidates else None)
+
+    team_bids = {}
+    for tiebreaker_id, team_id, new_amount in db.session.execute(
+            select(TeamTiebreaker.tiebreaker_id, TeamTiebreaker.team_id, TeamTiebreaker.new_amount)):
+        team_bids.setdefault(tiebreaker_id, {})[team_id] = new_amount
+    tiebreakers = {}
+    for tiebreaker in Tiebreaker.query.order_by(Tiebreaker.id):
+        tiebreakers.setdefault((tiebreaker.round_id, tiebreaker.player_id), []).append({
+            'id': tiebreaker.id,
+            'original_amount': tiebreaker.original_amount,
+            'resolved': bool(tiebreaker.resolved),
+            'bids': team_bids.get(tiebreaker.id, {}),
+        })
+
+    bulk_teams = {}
+    for row in TeamBulkTiebreaker.query:
+        bulk_teams.setdefault(row.tiebreaker_id, {})[row.team_id] = {
+            'last_bid': row.last_bid, 'last_bid_time': row.last_bid_time, 'is_active': bool(row.is_active),
+        }
+    bulk_tiebreakers = {}
+    for tiebreaker in BulkBidTiebreaker.query.order_by(BulkBidTiebreaker.id):
+        bulk_tiebreakers[(tiebreaker.bulk_round_id, tiebreaker.player_id)] = {
+            'id': tiebreaker.id,
+            'current_amount': tiebreaker.current_amount,
+            'resolved': bool(tiebreaker.resolved),
+            'winner': tiebreaker.winner_team_id,
+            'teams': bulk_teams.get(tiebreaker.id, {}),
+        }
+
+    return {
+        'finished': finished,
+        'statuses': {(kind, round_id): (bool(is_active), status)
+                     for kind, round_id, _, is_active, status in rounds},
+        'allocations': allocations,
+        'balances': dict(db.session.execute(select(Team.id, Team.balance)).all()),
+        'tiebreakers': tiebreakers,
+        'bulk_tiebreakers': bulk_tiebreakers,
+    }
+
+
+def rewind(outcome):
+    """Undo every finished round in ``outcome`` so it can be finalized again"""
+    from sqlalchemy import bindparam, select, update
+    from models import (
+        db, Player, Team, Round, RoundFinalization, RoundResultDocument, Bid, Tiebreaker, TeamTiebreaker,
+        BulkBidRound, BulkBid, BulkBidTiebreaker, TeamBulkTiebreaker,
+    )
+    from team_rosters import TeamRosters
+
+    finished = set(outcome['finished'])
+    round_ids = [round_id for kind, round_id in finished if kind == 'round']
+    bulk_round_ids = [round_id for kind, round_id in finished if kind == 'bulk']
+
+    refunds = {}
+    released = []
+    for player_id, (team_id, value, source) in outcome['allocations'].items():
+        if source in finished:
+            released.append(player_id)
+            if source[0] == 'round':
+                refunds[team_id] = refunds.get(team_id, 0) + (value or 0)
+
+    # Bulk rounds charge without checking who already owns the player, so refund what was charged
+    if bulk_round_ids:
+        single_bids = select(BulkBid.team_id, BulkBidRound.base_price).join(
+            BulkBidRound, BulkBid.round_id == BulkBidRound.id).where(
+            BulkBid.round_id.in_(bulk_round_ids), BulkBid.is_resolved.is_(True), BulkBid.has_tie.is_(False))
+        for team_id, base_price in db.session.execute(single_bids):
+            refunds[team_id] = refunds.get(team_id, 0) + (base_price or 0)
+    for (round_id, _), entry in outcome['bulk_tiebreakers'].items():
+        winner = entry['teams'].get(entry['winner'])
+        if ('bulk', round_id) in finished and entry['resolved'] and winner is not None:
+            refunds[entry['winner']] = refunds.get(entry['winner'], 0) + (winner['last_bid'] or entry['current_amount'])
+    for start in range(0, len(released), 500):
+        Player.query.filter(Player.id.in_(released[start:start + 500])).update(
+            {'team_id': None, 'acquisition_value': None}, synchronize_session=False)
+    if refunds:
+        db.session.execute(
+            Team.__table__.update().where(Team.__table__.c.id == bindparam('tid')).values(
+                balance=Team.__table__.c.balance + bindparam('refund')),
+            [{'tid': team_id, 'refund': refund} for team_id, refund in refunds.items()]
+        )
+
+    # Tied bids were overwritten with the tiebreaker amounts; the first tiebreaker on a player holds the tie
+    tiebreaker_ids = []
+    for (round_id, player_id), entries in outcome['tiebreakers'].items():
+        if ('round', round_id) not in finished:
+            continue
+        tiebreaker_ids.extend(entry['id'] for entry in entries)
+        Bid.query.filter(
+            Bid.round_id == round_id, Bid.player_id == player_id, Bid.team_id.in_(list(entries[0]['bids']))
+        ).update({'amount': entries[0]['original_amount']}, synchronize_session=False)
+    if tiebreaker_ids:
+        TeamTiebreaker.query.filter(TeamTiebreaker.tiebreaker_id.in_(tiebreaker_ids)).delete(synchronize_session=False)
+        Tiebreaker.query.filter(Tiebreaker.id.in_(tiebreaker_ids)).delete(synchronize_session=False)
+
+    bulk_tiebreaker_ids = [entry['id'] for (round_id, _), entry in outcome['bulk_tiebreakers'].items()
+                           if ('bulk', round_id) in finished]
+    if bulk_tiebreaker_ids:
+        TeamBulkTiebreaker.query.filter(TeamBulkTiebreaker.tiebreaker_id.in_(bulk_tiebreaker_ids)).delete(
+            synchronize_session=False)
+        BulkBidTiebreaker.query.filter(BulkBidTiebreaker.id.in_(bulk_tiebreaker_ids)).delete(
+            synchronize_session=False)
+
+    if round_ids:
+        RoundFinalization.query.filter(RoundFinalization.round_id.in_(round_ids)).delete(synchronize_session=False)
+        RoundResultDocument.query.filter(RoundResultDocument.round_id.in_(round_ids)).delete(synchronize_session=False)
+        db.session.execute(update(Round).where(Round.id.in_(round_ids)).values(is_active=False, status='pending'))
+    if bulk_round_ids:
+        RoundResultDocument.query.filter(RoundResultDocument.bulk_round_id.in_(bulk_round_ids)).delete(
+            synchronize_session=False)
+        db.session.execute(update(BulkBid).where(BulkBid.round_id.in_(bulk_round_ids)).values(
+            is_resolved=False, has_tie=False))
+        db.session.execute(update(BulkBidRound).where(BulkBidRound.id.in_(bulk_round_ids)).values(
+            is_active=False, status='pending'))
+    TeamRosters.reset()
+    db.session.commit()
+
+
+class ReplayDriver:
+    """Finalizes rounds through the test client as the admin and answers tiebreakers as each team"""
+
+    def __init__(self, app, recorded):
+        from sqlalchemy import select
+        from models import db, Team
+
+        self.app = app
+        self.recorded = recorded
+        self.expected_tiebreakers = {key: list(entries) for key, entries in recorded['tiebreakers'].items()}
+        with app.app_context():
+            self.admin_id = replay_admin_id()
+            self.team_users = dict(db.session.execute(select(Team.id, Team.user_id)).all())
+        self.admin = self._client(self.admin_id)
+        self.team_clients = {}
+        self.rejected = []
+
+    def _client(self, user_id):
+        client = self.app.test_client()
+        login_as(client, user_id)
+        return client
+
+    def _team(self, team_id):
+        if team_id not in self.team_clients:
+            self.team_clients[team_id] = self._client(self.team_users.get(team_id))
+        return self.team_clients[team_id]
+
+    def _post(self, client, path, payload=None):
+        response = client.post(path, json=payload)
+        if response.status_code >= 400:
+            self.rejected.append(f"{path} {payload or ''} -> {response.status_code} "
+                                 f"{response.get_data(as_text=True)[:120].strip()}")
+        return response
+
+    def _activate(self, model, round_id):
+        from sqlalchemy import update
+        from models import db
+        with self.app.app_context():
+            db.session.execute(update(model).where(model.id == round_id).values(is_active=True, status='active'))
+            db.session.commit()
+
+    def replay_round(self, round_id):
+        from sqlalchemy import select
+        from models import db, Round, Tiebreaker
+
+        self._activate(Round, round_id)
+        self._post(self.admin, f'/finalize_round/{round_id}')
+
+        # Each resolved tiebreaker finalizes the round again, which may raise the next one
+        answered = set()
+        while True:
+            with self.app.app_context():
+                open_tiebreakers = db.session.execute(select(Tiebreaker.id, Tiebreaker.player_id).where(
+                    Tiebreaker.round_id == round_id, Tiebreaker.resolved.is_(False),
+                    Tiebreaker.id.notin_(answered)).order_by(Tiebreaker.id)).all()
+            if not open_tiebreakers:
+                return
+            for tiebreaker_id, player_id in open_tiebreakers:
+                answered.add(tiebreaker_id)
+                queue = self.expected_tiebreakers.get((round_id, player_id))
+                if not queue:
+                    # A tie the recorded history never had; the diff reports it
+                    continue
+                for team_id, amount in sorted(queue.pop(0)['bids'].items()):
+                    if amount is not None:
+                        self._post(self._team(team_id), '/submit_tiebreaker_bid',
+                                   {'tiebreaker_id': tiebreaker_id, 'amount': amount})
+
+    def replay_bulk_round(self, round_id):
+        from sqlalchemy import select
+        from models import db, BulkBidRound, BulkBidTiebreaker
+
+        self._activate(BulkBidRound, round_id)
+        self._post(self.admin, f'/admin/finalize_bulk_round/{round_id}')
+
+        with self.app.app_context():
+            created = db.session.execute(select(BulkBidTiebreaker.id, BulkBidTiebreaker.player_id).where(
+                BulkBidTiebreaker.bulk_round_id == round_id).order_by(BulkBidTiebreaker.id)).all()
+        for tiebreaker_id, player_id in created:
+            recorded = self.recorded['bulk_tiebreakers'].get((round_id, player_id))
+            if recorded is not None:
+                self._replay_bulk_tiebreaker(tiebreaker_id, recorded)
+
+    def _replay_bulk_tiebreaker(self, tiebreaker_id, recorded):
+        from models import db, BulkBidTiebreaker
+
+        # Only each team's last raise survives, so replay those in the order they were made
+        raises = sorted((row['last_bid'], row['last_bid_time'] or datetime.min, team_id)
+                        for team_id, row in recorded['teams'].items() if row['last_bid'])
+        for amount, _, team_id in raises:
+            self._post(self._team(team_id), '/place_bulk_tiebreaker_bid',
+                       {'tiebreaker_id': tiebreaker_id, 'amount': amount})
+        for team_id, row in sorted(recorded['teams'].items()):
+            if not row['is_active'] and team_id != recorded['winner']:
+                self._post(self._team(team_id), '/withdraw_from_bulk_tiebreaker', {'tiebreaker_id': tiebreaker_id})
+
+        if recorded['resolved']:
+            with self.app.app_context():
+                resolved = db.session.get(BulkBidTiebreaker, tiebreaker_id).resolved
+            if not resolved:
+                self._post(self.admin, f'/admin/resolve_bulk_tiebreaker/{tiebreaker_id}')
+
+
+def replay(app, engine, recorded):
+    """Rewind and replay every finished round once; returns (outcome, timings, rejected requests)"""
+    from models import db
+
+    with app.app_context():
+        rewind(capture_outcome())
+    driver = ReplayDriver(app, recorded)
+
+    counter = QueryCounter()
+    counter.install(engine)
+    timings = {'round': [0, 0.0, 0], 'bulk': [0, 0.0, 0]}
+    try:
+        for kind, round_id in recorded['finished']:
+            counter.reset()
+            started = time.perf_counter()
+            if kind == 'round':
+                driver.replay_round(round_id)
+            else:
+                driver.replay_bulk_round(round_id)
+            row = timings[kind]
+            row[0] += 1
+            row[1] += time.perf_counter() - started
+            row[2] += counter.count
+    finally:
+        counter.remove(engine)
+
+    with app.app_context():
+        outcome = capture_outcome()
+        db.session.remove()
+    return outcome, timings, driver.rejected
+
+
+def _describe(allocation):
+    if allocation is None:
+        return 'unallocated'
+    team_id, value, source = allocation
+    where = f" in {source[0]} {source[1]}" if source else ''
+    return f"team {team_id} for {value}{where}"
+
+
+def _tiebreaker_signature(entries):
+    return [(sorted(entry['bids'].items()), entry['original_amount'], entry['resolved']) for entry in entries]
+
+
+def _bulk_tiebreaker_signature(entry):
+    if entry is None:
+        return None
+    teams = sorted((team_id, row['last_bid'], row['is_active']) for team_id, row in entry['teams'].items())
+    return teams, entry['current_amount'], entry['resolved'], entry['winner']
+
+
+def diff_outcomes(recorded, replayed):
+    """Human readable differences between two captured outcomes, by category"""
+    differences = {category: [] for category in DIFF_CATEGORIES}
+
+    for player_id in sorted(set(recorded['allocations']) | set(replayed['allocations'])):
+        before, after = recorded['allocations'].get(player_id), replayed['allocations'].get(player_id)
+        if (before or (None, None))[:2] != (after or (None, None))[:2]:
+            differences['allocations'].append(
+                f"player {player_id}: recorded {_describe(before)}, replayed {_describe(after)}")
+
+    for team_id in sorted(set(recorded['balances']) | set(replayed['balances'])):
+        before, after = recorded['balances'].get(team_id), replayed['balances'].get(team_id)
+        if before != after:
+            differences['balances'].append(f"team {team_id}: recorded {before}, replayed {after}")
+
+    for key in recorded['finished']:
+        before, after = recorded['statuses'].get(key), replayed['statuses'].get(key)
+        if before != after:
+            differences['rounds'].append(f"{key[0]} {key[1]}: recorded {before}, replayed {after}")
+
+    for key in sorted(set(recorded['tiebreakers']) | set(replayed['tiebreakers'])):
+        before = _tiebreaker_signature(recorded['tiebreakers'].get(key, []))
+        after = _tiebreaker_signature(replayed['tiebreakers'].get(key, []))
+        if before != after:
+            differences['tiebreakers'].append(
+                f"round {key[0]} player {key[1]}: recorded {before or 'none'}, replayed {after or 'none'}")
+
+    for key in sorted(set(recorded['bulk_tiebreakers']) | set(replayed['bulk_tiebreakers'])):
+        before = _bulk_tiebreaker_signature(recorded['bulk_tiebreakers'].get(key))
+        after = _bulk_tiebreaker_signature(replayed['bulk_tiebreakers'].get(key))
+        if before != after:
+            differences['bulk_tiebreakers'].append(
+                f"bulk round {key[0]} player {key[1]}: recorded {before or 'none'}, replayed {after or 'none'}")
+
+    return differences
+
+
+def summarize(timings):
+    """Rounds per second, mean milliseconds and queries per round for each kind and overall"""
+    rows = dict(timings)
+    rows['all'] = [sum(row[i] for row in timings.values()) for i in range(3)]
+    labels = {'round': 'regular_rounds', 'bulk': 'bulk_rounds', 'all': 'all_rounds'}
+    results = {}
+    for kind, (rounds, seconds, queries) in rows.items():
+        if not rounds:
+            continue
+        results[labels[kind]] = {
+            'rounds': rounds,
+            'rounds_per_second': round(rounds / seconds, 2) if seconds else 0.0,
+            'mean_ms': round(seconds / rounds * 1000, 3),
+            'queries_per_round': round(queries / rounds, 2),
+        }
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url
+
+    # The replay database is dropped and recreated, so refuse anything that looks like a real one
+    if not database_url.startswith('sqlite') and 'bench' not in database_url:
+        print("❌ Refusing to replay into a database without 'bench' in its URL")
+        return 2
+    if args.source and _source_url(args.source) == database_url:
+        print("❌ The replay database must not be the source snapshot")
+        return 2
+
+    app, db = create_bench_app(database_url)
+
+    if args.source:
+        with app.app_context():
+            load_snapshot(args.source)
+            recorded = capture_outcome()
+            engine = db.engine
+        label = args.source
+    else:
+        from benchmarks.seed import seed_synthetic_season
+        with app.app_context():
+            seed_synthetic_season(teams=args.teams, players=args.players, rounds=args.rounds,
+                                  bulk_rounds=args.bulk_rounds)
+            engine = db.engine
+            seeded = capture_outcome()
+        recorded = replay(app, engine, seeded)[0]
+        label = f'synthetic season ({args.teams} teams, {args.rounds} rounds, {args.bulk_rounds} bulk rounds)'
+
+    print(f"Replaying {len(recorded['finished'])} finished rounds from {label}")
+
+    timings = {'round': [0, 0.0, 0], 'bulk': [0, 0.0, 0]}
+    diverged = False
+    for attempt in range(1, args.repeat + 1):
+        replayed, pass_timings, rejected = replay(app, engine, recorded)
+        for kind, row in pass_timings.items():
+            timings[kind] = [total + value for total, value in zip(timings[kind], row)]
+
+        differences = diff_outcomes(recorded, replayed)
+        total = sum(len(lines) for lines in differences.values())
+        if not total:
+            print(f"✅ Pass {attempt}: allocations, balances, rounds and tiebreakers match")
+            continue
+        diverged = True
+        print(f"❌ Pass {attempt}: {total} differences")
+        for category in DIFF_CATEGORIES:
+            lines = differences[category]
+            if lines:
+                print(f"  {category} ({len(lines)})")
+                for line in lines[:args.show]:
+                    print(f"    {line}")
+        for line in rejected[:args.show]:
+            print(f"  rejected: {line}")
+
+    results = summarize(timings)
+    print(f"\n{'rounds':<16} {'count':>6} {'rounds/s':>10} {'mean ms':>10} {'q/round':>9}")
+    for name, row in results.items():
+        print(f"{name:<16} {row['rounds']:>6} {row['rounds_per_second']:>10.2f} "
+              f"{row['mean_ms']:>10.2f} {row['queries_per_round']:>9.1f}")
+
+    if diverged:
+        return 1
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results, {'source': label})}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None and baseline.get('metadata', {}).get('source') == label:
+        regressions = []
+        for name, row in results.items():
+            previous = baseline['results'].get(name)
+            if not previous:
+                continue
+            if row['rounds_per_second'] < previous['rounds_per_second'] * (1 - DEFAULT_LATENCY_TOLERANCE):
+                regressions.append(f"{name}: {row['rounds_per_second']:.2f} rounds/s vs baseline "
+                                   f"{previous['rounds_per_second']:.2f}")
+            if row['queries_per_round'] > previous['queries_per_round']:
+                regressions.append(f"{name}: {row['queries_per_round']:.1f} queries/round vs baseline "
+                                   f"{previous['queries_per_round']:.1f}")
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ Throughput and queries per round within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
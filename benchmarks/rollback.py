@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Round Rollback Benchmark
+========================
+Deletes finished rounds and bulk rounds with hundreds of allocations and
+reports what each deletion costs.
+
+Every round is seeded already finished: each team won ``--allocations``
+players of it at a known price, and lost bids and resolved tiebreakers sit
+next to the winning bids.  The admin deletes the rounds through
+``/admin/delete_round/<id>`` and ``/admin/delete_bulk_round/<id>``.
+
+Reported per round: mean milliseconds and queries of the delete request.  A
+run fails if a team is not refunded exactly what it paid, or a player stays
+on a team after its round is gone.  Only endpoints and tables that predate
+the set-based rollback are used, so the script can be run against an older
+checkout.
+
+Examples:
+    python -m benchmarks.rollback
+    python -m benchmarks.rollback --teams 40 --allocations 15
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, QueryCounter, create_bench_app, load_baseline, login_as,
+    refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'rollback'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Time deleting rounds with many allocations')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--teams', type=int, default=30, help='Teams that won players in every round')
+    parser.add_argument('--rounds', type=int, default=3, help='Rounds (and bulk rounds) to delete')
+    parser.add_argument('--allocations', type=int, default=10, help='Players each team won per round')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def seed_finished_round(team_ids, allocations, number):
+    """A finished round where every team won ``allocations`` players; returns (round_id, charged per team)"""
+    from models import db, Player, Round, Bid, Team, Tiebreaker, TeamTiebreaker
+
+    round_ = Round(position='CF', is_active=False, status='completed', max_bids_per_team=allocations)
+    db.session.add(round_)
+    players = [(team_id, Player(name=f'Rollback {number}-{team_id}-{j}', position='CF', round=round_))
+               for team_id in team_ids for j in range(allocations)]
+    db.session.add_all([player for _, player in players])
+    db.session.flush()
+
+    charged = {team_id: 0 for team_id in team_ids}
+    bids = []
+    for index, (team_id, player) in enumerate(players):
+        amount = 20 + index % 50
+        player.team_id, player.acquisition_value = team_id, amount
+        charged[team_id] += amount
+        rival = team_ids[(team_ids.index(team_id) + 1) % len(team_ids)]
+        bids.append(Bid(team_id=team_id, player_id=player.id, round_id=round_.id, amount=amount))
+        bids.append(Bid(team_id=rival, player_id=player.id, round_id=round_.id, amount=amount - 5))
+    db.session.add_all(bids)
+    for team in Team.query.filter(Team.id.in_(team_ids)):
+        team.balance -= charged[team.id]
+
+    for team_id, player in players[::allocations]:
+        tiebreaker = Tiebreaker(round_id=round_.id, player_id=player.id, original_amount=player.acquisition_value,
+                                resolved=True)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add(TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=team_id,
+                                      new_amount=player.acquisition_value))
+    db.session.commit()
+    return round_.id, charged
+
+
+def seed_finished_bulk_round(team_ids, allocations, number):
+    """A completed bulk round where every team won ``allocations`` players; returns (round_id, charged per team)"""
+    from models import db, Player, BulkBidRound, BulkBid, Team
+
+    bulk_round = BulkBidRound(is_active=False, status='completed', base_price=10)
+    db.session.add(bulk_round)
+    players = [(team_id, Player(name=f'Bulk rollback {number}-{team_id}-{j}', position='CF'))
+               for team_id in team_ids for j in range(allocations)]
+    db.session.add_all([player for _, player in players])
+    db.session.flush()
+
+    charged = {team_id: 0 for team_id in team_ids}
+    for team_id, player in players:
+        player.team_id, player.acquisition_value = team_id, bulk_round.base_price
+        charged[team_id] += bulk_round.base_price
+        db.session.add(BulkBid(team_id=team_id, player_id=player.id, round_id=bulk_round.id, is_resolved=True))
+    for team in Team.query.filter(Team.id.in_(team_ids)):
+        team.balance -= charged[team.id]
+    db.session.commit()
+    return bulk_round.id, charged
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+    from models import Player, Team
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=args.teams, players=500, rounds=2, bulk_rounds=1,
+                                       bids_per_team=1, bulk_bids_per_team=1)
+        team_ids = seeded['team_ids']
+        rounds = [seed_finished_round(team_ids, args.allocations, number) for number in range(args.rounds)]
+        bulk_rounds = [seed_finished_bulk_round(team_ids, args.allocations, number) for number in range(args.rounds)]
+        balances_before = {team.id: team.balance for team in Team.query}
+        engine = db.engine
+
+    admin = app.test_client()
+    login_as(admin, seeded['admin_id'])
+
+    counter = QueryCounter()
+    counter.install(engine)
+    results = {}
+    refunded = {team_id: 0 for team_id in balances_before}
+    try:
+        for name, url, seeded_rounds in (('delete_round', '/admin/delete_round/{}', rounds),
+                                         ('delete_bulk_round', '/admin/delete_bulk_round/{}', bulk_rounds)):
+            total_seconds, total_queries = 0.0, 0
+            for round_id, charged in seeded_rounds:
+                counter.reset()
+                started = time.perf_counter()
+                response = admin.post(url.format(round_id))
+                total_seconds += time.perf_counter() - started
+                total_queries += counter.count
+                if response.status_code >= 400:
+                    print(f"❌ {name} {round_id}: HTTP {response.status_code}")
+                    return 1
+                for team_id, amount in charged.items():
+                    refunded[team_id] += amount
+            results[name] = {
+                'mean_ms': round(total_seconds / len(seeded_rounds) * 1000, 2),
+                'queries': round(total_queries / len(seeded_rounds), 1),
+            }
+    finally:
+        counter.remove(engine)
+
+    with app.app_context():
+        misrefunded = sum(1 for team in Team.query if team.balance - balances_before[team.id] != refunded[team.id])
+        still_owned = Player.query.filter(Player.name.like('%ollback %'), Player.team_id.isnot(None)).count()
+
+    print(f"Deleted {args.rounds} rounds and {args.rounds} bulk rounds of "
+          f"{args.teams} teams x {args.allocations} allocations")
+    print(f"{'request':<18} {'mean ms':>9} {'queries':>8}")
+    for name, row in results.items():
+        print(f"{name:<18} {row['mean_ms']:>9.2f} {row['queries']:>8}")
+    if misrefunded or still_owned:
+        print(f"\n❌ {misrefunded} teams refunded the wrong amount, {still_owned} players still on a team")
+        return 1
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        regressions = []
+        for name, row in results.items():
+            previous = baseline['results'].get(name)
+            if not previous:
+                continue
+            if row['mean_ms'] > previous['mean_ms'] * (1 + DEFAULT_LATENCY_TOLERANCE):
+                regressions.append(f"{name}: {row['mean_ms']:.2f}ms vs baseline {previous['mean_ms']:.2f}ms")
+            if row['queries'] > previous['queries']:
+                regressions.append(f"{name}: {row['queries']} queries vs baseline {previous['queries']}")
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ Round rollback within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
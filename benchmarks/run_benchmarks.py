@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner
+================
+Seeds a synthetic season, runs the scripted journeys and compares the results
+with the stored baseline for the database backend in use.
+
+Examples:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --save-baseline
+    BENCH_DATABASE_URL=postgresql://localhost/auction_bench python -m benchmarks.run_benchmarks
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, BenchmarkRecorder, QueryCounter,
+    compare_to_baseline, create_bench_app, format_report, load_baseline, refuse_to_seed, save_baseline,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the auction benchmark suite')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--teams', type=int, default=30)
+    parser.add_argument('--players', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=25)
+    parser.add_argument('--bulk-rounds', type=int, default=3)
+    parser.add_argument('--journeys', nargs='*', help='Subset of journeys to run')
+    parser.add_argument('--baseline', help='Baseline name (default: database dialect)')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--latency-tolerance', type=float, default=DEFAULT_LATENCY_TOLERANCE,
+                        help='Allowed p95 growth before flagging a regression (0.25 = 25%%)')
+    parser.add_argument('--output', help='Write the raw results as JSON to this path')
+    parser.add_argument('--force', action='store_true',
+                        help="Allow seeding a non-SQLite database whose name does not contain 'bench'")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if not args.force and refuse_to_seed(database_url, '--force'):
+        return 2
+
+    app, db = create_bench_app(database_url)
+
+    from benchmarks.journeys import JOURNEYS, JourneyContext
+    from benchmarks.seed import seed_synthetic_season
+
+    selected = [(name, fn) for name, fn in JOURNEYS if not args.journeys or name in args.journeys]
+
+    with app.app_context():
+        engine = db.engine
+        dialect = engine.dialect.name
+        print(f"🌱 Seeding synthetic season on {dialect}...")
+        seed_start = time.perf_counter()
+        seeded = seed_synthetic_season(teams=args.teams, players=args.players,
+                                       rounds=args.rounds, bulk_rounds=args.bulk_rounds)
+        print(f"   {seeded['counts']} in {time.perf_counter() - seed_start:.1f}s")
+
+    # Journeys run outside the seeding context: each request must get its own app context,
+    # or Flask-Login's user cached in g serves every client as the first one to log in
+    counter = QueryCounter()
+    counter.install(engine)
+    recorder = BenchmarkRecorder(counter)
+    ctx = JourneyContext(app, seeded)
+
+    try:
+        for name, journey in selected:
+            journey_start = time.perf_counter()
+            journey(ctx, recorder)
+            print(f"🏃 {name}: {time.perf_counter() - journey_start:.2f}s")
+    finally:
+        counter.remove(engine)
+
+    results = recorder.summary()
+    print()
+    print(format_report(results))
+    total_requests = sum(row['requests'] for row in results.values())
+    if recorder.wall_time:
+        print(f"\nTotal: {total_requests} requests, {total_requests / recorder.wall_time:.1f} req/s")
+
+    metadata = {
+        'dialect': dialect,
+        'python': platform.python_version(),
+        'recorded_at': datetime.utcnow().isoformat(),
+        'seed_counts': seeded['counts'],
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'metadata': metadata, 'results': results}, f, indent=2, sort_keys=True)
+
+    baseline_name = args.baseline or dialect
+    if args.save_baseline:
+        path = save_baseline(baseline_name, results, metadata)
+        print(f"💾 Baseline saved to {path}")
+        return 0
+
+    baseline = load_baseline(baseline_name)
+    if baseline is None:
+        print(f"ℹ️  No '{baseline_name}' baseline stored yet; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, latency_tolerance=args.latency_tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against '{baseline_name}' baseline:")
+        for line in regressions:
+            print(f"   • {line}")
+        return 1
+
+    print(f"\n✅ No regressions against '{baseline_name}' baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Synthetic Season Seeder
+=======================
+Populates an empty database with a realistic auction season: teams and their
+users, a player pool, completed and active rounds with bids and allocations,
+bulk rounds with bulk bids, and resolved/pending tiebreakers.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from config import Config
+from models import (
+    db, Season, User, Team, Player, Round, Bid, Tiebreaker, TeamTiebreaker,
+    BulkBidRound, BulkBid, BulkBidTiebreaker, TeamBulkTiebreaker, AuctionSettings,
+)
+from team_rosters import TeamRosters
+
+BENCH_PASSWORD = 'benchmark'
+
+PLAYING_STYLES = ['Goal Poacher', 'Box-to-Box', 'Orchestrator', 'Anchor Man', 'Build Up',
+                  'Destroyer', 'Hole Player', 'Prolific Winger', 'Target Man', 'Classic No. 10']
+NATIONALITIES = ['Brazil', 'Argentina', 'France', 'Spain', 'England', 'Germany', 'Italy',
+                 'Portugal', 'Netherlands', 'Belgium', 'Croatia', 'Uruguay', 'India']
+ATTRIBUTES = ['offensive_awareness', 'ball_control', 'dribbling', 'tight_possession', 'low_pass',
+              'lofted_pass', 'finishing', 'heading', 'set_piece_taking', 'curl', 'speed',
+              'acceleration', 'kicking_power', 'jumping', 'physical_contact', 'balance', 'stamina',
+              'defensive_awareness', 'tackling', 'aggression', 'defensive_engagement']
+GK_ATTRIBUTES = ['gk_awareness', 'gk_catching', 'gk_parrying', 'gk_reflexes', 'gk_reach']
+
+
+def _bulk_insert(model, rows):
+    """Insert rows in one executemany and return their primary keys in order"""
+    if not rows:
+        return []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.session.scalars(stmt, rows))
+
+
+def seed_synthetic_season(teams=30, players=5000, rounds=25, bulk_rounds=3,
+                          bids_per_team=5, bulk_bids_per_team=20, seed=42):
+    """Drop and recreate all tables, then seed a synthetic season.
+
+    The last regular round and the last bulk round are left active so polling
+    and bidding journeys have something to work against.  Returns a dict of
+    the ids the journeys need.
+    """
+    rng = random.Random(seed)
+    gk_rng = random.Random(seed + 1)
+    now = datetime.utcnow()
+
+    db.drop_all()
+    db.create_all()
+
+    season = Season(name='Benchmark Season', short_name='BENCH', is_active=True, status='active')
+    db.session.add(season)
+    db.session.add(AuctionSettings(max_rounds=rounds, min_balance_per_round=30))
+    db.session.flush()
+
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    admin_id = _bulk_insert(User, [{
+        'username': 'bench_admin', 'email': 'bench_admin@example.com',
+        'password_hash': password_hash, 'is_admin': True, 'is_approved': True,
+        'user_role': 'super_admin',
+    }])[0]
+    user_ids = _bulk_insert(User, [{
+        'username': f'bench_team_{i}', 'email': f'bench_team_{i}@example.com',
+        'password_hash': password_hash, 'is_admin': False, 'is_approved': True,
+        'user_role': 'team_user',
+    } for i in range(teams)])
+    team_ids = _bulk_insert(Team, [{
+        'name': f'Bench FC {i}', 'balance': Config.INITIAL_BALANCE, 'user_id': user_id,
+        'season_id': season.id, 'team_lineage_id': f'lineage-{i}', 'logo_storage_type': 'local',
+    } for i, user_id in enumerate(user_ids)])
+
+    player_rows = []
+    for i in range(players):
+        position = Config.POSITIONS[i % len(Config.POSITIONS)]
+        row = {
+            'name': f'Player {i}', 'position': position, 'team_name': f'Club {i % 200}',
+            'nationality': rng.choice(NATIONALITIES), 'playing_style': rng.choice(PLAYING_STYLES),
+            'overall_rating': rng.randint(60, 99), 'is_auction_eligible': True, 'player_id': 100000 + i,
+        }
+        for attribute in ATTRIBUTES:
+            row[attribute] = rng.randint(40, 99)
+        if position == 'GK':
+            # Own generator so outfield players keep the values earlier baselines were seeded with
+            for attribute in GK_ATTRIBUTES:
+                row[attribute] = gk_rng.randint(40, 99)
+        player_rows.append(row)
+    player_ids = _bulk_insert(Player, player_rows)
+
+    pool = {}
+    for player_id, row in zip(player_ids, player_rows):
+        pool.setdefault(row['position'], []).append(player_id)
+    for ids in pool.values():
+        rng.shuffle(ids)
+
+    balances = {team_id: Config.INITIAL_BALANCE for team_id in team_ids}
+    squad_sizes = {team_id: 0 for team_id in team_ids}
+    allocations = {}
+
+    round_rows = []
+    for i in range(rounds):
+        active = i == rounds - 1
+        start = now - timedelta(minutes=5) if active else now - timedelta(days=rounds - i)
+        round_rows.append({
+            'position': Config.POSITIONS[i % len(Config.POSITIONS)], 'season_id': season.id,
+            'is_active': active, 'status': 'active' if active else 'completed',
+            'start_time': start, 'end_time': start + timedelta(hours=1), 'duration': 3600,
+            'max_bids_per_team': bids_per_team,
+        })
+    round_ids = _bulk_insert(Round, round_rows)
+
+    bid_rows = []
+    tiebreaker_specs = []
+    for round_id, round_row in zip(round_ids, round_rows):
+        if round_row['is_active']:
+            # Bids on the active round are placed by the bidding journey
+            continue
+
+        candidates = pool[round_row['position']]
+        round_bids = []
+        for team_id in team_ids:
+            targets = rng.sample(candidates[:bids_per_team * 6], min(bids_per_team, len(candidates)))
+            amounts = rng.sample(range(Config.MINIMUM_BID, 400), len(targets))
+            for player_id, amount in zip(targets, amounts):
+                round_bids.append({'team_id': team_id, 'player_id': player_id,
+                                   'round_id': round_id, 'amount': amount})
+        bid_rows.extend(round_bids)
+
+        # Allocate highest bids first, one player per team per round
+        won_this_round = set()
+        seen_players = set()
+        for bid in sorted(round_bids, key=lambda b: -b['amount']):
+            player_id, team_id = bid['player_id'], bid['team_id']
+            if player_id in seen_players or team_id in won_this_round:
+                continue
+            if squad_sizes[team_id] >= Config.MAX_PLAYERS_PER_TEAM:
+                continue
+            seen_players.add(player_id)
+            won_this_round.add(team_id)
+            allocations[player_id] = (team_id, bid['amount'], round_id)
+            balances[team_id] -= bid['amount']
+            squad_sizes[team_id] += 1
+        candidates[:] = [p for p in candidates if p not in seen_players]
+
+        # Every completed round carries one resolved tiebreaker for history pages
+        contested = rng.choice(sorted(seen_players))
+        tiebreaker_specs.append((round_id, contested, allocations[contested][1],
+                                 rng.sample(team_ids, 2)))
+
+    for start in range(0, len(bid_rows), 2000):
+        db.session.execute(insert(Bid), bid_rows[start:start + 2000])
+
+    tiebreaker_ids = _bulk_insert(Tiebreaker, [{
+        'round_id': round_id, 'player_id': player_id, 'original_amount': amount, 'resolved': True,
+    } for round_id, player_id, amount, _ in tiebreaker_specs])
+    if tiebreaker_ids:
+        db.session.execute(insert(TeamTiebreaker), [
+            {'tiebreaker_id': tiebreaker_id, 'team_id': team_id, 'new_amount': spec[2] + 10 * n}
+            for tiebreaker_id, spec in zip(tiebreaker_ids, tiebreaker_specs)
+            for n, team_id in enumerate(spec[3])
+        ])
+
+    bulk_round_rows = []
+    for i in range(bulk_rounds):
+        active = i == bulk_rounds - 1
+        start = now - timedelta(minutes=10) if active else now - timedelta(days=bulk_rounds - i, hours=6)
+        bulk_round_rows.append({
+            'is_active': active, 'status': 'active' if active else 'completed',
+            'start_time': start, 'end_time': start + timedelta(seconds=10800),
+            'duration': 10800, 'base_price': 10,
+        })
+    bulk_round_ids = _bulk_insert(BulkBidRound, bulk_round_rows)
+
+    unallocated = [p for ids in pool.values() for p in ids if p not in allocations]
+    bulk_bid_rows = []
+    bulk_tiebreaker_specs = []
+    for bulk_round_id, bulk_row in zip(bulk_round_ids, bulk_round_rows):
+        shortlist = rng.sample(unallocated, min(len(unallocated), bulk_bids_per_team * 4))
+        bidders = {}
+        for team_id in team_ids:
+            for player_id in rng.sample(shortlist, min(bulk_bids_per_team, len(shortlist))):
+                bidders.setdefault(player_id, []).append(team_id)
+        for player_id, bidding_teams in bidders.items():
+            tied = len(bidding_teams) > 1
+            for team_id in bidding_teams:
+                bulk_bid_rows.append({
+                    'team_id': team_id, 'player_id': player_id, 'round_id': bulk_round_id,
+                    'is_resolved': not bulk_row['is_active'], 'has_tie': tied,
+                })
+            if not bulk_row['is_active'] and not tied:
+                allocations[player_id] = (bidding_teams[0], bulk_row['base_price'], None)
+                balances[bidding_teams[0]] -= bulk_row['base_price']
+            elif not bulk_row['is_active']:
+                bulk_tiebreaker_specs.append((bulk_round_id, player_id, bidding_teams))
+        unallocated = [p for p in unallocated if p not in allocations]
+
+    for start in range(0, len(bulk_bid_rows), 2000):
+        db.session.execute(insert(BulkBid), bulk_bid_rows[start:start + 2000])
+
+    # Resolve all but the last few bulk tiebreakers; the remainder stay open
+    # for admin tiebreaker polling and involve only the final two teams.
+    open_specs = bulk_tiebreaker_specs[-5:]
+    resolved_specs = bulk_tiebreaker_specs[:-5]
+    bulk_tiebreaker_rows = []
+    for bulk_round_id, player_id, bidding_teams in resolved_specs:
+        winner = bidding_teams[0]
+        allocations[player_id] = (winner, 20, None)
+        balances[winner] -= 20
+        bulk_tiebreaker_rows.append({'bulk_round_id': bulk_round_id, 'player_id': player_id,
+                                     'current_amount': 20, 'resolved': True,
+                                     'winner_team_id': winner})
+    for bulk_round_id, player_id, _ in open_specs:
+        bulk_tiebreaker_rows.append({'bulk_round_id': bulk_round_id, 'player_id': player_id,
+                                     'current_amount': 10, 'resolved': False,
+                                     'winner_team_id': None})
+    bulk_tiebreaker_ids = _bulk_insert(BulkBidTiebreaker, bulk_tiebreaker_rows)
+
+    team_bulk_rows = []
+    for tiebreaker_id, (_, _, bidding_teams) in zip(bulk_tiebreaker_ids, resolved_specs):
+        for team_id in bidding_teams[:4]:
+            team_bulk_rows.append({'tiebreaker_id': tiebreaker_id, 'team_id': team_id,
+                                   'is_active': False, 'last_bid': 20, 'last_bid_time': now})
+    for tiebreaker_id in bulk_tiebreaker_ids[len(resolved_specs):]:
+        for team_id in team_ids[-2:]:
+            team_bulk_rows.append({'tiebreaker_id': tiebreaker_id, 'team_id': team_id,
+                                   'is_active': True, 'last_bid': None, 'last_bid_time': None})
+    if team_bulk_rows:
+        db.session.execute(insert(TeamBulkTiebreaker), team_bulk_rows)
+
+    # Apply allocations and balances with executemany updates keyed by id
+    if allocations:
+        db.session.execute(
+            Player.__table__.update().where(Player.__table__.c.id == db.bindparam('pid')).values(
+                team_id=db.bindparam('tid'), acquisition_value=db.bindparam('value'),
+                round_id=db.bindparam('rid')),
+            [{'pid': pid, 'tid': tid, 'value': value, 'rid': rid}
+             for pid, (tid, value, rid) in allocations.items()]
+        )
+    db.session.execute(
+        Team.__table__.update().where(Team.__table__.c.id == db.bindparam('tid')).values(
+            balance=db.bindparam('bal')),
+        [{'tid': tid, 'bal': balance} for tid, balance in balances.items()]
+    )
+
+    # The active round's player pool is linked the way start_round links it
+    active_round_id = round_ids[-1]
+    active_position = round_rows[-1]['position']
+    Player.query.filter(
+        Player.position == active_position,
+        Player.team_id.is_(None),
+    ).update({'round_id': active_round_id}, synchronize_session=False)
+
+    # Built the way the add_team_roster_summary migration leaves a live database
+    TeamRosters.rebuild()
+    db.session.commit()
+
+    return {
+        'season_id': season.id,
+        'admin_id': admin_id,
+        'user_ids': user_ids,
+        'team_ids': team_ids,
+        'round_ids': round_ids,
+        'active_round_id': active_round_id,
+        'completed_round_ids': round_ids[:-1],
+        'bulk_round_ids': bulk_round_ids,
+        'active_bulk_round_id': bulk_round_ids[-1],
+        'available_player_ids': [p for p in pool[active_position] if p not in allocations],
+        'counts': {
+            'teams': len(team_ids), 'players': len(player_ids), 'rounds': len(round_ids),
+            'bids': len(bid_rows), 'bulk_rounds': len(bulk_round_ids),
+            'bulk_bids': len(bulk_bid_rows), 'tiebreakers': len(tiebreaker_ids),
+            'bulk_tiebreakers': len(bulk_tiebreaker_ids), 'allocated': len(allocations),
+        },
+    }
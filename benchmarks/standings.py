@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Standings Benchmark
+===================
+Times the two pages served by the standings store on a synthetic season with
+a full league programme:
+
+* ``team_compare``: random pairs of teams on ``/team/compare``,
+* ``team_detail``: every team's ``/team_detail/<name>`` page.
+
+The season is seeded with its finalized rounds, a round-robin of completed
+matches and the matching ``TeamStats`` rows, then the store is rebuilt the way
+the migration backfills it.  Each page reports mean milliseconds and queries.
+
+Examples:
+    python -m benchmarks.standings
+    python -m benchmarks.standings --teams 30 --requests 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import combinations
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, QueryCounter, create_bench_app, load_baseline, login_as,
+    refuse_to_seed, save_baseline,
+)
+
+BASELINE_NAME = 'standings'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Time the team compare and team detail pages')
+    parser.add_argument('--database-url', help='Database to seed (default: BENCH_DATABASE_URL or local SQLite)')
+    parser.add_argument('--teams', type=int, default=20, help='Teams in the league')
+    parser.add_argument('--rounds', type=int, default=25, help='Auction rounds, all but one finalized')
+    parser.add_argument('--requests', type=int, default=30, help='Requests per page')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def seed_league(team_ids, seed=42):
+    """A completed round-robin with TeamStats rows that agree with it"""
+    from models import db, Match, TeamStats
+
+    rng = random.Random(seed)
+    stats = {team_id: dict(team_id=team_id, played=0, wins=0, draws=0, losses=0,
+                           goals_for=0, goals_against=0, points=0) for team_id in team_ids}
+    start = datetime(2026, 1, 1)
+    matches = []
+    for number, (home, away) in enumerate(combinations(team_ids, 2)):
+        home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 4)
+        matches.append(Match(home_team_id=home, away_team_id=away, home_score=home_goals, away_score=away_goals,
+                             match_date=start + timedelta(days=number // 10), round_number=number // 10 + 1,
+                             match_number=number % 10 + 1, is_completed=True))
+        for team_id, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+            row = stats[team_id]
+            row['played'] += 1
+            row['goals_for'] += scored
+            row['goals_against'] += conceded
+            outcome = 'wins' if scored > conceded else 'losses' if scored < conceded else 'draws'
+            row[outcome] += 1
+            row['points'] = row['wins'] * 3 + row['draws']
+    db.session.add_all(matches)
+    db.session.add_all([TeamStats(**row) for row in stats.values()])
+    db.session.commit()
+    return len(matches)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    if refuse_to_seed(database_url):
+        return 2
+
+    app, db = create_bench_app(database_url)
+    from benchmarks.seed import seed_synthetic_season
+    from models import Team
+    from standings_store import StandingsStore
+
+    with app.app_context():
+        seeded = seed_synthetic_season(teams=args.teams, players=max(2000, args.rounds * 60),
+                                       rounds=args.rounds, bulk_rounds=1, bids_per_team=10)
+        match_count = seed_league(seeded['team_ids'])
+        StandingsStore.rebuild()
+        team_names = [team.name for team in Team.query.order_by(Team.id)]
+        engine = db.engine
+
+    rng = random.Random(7)
+    pairs = [rng.sample(seeded['team_ids'], 2) for _ in range(args.requests)]
+    pages = {
+        'team_compare': [f'/team/compare?team1={a}&team2={b}' for a, b in pairs],
+        'team_detail': [f'/team_management/team_detail/{team_names[i % len(team_names)]}' for i in range(args.requests)],
+    }
+
+    client = app.test_client()
+    login_as(client, seeded['user_ids'][0])
+    counter = QueryCounter()
+    counter.install(engine)
+    results = {}
+    try:
+        for name, urls in pages.items():
+            total_seconds, total_queries = 0.0, 0
+            for url in urls:
+                counter.reset()
+                started = time.perf_counter()
+                response = client.get(url)
+                total_seconds += time.perf_counter() - started
+                total_queries += counter.count
+                if response.status_code != 200:
+                    print(f"❌ {url}: HTTP {response.status_code}")
+                    return 1
+            results[name] = {
+                'mean_ms': round(total_seconds / len(urls) * 1000, 2),
+                'queries': round(total_queries / len(urls), 1),
+            }
+    finally:
+        counter.remove(engine)
+
+    print(f"Standings pages for {args.teams} teams, {match_count} matches and "
+          f"{len(seeded['completed_round_ids'])} finalized rounds ({args.requests} requests each)")
+    print(f"{'page':<16} {'mean ms':>9} {'queries':>8}")
+    for name, row in results.items():
+        print(f"{name:<16} {row['mean_ms']:>9.2f} {row['queries']:>8}")
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        regressions = []
+        for name, row in results.items():
+            previous = baseline['results'].get(name)
+            if not previous:
+                continue
+            if row['mean_ms'] > previous['mean_ms'] * (1 + DEFAULT_LATENCY_TOLERANCE):
+                regressions.append(f"{name}: {row['mean_ms']:.2f}ms vs baseline {previous['mean_ms']:.2f}ms")
+            if row['queries'] > previous['queries']:
+                regressions.append(f"{name}: {row['queries']} queries vs baseline {previous['queries']}")
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ Standings pages within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
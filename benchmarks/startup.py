@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+=================
+Measures a cold start the way a sleeping dyno pays for it: a fresh interpreter
+imports ``app`` and serves its first request.  Reports the median import time,
+time to first response and the startup profile phases over several runs, the
+slowest imports ``app`` makes according to ``python -X importtime``, and
+whether any of the heavy libraries that should be deferred were imported anyway.
+
+Examples:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5 --save-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.harness import (
+    DEFAULT_DATABASE_URL, DEFAULT_LATENCY_TOLERANCE, REPO_ROOT, load_baseline, save_baseline,
+)
+
+BASELINE_NAME = 'startup'
+
+# Modules that only specific routes need and must stay off the import path
+DEFERRED_MODULES = ['pandas', 'bs4', 'imagekitio', 'github_service', 'imagekit_service', 'numpy', 'position_groups']
+
+FIRST_RESPONSE_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+loaded = [name for name in %r if name in sys.modules]
+response = app.test_client().get('/login')
+finished = time.perf_counter()
+from startup_profile import get_profile
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_response_ms': (finished - started) * 1000,
+    'status': response.status_code,
+    'phases': get_profile()['phases'],
+    'loaded': loaded,
+}))
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold-start import and first-response time')
+    parser.add_argument('--database-url', help='Database the app is configured with (default: local SQLite)')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest imports to list')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_LATENCY_TOLERANCE,
+                        help='Allowed growth in time to first response (0.25 = 25%%)')
+    return parser.parse_args(argv)
+
+
+def _env(database_url):
+    env = dict(os.environ)
+    env['DATABASE_URL'] = database_url
+    env['PYTHONPATH'] = REPO_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    # Bytecode is cached on a real deploy after the first boot as well
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def measure_first_response(database_url):
+    script = FIRST_RESPONSE_SCRIPT % (DEFERRED_MODULES,)
+    result = subprocess.run([sys.executable, '-c', script], cwd=REPO_ROOT, env=_env(database_url),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'startup failed')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_importtime(database_url):
+    """Modules imported directly by ``app`` as [(cumulative_ms, module)], slowest first"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=REPO_ROOT,
+                            env=_env(database_url), capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # Each nesting level indents the name by two more spaces
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((depth, int(cumulative_us) / 1000, name.strip()))
+
+    # A module's imports are listed before it, so walk back from the 'app' line
+    modules = []
+    for index, (depth, cumulative_ms, name) in enumerate(entries):
+        if depth == 0 and name == 'app':
+            for child_depth, child_ms, child in reversed(entries[:index]):
+                if child_depth == 0:
+                    break
+                if child_depth == 1:
+                    modules.append((child_ms, child))
+            modules.append((cumulative_ms, 'app (total)'))
+    return sorted(modules, reverse=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    database_url = args.database_url or os.environ.get('BENCH_DATABASE_URL') or DEFAULT_DATABASE_URL
+
+    runs = [measure_first_response(database_url) for _ in range(max(1, args.runs))]
+    results = {
+        'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+        'first_response_ms': round(statistics.median(run['first_response_ms'] for run in runs), 1),
+        'phases': runs[-1]['phases'],
+        'deferred_modules_loaded': runs[-1]['loaded'],
+    }
+
+    print(f"Cold start over {len(runs)} run(s) (median)")
+    print(f"  import app:           {results['import_ms']:.1f} ms")
+    print(f"  time to 1st response: {results['first_response_ms']:.1f} ms")
+    print(f"  phases: {', '.join(f'{phase} {ms}ms' for phase, ms in results['phases'].items())}")
+
+    print("\nSlowest imports made by app (-X importtime):")
+    for cumulative_ms, name in measure_importtime(database_url)[:args.top]:
+        print(f"  {cumulative_ms:>9.1f} ms  {name}")
+
+    if results['deferred_modules_loaded']:
+        print(f"\n❌ Loaded at startup but should be deferred: {', '.join(results['deferred_modules_loaded'])}")
+
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is not None:
+        previous = baseline['results']['first_response_ms']
+        if results['first_response_ms'] > previous * (1 + args.tolerance):
+            print(f"\n❌ Time to first response {results['first_response_ms']:.1f}ms vs baseline {previous:.1f}ms")
+            return 1
+        print(f"\n✅ Time to first response within {args.tolerance:.0%} of baseline ({previous:.1f}ms)")
+    return 1 if results['deferred_modules_loaded'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Bulk Round Counters
+===================
+Live bid aggregates for the admin bulk-round monitor, so a poll reads a few
+summary rows instead of every ``BulkBid`` in the round.
+
+``bulk_round_monitor`` holds one row per round with its totals (bids,
+players and teams with bids, contested players) and a version number.
+``bulk_round_player_counter`` and ``bulk_round_team_counter`` hold the bid
+count per player and per team, stamped with the version that last changed
+them.  ``place_bulk_bid`` and ``delete_bulk_bid`` adjust the counters in the
+same transaction as the bid, so a poll with ``since=<version>`` returns only
+the rows stamped after it.
+
+Bulk deletes and finalization bypass the bid routes; they mark the round
+stale and the next read rebuilds it from grouped queries, on the primary even
+when the monitor poll is served from the read replica.  A rebuild sets
+``rebuilt_version`` so clients holding an older version replace their state
+instead of merging into it.
+
+Every bulk bid is at the round's base price, so each contested player
+becomes a tiebreaker at finalization: the projected tiebreaker count is the
+contested player count.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import text, bindparam
+
+from db_routing import use_primary
+from models import db
+
+COUNTER_TABLES = {
+    'player_id': 'bulk_round_player_counter',
+    'team_id': 'bulk_round_team_counter',
+}
+
+
+def _crossed(before, after, threshold):
+    """+1 if a count rose to ``threshold``, -1 if it fell below it, else 0"""
+    return int(after >= threshold) - int(before >= threshold)
+
+
+class BulkRoundCounters:
+    """Maintains and reads the bulk round monitor tables"""
+
+    # ------------------------------------------------------------------
+    # Writes (inside the caller's transaction)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def start_round(round_id):
+        """Create empty counters for a new round"""
+        db.session.execute(text("""
+            INSERT INTO bulk_round_monitor
+                (round_id, version, rebuilt_version, bid_count, player_count, team_count,
+                 contested_count, stale, updated_at)
+            VALUES (:round_id, 1, 1, 0, 0, 0, 0, false, :now)
+        """), {'round_id': round_id, 'now': datetime.utcnow()})
+
+    @staticmethod
+    def record_bid(round_id, player_id, team_id, delta):
+        """Count a placed (+1) or deleted (-1) bid after it has been flushed.
+
+        Returns False when the round has no live counters; the next read
+        rebuilds them, so the bid is still counted.
+        """
+        version = BulkRoundCounters._bump(round_id)
+        if version is None:
+            return False
+
+        changes = {}
+        for key, value in (('player_id', player_id), ('team_id', team_id)):
+            before = BulkRoundCounters._adjust(key, round_id, value, delta, version)
+            changes[key] = (before, max(before + delta, 0))
+
+        players_before, players_after = changes['player_id']
+        teams_before, teams_after = changes['team_id']
+        db.session.execute(text("""
+            UPDATE bulk_round_monitor
+            SET bid_count = bid_count + :delta,
+                player_count = player_count + :players,
+                team_count = team_count + :teams,
+                contested_count = contested_count + :contested,
+                updated_at = :now
+            WHERE round_id = :round_id
+        """), {
+            'round_id': round_id,
+            'delta': delta,
+            'players': _crossed(players_before, players_after, 1),
+            'teams': _crossed(teams_before, teams_after, 1),
+            'contested': _crossed(players_before, players_after, 2),
+            'now': datetime.utcnow(),
+        })
+        return True
+
+    @staticmethod
+    def touch(round_id, player_ids):
+        """Re-send players (and the teams that bid on them) whose status changed"""
+        if not player_ids:
+            return
+        version = BulkRoundCounters._bump(round_id)
+        if version is None:
+            return
+        params = {'round_id': round_id, 'player_ids': list(player_ids), 'version': version}
+        db.session.execute(text("""
+            UPDATE bulk_round_player_counter SET version = :version
+            WHERE round_id = :round_id AND player_id IN :player_ids
+        """).bindparams(bindparam('player_ids', expanding=True)), params)
+        db.session.execute(text("""
+            UPDATE bulk_round_team_counter SET version = :version
+            WHERE round_id = :round_id AND team_id IN (
+                SELECT team_id FROM bulk_bid WHERE round_id = :round_id AND player_id IN :player_ids
+            )
+        """).bindparams(bindparam('player_ids', expanding=True)), params)
+
+    @staticmethod
+    def invalidate(round_id=None):
+        """Mark one round (or every round) for a rebuild on its next read"""
+        if round_id is None:
+            db.session.execute(text("UPDATE bulk_round_monitor SET stale = true"))
+        else:
+            db.session.execute(text("UPDATE bulk_round_monitor SET stale = true WHERE round_id = :round_id"),
+                               {'round_id': round_id})
+
+    @staticmethod
+    def remove_round(round_id):
+        """Drop a round's counters before the round itself is deleted"""
+        for table in ('bulk_round_player_counter', 'bulk_round_team_counter', 'bulk_round_monitor'):
+            db.session.execute(text(f"DELETE FROM {table} WHERE round_id = :round_id"), {'round_id': round_id})
+
+    @staticmethod
+    def rebuild(round_id):
+        """Recompute a round's counters from its bids; returns the new version"""
+        params = {'round_id': round_id, 'now': datetime.utcnow()}
+        previous = db.session.execute(text("""
+            SELECT version FROM bulk_round_monitor WHERE round_id = :round_id
+        """), params).scalar()
+        params['version'] = (previous or 0) + 1
+
+        for key, table in COUNTER_TABLES.items():
+            db.session.execute(text(f"DELETE FROM {table} WHERE round_id = :round_id"), params)
+            db.session.execute(text(f"""
+                INSERT INTO {table} (round_id, {key}, bid_count, version)
+                SELECT round_id, {key}, COUNT(*), :version
+                FROM bulk_bid WHERE round_id = :round_id
+                GROUP BY round_id, {key}
+            """), params)
+
+        totals = db.session.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM bulk_bid WHERE round_id = :round_id),
+                (SELECT COUNT(*) FROM bulk_round_player_counter WHERE round_id = :round_id),
+                (SELECT COUNT(*) FROM bulk_round_team_counter WHERE round_id = :round_id),
+                (SELECT COUNT(*) FROM bulk_round_player_counter WHERE round_id = :round_id AND bid_count >= 2)
+        """), params).one()
+        params.update(bids=totals[0], players=totals[1], teams=totals[2], contested=totals[3])
+
+        if previous is None:
+            db.session.execute(text("""
+                INSERT INTO bulk_round_monitor
+                    (round_id, version, rebuilt_version, bid_count, player_count, team_count,
+                     contested_count, stale, updated_at)
+                VALUES (:round_id, :version, :version, :bids, :players, :teams, :contested, false, :now)
+            """), params)
+        else:
+            db.session.execute(text("""
+                UPDATE bulk_round_monitor
+                SET version = :version, rebuilt_version = :version, bid_count = :bids,
+                    player_count = :players, team_count = :teams, contested_count = :contested,
+                    stale = false, updated_at = :now
+                WHERE round_id = :round_id
+            """), params)
+        return params['version']
+
+    @staticmethod
+    def _bump(round_id):
+        """Take the next version of a live round (locking its row), or None"""
+        result = db.session.execute(text("""
+            UPDATE bulk_round_monitor SET version = version + 1
+            WHERE round_id = :round_id AND stale = false
+        """), {'round_id': round_id})
+        if result.rowcount == 0:
+            return None
+        return db.session.execute(text("""
+            SELECT version FROM bulk_round_monitor WHERE round_id = :round_id
+        """), {'round_id': round_id}).scalar()
+
+    @staticmethod
+    def _adjust(key, round_id, value, delta, version):
+        """Add ``delta`` to one player or team counter; returns its previous count"""
+        table = COUNTER_TABLES[key]
+        params = {'round_id': round_id, 'value': value, 'delta': delta, 'version': version}
+        before = db.session.execute(text(f"""
+            SELECT bid_count FROM {table} WHERE round_id = :round_id AND {key} = :value
+        """), params).scalar()
+        if before is None:
+            db.session.execute(text(f"""
+                INSERT INTO {table} (round_id, {key}, bid_count, version)
+                VALUES (:round_id, :value, :count, :version)
+            """), dict(params, count=max(delta, 0)))
+            return 0
+        db.session.execute(text(f"""
+            UPDATE {table} SET bid_count = :count, version = :version
+            WHERE round_id = :round_id AND {key} = :value
+        """), dict(params, count=max(before + delta, 0)))
+        return before
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def current_version(round_id):
+        """The round's counter version, rebuilding the counters if needed"""
+        return BulkRoundCounters._monitor_row(round_id).version
+
+    @staticmethod
+    def changes(round_id, since=None):
+        """Counters plus the players and teams changed after ``since``.
+
+        With no ``since``, or one older than the last rebuild, every player
+        and team with bids is returned and ``full`` is True.  Otherwise the
+        players and teams whose count dropped to zero are listed under
+        ``removed_players``/``removed_teams``.
+        """
+        monitor = BulkRoundCounters._monitor_row(round_id)
+        full = since is None or since < monitor.rebuilt_version
+        params = {'round_id': round_id, 'since': -1 if full else since}
+
+        player_rows = db.session.execute(text("""
+            SELECT c.player_id, c.bid_count, p.name, p.position, p.overall_rating, p.team_id
+            FROM bulk_round_player_counter c
+            JOIN player p ON p.id = c.player_id
+            WHERE c.round_id = :round_id AND c.version > :since
+            ORDER BY c.player_id
+        """), params).all()
+        team_rows = db.session.execute(text("""
+            SELECT c.team_id, c.bid_count, t.name
+            FROM bulk_round_team_counter c
+            JOIN team t ON t.id = c.team_id
+            WHERE c.round_id = :round_id AND c.version > :since
+            ORDER BY c.team_id
+        """), params).all()
+
+        team_bids = {}
+        changed_teams = [row.team_id for row in team_rows if row.bid_count > 0]
+        if changed_teams:
+            bid_rows = db.session.execute(text("""
+                SELECT b.id, b.team_id, b.player_id, b.is_resolved, p.name, p.position, p.team_id AS player_team_id
+                FROM bulk_bid b
+                JOIN player p ON p.id = b.player_id
+                WHERE b.round_id = :round_id AND b.team_id IN :team_ids
+                ORDER BY b.id
+            """).bindparams(bindparam('team_ids', expanding=True)),
+                dict(params, team_ids=changed_teams)).all()
+            for row in bid_rows:
+                team_bids.setdefault(row.team_id, []).append(row)
+
+        return {
+            'version': monitor.version,
+            'full': full,
+            'counters': {
+                'bids': monitor.bid_count,
+                'players': monitor.player_count,
+                'teams': monitor.team_count,
+                'contested_players': monitor.contested_count,
+                'projected_tiebreakers': monitor.contested_count,
+            },
+            'players': [row for row in player_rows if row.bid_count > 0],
+            'removed_players': [] if full else [row.player_id for row in player_rows if row.bid_count == 0],
+            'teams': [row for row in team_rows if row.bid_count > 0],
+            'removed_teams': [] if full else [row.team_id for row in team_rows if row.bid_count == 0],
+            'team_bids': team_bids,
+        }
+
+    @staticmethod
+    def _monitor_row(round_id):
+        query = text("""
+            SELECT version, rebuilt_version, bid_count, player_count, team_count, contested_count, stale
+            FROM bulk_round_monitor WHERE round_id = :round_id
+        """)
+        row = db.session.execute(query, {'round_id': round_id}).one_or_none()
+        if row is None or row.stale:
+            # The poll may be reading from the replica; the rebuild and the reads after it use the primary
+            use_primary()
+            BulkRoundCounters.rebuild(round_id)
+            db.session.commit()
+            row = db.session.execute(query, {'round_id': round_id}).one()
+        return row
@@ -0,0 +1,39 @@
+import argparse
+import sys
+
+from app import app, db
+from team_rosters import TeamRosters
+
+
+def check_team_rosters(repair=False):
+    """Compare the team roster summaries with the players and bids tables"""
+    with app.app_context():
+        print("=== TEAM ROSTER SUMMARY CHECK ===")
+        differences = TeamRosters.check()
+        
+        if not differences:
+            print("✅ Every team roster summary matches its players and bids")
+            return 0
+        
+        print(f"⚠️  Found {len(differences)} differences:")
+        for team_id, field, stored, actual in differences:
+            if field is None:
+                print(f"  Team {team_id}: no summary yet")
+            else:
+                print(f"  Team {team_id}: {field} is {stored}, should be {actual}")
+        
+        if not repair:
+            print("\nRun with --repair to rebuild these teams")
+            return 1
+        
+        team_ids = sorted({team_id for team_id, _, _, _ in differences})
+        TeamRosters.rebuild(team_ids)
+        db.session.commit()
+        print(f"\n🔧 Rebuilt the summaries of {len(team_ids)} teams (spending ledgers kept)")
+        return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check the denormalized team roster summaries')
+    parser.add_argument('--repair', action='store_true', help='Rebuild the summaries that differ')
+    sys.exit(check_team_rosters(parser.parse_args().repair))
@@ -0,0 +1,136 @@
+"""
+Read Replica Routing
+====================
+Sends the ORM reads of read-only endpoints (leaderboards, history, exports,
+player browsing and the polling endpoints) to the ``replica`` bind and
+everything else to the primary.
+
+* A request is routed to the replica only if it is a GET/HEAD to an endpoint
+  in ``REPLICA_ENDPOINTS``/``REPLICA_BLUEPRINTS`` and ``g.read_only`` is set.
+* Only SELECTs go to the replica.  A flush or any other statement (Core or
+  ``text()`` INSERT/UPDATE/DELETE through ``db.session``) goes to the
+  primary and switches the rest of the request there, so a read-only
+  endpoint that happens to write still sees its own rows.
+* Read-your-writes: after a successful POST/PUT/DELETE (placing or deleting
+  a bid, for example) the user's session sticks to the primary for
+  ``READ_YOUR_WRITES_SECONDS`` so their next poll reflects their own bid.
+
+Raw SQL should take its engine from ``read_engine()`` instead of ``db.engine``
+when it is safe to serve from the replica.
+
+The replica is configured with ``DATABASE_REPLICA_URL``; ``same`` reuses the
+primary URL with its own pool, which exercises the routing locally without a
+second Postgres instance.
+"""
+
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_BIND_KEY = 'replica'
+STICKY_SESSION_KEY = '_primary_until'
+
+# Endpoints that only read and tolerate replica lag
+REPLICA_ENDPOINTS = {
+    # Player browsing
+    'all_players', 'player_detail', 'players_by_position', 'api_players', 'api_player_detail',
+    # Teams and results
+    'all_teams', 'team_squad', 'team_compare', 'round_results', 'api_transfers',
+    # Exports
+    'admin_export_players', 'admin_export_round', 'export_team_squad', 'admin_export_player_selection',
+    # Polling endpoints
+    'team_dashboard_update', 'admin_dashboard_update', 'admin_teams_update', 'admin_rounds_update',
+    'admin_bulk_round_update', 'admin_bulk_tiebreakers_update', 'check_bulk_tiebreaker_status',
+    # Leaderboards and season statistics
+    'team_management.team_detail',
+    'admin.season_details', 'admin.season_player_stats', 'admin.team_details',
+}
+
+# Blueprints whose GET endpoints are all read-only
+REPLICA_BLUEPRINTS = {'history'}
+
+
+def replica_engine():
+    """The replica engine, or None when no replica is configured"""
+    return current_app.extensions['sqlalchemy'].engines.get(REPLICA_BIND_KEY)
+
+
+def use_replica():
+    """Whether reads in the current request should go to the replica"""
+    if not has_request_context():
+        return False
+    return bool(g.get('read_only')) and not g.get('db_wrote')
+
+
+def use_primary():
+    """Send the rest of this request to the primary, e.g. before rebuilding a derived table on read"""
+    if has_request_context():
+        g.db_wrote = True
+
+
+def read_engine():
+    """Engine for raw read queries: the replica when routed, otherwise the primary"""
+    engines = current_app.extensions['sqlalchemy'].engines
+    if use_replica() and REPLICA_BIND_KEY in engines:
+        return engines[REPLICA_BIND_KEY]
+    return engines[None]
+
+
+def is_sticky_to_primary():
+    return session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+def stick_to_primary(seconds=None):
+    """Pin this user's reads to the primary for a few seconds after a write"""
+    if seconds is None:
+        seconds = current_app.config.get('READ_YOUR_WRITES_SECONDS', 10)
+    session[STICKY_SESSION_KEY] = time.time() + seconds
+
+
+def is_read(clause):
+    """Whether a statement only reads: a SELECT, or raw SQL that starts with SELECT"""
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith('SELECT')
+    return bool(getattr(clause, 'is_select', False))
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that reads from the replica when the request allows it"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or not is_read(clause):
+                if has_request_context():
+                    g.db_wrote = True
+            elif use_replica():
+                engine = self._db.engines.get(REPLICA_BIND_KEY)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _is_replica_endpoint(endpoint):
+    if not endpoint:
+        return False
+    return endpoint in REPLICA_ENDPOINTS or endpoint.split('.', 1)[0] in REPLICA_BLUEPRINTS
+
+
+def init_db_routing(app):
+    """Install the request hooks that drive replica routing"""
+
+    @app.before_request
+    def route_read_only_requests():
+        g.read_only = (
+            request.method in ('GET', 'HEAD')
+            and REPLICA_BIND_KEY in app.extensions['sqlalchemy'].engines
+            and _is_replica_endpoint(request.endpoint)
+            and not is_sticky_to_primary()
+        )
+
+    @app.after_request
+    def stick_after_write(response):
+        if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400:
+            stick_to_primary()
+        return response
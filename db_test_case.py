@@ -0,0 +1,32 @@
+"""Shared fixture for tests that run against an in-memory SQLite database."""
+
+import unittest
+
+from flask import Flask
+
+from models import db
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """A bare app bound to a fresh in-memory database, with its app context pushed for each test.
+
+    Subclasses add their fixture data after ``super().setUp()``, and override
+    ``create_app`` to set extra config or install extensions before the tables exist.
+    """
+
+    def create_app(self):
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(app)
+        return app
+
+    def setUp(self):
+        self.app = self.create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
@@ -0,0 +1,182 @@
+"""
+Template Fragment Cache
+=======================
+A ``{% cache %}`` tag for Jinja that stores rendered HTML in a process-local,
+byte-bounded LRU store:
+
+    {% cache 'mobile_nav', cache_version(current_user, current_user.team) %}
+        ...
+    {% endcache %}
+
+The first argument is the fragment key; it is combined with the template
+name and line so two blocks sharing a key never collide.  Any further
+arguments form the version.  A lookup whose stored version differs is a
+miss, and the entry is replaced, so a stale fragment never outlives the
+change that invalidated it and old versions do not pile up in the store.
+
+``cache_version()`` turns the objects a fragment renders into a version:
+update timestamps for seasons and users, and the rendered columns for teams
+(the team table has no update timestamp).  Anything that is not a model,
+such as counts a view has already computed, is used as-is.
+
+Hit rates per fragment are available from ``fragment_cache.stats()`` and,
+for admins, ``/admin/fragment_cache_stats``.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+
+from flask import jsonify
+from flask_login import current_user, login_required
+from jinja2 import Undefined, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+# Team columns the badge, navigation and card fragments render
+TEAM_VERSION_COLUMNS = ('name', 'balance', 'logo_url', 'logo_storage_type', 'imagekit_file_id', 'user_id')
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments bounded by their UTF-8 size"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.stale = Counter()
+        self.evictions = 0
+
+    def get(self, name, key, version):
+        """Cached HTML for ``key`` at ``version``, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits[name] += 1
+                return entry[1]
+            if entry is not None:
+                self.stale[name] += 1
+            self.misses[name] += 1
+            return None
+
+    def set(self, key, version, html):
+        size = len(html.encode('utf-8')) + len(key)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[2]
+            self._entries[key] = (version, html, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _key, (_version, _html, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            fragments = {}
+            for name in set(self.hits) | set(self.misses):
+                lookups = self.hits[name] + self.misses[name]
+                fragments[name] = {
+                    'hits': self.hits[name],
+                    'misses': self.misses[name],
+                    'stale': self.stale[name],
+                    'hit_rate': round(self.hits[name] / lookups, 3) if lookups else 0.0,
+                }
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                'evictions': self.evictions,
+                'fragments': fragments,
+            }
+
+
+fragment_cache = FragmentCache()
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache key[, version...] %}...{% endcache %}``"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=fragment_cache)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        location = nodes.Const(f"{parser.name}:{lineno}")
+        key = parser.parse_expression()
+        versions = []
+        while parser.stream.skip_if('comma'):
+            versions.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        args = [location, key, nodes.Tuple(versions, 'load')]
+        return nodes.CallBlock(self.call_method('_render', args), [], [], body).set_lineno(lineno)
+
+    def _render(self, location, key, version, caller):
+        cache = self.environment.fragment_cache
+        if not cache.enabled:
+            return caller()
+        name = key if isinstance(key, str) else str(key[0])
+        cache_key = f"{location}:{key!r}"
+        html = cache.get(name, cache_key, version)
+        if html is None:
+            html = str(caller())
+            cache.set(cache_key, version, html)
+        return Markup(html)
+
+
+def cache_version(*objects):
+    """Version tuple for a fragment from the objects it renders"""
+    parts = []
+    for obj in objects:
+        if obj is None or isinstance(obj, Undefined):
+            parts.append(None)
+        elif getattr(obj, 'is_anonymous', False) is True:
+            parts.append('anonymous')
+        elif isinstance(obj, dict):
+            # Season context dicts
+            parts.append((obj.get('id'), obj.get('updated_at'), obj.get('status')))
+        elif hasattr(obj, '__table__') and obj.__table__.name == 'team':
+            parts.append(('team', obj.id) + tuple(getattr(obj, column) for column in TEAM_VERSION_COLUMNS))
+        elif hasattr(obj, '__table__'):
+            parts.append((obj.__table__.name, obj.id, getattr(obj, 'updated_at', None),
+                          getattr(obj, 'profile_updated_at', None)))
+        else:
+            parts.append(obj)
+    return tuple(parts)
+
+
+def init_fragment_cache(app):
+    """Install the {% cache %} tag, cache_version() and the stats endpoint"""
+    fragment_cache.max_bytes = app.config.get('FRAGMENT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+    fragment_cache.enabled = app.config.get('FRAGMENT_CACHE_ENABLED', True)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.globals['cache_version'] = cache_version
+
+    @app.route('/admin/fragment_cache_stats')
+    @login_required
+    def fragment_cache_stats():
+        if not current_user.is_admin:
+            return jsonify({'error': 'Unauthorized'}), 403
+        return jsonify(fragment_cache.stats())
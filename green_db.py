@@ -0,0 +1,103 @@
+"""
+Green Database Driver
+=====================
+Makes psycopg2 cooperative under the eventlet worker, so a query waiting on
+the database yields to the other requests instead of blocking the process.
+
+Gunicorn's eventlet worker monkey patches Python sockets, but psycopg2 talks
+to PostgreSQL through libpq's own C sockets, so without help every query
+blocks the hub and concurrent users are served one round trip at a time.
+psycopg2 supports a *wait callback*: with one installed, libpq runs in
+non-blocking mode and the callback waits for the socket to become readable
+or writable, which under eventlet means parking the green thread with
+``trampoline`` while the hub serves other requests.
+
+``DB_CONCURRENCY`` picks the mode:
+
+* ``auto`` (default): install the callback when eventlet has monkey patched
+  sockets, i.e. under ``gunicorn --worker-class eventlet``; leave psycopg2
+  alone otherwise (flask run, tests, scripts).
+* ``green``: always install it (eventlet must be importable).
+* ``blocking``: never install it.
+
+The callback is process-wide and has to be installed before the first
+connection is opened, which ``init_green_db`` does while the app is created.
+With queries now overlapping, the SQLAlchemy pool bounds how many run at
+once; ``DB_POOL_SIZE``/``DB_MAX_OVERFLOW`` in ``config.py`` size it.
+"""
+
+import logging
+
+try:
+    from eventlet import patcher
+    from eventlet.hubs import trampoline
+    EVENTLET_AVAILABLE = True
+except ImportError:
+    EVENTLET_AVAILABLE = False
+
+try:
+    import psycopg2
+    from psycopg2 import extensions
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MODES = ('auto', 'green', 'blocking')
+
+
+def eventlet_wait_callback(conn, timeout=-1):
+    """Wait for a non-blocking libpq operation by parking the green thread on its socket"""
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            trampoline(conn.fileno(), read=True)
+        elif state == extensions.POLL_WRITE:
+            trampoline(conn.fileno(), write=True)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+
+def eventlet_active():
+    """Whether this process runs under eventlet with patched sockets"""
+    return EVENTLET_AVAILABLE and patcher.is_monkey_patched('socket')
+
+
+def is_green():
+    return PSYCOPG2_AVAILABLE and extensions.get_wait_callback() is eventlet_wait_callback
+
+
+def install(mode='auto'):
+    """Install or remove the wait callback for ``mode``; returns whether queries are now green"""
+    if mode not in MODES:
+        raise ValueError(f"DB_CONCURRENCY must be one of {', '.join(MODES)}, not {mode!r}")
+    if not PSYCOPG2_AVAILABLE:
+        return False
+
+    green = mode == 'green' or (mode == 'auto' and eventlet_active())
+    if green and not EVENTLET_AVAILABLE:
+        raise RuntimeError('DB_CONCURRENCY=green needs eventlet installed')
+    extensions.set_wait_callback(eventlet_wait_callback if green else None)
+    return green
+
+
+def get_status():
+    return {
+        'eventlet': eventlet_active(),
+        'green': is_green(),
+    }
+
+
+def init_green_db(app):
+    """Install the wait callback for the configured mode before any connection is opened"""
+    mode = app.config.get('DB_CONCURRENCY', 'auto')
+    green = install(mode)
+    engine_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    pool = f"pool {engine_options.get('pool_size', 5)}+{engine_options.get('max_overflow', 10)}"
+    if green:
+        logger.info(f"psycopg2 is cooperative under eventlet ({pool})")
+    elif eventlet_active():
+        logger.warning(f"DB_CONCURRENCY={mode}: every query blocks the eventlet hub")
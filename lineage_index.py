@@ -0,0 +1,191 @@
+"""
+Team Lineage Index
+==================
+One precomputed row per team lineage holding its ordered seasons (team id,
+name, final standing, spend) and aggregate stats, so the history pages look a
+lineage up by primary key instead of rebuilding the chain from
+``team.team_lineage_id`` on every request.
+
+Rows are rebuilt when a team registers for a season and when a season is
+completed.  Archived seasons are read from their ``season_archive`` snapshot.
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from sqlalchemy import text, bindparam
+from models import db
+from season_archive import SeasonArchiveStore, _season_dict, _parse_datetime
+from season_stats import SeasonStatsStore, _json_default
+
+logger = logging.getLogger(__name__)
+
+
+class LineageIndex:
+    """Builds and reads team_lineage_index rows"""
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def record_registration(team_id):
+        """Add a newly registered team to its lineage's row"""
+        try:
+            with db.engine.connect() as conn:
+                lineage_id = conn.execute(text("SELECT team_lineage_id FROM team WHERE id = :team_id"),
+                                          {'team_id': team_id}).scalar()
+            if not lineage_id:
+                return True  # Not part of a lineage, nothing to index
+            return LineageIndex.rebuild(lineage_id)
+        except Exception as e:
+            logger.error(f"Error indexing lineage for team {team_id}: {e}")
+            return False
+
+    @staticmethod
+    def refresh_season(season_id):
+        """Rebuild every lineage with a team in the season (standings and spend are final)"""
+        try:
+            with db.engine.connect() as conn:
+                lineage_ids = [row[0] for row in conn.execute(text("""
+                    SELECT DISTINCT team_lineage_id FROM team
+                    WHERE season_id = :season_id AND team_lineage_id IS NOT NULL
+                """), {'season_id': season_id})]
+            return all([LineageIndex.rebuild(lineage_id) for lineage_id in lineage_ids])
+        except Exception as e:
+            logger.error(f"Error refreshing lineages for season {season_id}: {e}")
+            return False
+
+    @staticmethod
+    def rebuild(lineage_id):
+        """Recompute one lineage's row from snapshots and live teams"""
+        try:
+            with db.engine.begin() as conn:
+                entries = LineageIndex._collect_entries(conn, str(lineage_id))
+                LineageIndex._store(conn, str(lineage_id), entries)
+            return True
+        except Exception as e:
+            logger.error(f"Error rebuilding lineage {lineage_id}: {e}")
+            return False
+
+    @staticmethod
+    def _collect_entries(conn, lineage_id):
+        """Season entries for a lineage, oldest season first"""
+        entries = []
+
+        snapshots = SeasonArchiveStore.get_snapshots(conn)
+        for season_id, snapshot in snapshots.items():
+            season = snapshot['season']
+            standings = snapshot.get('standings', {})
+            for team in snapshot['teams']:
+                if team[5] is not None and str(team[5]) == lineage_id:
+                    entries.append({
+                        'team_id': team[0], 'team_name': team[1],
+                        'season_id': season_id, 'season_name': season.get('name'),
+                        'is_continuing_team': bool(team[3]),
+                        'season_created_at': season.get('created_at'),
+                        'season_start_date': season.get('season_start_date'),
+                        'season_end_date': season.get('season_end_date'),
+                        'final_standing': standings.get(str(team[0])),
+                        'bid_count': team[6], 'total_spent': team[9], 'players_acquired': team[8],
+                    })
+
+        live_teams = conn.execute(text("""
+            SELECT t.id, t.name, t.season_id, t.is_continuing_team,
+                   COALESCE(ts.bid_count, 0), COALESCE(ts.total_spent, 0), COALESCE(ts.players_acquired, 0)
+            FROM team t
+            LEFT JOIN team_season_stats ts ON ts.team_id = t.id AND ts.season_id = t.season_id
+            WHERE t.team_lineage_id = :lineage_id
+        """), {'lineage_id': lineage_id}).fetchall()
+        live_teams = [team for team in live_teams if team[2] not in snapshots]
+        if live_teams:
+            season_ids = list({team[2] for team in live_teams})
+            seasons = {row._mapping['id']: _season_dict(row._mapping) for row in conn.execute(
+                text("SELECT * FROM season WHERE id IN :season_ids").bindparams(
+                    bindparam('season_ids', expanding=True)),
+                {'season_ids': season_ids})}
+            standings = SeasonStatsStore.get_standings(conn, season_ids)
+            for team in live_teams:
+                season = seasons.get(team[2], {})
+                entries.append({
+                    'team_id': team[0], 'team_name': team[1],
+                    'season_id': team[2], 'season_name': season.get('name'),
+                    'is_continuing_team': bool(team[3]),
+                    'season_created_at': season.get('created_at'),
+                    'season_start_date': season.get('season_start_date'),
+                    'season_end_date': season.get('season_end_date'),
+                    'final_standing': standings.get(team[0]),
+                    'bid_count': team[4], 'total_spent': team[5], 'players_acquired': team[6],
+                })
+
+        entries.sort(key=lambda e: (e['season_created_at'] is None,
+                                    e['season_created_at'] or datetime.min, e['season_id']))
+        return entries
+
+    @staticmethod
+    def _store(conn, lineage_id, entries):
+        starts = [e['season_start_date'] for e in entries if e['season_start_date']]
+        ends = [e['season_end_date'] for e in entries if e['season_end_date']]
+        standings = [e['final_standing'] for e in entries if e['final_standing']]
+
+        conn.execute(text("DELETE FROM team_lineage_index WHERE lineage_id = :lineage_id"),
+                     {'lineage_id': lineage_id})
+        if not entries:
+            return
+        conn.execute(text("""
+            INSERT INTO team_lineage_index
+                (lineage_id, entries, seasons_participated, first_season_start, last_season_end,
+                 all_names, total_spent, players_acquired, best_standing, latest_team_id, updated_at)
+            VALUES (:lineage_id, :entries, :seasons, :first_start, :last_end,
+                    :all_names, :total_spent, :players_acquired, :best_standing, :latest_team_id, :now)
+        """), {
+            'lineage_id': lineage_id,
+            'entries': json.dumps(entries, default=_json_default),
+            'seasons': len(entries),
+            'first_start': min(starts) if starts else None,
+            'last_end': max(ends) if ends else None,
+            'all_names': ', '.join(sorted({e['team_name'] for e in entries})),
+            'total_spent': sum(e['total_spent'] or 0 for e in entries),
+            'players_acquired': sum(e['players_acquired'] or 0 for e in entries),
+            'best_standing': min(standings) if standings else None,
+            'latest_team_id': entries[-1]['team_id'],
+            'now': datetime.utcnow(),
+        })
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get(conn, lineage_id):
+        """(lineage_history, lineage_stats) for a lineage, or ([], None) if unknown.
+
+        History rows are (team_id, team_name, season_id, season_name,
+        is_continuing_team, season_start_date, season_end_date, final_standing,
+        bid_count, total_spent, players_acquired).  Stats are
+        (seasons_participated, first_season_start, last_season_end, all_names,
+        total_spent, players_acquired, best_standing).
+        """
+        query = text("""
+            SELECT entries, seasons_participated, first_season_start, last_season_end,
+                   all_names, total_spent, players_acquired, best_standing
+            FROM team_lineage_index WHERE lineage_id = :lineage_id
+        """)
+        params = {'lineage_id': str(lineage_id)}
+        row = conn.execute(query, params).fetchone()
+        if row is None:
+            # Lineages registered before the index existed are built on first view
+            if not LineageIndex.rebuild(lineage_id):
+                return [], None
+            row = conn.execute(query, params).fetchone()
+            if row is None:
+                return [], None
+
+        history = [(
+            e['team_id'], e['team_name'], e['season_id'], e['season_name'], e['is_continuing_team'],
+            _parse_datetime(e['season_start_date']), _parse_datetime(e['season_end_date']),
+            e['final_standing'], e['bid_count'], e['total_spent'], e['players_acquired'],
+        ) for e in json.loads(row[0])]
+        stats = (row[1], _parse_datetime(row[2]), _parse_datetime(row[3]), row[4], row[5], row[6], row[7])
+        return history, stats
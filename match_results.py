@@ -0,0 +1,405 @@
+"""
+Match Results
+=============
+League fixtures and results in bulk: a round-robin fixture generator, an
+import of finished matches with their player matchups, and the set-based
+pass that turns results into team and player stats.
+
+Fixtures for every team are created with one multi-row ``INSERT``, numbered
+after the last existing round; a double round robin adds the reverse
+fixtures as a second half.
+
+An import file lists matches by round and match number, with the matchups
+played in each (``home_player``/``away_player`` are team member names or
+ids):
+
+    [{"round_number": 1, "match_number": 1,
+      "matchups": [{"home_player": "Ann", "away_player": "Bob", "home_goals": 2, "away_goals": 1}]}]
+
+or the same as CSV, one matchup per row with the columns ``round_number``,
+``match_number``, ``home_player``, ``away_player``, ``home_goals`` and
+``away_goals``.  The whole file is checked in memory first (the matches
+exist and are not completed, each player belongs to the right team and plays
+once per match, goals are whole numbers); any problem rejects the file and
+nothing is written.  Valid files are applied ``BATCH_SIZE`` matches at a
+time: the matchups are inserted, the matches scored and completed, and the
+stats of every team and player in the batch change with one ``UPDATE`` per
+stats table.
+
+Stats keep one invariant: a player's points are the category points of
+their results plus half their goal difference, rounded half away from zero.
+Each pass adds the category points of its matchups and the change in that
+bonus, so applying matches one at a time or a whole season at once gives the
+same totals.  Team points are three per win and one per draw.
+
+Everything runs in the caller's transaction; nothing is committed here.
+"""
+
+import csv
+import io
+import json
+import logging
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text, update
+
+from models import db, Category, Match, PlayerMatchup, PlayerStats, TeamMember, TeamStats
+
+logger = logging.getLogger(__name__)
+
+# Matches applied per set of statements
+BATCH_SIZE = 200
+
+ImportReport = namedtuple('ImportReport', ['matches', 'matchups', 'errors'])
+
+RESULT_COLUMNS = {'win': 'wins', 'draw': 'draws', 'loss': 'losses'}
+
+# Category point columns by result, indexed by the difference in priority (capped at 3)
+CATEGORY_POINT_COLUMNS = {
+    'win': ('points_same_category', 'points_one_level_diff', 'points_two_level_diff', 'points_three_level_diff'),
+    'draw': ('draw_same_category', 'draw_one_level_diff', 'draw_two_level_diff', 'draw_three_level_diff'),
+    'loss': ('loss_same_category', 'loss_one_level_diff', 'loss_two_level_diff', 'loss_three_level_diff'),
+}
+
+# Points when a category is missing
+DEFAULT_POINTS = {'win': 3, 'draw': 1, 'loss': 0}
+
+CSV_COLUMNS = ('round_number', 'match_number', 'home_player', 'away_player', 'home_goals', 'away_goals')
+
+
+def _result(goals, opponent_goals):
+    if goals > opponent_goals:
+        return 'win'
+    if goals < opponent_goals:
+        return 'loss'
+    return 'draw'
+
+
+def category_points(own, opponent, result):
+    """Points a player of category ``own`` earns for ``result`` against one of category ``opponent``"""
+    if own is None or opponent is None:
+        return DEFAULT_POINTS.get(result, 0)
+    columns = CATEGORY_POINT_COLUMNS.get(result)
+    if columns is None:
+        return 0
+    return getattr(own, columns[min(abs(own.priority - opponent.priority), 3)])
+
+
+def goal_difference_bonus(goal_difference):
+    """Half the goal difference, rounded half away from zero"""
+    half = goal_difference / 2
+    return int(half + 0.5) if half >= 0 else int(half - 0.5)
+
+
+def round_robin(team_ids, double=True):
+    """Rounds of (home, away) pairs in which every team meets every other (twice when ``double``)"""
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    rounds = []
+    for number in range(len(teams) - 1):
+        pairs = []
+        for i in range(len(teams) // 2):
+            home, away = teams[i], teams[-1 - i]
+            if home is None or away is None:
+                continue
+            # The fixed team alternates between home and away
+            if i == 0 and number % 2:
+                home, away = away, home
+            pairs.append((home, away))
+        rounds.append(pairs)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    if double:
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    return rounds
+
+
+def parse_results(content, filename=''):
+    """Matches from an import file's text: JSON, or CSV when ``filename`` ends in .csv"""
+    if filename.lower().endswith('.csv'):
+        reader = csv.DictReader(io.StringIO(content))
+        missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+        matches = {}
+        for row in reader:
+            key = (row['round_number'], row['match_number'])
+            matches.setdefault(key, {'round_number': key[0], 'match_number': key[1], 'matchups': []})
+            matches[key]['matchups'].append({column: row[column] for column in CSV_COLUMNS[2:]})
+        return list(matches.values())
+
+    try:
+        data = json.loads(content)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if isinstance(data, dict):
+        data = data.get('matches')
+    if not isinstance(data, list):
+        raise ValueError('Expected a list of matches')
+    return data
+
+
+def _whole_number(value):
+    """``value`` as a non-negative int, or None"""
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 else None
+
+
+class MatchResults:
+    """Generates fixtures, imports results and keeps team and player stats in step"""
+
+    # ------------------------------------------------------------------
+    # Fixtures (inside the caller's transaction)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def create_fixtures(team_ids, start_date=None, days_between=7, double=True):
+        """Insert a round robin of matches after the last existing round; returns how many"""
+        if len(team_ids) < 2:
+            raise ValueError('At least two teams are needed for fixtures')
+        start_date = start_date or datetime.utcnow()
+        first_round = (db.session.execute(select(func.max(Match.round_number))).scalar() or 0) + 1
+        rows = [
+            {'home_team_id': home, 'away_team_id': away, 'round_number': first_round + offset,
+             'match_number': number, 'match_date': start_date + timedelta(days=offset * days_between)}
+            for offset, pairs in enumerate(round_robin(team_ids, double))
+            for number, (home, away) in enumerate(pairs, start=1)
+        ]
+        db.session.execute(insert(Match), rows)
+        logger.info(f"Created {len(rows)} fixtures from round {first_round} for {len(team_ids)} teams")
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # Results import (inside the caller's transaction)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def import_results(entries):
+        """Validate and apply parsed matches; returns an ``ImportReport`` (nothing written if it has errors)"""
+        matches, errors = MatchResults._resolve(entries)
+        if errors:
+            return ImportReport(0, 0, errors)
+
+        for start in range(0, len(matches), BATCH_SIZE):
+            batch = matches[start:start + BATCH_SIZE]
+            match_ids = [match['id'] for match in batch]
+            matchups = [matchup for match in batch for matchup in match['matchups']]
+            db.session.execute(delete(PlayerMatchup).where(PlayerMatchup.match_id.in_(match_ids)),
+                               execution_options={'synchronize_session': False})
+            if matchups:
+                db.session.execute(insert(PlayerMatchup), matchups)
+            db.session.execute(update(Match), [
+                {'id': match['id'], 'home_score': match['home_score'], 'away_score': match['away_score'],
+                 'is_completed': True}
+                for match in batch
+            ])
+            MatchResults._apply(
+                [(match['home_team_id'], match['away_team_id'], match['home_score'], match['away_score'])
+                 for match in batch],
+                [(m['home_player_id'], m['away_player_id'], m['home_goals'], m['away_goals']) for m in matchups],
+            )
+
+        report = ImportReport(len(matches), sum(len(match['matchups']) for match in matches), [])
+        logger.info(f"Imported results of {report.matches} matches with {report.matchups} matchups")
+        return report
+
+    @staticmethod
+    def _resolve(entries):
+        """Check parsed matches against the database; returns (matches ready to apply, errors)"""
+        errors = []
+        keys = []
+        for index, entry in enumerate(entries, start=1):
+            key = (_whole_number(entry.get('round_number')), _whole_number(entry.get('match_number'))) \
+                if isinstance(entry, dict) else (None, None)
+            if None in key:
+                errors.append(f"Match {index}: round_number and match_number must be whole numbers")
+            keys.append(key)
+
+        rounds = {round_number for round_number, _ in keys if round_number is not None}
+        existing = {
+            (match.round_number, match.match_number): match
+            for match in db.session.execute(select(Match).where(Match.round_number.in_(rounds))).scalars()
+        }
+        team_ids = {team_id for match in existing.values() for team_id in (match.home_team_id, match.away_team_id)}
+        members = defaultdict(dict)
+        for member_id, name, team_id in db.session.execute(
+            select(TeamMember.id, TeamMember.name, TeamMember.team_id).where(TeamMember.team_id.in_(team_ids))
+        ):
+            members[team_id][str(member_id)] = member_id
+            members[team_id].setdefault(name.strip().lower(), member_id)
+
+        def member(team_id, reference):
+            reference = str(reference if reference is not None else '').strip()
+            return members[team_id].get(reference) or members[team_id].get(reference.lower())
+
+        resolved, seen = [], set()
+        for entry, key in zip(entries, keys):
+            if None in key:
+                continue
+            label = f"Round {key[0]} match {key[1]}"
+            match = existing.get(key)
+            if match is None:
+                errors.append(f"{label}: no such match")
+                continue
+            if match.is_completed:
+                errors.append(f"{label}: already completed")
+                continue
+            if key in seen:
+                errors.append(f"{label}: listed more than once")
+                continue
+            seen.add(key)
+
+            matchups, players = [], set()
+            for number, matchup in enumerate(entry.get('matchups') or [], start=1):
+                home_player = member(match.home_team_id, matchup.get('home_player'))
+                away_player = member(match.away_team_id, matchup.get('away_player'))
+                home_goals, away_goals = _whole_number(matchup.get('home_goals')), _whole_number(matchup.get('away_goals'))
+                if home_player is None or away_player is None:
+                    errors.append(f"{label}, matchup {number}: players must belong to the home and away teams")
+                elif home_player in players or away_player in players:
+                    errors.append(f"{label}, matchup {number}: a player is already in a matchup for this match")
+                elif home_goals is None or away_goals is None:
+                    errors.append(f"{label}, matchup {number}: goals must be whole numbers")
+                else:
+                    players.update((home_player, away_player))
+                    matchups.append({'match_id': match.id, 'home_player_id': home_player,
+                                     'away_player_id': away_player, 'home_goals': home_goals,
+                                     'away_goals': away_goals})
+            resolved.append({
+                'id': match.id, 'home_team_id': match.home_team_id, 'away_team_id': match.away_team_id,
+                'home_score': sum(m['home_goals'] for m in matchups),
+                'away_score': sum(m['away_goals'] for m in matchups),
+                'matchups': matchups,
+            })
+        return resolved, errors
+
+    # ------------------------------------------------------------------
+    # Stats (inside the caller's transaction)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def apply_completed(match_ids):
+        """Add the results of already-completed matches, with their stored matchups, to the stats"""
+        for start in range(0, len(match_ids), BATCH_SIZE):
+            MatchResults._apply_stored(Match.id.in_(match_ids[start:start + BATCH_SIZE]))
+
+    @staticmethod
+    def recalculate():
+        """Rebuild every team's and player's stats from the completed matches"""
+        zero = {'played': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'points': 0}
+        for statement in (
+            update(TeamStats).values(goals_for=0, goals_against=0, **zero),
+            update(PlayerStats).values(goals_scored=0, goals_conceded=0, clean_sheets=0, **zero),
+        ):
+            db.session.execute(statement, execution_options={'synchronize_session': False})
+        match_ids = db.session.execute(
+            select(Match.id).where(Match.is_completed == True).order_by(Match.id)
+        ).scalars().all()
+        MatchResults.apply_completed(match_ids)
+        # The ORM rows in the session still hold the old counts
+        db.session.expire_all()
+
+    @staticmethod
+    def _apply_stored(condition):
+        matches = db.session.execute(
+            select(Match.id, Match.home_team_id, Match.away_team_id, Match.home_score, Match.away_score)
+            .where(condition, Match.is_completed == True)
+        ).all()
+        if not matches:
+            return
+        matchups = db.session.execute(
+            select(PlayerMatchup.home_player_id, PlayerMatchup.away_player_id,
+                   PlayerMatchup.home_goals, PlayerMatchup.away_goals)
+            .where(PlayerMatchup.match_id.in_([match.id for match in matches]))
+        ).all()
+        MatchResults._apply([tuple(match)[1:] for match in matches], matchups)
+
+    @staticmethod
+    def _apply(matches, matchups):
+        """Add (home team, away team, home score, away score) results and
+        (home player, away player, home goals, away goals) matchups to the stats"""
+        teams = defaultdict(Counter)
+        for home, away, home_score, away_score in matches:
+            home_score, away_score = home_score or 0, away_score or 0
+            for team_id, scored, conceded in ((home, home_score, away_score), (away, away_score, home_score)):
+                delta = teams[team_id]
+                delta['played'] += 1
+                delta[RESULT_COLUMNS[_result(scored, conceded)]] += 1
+                delta['goals_for'] += scored
+                delta['goals_against'] += conceded
+
+        member_ids = {player_id for matchup in matchups for player_id in matchup[:2]}
+        member_categories = dict(db.session.execute(
+            select(TeamMember.id, TeamMember.category_id).where(TeamMember.id.in_(member_ids))
+        ).all()) if member_ids else {}
+        categories = {category.id: category for category in Category.query} if member_categories else {}
+
+        players = defaultdict(Counter)
+        for home, away, home_goals, away_goals in matchups:
+            if home not in member_categories or away not in member_categories:
+                continue
+            home_goals, away_goals = home_goals or 0, away_goals or 0
+            for player_id, opponent_id, scored, conceded in ((home, away, home_goals, away_goals),
+                                                             (away, home, away_goals, home_goals)):
+                result = _result(scored, conceded)
+                delta = players[player_id]
+                delta['played'] += 1
+                delta[RESULT_COLUMNS[result]] += 1
+                delta['goals_scored'] += scored
+                delta['goals_conceded'] += conceded
+                delta['clean_sheets'] += conceded == 0
+                delta['points'] += category_points(categories.get(member_categories[player_id]),
+                                                   categories.get(member_categories[opponent_id]), result)
+
+        if teams:
+            MatchResults._ensure_rows(TeamStats, TeamStats.team_id, teams)
+            db.session.execute(text("""
+                UPDATE team_stats SET
+                    played = played + :played, wins = wins + :wins, draws = draws + :draws,
+                    losses = losses + :losses, goals_for = goals_for + :goals_for,
+                    goals_against = goals_against + :goals_against,
+                    points = (wins + :wins) * 3 + draws + :draws
+                WHERE team_id = :team_id
+            """), [MatchResults._row(delta, team_id=team_id) for team_id, delta in teams.items()])
+
+        if players:
+            MatchResults._ensure_rows(PlayerStats, PlayerStats.team_member_id, players)
+            # The bonus on goal difference changes with the totals, so the old totals are needed
+            totals = dict((member_id, scored - conceded) for member_id, scored, conceded in db.session.execute(
+                select(PlayerStats.team_member_id, PlayerStats.goals_scored, PlayerStats.goals_conceded)
+                .where(PlayerStats.team_member_id.in_(players))
+            ))
+            rows = []
+            for member_id, delta in players.items():
+                before = totals.get(member_id) or 0
+                after = before + delta['goals_scored'] - delta['goals_conceded']
+                delta['points'] += goal_difference_bonus(after) - goal_difference_bonus(before)
+                rows.append(MatchResults._row(delta, team_member_id=member_id))
+            db.session.execute(text("""
+                UPDATE player_stats SET
+                    played = played + :played, wins = wins + :wins, draws = draws + :draws,
+                    losses = losses + :losses, goals_scored = goals_scored + :goals_scored,
+                    goals_conceded = goals_conceded + :goals_conceded,
+                    clean_sheets = clean_sheets + :clean_sheets, points = points + :points
+                WHERE team_member_id = :team_member_id
+            """), rows)
+
+    @staticmethod
+    def _row(delta, **key):
+        columns = ('played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+                   'goals_scored', 'goals_conceded', 'clean_sheets', 'points')
+        return {**{column: int(delta[column]) for column in columns}, **key}
+
+    @staticmethod
+    def _ensure_rows(model, key_column, keys):
+        """Insert zeroed stats rows for the keys that have none"""
+        present = set(db.session.execute(select(key_column).where(key_column.in_(keys))).scalars())
+        zero = {column.name: 0 for column in model.__table__.columns
+                if column.name not in ('id', key_column.name)}
+        missing = [{key_column.name: key, **zero} for key in keys if key not in present]
+        if missing:
+            db.session.execute(insert(model), missing)
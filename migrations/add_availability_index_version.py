@@ -0,0 +1,24 @@
+from app import app, db
+from models import AvailabilityIndexVersion
+
+def run_migration():
+    """
+    Create the counter row the player availability index checks on each request.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        
+        if AvailabilityIndexVersion.__tablename__ not in inspector.get_table_names():
+            print(f"Creating {AvailabilityIndexVersion.__tablename__} table...")
+            AvailabilityIndexVersion.__table__.create(engine)
+        else:
+            print(f"{AvailabilityIndexVersion.__tablename__} table already exists, skipping")
+        
+        if db.session.get(AvailabilityIndexVersion, 1) is None:
+            db.session.add(AvailabilityIndexVersion(id=1, version=1))
+            db.session.commit()
+            print("Created version row")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,28 @@
+from app import app, db
+from models import BulkBidRound, BulkRoundMonitor, BulkRoundPlayerCounter, BulkRoundTeamCounter
+from bulk_round_counters import BulkRoundCounters
+
+def run_migration():
+    """
+    Create the bulk round monitor tables and build the counters of every
+    bulk round that is still active.  Finished rounds are built on first view.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        tables = inspector.get_table_names()
+        
+        for model in (BulkRoundMonitor, BulkRoundPlayerCounter, BulkRoundTeamCounter):
+            if model.__tablename__ not in tables:
+                print(f"Creating {model.__tablename__} table...")
+                model.__table__.create(engine)
+            else:
+                print(f"{model.__tablename__} table already exists, skipping")
+        
+        for bulk_round in BulkBidRound.query.filter_by(is_active=True).order_by(BulkBidRound.id).all():
+            version = BulkRoundCounters.rebuild(bulk_round.id)
+            db.session.commit()
+            print(f"Bulk round {bulk_round.id}: counters built at version {version}")
+
+if __name__ == "__main__":
+    run_migration()
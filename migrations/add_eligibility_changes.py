@@ -0,0 +1,20 @@
+from app import app, db
+from models import EligibilityChange
+
+def run_migration():
+    """
+    Create the eligibility_change table that records batch auction pool
+    changes so the latest one can be undone.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        
+        if EligibilityChange.__tablename__ not in inspector.get_table_names():
+            print(f"Creating {EligibilityChange.__tablename__} table...")
+            EligibilityChange.__table__.create(engine)
+        else:
+            print(f"{EligibilityChange.__tablename__} table already exists, skipping")
+
+if __name__ == "__main__":
+    run_migration()
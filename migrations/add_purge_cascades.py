@@ -0,0 +1,62 @@
+from sqlalchemy import text
+
+from app import app, db
+from models import PurgeJob
+
+# (table, column, referenced table, ON DELETE action)
+CASCADES = [
+    ('bid', 'player_id', 'player', 'CASCADE'),
+    ('bid', 'team_id', 'team', 'CASCADE'),
+    ('starred_player', 'player_id', 'player', 'CASCADE'),
+    ('starred_player', 'team_id', 'team', 'CASCADE'),
+    ('tiebreaker', 'player_id', 'player', 'CASCADE'),
+    ('team_tiebreaker', 'tiebreaker_id', 'tiebreaker', 'CASCADE'),
+    ('team_tiebreaker', 'team_id', 'team', 'CASCADE'),
+    ('bulk_bid', 'player_id', 'player', 'CASCADE'),
+    ('bulk_bid', 'team_id', 'team', 'CASCADE'),
+    ('bulk_bid_tiebreaker', 'player_id', 'player', 'CASCADE'),
+    ('bulk_bid_tiebreaker', 'winner_team_id', 'team', 'SET NULL'),
+    ('team_bulk_tiebreaker', 'tiebreaker_id', 'bulk_bid_tiebreaker', 'CASCADE'),
+    ('team_bulk_tiebreaker', 'team_id', 'team', 'CASCADE'),
+    ('player', 'team_id', 'team', 'SET NULL'),
+    ('team', 'user_id', 'user', 'SET NULL'),
+    ('password_reset_request', 'user_id', 'user', 'CASCADE'),
+]
+
+def run_migration():
+    """
+    Create the purge_job table and, on PostgreSQL, recreate the foreign keys
+    that point at players, teams and users with ON DELETE CASCADE / SET NULL.
+    SQLite cannot alter constraints (and does not enforce them by default),
+    so there the keys are left alone; purges.py deletes dependents itself.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+
+        if PurgeJob.__tablename__ not in inspector.get_table_names():
+            print(f"Creating {PurgeJob.__tablename__} table...")
+            PurgeJob.__table__.create(engine)
+        else:
+            print(f"{PurgeJob.__tablename__} table already exists, skipping")
+
+        if engine.dialect.name != 'postgresql':
+            print(f"{engine.dialect.name} cannot alter foreign keys, skipping ON DELETE rules")
+            return
+
+        with engine.begin() as conn:
+            for table, column, referred, action in CASCADES:
+                existing = [fk for fk in inspector.get_foreign_keys(table) if fk['constrained_columns'] == [column]]
+                if any((fk.get('options') or {}).get('ondelete', '').upper() == action for fk in existing):
+                    print(f"{table}.{column} already ON DELETE {action}, skipping")
+                    continue
+                for fk in existing:
+                    conn.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{fk["name"]}"'))
+                conn.execute(text(
+                    f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_{column}_fkey" '
+                    f'FOREIGN KEY ("{column}") REFERENCES "{referred}" (id) ON DELETE {action}'
+                ))
+                print(f"{table}.{column} -> {referred} ON DELETE {action}")
+
+if __name__ == "__main__":
+    run_migration()
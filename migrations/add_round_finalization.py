@@ -0,0 +1,21 @@
+from app import app, db
+from models import RoundFinalization
+
+def run_migration():
+    """
+    Create the round_finalization checkpoint table.  Rounds already waiting on
+    a tiebreaker start with an empty checkpoint; players they allocated before
+    the tie keep their team and are not allocated again.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        
+        if RoundFinalization.__tablename__ not in inspector.get_table_names():
+            print(f"Creating {RoundFinalization.__tablename__} table...")
+            RoundFinalization.__table__.create(engine)
+        else:
+            print(f"{RoundFinalization.__tablename__} table already exists, skipping")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,30 @@
+from app import app, db
+from models import Round, BulkBidRound, RoundResultDocument
+from result_documents import ResultDocuments
+
+def run_migration():
+    """
+    Create the round_result_document table and compile the results of every
+    finished round and settled bulk round.  Rounds left out here are compiled
+    on their first view.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        
+        if RoundResultDocument.__tablename__ not in inspector.get_table_names():
+            print(f"Creating {RoundResultDocument.__tablename__} table...")
+            RoundResultDocument.__table__.create(engine)
+        else:
+            print(f"{RoundResultDocument.__tablename__} table already exists, skipping")
+        
+        round_ids = [round_id for round_id, in db.session.query(Round.id).filter(Round.is_active == False)]
+        compiled = sum(1 for round_id in round_ids if ResultDocuments.compile_round(round_id))
+        print(f"Compiled results for {compiled} of {len(round_ids)} finished rounds")
+        
+        bulk_round_ids = [round_id for round_id, in db.session.query(BulkBidRound.id).filter(BulkBidRound.is_active == False)]
+        compiled = sum(1 for round_id in bulk_round_ids if ResultDocuments.compile_bulk_round(round_id))
+        print(f"Compiled results for {compiled} of {len(bulk_round_ids)} finished bulk rounds (the rest are still settling)")
+
+if __name__ == "__main__":
+    run_migration()
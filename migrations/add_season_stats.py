@@ -0,0 +1,27 @@
+from app import app, db
+from models import Season, SeasonStatsSummary, TeamSeasonStats, RoundStatsSummary
+from season_stats import SeasonStatsStore
+
+def run_migration():
+    """
+    Create the season statistics summary tables and backfill every season.
+    Completed seasons are frozen after their backfill.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        tables = inspector.get_table_names()
+        
+        for model in (SeasonStatsSummary, TeamSeasonStats, RoundStatsSummary):
+            if model.__tablename__ not in tables:
+                print(f"Creating {model.__tablename__} table...")
+                model.__table__.create(engine)
+            else:
+                print(f"{model.__tablename__} table already exists, skipping")
+        
+        for season in Season.query.order_by(Season.id).all():
+            refreshed = SeasonStatsStore.refresh_season(season.id, force=True)
+            print(f"Season {season.id} ({season.name}): {'backfilled' if refreshed else 'failed'}")
+
+if __name__ == "__main__":
+    run_migration()
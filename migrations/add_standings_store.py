@@ -0,0 +1,26 @@
+from app import app, db
+from models import TeamStanding, TeamPairResult
+from standings_store import StandingsStore
+
+def run_migration():
+    """
+    Create the standings and head-to-head tables and backfill them from the
+    current league table, completed matches and finalized rounds.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        tables = inspector.get_table_names()
+        
+        for model in (TeamStanding, TeamPairResult):
+            if model.__tablename__ not in tables:
+                print(f"Creating {model.__tablename__} table...")
+                model.__table__.create(engine)
+            else:
+                print(f"{model.__tablename__} table already exists, skipping")
+        
+        rebuilt = StandingsStore.rebuild()
+        print(f"Standings and head-to-head results: {'backfilled' if rebuilt else 'failed'}")
+
+if __name__ == "__main__":
+    run_migration()
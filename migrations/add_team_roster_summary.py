@@ -0,0 +1,25 @@
+from app import app, db
+from models import TeamRosterSummary
+from team_rosters import TeamRosters
+
+def run_migration():
+    """
+    Create the team_roster_summary table and build every team's summary.
+    Each team's spending ledger starts at its current squad value.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        
+        if TeamRosterSummary.__tablename__ not in inspector.get_table_names():
+            print(f"Creating {TeamRosterSummary.__tablename__} table...")
+            TeamRosterSummary.__table__.create(engine)
+        else:
+            print(f"{TeamRosterSummary.__tablename__} table already exists, skipping")
+        
+        built = TeamRosters.rebuild()
+        db.session.commit()
+        print(f"Built roster summaries for {built} teams")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,30 @@
+import sys
+
+from app import app, db
+from models import Season, SeasonArchive
+from season_archive import SeasonArchiveStore
+from lineage_index import LineageIndex
+
+def run_migration(force=False):
+    """
+    Create the season_archive table if missing and snapshot every completed season.
+    Pass --force to rebuild snapshots that already exist.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        
+        if SeasonArchive.__tablename__ not in inspector.get_table_names():
+            print("Creating season_archive table...")
+            SeasonArchive.__table__.create(engine)
+        else:
+            print("season_archive table already exists, skipping")
+        
+        for season in Season.query.filter_by(status='completed').order_by(Season.id).all():
+            archived = SeasonArchiveStore.archive_season(season.id, force=force)
+            print(f"Season {season.id} ({season.name}): {'archived' if archived else 'skipped'}")
+            if archived:
+                LineageIndex.refresh_season(season.id)
+
+if __name__ == "__main__":
+    run_migration(force='--force' in sys.argv)
@@ -0,0 +1,30 @@
+from app import app, db
+from models import TeamLineageIndex
+from lineage_index import LineageIndex
+
+def run_migration():
+    """
+    Create the team_lineage_index table if missing and build a row for every lineage.
+    """
+    with app.app_context():
+        engine = db.engine
+        inspector = db.inspect(engine)
+        
+        if TeamLineageIndex.__tablename__ not in inspector.get_table_names():
+            print("Creating team_lineage_index table...")
+            TeamLineageIndex.__table__.create(engine)
+        else:
+            print("team_lineage_index table already exists, skipping")
+        
+        with engine.connect() as conn:
+            lineage_ids = [row[0] for row in conn.execute(db.text(
+                "SELECT DISTINCT team_lineage_id FROM team WHERE team_lineage_id IS NOT NULL"
+            ))]
+        
+        failed = [lineage_id for lineage_id in lineage_ids if not LineageIndex.rebuild(lineage_id)]
+        print(f"Indexed {len(lineage_ids) - len(failed)} of {len(lineage_ids)} lineages")
+        for lineage_id in failed:
+            print(f"  failed: {lineage_id}")
+
+if __name__ == "__main__":
+    run_migration()
@@ -1,10 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from offload import run_in_thread
 from datetime import datetime, timedelta, timezone
+import logging
 import secrets
 
-db = SQLAlchemy()
+from db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+logger = logging.getLogger(__name__)
 
 class Season(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -73,11 +78,12 @@ class User(UserMixin, db.Model):
         """Alias for user_role to maintain consistency with templates and routes"""
         return self.user_role
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        # scrypt releases the GIL, so hashing runs on a native thread instead of the hub
+        self.password_hash = run_in_thread(generate_password_hash, password)
         self.last_password_change = datetime.now(timezone.utc)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return run_in_thread(check_password_hash, self.password_hash, password)
     
     def can_change_password(self):
         """Check if user can change password (5 times per day restriction)"""
@@ -125,46 +131,8 @@ class User(UserMixin, db.Model):
         wait_time = timedelta(hours=4.8) - time_since_change
         return max(wait_time, timedelta(0))
         
-    def generate_remember_token(self, days=30):
-        """Generate a secure token for the 'remember me' functionality"""
-        # Clear any existing token
-        self.remember_token = None
-        
-        # Generate new token
-        token = secrets.token_urlsafe(32)
-        self.remember_token = token
-        
-        # Set expiration (30 days by default)
-        self.token_expires_at = datetime.now(timezone.utc) + timedelta(days=days)
-        
-        return token
-        
-    @classmethod
-    def get_by_remember_token(cls, token):
-        """Find a user by remember token if not expired"""
-        user = cls.query.filter_by(remember_token=token).first()
-        
-        if user and user.token_expires_at:
-            # Check if token is still valid
-            now = datetime.now(timezone.utc)
-            expires_at = user.token_expires_at
-            
-            # If token_expires_at is naive, make it timezone-aware
-            if expires_at.tzinfo is None:
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-            
-            if expires_at > now:
-                return user
-            
-            # Token expired, clear it
-            user.remember_token = None
-            user.token_expires_at = None
-            db.session.commit()
-            
-        return None
-    
     def clear_remember_token(self):
-        """Clear the remember token for this user"""
+        """Revoke every remember-me cookie issued to this user (see remember_me.py)"""
         self.remember_token = None
         self.token_expires_at = None
 
@@ -187,7 +155,7 @@ class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     balance = db.Column(db.Integer, default=15000)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'))
     season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True)  # Added for season support
     team_lineage_id = db.Column(db.String(50), nullable=True)  # For tracking team across seasons
     is_continuing_team = db.Column(db.Boolean, default=False)  # Whether this team continues from previous season
@@ -246,30 +214,24 @@ class Team(db.Model):
     # season property is now handled by SQLAlchemy relationship above
     
     def get_lineage_history(self):
-        """Get the complete lineage history of this team"""
-        if hasattr(self, 'team_lineage_id') and self.team_lineage_id:
-            try:
-                with db.engine.connect() as conn:
-                    result = conn.execute("""
-                        SELECT t.id, t.name, s.name as season_name, t.is_continuing_team
-                        FROM team t
-                        JOIN season s ON t.season_id = s.id
-                        WHERE t.team_lineage_id = %s
-                        ORDER BY s.created_at ASC
-                    """, (self.team_lineage_id,))
-                    
-                    history = []
-                    for row in result:
-                        history.append({
-                            'id': row[0],
-                            'name': row[1],
-                            'season_name': row[2],
-                            'is_continuing_team': row[3]
-                        })
-                    return history
-            except Exception:
-                pass
-        return []
+        """Get the complete lineage history of this team from the lineage index"""
+        if not self.team_lineage_id:
+            return []
+        from lineage_index import LineageIndex
+        try:
+            with db.engine.connect() as conn:
+                history, _ = LineageIndex.get(conn, self.team_lineage_id)
+        except Exception as e:
+            logger.error(f"Error loading lineage history for team {self.id}: {e}")
+            return []
+        return [{
+            'id': row[0],
+            'name': row[1],
+            'season_name': row[3],
+            'is_continuing_team': row[4],
+            'final_standing': row[7],
+            'total_spent': row[9],
+        } for row in history]
 
 
 class Category(db.Model):
@@ -378,7 +340,7 @@ class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     position = db.Column(db.String(10), nullable=False)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='SET NULL'), nullable=True)
     round_id = db.Column(db.Integer, db.ForeignKey('round.id'), nullable=True)
     acquisition_value = db.Column(db.Integer, nullable=True)
     is_auction_eligible = db.Column(db.Boolean, default=True)  # New field to track if player is eligible for auction
@@ -430,8 +392,8 @@ class Player(db.Model):
 
 class StarredPlayer(db.Model):
     """Model for storing which players are starred by which teams"""
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
-    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'), primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -477,8 +439,8 @@ class Round(db.Model):
 
 class Bid(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
-    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'), nullable=False)
     round_id = db.Column(db.Integer, db.ForeignKey('round.id'), nullable=False)
     amount = db.Column(db.Integer, nullable=False)
     is_hidden = db.Column(db.Boolean, default=True)
@@ -524,7 +486,7 @@ class Bid(db.Model):
 class Tiebreaker(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     round_id = db.Column(db.Integer, db.ForeignKey('round.id'), nullable=False)
-    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'), nullable=False)
     original_amount = db.Column(db.Integer, nullable=False)
     resolved = db.Column(db.Boolean, default=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
@@ -535,8 +497,8 @@ class Tiebreaker(db.Model):
 
 class TeamTiebreaker(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    tiebreaker_id = db.Column(db.Integer, db.ForeignKey('tiebreaker.id'), nullable=False)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    tiebreaker_id = db.Column(db.Integer, db.ForeignKey('tiebreaker.id', ondelete='CASCADE'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), nullable=False)
     new_amount = db.Column(db.Integer, nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -544,7 +506,7 @@ class TeamTiebreaker(db.Model):
 
 class PasswordResetRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     reset_token = db.Column(db.String(100), unique=True, nullable=True)
     reason = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='pending')  # pending, approved, rejected, completed
@@ -613,8 +575,8 @@ class BulkBidRound(db.Model):
 class BulkBid(db.Model):
     __tablename__ = 'bulk_bid'
     id = db.Column(db.Integer, primary_key=True)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
-    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'), nullable=False)
     round_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_round.id'), nullable=False)
     is_resolved = db.Column(db.Boolean, default=False)
     has_tie = db.Column(db.Boolean, default=False)
@@ -628,10 +590,10 @@ class BulkBidTiebreaker(db.Model):
     __tablename__ = 'bulk_bid_tiebreaker'
     id = db.Column(db.Integer, primary_key=True)
     bulk_round_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_round.id'), nullable=False)
-    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'), nullable=False)
     current_amount = db.Column(db.Integer, nullable=False)  # Current highest bid amount
     resolved = db.Column(db.Boolean, default=False)
-    winner_team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=True)
+    winner_team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='SET NULL'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -642,12 +604,204 @@ class BulkBidTiebreaker(db.Model):
 class TeamBulkTiebreaker(db.Model):
     __tablename__ = 'team_bulk_tiebreaker'
     id = db.Column(db.Integer, primary_key=True)
-    tiebreaker_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_tiebreaker.id'), nullable=False)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    tiebreaker_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_tiebreaker.id', ondelete='CASCADE'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), nullable=False)
     is_active = db.Column(db.Boolean, default=True)  # Whether the team is still in the tiebreaker
     last_bid = db.Column(db.Integer, nullable=True)  # Last bid amount by this team
     last_bid_time = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    team = db.relationship('Team', backref='bulk_tiebreakers') 
\ No newline at end of file
+    team = db.relationship('Team', backref='bulk_tiebreakers') 
+
+
+class SeasonStatsSummary(db.Model):
+    """Bid aggregates and player leaderboards for a season, refreshed on round finalization"""
+    __tablename__ = 'season_stats_summary'
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), primary_key=True)
+    total_bids = db.Column(db.Integer, default=0)
+    teams_with_bids = db.Column(db.Integer, default=0)
+    players_bid_on = db.Column(db.Integer, default=0)
+    bid_amount_total = db.Column(db.BigInteger, default=0)
+    max_bid = db.Column(db.Integer, default=0)
+    min_bid = db.Column(db.Integer, default=0)
+    leaderboards = db.Column(db.Text, nullable=True)  # JSON: top bids and player award lists
+    is_frozen = db.Column(db.Boolean, default=False)  # Set once the season is completed
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TeamSeasonStats(db.Model):
+    """Per-team bidding and acquisition totals within a season"""
+    __tablename__ = 'team_season_stats'
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    bid_count = db.Column(db.Integer, default=0)
+    bid_amount_total = db.Column(db.BigInteger, default=0)
+    max_bid = db.Column(db.Integer, default=0)
+    min_bid = db.Column(db.Integer, default=0)
+    rounds_participated = db.Column(db.Integer, default=0)
+    players_acquired = db.Column(db.Integer, default=0)
+    total_spent = db.Column(db.BigInteger, default=0)
+    tiebreakers_involved = db.Column(db.Integer, default=0)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RoundStatsSummary(db.Model):
+    """Bid counts for a finalized round"""
+    __tablename__ = 'round_stats_summary'
+    round_id = db.Column(db.Integer, db.ForeignKey('round.id', ondelete='CASCADE'), primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True, index=True)
+    bid_count = db.Column(db.Integer, default=0)
+    participating_teams = db.Column(db.Integer, default=0)
+    players_bid_on = db.Column(db.Integer, default=0)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SeasonArchive(db.Model):
+    """Frozen snapshot of a completed season, read by the history pages"""
+    __tablename__ = 'season_archive'
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), primary_key=True)
+    format_version = db.Column(db.Integer, nullable=False, default=1)
+    payload = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON snapshot
+    checksum = db.Column(db.String(64), nullable=False)  # sha256 of the uncompressed JSON
+    raw_size = db.Column(db.Integer, default=0)
+    compressed_size = db.Column(db.Integer, default=0)
+    team_count = db.Column(db.Integer, default=0)
+    round_count = db.Column(db.Integer, default=0)
+    bid_count = db.Column(db.Integer, default=0)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TeamLineageIndex(db.Model):
+    """Ordered seasons and aggregate stats for one team lineage"""
+    __tablename__ = 'team_lineage_index'
+    lineage_id = db.Column(db.String(50), primary_key=True)
+    entries = db.Column(db.Text, nullable=False)  # JSON: one entry per season, oldest first
+    seasons_participated = db.Column(db.Integer, default=0)
+    first_season_start = db.Column(db.DateTime, nullable=True)
+    last_season_end = db.Column(db.DateTime, nullable=True)
+    all_names = db.Column(db.Text, nullable=True)
+    total_spent = db.Column(db.BigInteger, default=0)
+    players_acquired = db.Column(db.Integer, default=0)
+    best_standing = db.Column(db.Integer, nullable=True)
+    latest_team_id = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class BulkRoundMonitor(db.Model):
+    """Live bid totals for a bulk round and the version of their last change"""
+    __tablename__ = 'bulk_round_monitor'
+    round_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_round.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    rebuilt_version = db.Column(db.Integer, nullable=False, default=1)  # Deltas older than this are discarded
+    bid_count = db.Column(db.Integer, default=0)
+    player_count = db.Column(db.Integer, default=0)
+    team_count = db.Column(db.Integer, default=0)
+    contested_count = db.Column(db.Integer, default=0)  # Players with two or more bids
+    stale = db.Column(db.Boolean, default=False)  # Set when bids change outside the bid routes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class BulkRoundPlayerCounter(db.Model):
+    """Number of bulk bids on a player within a round"""
+    __tablename__ = 'bulk_round_player_counter'
+    round_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_round.id', ondelete='CASCADE'), primary_key=True)
+    player_id = db.Column(db.Integer, primary_key=True)
+    bid_count = db.Column(db.Integer, default=0)
+    version = db.Column(db.Integer, nullable=False, index=True)
+
+class BulkRoundTeamCounter(db.Model):
+    """Number of bulk bids placed by a team within a round"""
+    __tablename__ = 'bulk_round_team_counter'
+    round_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_round.id', ondelete='CASCADE'), primary_key=True)
+    team_id = db.Column(db.Integer, primary_key=True)
+    bid_count = db.Column(db.Integer, default=0)
+    version = db.Column(db.Integer, nullable=False, index=True)
+
+class AvailabilityIndexVersion(db.Model):
+    """Single-row counter bumped whenever a player's allocation, eligibility or listing changes"""
+    __tablename__ = 'availability_index_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+class TeamStanding(db.Model):
+    """League position, form and home/away record of a team, rebuilt when match results change"""
+    __tablename__ = 'team_standing'
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), primary_key=True)
+    position = db.Column(db.Integer, nullable=True)  # None until the team has a TeamStats row
+    form = db.Column(db.String(5), default='')  # Last five results, most recent first (W/D/L)
+    home_wins = db.Column(db.Integer, default=0)
+    home_draws = db.Column(db.Integer, default=0)
+    home_losses = db.Column(db.Integer, default=0)
+    away_wins = db.Column(db.Integer, default=0)
+    away_draws = db.Column(db.Integer, default=0)
+    away_losses = db.Column(db.Integer, default=0)
+    recent_matches = db.Column(db.Text, nullable=True)  # JSON list of the last five completed matches
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TeamPairResult(db.Model):
+    """Auction head-to-head: a player won in a finalized round that another team also bid on"""
+    __tablename__ = 'team_pair_result'
+    round_id = db.Column(db.Integer, db.ForeignKey('round.id', ondelete='CASCADE'), primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'), primary_key=True)
+    loser_team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), primary_key=True)
+    winner_team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), nullable=False)
+    winning_bid = db.Column(db.Integer, nullable=True)
+
+    __table_args__ = (
+        db.Index('idx_team_pair_result_pair', 'winner_team_id', 'loser_team_id'),
+    )
+
+class RoundFinalization(db.Model):
+    """Checkpoint of a regular round's finalization, resumed as its tiebreakers resolve"""
+    __tablename__ = 'round_finalization'
+    round_id = db.Column(db.Integer, db.ForeignKey('round.id', ondelete='CASCADE'), primary_key=True)
+    team_ids = db.Column(db.Text, nullable=False)  # JSON: teams whose bids count, fixed by the first pass
+    allocations = db.Column(db.Text, nullable=False, default='[]')  # JSON: [player_id, team_id, amount] in order
+    resolved_tiebreakers = db.Column(db.Integer, default=0)  # Resolved tiebreakers the last pass saw
+    passes = db.Column(db.Integer, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RoundResultDocument(db.Model):
+    """Compiled, never-rewritten results of a finished round or bulk round"""
+    __tablename__ = 'round_result_document'
+    id = db.Column(db.Integer, primary_key=True)
+    round_id = db.Column(db.Integer, db.ForeignKey('round.id', ondelete='CASCADE'), unique=True, nullable=True)
+    bulk_round_id = db.Column(db.Integer, db.ForeignKey('bulk_bid_round.id', ondelete='CASCADE'), unique=True, nullable=True)
+    document = db.Column(db.Text, nullable=False)  # JSON, see result_documents.py
+    etag = db.Column(db.String(64), nullable=False)  # Hash of the document
+    compiled_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TeamRosterSummary(db.Model):
+    """Squad and bid totals of a team, kept up to date as players and bids change"""
+    __tablename__ = 'team_roster_summary'
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id', ondelete='CASCADE'), primary_key=True)
+    player_count = db.Column(db.Integer, nullable=False, default=0)
+    position_counts = db.Column(db.Text, nullable=False, default='{}')  # JSON: position -> players
+    squad_value = db.Column(db.Integer, nullable=False, default=0)  # Sum of the players' acquisition values
+    total_spent = db.Column(db.Integer, nullable=False, default=0)  # Charged for players, net of refunds
+    active_bid_count = db.Column(db.Integer, nullable=False, default=0)  # Bids in active rounds
+    completed_bid_count = db.Column(db.Integer, nullable=False, default=0)  # Bids in finished rounds
+    stale = db.Column(db.Boolean, default=False)  # Set when players or bids change outside the tracked paths
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class EligibilityChange(db.Model):
+    """One batch change to the auction pool, with the players it flipped so it can be undone"""
+    __tablename__ = 'eligibility_change'
+    id = db.Column(db.Integer, primary_key=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True)
+    mode = db.Column(db.String(10), nullable=False)  # 'add', 'remove' or 'replace'
+    rule = db.Column(db.Text, nullable=False)  # JSON, see auction_pool.py
+    enabled_ids = db.Column(db.Text, nullable=False, default='[]')  # JSON: players made eligible
+    disabled_ids = db.Column(db.Text, nullable=False, default='[]')  # JSON: players taken out of the pool
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    undone_at = db.Column(db.DateTime, nullable=True)
+
+class PurgeJob(db.Model):
+    """A chunked background deletion of players, with its progress"""
+    __tablename__ = 'purge_job'
+    id = db.Column(db.Integer, primary_key=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True)
+    criteria = db.Column(db.Text, nullable=False)  # JSON, see purge_jobs.py
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    total = db.Column(db.Integer, nullable=False, default=0)  # Matching players when the job was queued
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,318 @@
+"""
+CPU Offload
+===========
+Runs CPU-heavy work off the eventlet hub, so one export or a burst of logins
+does not stall every other request in the worker.
+
+The single eventlet worker serves all requests on one OS thread; anything
+that computes instead of waiting on I/O blocks the hub for its whole
+duration.  Two pools take that work:
+
+* ``run_in_process(fn, *args)``: pure-Python work that holds the GIL (the
+  pandas/xlsxwriter exports, the BeautifulSoup pass over HTML responses,
+  encoding large stream payloads) runs in worker processes.  Arguments and
+  results are pickled, so ``fn`` must be a module-level function of plain
+  data; the jobs live in ``cpu_jobs.py``.
+* ``run_in_thread(fn, *args)``: work that releases the GIL (password hashing
+  with scrypt/PBKDF2 in OpenSSL) runs on native threads, through
+  ``eventlet.tpool`` under eventlet.
+
+The caller's green thread yields until the result is back.  Workers are
+started on first use and replaced if they die; each gunicorn worker has its
+own.  ``CPU_OFFLOAD`` is ``auto`` (offload under eventlet, run inline
+otherwise: flask run, tests, scripts), ``on`` or ``off``;
+``OFFLOAD_PROCESSES``/``OFFLOAD_THREADS`` size the pools, and 0 processes
+runs process jobs inline.  Worker processes run ``OFFLOAD_NICE`` steps below
+the serving process, so on a small instance the scheduler still favours
+requests over a running export.
+
+Per pool, jobs and errors, the current and peak queue depth (jobs waiting for
+a free worker) and wait and run times are available from ``get_stats()`` and,
+for admins, ``/admin/offload_stats``.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+
+from flask import jsonify
+from flask_login import current_user, login_required
+
+from green_db import eventlet_active
+
+try:
+    from eventlet import tpool
+    from eventlet.hubs import trampoline
+except ImportError:
+    tpool = None
+
+logger = logging.getLogger(__name__)
+
+MODES = ('auto', 'on', 'off')
+DEFAULT_PROCESSES = 2
+DEFAULT_THREADS = 4
+DEFAULT_NICE = 10
+
+# Wait times kept for the p99
+RECENT_WAITS = 1000
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def _timed(fn, args, kwargs):
+    """Run ``fn`` and report when it started, so queueing can be told apart from running"""
+    started = time.perf_counter()
+    try:
+        return started, True, fn(*args, **kwargs)
+    except Exception as e:
+        return started, False, e
+
+
+class _Pool:
+    """Job counts, queue depth and wait/run times shared by both pools"""
+
+    kind = None
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_queued = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.run_ms = 0.0
+        self.max_run_ms = 0.0
+        self.recent_waits = deque(maxlen=RECENT_WAITS)
+
+    def run(self, fn, args, kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_queued = max(self.peak_queued, self.in_flight - self.size)
+        submitted = time.perf_counter()
+        started, ok, value = submitted, False, None
+        try:
+            started, ok, value = self._execute(fn, args, kwargs)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.in_flight -= 1
+                self.jobs += 1
+                self.errors += not ok
+                wait_ms, run_ms = (started - submitted) * 1000, (finished - started) * 1000
+                self.wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+                self.run_ms += run_ms
+                self.max_run_ms = max(self.max_run_ms, run_ms)
+                self.recent_waits.append(wait_ms)
+        if not ok:
+            raise value
+        return value
+
+    def _execute(self, fn, args, kwargs):
+        """Returns ``(started, ok, result or exception)``"""
+        raise NotImplementedError
+
+    def stats(self):
+        with self._lock:
+            jobs = self.jobs or 1
+            return {
+                'size': self.size,
+                'jobs': self.jobs,
+                'errors': self.errors,
+                'busy': min(self.in_flight, self.size),
+                'queued': max(self.in_flight - self.size, 0),
+                'peak_queued': self.peak_queued,
+                'mean_wait_ms': round(self.wait_ms / jobs, 2),
+                'p99_wait_ms': round(_percentile(self.recent_waits, 99), 2),
+                'max_wait_ms': round(self.max_wait_ms, 2),
+                'mean_run_ms': round(self.run_ms / jobs, 2),
+                'max_run_ms': round(self.max_run_ms, 2),
+            }
+
+
+class ThreadPool(_Pool):
+    """Native threads for work that releases the GIL"""
+
+    kind = 'thread'
+
+    def __init__(self, size):
+        super().__init__(size)
+        self._executor = None
+
+    def _execute(self, fn, args, kwargs):
+        if eventlet_active():
+            # Monkey patched threads are green; tpool's are real and wake the hub when done
+            return tpool.execute(_timed, fn, args, kwargs)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.size, thread_name_prefix='offload')
+        return self._executor.submit(_timed, fn, args, kwargs).result()
+
+
+class _Worker:
+    """One ``python -m cpu_jobs`` process and the pipes to it"""
+
+    def __init__(self, nice):
+        job_read, job_write = os.pipe()
+        result_read, result_write = os.pipe()
+        command = [sys.executable, '-m', 'cpu_jobs', str(job_read), str(result_write), str(nice)]
+        self.process = subprocess.Popen(command, cwd=HERE, pass_fds=(job_read, result_write))
+        os.close(job_read)
+        os.close(result_write)
+        self.jobs = Connection(job_write, readable=False)
+        self.results = Connection(result_read, writable=False)
+
+    def call(self, fn, args, kwargs):
+        self.jobs.send((fn, args, kwargs))
+        if eventlet_active():
+            trampoline(self.results.fileno(), read=True)
+        return self.results.recv()
+
+    def close(self):
+        self.jobs.close()
+        self.results.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class ProcessPool(_Pool):
+    """Worker processes for pure-Python work that holds the GIL"""
+
+    kind = 'process'
+
+    def __init__(self, size, nice=DEFAULT_NICE):
+        super().__init__(size)
+        self.nice = nice
+        self._idle = queue.Queue()
+        self._started = 0
+        self._pid = os.getpid()
+
+    def _checkout(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked after workers were started: those belong to the parent
+                self._idle, self._started, self._pid = queue.Queue(), 0, os.getpid()
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            start = self._started < self.size
+            if start:
+                self._started += 1
+        if not start:
+            return self._idle.get()
+        try:
+            return _Worker(self.nice)
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            raise
+
+    def _discard(self, worker):
+        with self._lock:
+            self._started -= 1
+        worker.close()
+
+    def _execute(self, fn, args, kwargs):
+        worker = self._checkout()
+        started = time.perf_counter()
+        try:
+            ok, value = worker.call(fn, args, kwargs)
+        except (EOFError, OSError):
+            self._discard(worker)
+            return started, False, RuntimeError(f"Offload worker exited while running {fn.__name__}")
+        except BaseException:
+            # Unpicklable arguments or an interrupted wait; the worker's state is unknown
+            self._discard(worker)
+            raise
+        self._idle.put(worker)
+        return started, ok, value
+
+    def close(self):
+        """Stop the idle workers; called at exit"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(worker)
+
+
+process_pool = ProcessPool(DEFAULT_PROCESSES)
+thread_pool = ThreadPool(DEFAULT_THREADS)
+_mode = 'auto'
+
+
+def configure(mode='auto', processes=DEFAULT_PROCESSES, threads=DEFAULT_THREADS, nice=DEFAULT_NICE):
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"CPU_OFFLOAD must be one of {', '.join(MODES)}, not {mode!r}")
+    _mode = mode
+    process_pool.size = processes
+    process_pool.nice = nice
+    thread_pool.size = threads
+    if tpool is not None:
+        # Only takes effect before tpool's first job
+        tpool.set_num_threads(threads)
+
+
+def enabled():
+    return _mode == 'on' or (_mode == 'auto' and eventlet_active())
+
+
+def run_in_process(fn, *args, **kwargs):
+    """Run a module-level CPU-bound function in a worker process and return its result"""
+    if not enabled() or process_pool.size <= 0:
+        return fn(*args, **kwargs)
+    return process_pool.run(fn, args, kwargs)
+
+
+def run_in_thread(fn, *args, **kwargs):
+    """Run a function that releases the GIL on a native thread and return its result"""
+    if not enabled() or thread_pool.size <= 0:
+        return fn(*args, **kwargs)
+    return thread_pool.run(fn, args, kwargs)
+
+
+def get_stats():
+    return {
+        'mode': _mode,
+        'enabled': enabled(),
+        process_pool.kind: process_pool.stats(),
+        thread_pool.kind: thread_pool.stats(),
+    }
+
+
+def init_offload(app):
+    """Configure the pools and install the stats endpoint"""
+    configure(app.config.get('CPU_OFFLOAD', 'auto'),
+              processes=app.config.get('OFFLOAD_PROCESSES', DEFAULT_PROCESSES),
+              threads=app.config.get('OFFLOAD_THREADS', DEFAULT_THREADS),
+              nice=app.config.get('OFFLOAD_NICE', DEFAULT_NICE))
+    atexit.register(process_pool.close)
+    if enabled():
+        logger.info(f"CPU offload: {process_pool.size} processes, {thread_pool.size} threads")
+
+    @app.route('/admin/offload_stats')
+    @login_required
+    def offload_stats():
+        if not current_user.is_admin:
+            return jsonify({'error': 'Unauthorized'}), 403
+        return jsonify(get_stats())
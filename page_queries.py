@@ -0,0 +1,367 @@
+"""
+Page Queries
+============
+Named, bound SQL for the admin, history and registration pages, run on one
+connection per page and timed per query.
+
+A page opens a single connection and runs its statements by name:
+
+    with PageQueries.open(read_engine()) as q:
+        season = q.one('history.season', season_id=season_id)
+        teams = q.all('history.season_teams', season_id=season_id)
+
+Reads a page needs together and that return one row each are written as a
+single statement (scalar subqueries side by side), so they cost one round
+trip instead of several: the registration checks, the round header with its
+statistics.  Statements are ``text()`` with named parameters; a query that
+needs dialect-specific SQL (``STRING_AGG`` is PostgreSQL-only) registers a
+variant per dialect.
+
+Every execution is timed, including fetching its rows.  Counts, total and
+slowest milliseconds per query are available from ``query_timings.stats()``
+and, for admins, ``/admin/page_query_stats``; a query slower than
+``PAGE_QUERY_SLOW_MS`` is logged as a warning.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import jsonify
+from flask_login import current_user, login_required
+from sqlalchemy import text
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_MS = 250
+
+
+class QueryTimings:
+    """Thread-safe count, total and maximum milliseconds per named query"""
+
+    def __init__(self, slow_ms=DEFAULT_SLOW_MS):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.total_ms = Counter()
+        self.max_ms = {}
+
+    def record(self, name, ms):
+        with self._lock:
+            self.calls[name] += 1
+            self.total_ms[name] += ms
+            self.max_ms[name] = max(ms, self.max_ms.get(name, 0.0))
+        if ms > self.slow_ms:
+            logger.warning(f"Slow page query {name}: {ms:.1f}ms")
+
+    def clear(self):
+        with self._lock:
+            self.calls.clear()
+            self.total_ms.clear()
+            self.max_ms.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'calls': calls,
+                    'total_ms': round(self.total_ms[name], 2),
+                    'mean_ms': round(self.total_ms[name] / calls, 2),
+                    'max_ms': round(self.max_ms[name], 2),
+                }
+                for name, calls in self.calls.items()
+            }
+
+
+query_timings = QueryTimings()
+
+# name -> {dialect name or None: TextClause}
+QUERIES = {}
+
+
+def define(name, sql, **dialects):
+    """Register a named statement, with optional per-dialect variants"""
+    QUERIES[name] = {None: text(sql), **{dialect: text(variant) for dialect, variant in dialects.items()}}
+
+
+# ----------------------------------------------------------------------
+# Registration
+# ----------------------------------------------------------------------
+
+define('registration.open_season_count', """
+    SELECT COUNT(*) FROM season
+    WHERE registration_open = true AND status IN ('upcoming', 'active')
+""")
+
+define('registration.open_seasons', """
+    SELECT
+        s.id, s.name, s.short_name, s.description,
+        s.team_limit, s.registration_deadline,
+        s.season_start_date, s.season_end_date,
+        (SELECT COUNT(*) FROM team WHERE season_id = s.id) as current_teams
+    FROM season s
+    WHERE s.registration_open = true
+      AND s.status IN ('upcoming', 'active')
+    ORDER BY s.season_start_date ASC
+""")
+
+define('registration.user_registrations', """
+    SELECT t.season_id, s.name, t.name as team_name, t.is_continuing_team
+    FROM team t
+    JOIN season s ON t.season_id = s.id
+    WHERE t.user_id = :user_id
+    ORDER BY s.created_at DESC
+""")
+
+# The season form plus the team the user already registered for it
+define('registration.season_form', """
+    SELECT
+        s.id, s.name, s.short_name, s.description,
+        s.team_limit, s.registration_deadline, s.registration_open,
+        s.season_start_date, s.season_end_date,
+        (SELECT COUNT(*) FROM team WHERE season_id = s.id) as current_teams,
+        (SELECT name FROM team WHERE user_id = :user_id AND season_id = s.id
+         ORDER BY id LIMIT 1) as registered_team
+    FROM season s
+    WHERE s.id = :season_id
+""")
+
+# Everything a submission is checked against, in one round trip
+define('registration.submit_checks', """
+    SELECT s.id, s.name, s.registration_open, s.team_limit,
+           (SELECT COUNT(*) FROM team WHERE season_id = s.id) as current_teams,
+           EXISTS (SELECT 1 FROM team WHERE user_id = :user_id AND season_id = s.id) as already_registered,
+           EXISTS (SELECT 1 FROM team WHERE season_id = s.id
+                   AND LOWER(name) = LOWER(:team_name)) as name_taken
+    FROM season s WHERE s.id = :season_id
+""")
+
+define('registration.create_continuing_team', """
+    SELECT create_continuing_team(:previous_team_id, :season_id, :team_name, :user_id)
+""")
+
+define('registration.create_new_team', """
+    SELECT create_new_team(:team_name, :user_id, :season_id)
+""")
+
+define('registration.success_team', """
+    SELECT
+        t.id, t.name, t.is_continuing_team, t.team_lineage_id,
+        s.name as season_name, s.short_name,
+        s.season_start_date, s.registration_deadline
+    FROM team t
+    JOIN season s ON t.season_id = s.id
+    WHERE t.id = :team_id AND t.user_id = :user_id
+""")
+
+define('registration.user_teams', """
+    SELECT
+        t.id, t.name, t.balance, t.is_continuing_team, t.team_lineage_id,
+        s.name as season_name, s.short_name, s.is_active, s.status,
+        s.season_start_date, s.season_end_date,
+        (SELECT COUNT(*) FROM team WHERE team_lineage_id = t.team_lineage_id) as lineage_count
+    FROM team t
+    JOIN season s ON t.season_id = s.id
+    WHERE t.user_id = :user_id
+    ORDER BY s.created_at DESC, t.created_at DESC
+""")
+
+define('registration.owned_team', """
+    SELECT t.id, t.name, t.team_lineage_id, t.is_continuing_team,
+           s.name as season_name
+    FROM team t
+    JOIN season s ON t.season_id = s.id
+    WHERE t.id = :team_id AND t.user_id = :user_id
+""")
+
+# ----------------------------------------------------------------------
+# History
+# ----------------------------------------------------------------------
+
+define('history.season', """
+    SELECT s.id, s.name, s.short_name, s.description, s.is_active,
+           s.status, s.season_start_date, s.season_end_date,
+           s.team_limit, s.max_committee_admins
+    FROM season s WHERE s.id = :season_id
+""")
+
+define('history.season_statistics', "SELECT * FROM get_season_statistics(:season_id)")
+
+define('history.season_teams', """
+    SELECT t.id, t.name, t.balance, t.is_continuing_team,
+           u.username, t.team_lineage_id
+    FROM team t
+    JOIN "user" u ON t.user_id = u.id
+    WHERE t.season_id = :season_id
+    ORDER BY t.name
+""")
+
+# ----------------------------------------------------------------------
+# Admin
+# ----------------------------------------------------------------------
+
+define('admin.season_stats', """
+    SELECT
+        :season_id as season_id,
+        :season_name as season_name,
+        (SELECT COUNT(*) FROM team WHERE season_id = :season_id) as total_teams,
+        (SELECT COUNT(*) FROM team WHERE season_id = :season_id AND is_continuing_team = true) as continuing_teams,
+        (SELECT COUNT(*) FROM team WHERE season_id = :season_id AND is_continuing_team = false) as new_teams,
+        (SELECT COUNT(*) FROM round WHERE season_id = :season_id) as total_rounds,
+        (SELECT COUNT(*) FROM round WHERE season_id = :season_id AND is_active = true) as active_rounds,
+        (SELECT COUNT(*) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id) as total_bids
+""")
+
+define('admin.role_stats', """
+    SELECT user_role as role, COUNT(*) as count
+    FROM "user"
+    GROUP BY user_role
+    ORDER BY CASE user_role
+        WHEN 'super_admin' THEN 1
+        WHEN 'committee_admin' THEN 2
+        WHEN 'team_user' THEN 3
+        ELSE 4 END
+""")
+
+# Round info (the first ROUND_INFO_COLUMNS columns) followed by its statistics
+ROUND_INFO_COLUMNS = 10
+
+define('admin.round_header', """
+    SELECT r.id, r.position, r.is_active, r.status, r.start_time, r.end_time, r.duration,
+           r.max_bids_per_team, s.name as season_name, s.short_name as season_short_name,
+           (SELECT COUNT(*) FROM bid WHERE round_id = r.id) as total_bids,
+           (SELECT COUNT(DISTINCT team_id) FROM bid WHERE round_id = r.id) as participating_teams,
+           (SELECT COUNT(DISTINCT player_id) FROM bid WHERE round_id = r.id) as players_bid_on,
+           (SELECT COALESCE(AVG(amount), 0) FROM bid WHERE round_id = r.id) as avg_bid,
+           (SELECT COALESCE(MAX(amount), 0) FROM bid WHERE round_id = r.id) as max_bid,
+           (SELECT COALESCE(MIN(amount), 0) FROM bid WHERE round_id = r.id) as min_bid,
+           (SELECT COUNT(*) FROM tiebreaker WHERE round_id = r.id) as tiebreaker_count,
+           (SELECT COUNT(*) FROM player WHERE round_id = r.id) as players_acquired,
+           (SELECT COALESCE(SUM(acquisition_value), 0) FROM player WHERE round_id = r.id) as total_spent
+    FROM round r
+    JOIN season s ON r.season_id = s.id
+    WHERE r.id = :round_id AND r.season_id = :season_id
+""")
+
+define('admin.round_bids', """
+    SELECT
+        b.id, b.amount, b.is_hidden, b.timestamp,
+        p.name as player_name, p.position, p.team_name as original_team,
+        p.overall_rating, p.nationality,
+        t.name as bidding_team, u.username as team_owner,
+        CASE
+            WHEN EXISTS (SELECT 1 FROM tiebreaker tb WHERE tb.round_id = b.round_id AND tb.player_id = b.player_id)
+            THEN 'Tiebreaker'
+            WHEN p.team_id = b.team_id
+            THEN 'Won'
+            ELSE 'Lost'
+        END as bid_status
+    FROM bid b
+    JOIN player p ON b.player_id = p.id
+    JOIN team t ON b.team_id = t.id
+    JOIN "user" u ON t.user_id = u.id
+    WHERE b.round_id = :round_id
+    ORDER BY b.amount DESC, b.timestamp ASC
+""")
+
+_ROUND_TIEBREAKERS = """
+    SELECT
+        tb.id, tb.original_amount, tb.resolved, tb.timestamp,
+        p.name as player_name, p.position,
+        COUNT(ttb.team_id) as teams_count,
+        {team_names} as team_names
+    FROM tiebreaker tb
+    JOIN player p ON tb.player_id = p.id
+    LEFT JOIN team_tiebreaker ttb ON tb.id = ttb.tiebreaker_id
+    LEFT JOIN team t ON ttb.team_id = t.id
+    WHERE tb.round_id = :round_id
+    GROUP BY tb.id, tb.original_amount, tb.resolved, tb.timestamp, p.name, p.position
+    ORDER BY tb.timestamp
+"""
+
+define('admin.round_tiebreakers', _ROUND_TIEBREAKERS.format(team_names="STRING_AGG(t.name, ', ')"),
+       sqlite=_ROUND_TIEBREAKERS.format(team_names="GROUP_CONCAT(t.name, ', ')"))
+
+define('admin.round_acquisitions', """
+    SELECT DISTINCT
+        p.name as player_name, p.position, p.team_name as original_team,
+        p.overall_rating, p.nationality, p.acquisition_value,
+        t.name as new_team, u.username as team_owner
+    FROM player p
+    JOIN team t ON p.team_id = t.id
+    JOIN "user" u ON t.user_id = u.id
+    WHERE p.round_id = :round_id
+    ORDER BY p.acquisition_value DESC
+""")
+
+define('admin.round_team_bids', """
+    SELECT
+        t.name as team_name,
+        COUNT(b.id) as bid_count,
+        COALESCE(AVG(b.amount), 0) as avg_bid,
+        COALESCE(SUM(CASE WHEN p.team_id = t.id THEN 1 ELSE 0 END), 0) as players_won,
+        COALESCE(SUM(CASE WHEN p.team_id = t.id THEN p.acquisition_value ELSE 0 END), 0) as total_spent
+    FROM team t
+    LEFT JOIN bid b ON t.id = b.team_id AND b.round_id = :round_id
+    LEFT JOIN player p ON b.player_id = p.id AND p.round_id = :round_id
+    WHERE t.season_id = :season_id
+    GROUP BY t.id, t.name
+    HAVING COUNT(b.id) > 0
+    ORDER BY bid_count DESC, total_spent DESC
+""")
+
+
+class PageQueries:
+    """Runs named queries on one connection and times each of them"""
+
+    def __init__(self, conn, timings=query_timings):
+        self.conn = conn
+        self.timings = timings
+        self.dialect = conn.dialect.name
+
+    @classmethod
+    @contextmanager
+    def open(cls, engine=None):
+        """One connection (from ``engine``, default the primary) for a page's queries"""
+        with (engine or db.engine).connect() as conn:
+            yield cls(conn)
+
+    def statement(self, name):
+        variants = QUERIES[name]
+        return variants.get(self.dialect, variants[None])
+
+    def _run(self, name, params, fetch):
+        started = time.perf_counter()
+        try:
+            return fetch(self.conn.execute(self.statement(name), params))
+        finally:
+            self.timings.record(name, (time.perf_counter() - started) * 1000)
+
+    def one(self, name, **params):
+        """The first row, or None"""
+        return self._run(name, params, lambda result: result.fetchone())
+
+    def all(self, name, **params):
+        return self._run(name, params, lambda result: result.fetchall())
+
+    def scalar(self, name, **params):
+        return self._run(name, params, lambda result: result.scalar())
+
+    def commit(self):
+        self.conn.commit()
+
+
+def init_page_queries(app):
+    """Configure the slow-query threshold and install the stats endpoint"""
+    query_timings.slow_ms = app.config.get('PAGE_QUERY_SLOW_MS', DEFAULT_SLOW_MS)
+
+    @app.route('/admin/page_query_stats')
+    @login_required
+    def page_query_stats():
+        if not current_user.is_admin:
+            return jsonify({'error': 'Unauthorized'}), 403
+        return jsonify(query_timings.stats())
@@ -0,0 +1,215 @@
+"""
+Position Groups
+===============
+Splits the auction-eligible players of each position into ``k`` groups for
+group rounds (``CB-1``, ``CB-2``, ...).  Groups get the same number of
+players, give or take one, and close sums of ``overall_rating`` and of a few
+secondary attributes, so no group round is stacked.
+
+Each position is partitioned over a NumPy feature matrix in two steps:
+
+1. Balanced greedy: players are taken in blocks of ``k`` by descending
+   rating and the best of each block goes to the group with the lowest
+   rating sum so far.  This fixes the group sizes and gets the rating sums
+   close.
+2. Swap refinement: the swap between two groups that most reduces the
+   weighted spread of rating and attribute sums is applied, until no swap
+   helps.  Swaps keep the group sizes.
+
+The number of groups per position comes from ``Config.POSITION_GROUPS``.  A
+plan can be previewed without writing; applying it issues one UPDATE per
+group.  NumPy is imported here, so callers import this module lazily.
+"""
+
+import numpy as np
+from sqlalchemy import select, update
+
+from config import Config
+from models import db, Player
+
+# Attributes balanced alongside overall_rating, by position
+SECONDARY_ATTRIBUTES = {
+    'GK': ['gk_awareness', 'gk_reflexes', 'gk_reach', 'gk_catching'],
+}
+DEFAULT_SECONDARY_ATTRIBUTES = ['offensive_awareness', 'ball_control', 'speed',
+                                'physical_contact', 'defensive_awareness', 'stamina']
+
+# overall_rating counts this many times as much as each secondary attribute
+RATING_WEIGHT = 4.0
+DEFAULT_GROUP_COUNT = 2
+MAX_SWAPS = 500
+# Upper bound on the swap-gain matrix evaluated at once
+SWAP_BLOCK_CELLS = 2_000_000
+
+
+def group_counts():
+    """{position: number of groups} as configured in ``Config.POSITION_GROUPS``"""
+    counts = {}
+    for name in Config.POSITION_GROUPS:
+        position, _, number = name.rpartition('-')
+        counts[position] = max(counts.get(position, 0), int(number))
+    return counts
+
+
+def _feature_matrix(raw):
+    """Impute missing values with column means and scale columns to unit variance"""
+    features = np.array(raw, dtype=float)
+    missing = np.isnan(features)
+    present = (~missing).sum(axis=0)
+    totals = np.where(missing, 0.0, features).sum(axis=0)
+    means = np.divide(totals, present, out=np.zeros_like(totals), where=present > 0)
+    rows, columns = np.nonzero(missing)
+    features[rows, columns] = means[columns]
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    return features / scale
+
+
+def _best_swap(members_a, members_b, X, difference):
+    """(gain, i, j) of the best swap of X[members_a[i]] and X[members_b[j]]; negative gains help.
+
+    Swapping moves delta = x_j - x_i into group a and out of group b, which
+    changes the sum of squared deviations by 2*delta.(S_a - S_b) + 2*|delta|^2.
+    """
+    Xb = X[members_b]
+    b_terms = 2 * (Xb @ difference) + 2 * np.einsum('ij,ij->i', Xb, Xb)
+    best = (0.0, -1, -1)
+    block = max(1, SWAP_BLOCK_CELLS // max(1, len(members_b)))
+    for start in range(0, len(members_a), block):
+        Xa = X[members_a[start:start + block]]
+        a_terms = -2 * (Xa @ difference) + 2 * np.einsum('ij,ij->i', Xa, Xa)
+        gains = a_terms[:, None] + b_terms[None, :] - 4 * (Xa @ Xb.T)
+        i, j = np.unravel_index(np.argmin(gains), gains.shape)
+        if gains[i, j] < best[0]:
+            best = (float(gains[i, j]), start + int(i), int(j))
+    return best
+
+
+def partition(ratings, attributes, k, max_swaps=MAX_SWAPS):
+    """Group index (0..k-1) for each player, balancing rating and attribute sums.
+
+    ``ratings`` is a length-n sequence and ``attributes`` an n x m sequence;
+    either may contain None.
+    """
+    n = len(ratings)
+    assignment = np.zeros(n, dtype=np.intp)
+    if n == 0 or k < 2:
+        return assignment
+
+    raw = np.column_stack([np.array(ratings, dtype=float).reshape(n, 1),
+                           np.array(attributes, dtype=float).reshape(n, -1)])
+    X = _feature_matrix(raw)
+    weights = np.ones(X.shape[1])
+    weights[0] = RATING_WEIGHT
+    X *= np.sqrt(weights)
+
+    # Balanced greedy: best remaining player of each block to the weakest group
+    order = np.argsort(-X[:, 0], kind='stable')
+    sums = np.zeros(k)
+    for start in range(0, n, k):
+        block = order[start:start + k]
+        targets = np.argsort(sums, kind='stable')[:len(block)]
+        assignment[block] = targets
+        sums[targets] += X[block, 0]
+
+    group_sums = np.zeros((k, X.shape[1]))
+    np.add.at(group_sums, assignment, X)
+    for _ in range(max_swaps):
+        members = [np.flatnonzero(assignment == group) for group in range(k)]
+        best = None
+        for a in range(k):
+            for b in range(a + 1, k):
+                gain, i, j = _best_swap(members[a], members[b], X, group_sums[a] - group_sums[b])
+                if i >= 0 and (best is None or gain < best[0]):
+                    best = (gain, a, b, members[a][i], members[b][j])
+        if best is None or best[0] > -1e-9:
+            break
+        _, a, b, player_a, player_b = best
+        delta = X[player_b] - X[player_a]
+        assignment[player_a], assignment[player_b] = b, a
+        group_sums[a] += delta
+        group_sums[b] -= delta
+    return assignment
+
+
+def plan_position_groups(positions, groups=None):
+    """Partition the eligible players of ``positions`` without writing.
+
+    ``groups`` overrides the configured number of groups for every position.
+    Returns {position: {'groups': [...], 'rating_spread': ...}} for positions
+    with eligible players; each group lists its ``player_ids``.
+    """
+    configured = group_counts()
+    columns = {position: SECONDARY_ATTRIBUTES.get(position, DEFAULT_SECONDARY_ATTRIBUTES)
+               for position in positions}
+    attribute_names = sorted({name for names in columns.values() for name in names})
+    rows = db.session.execute(
+        select(Player.id, Player.position, Player.overall_rating,
+               *[getattr(Player, name) for name in attribute_names])
+        .where(Player.position.in_(positions), Player.is_auction_eligible.is_(True))
+        .order_by(Player.id)
+    ).all()
+
+    by_position = {}
+    for row in rows:
+        by_position.setdefault(row[1], []).append(row)
+
+    plan = {}
+    for position in positions:
+        players = by_position.get(position)
+        if not players:
+            continue
+        k = groups or configured.get(position, DEFAULT_GROUP_COUNT)
+        indexes = [3 + attribute_names.index(name) for name in columns[position]]
+        ratings = [row[2] for row in players]
+        attributes = [[row[index] for index in indexes] for row in players]
+        assignment = partition(ratings, attributes, k)
+
+        rating_values = np.array([rating or 0 for rating in ratings], dtype=float)
+        attribute_values = np.array(attributes, dtype=float)
+        position_groups = []
+        for group in range(k):
+            mask = assignment == group
+            name = f"{position}-{group + 1}"
+            position_groups.append({
+                'name': name,
+                'configured': name in Config.POSITION_GROUPS,
+                'count': int(mask.sum()),
+                'rating_sum': int(rating_values[mask].sum()),
+                'rating_mean': round(float(rating_values[mask].mean()), 2) if mask.any() else 0.0,
+                'attribute_means': {
+                    attribute: round(float(np.nanmean(attribute_values[mask, column])), 2)
+                    if mask.any() and not np.isnan(attribute_values[mask, column]).all() else None
+                    for column, attribute in enumerate(columns[position])
+                },
+                'player_ids': [players[i][0] for i in np.flatnonzero(mask)],
+            })
+        sums = [group['rating_sum'] for group in position_groups]
+        plan[position] = {
+            'groups': position_groups,
+            'players': len(players),
+            'rating_spread': max(sums) - min(sums),
+        }
+    return plan
+
+
+def apply_position_groups(plan):
+    """Write a plan with one UPDATE per group and commit"""
+    for position_plan in plan.values():
+        for group in position_plan['groups']:
+            if group['player_ids']:
+                db.session.execute(
+                    update(Player).where(Player.id.in_(group['player_ids'])).values(position_group=group['name'])
+                )
+    db.session.commit()
+
+
+def plan_summary(plan):
+    """The plan without player ids, for JSON responses"""
+    return {
+        position: dict(position_plan, groups=[
+            {key: value for key, value in group.items() if key != 'player_ids'}
+            for group in position_plan['groups']
+        ])
+        for position, position_plan in plan.items()
+    }
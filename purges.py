@@ -0,0 +1,224 @@
+"""
+Purges
+======
+Deleting players, teams and users together with every row that references
+them, with set-based statements instead of loading ORM objects.
+
+Large player deletions (the whole table or an admin filter) run as a
+``purge_job`` in the background: each chunk of ``CHUNK_SIZE`` players is
+deleted with its bids, tiebreakers, bulk rows and stars in one transaction
+that also records the job's progress, and the worker yields between chunks,
+so the single eventlet worker keeps serving requests and an interrupted job
+leaves nothing half-deleted.  Running a job again only deletes what still
+matches, so a job cut short by a restart can simply be launched again.
+
+Job criteria are a JSON object: ``{"all": true}`` or any of ``position``,
+``min_rating`` and ``max_rating``.
+
+Teams and users are single rows with a bounded number of dependents, so they
+are deleted inline, in the caller's transaction.
+
+The foreign keys also declare ``ON DELETE CASCADE``/``SET NULL``
+(``migrations/add_purge_cascades.py``), so PostgreSQL keeps the tables
+consistent for deletions outside this module; SQLite does not enforce them,
+which is why the dependents are still deleted explicitly here.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, delete, func, select, true, update
+
+from models import (db, Bid, BulkBid, BulkBidTiebreaker, PasswordResetRequest, Player, PurgeJob, StarredPlayer,
+                    Team, TeamBulkTiebreaker, TeamPairResult, TeamTiebreaker, Tiebreaker, User)
+from bulk_round_counters import BulkRoundCounters
+from realtime import socketio
+from team_rosters import TeamRosters
+
+logger = logging.getLogger(__name__)
+
+# Players deleted per transaction; bounds how long one chunk holds the worker
+CHUNK_SIZE = 1000
+
+
+def _players_condition(criteria):
+    """SQL condition for the players a job deletes"""
+    if criteria.get('all'):
+        return true()
+    conditions = []
+    if criteria.get('position'):
+        conditions.append(Player.position == criteria['position'])
+    if criteria.get('min_rating') is not None:
+        conditions.append(Player.overall_rating >= criteria['min_rating'])
+    if criteria.get('max_rating') is not None:
+        conditions.append(Player.overall_rating <= criteria['max_rating'])
+    if not conditions:
+        raise ValueError('At least one filter must be specified for deletion')
+    return and_(*conditions)
+
+
+def _delete(*statements):
+    """Run bulk DELETEs without touching the session; returns their row counts"""
+    return [db.session.execute(statement, execution_options={'synchronize_session': False}).rowcount
+            for statement in statements]
+
+
+def _pause():
+    """Let the eventlet hub serve other requests between chunks"""
+    if socketio.server is not None:
+        socketio.sleep(0)
+
+
+class Purges:
+    """Starts, runs and reports player purge jobs; deletes teams and users"""
+
+    # ------------------------------------------------------------------
+    # Player purge jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def start_players(criteria, user_id=None):
+        """Queue a purge of the players matching ``criteria`` and commit it; returns the ``PurgeJob``"""
+        condition = _players_condition(criteria)
+        total = db.session.execute(select(func.count(Player.id)).where(condition)).scalar()
+        job = PurgeJob(created_by=user_id, criteria=json.dumps(criteria, sort_keys=True), total=total)
+        if total == 0:
+            job.status, job.finished_at = 'completed', datetime.utcnow()
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def launch(job_id):
+        """Run a job in the background: a green thread under eventlet, a thread otherwise"""
+        app = current_app._get_current_object()
+
+        def work():
+            with app.app_context():
+                Purges.run(job_id)
+                db.session.remove()
+
+        if socketio.server is not None:
+            socketio.start_background_task(work)
+        else:
+            threading.Thread(target=work, daemon=True).start()
+
+    @staticmethod
+    def run(job_id):
+        """Delete a job's players chunk by chunk, committing progress with each chunk; returns the job"""
+        job = db.session.get(PurgeJob, job_id)
+        if job is None or job.status == 'completed':
+            return job
+        job.status = 'running'
+        job.started_at = job.started_at or datetime.utcnow()
+        job.error = None
+        db.session.commit()
+
+        condition = _players_condition(json.loads(job.criteria))
+        try:
+            while True:
+                player_ids = db.session.execute(
+                    select(Player.id).where(condition).order_by(Player.id).limit(CHUNK_SIZE)
+                ).scalars().all()
+                if not player_ids:
+                    break
+                Purges._delete_players(player_ids)
+                job.deleted += len(player_ids)
+                db.session.commit()
+                _pause()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Purge job {job_id} failed after {job.deleted} players: {e}")
+            job.status, job.error = 'failed', str(e)
+            db.session.commit()
+            return job
+
+        job.status = 'completed'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        logger.info(f"Purge job {job_id} deleted {job.deleted} players")
+        return job
+
+    @staticmethod
+    def _delete_players(player_ids):
+        """Delete players and everything that references them, in the caller's transaction"""
+        tiebreakers = select(Tiebreaker.id).where(Tiebreaker.player_id.in_(player_ids))
+        bulk_tiebreakers = select(BulkBidTiebreaker.id).where(BulkBidTiebreaker.player_id.in_(player_ids))
+        _delete(
+            delete(TeamTiebreaker).where(TeamTiebreaker.tiebreaker_id.in_(tiebreakers)),
+            delete(Tiebreaker).where(Tiebreaker.player_id.in_(player_ids)),
+            delete(TeamBulkTiebreaker).where(TeamBulkTiebreaker.tiebreaker_id.in_(bulk_tiebreakers)),
+            delete(BulkBidTiebreaker).where(BulkBidTiebreaker.player_id.in_(player_ids)),
+            delete(BulkBid).where(BulkBid.player_id.in_(player_ids)),
+            delete(Bid).where(Bid.player_id.in_(player_ids)),
+            delete(StarredPlayer).where(StarredPlayer.player_id.in_(player_ids)),
+            delete(TeamPairResult).where(TeamPairResult.player_id.in_(player_ids)),
+            # Through the ORM so the availability index sees the players go
+            delete(Player).where(Player.id.in_(player_ids)),
+        )
+        # Squads and bid counts changed under the summaries; rebuild them on their next read
+        TeamRosters.invalidate()
+        BulkRoundCounters.invalidate()
+
+    @staticmethod
+    def get(job_id):
+        return db.session.get(PurgeJob, job_id)
+
+    @staticmethod
+    def describe(job):
+        """A job as JSON for the admin page"""
+        return {
+            'id': job.id,
+            'status': job.status,
+            'criteria': json.loads(job.criteria),
+            'total': job.total,
+            'deleted': job.deleted,
+            'error': job.error,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Teams and users (inside the caller's transaction)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def delete_team(team_id):
+        """Delete a team with its bids, tiebreaker entries and stars; its players become free agents"""
+        _delete(
+            delete(TeamTiebreaker).where(TeamTiebreaker.team_id == team_id),
+            delete(TeamBulkTiebreaker).where(TeamBulkTiebreaker.team_id == team_id),
+            delete(Bid).where(Bid.team_id == team_id),
+            delete(BulkBid).where(BulkBid.team_id == team_id),
+            delete(StarredPlayer).where(StarredPlayer.team_id == team_id),
+        )
+        for statement in (
+            update(BulkBidTiebreaker).where(BulkBidTiebreaker.winner_team_id == team_id).values(winner_team_id=None),
+            update(Player).where(Player.team_id == team_id).values(team_id=None),
+        ):
+            db.session.execute(statement, execution_options={'synchronize_session': False})
+        TeamRosters.remove_team(team_id)
+        BulkRoundCounters.invalidate()
+        _delete(delete(Team).where(Team.id == team_id))
+        Purges._forget(Team, team_id)
+
+    @staticmethod
+    def delete_user(user_id):
+        """Delete a user, their team (as ``delete_team``) and their password reset requests"""
+        for team_id in db.session.execute(select(Team.id).where(Team.user_id == user_id)).scalars().all():
+            Purges.delete_team(team_id)
+        _delete(
+            delete(PasswordResetRequest).where(PasswordResetRequest.user_id == user_id),
+            delete(User).where(User.id == user_id),
+        )
+        Purges._forget(User, user_id)
+
+    @staticmethod
+    def _forget(model, key):
+        """Drop a row deleted behind the session's back from its identity map"""
+        instance = db.session.identity_map.get(db.inspect(model).identity_key_from_primary_key((key,)))
+        if instance is not None:
+            db.session.expunge(instance)
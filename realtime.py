@@ -0,0 +1,267 @@
+"""
+Real-time Auction Events
+========================
+Socket.IO namespace (``/auction``) that pushes round, bid, tiebreaker and
+balance changes to the clients that care about them, replacing the 2-3 second
+polling loops on the dashboard, round and tiebreaker pages.
+
+Rooms:
+    round:<id>             clients viewing a round
+    bulk_round:<id>        clients viewing a bulk round
+    tiebreaker:<id>        participants (and admins) of a round tiebreaker
+    bulk_tiebreaker:<id>   participants (and admins) of a bulk tiebreaker
+    team:<id>              every connection of a team (joined on connect)
+    admins                 every admin connection (joined on connect)
+
+Each change is emitted once per room after the database commit.  The HTTP
+polling endpoints are unchanged, so clients without a socket keep working.
+"""
+
+import logging
+from collections import Counter
+
+from flask_login import current_user
+from flask_socketio import SocketIO, Namespace, join_room, leave_room
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = '/auction'
+ADMIN_ROOM = 'admins'
+
+socketio = SocketIO()
+
+# Emitted events by name, for /api/performance style reporting and load tests
+PUSH_STATS = Counter()
+
+
+def round_room(round_id):
+    return f'round:{round_id}'
+
+
+def bulk_round_room(round_id):
+    return f'bulk_round:{round_id}'
+
+
+def tiebreaker_room(tiebreaker_id):
+    return f'tiebreaker:{tiebreaker_id}'
+
+
+def bulk_tiebreaker_room(tiebreaker_id):
+    return f'bulk_tiebreaker:{tiebreaker_id}'
+
+
+def team_room(team_id):
+    return f'team:{team_id}'
+
+
+def init_realtime(app):
+    """Attach Socket.IO to the app and register the auction namespace.
+
+    Set SOCKETIO_MESSAGE_QUEUE (e.g. a Redis URL) when running more than one
+    worker so emits reach clients connected to other processes.
+    """
+    socketio.init_app(
+        app,
+        message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'),
+        cors_allowed_origins=app.config.get('SOCKETIO_CORS_ALLOWED_ORIGINS'),
+        manage_session=False,
+    )
+    socketio.on_namespace(AuctionNamespace(NAMESPACE))
+
+
+class AuctionNamespace(Namespace):
+    """Authenticated connections subscribe to the rooms of the pages they show"""
+
+    def on_connect(self, auth=None):
+        if not current_user.is_authenticated:
+            return False
+        if current_user.is_admin:
+            join_room(ADMIN_ROOM)
+        elif current_user.team:
+            join_room(team_room(current_user.team.id))
+
+    def on_subscribe(self, data):
+        room = self._authorized_room(data or {})
+        if room is None:
+            return {'ok': False}
+        join_room(room)
+        return {'ok': True, 'room': room}
+
+    def on_unsubscribe(self, data):
+        room = self._room_for(data or {})
+        if room is not None:
+            leave_room(room)
+        return {'ok': room is not None}
+
+    @staticmethod
+    def _room_for(data):
+        for key, room_fn in (('round_id', round_room), ('bulk_round_id', bulk_round_room),
+                             ('tiebreaker_id', tiebreaker_room),
+                             ('bulk_tiebreaker_id', bulk_tiebreaker_room)):
+            if data.get(key) is not None:
+                try:
+                    return room_fn(int(data[key]))
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    @staticmethod
+    def _authorized_room(data):
+        """Rounds are visible to every user; tiebreakers only to admins and participants"""
+        room = AuctionNamespace._room_for(data)
+        if room is None or not current_user.is_authenticated:
+            return None
+        if not room.startswith(('tiebreaker:', 'bulk_tiebreaker:')) or current_user.is_admin:
+            return room
+        if not current_user.team:
+            return None
+
+        from models import TeamTiebreaker, TeamBulkTiebreaker
+        if room.startswith('tiebreaker:'):
+            member = TeamTiebreaker.query.filter_by(
+                tiebreaker_id=int(data['tiebreaker_id']), team_id=current_user.team.id).first()
+        else:
+            member = TeamBulkTiebreaker.query.filter_by(
+                tiebreaker_id=int(data['bulk_tiebreaker_id']), team_id=current_user.team.id).first()
+        return room if member else None
+
+
+def _emit(event, payload, room=None):
+    """Emit once to a room (or every connection when room is None); never raises"""
+    if socketio.server is None:
+        return
+    try:
+        socketio.emit(event, payload, to=room, namespace=NAMESPACE)
+        PUSH_STATS[event] += 1
+    except Exception as e:
+        logger.error(f"Error emitting {event} to {room or 'all'}: {e}")
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+class RealtimeEvents:
+    """Publishers called by the routes after their changes are committed"""
+
+    # ---- Rounds ------------------------------------------------------
+
+    @staticmethod
+    def round_started(round):
+        _emit('round_started', {'round': {
+            'id': round.id,
+            'position': round.position,
+            'duration': round.duration,
+            'max_bids': round.max_bids_per_team,
+            'end_time': _isoformat(round.end_time),
+        }})
+
+    @staticmethod
+    def round_timer_updated(round):
+        _emit('round_timer_updated', {
+            'round_id': round.id,
+            'end_time': _isoformat(round.end_time),
+            'remaining': round.get_remaining_time(),
+        }, room=round_room(round.id))
+
+    @staticmethod
+    def round_finalized(round_id, status, tiebreaker_id=None):
+        _emit('round_finalized', {
+            'round_id': round_id,
+            'status': status,
+            'redirect_to': f'/round_results/{round_id}' if status == 'success' else None,
+        }, room=round_room(round_id))
+        _emit('round_finalized', {'round_id': round_id, 'status': status,
+                                  'tiebreaker_id': tiebreaker_id}, room=ADMIN_ROOM)
+
+    @staticmethod
+    def bid_count_changed(round_id, team_id, team_bid_count, total_bids, teams_bid):
+        """The bidding team sees its own count; admins see round totals (amounts stay hidden)"""
+        _emit('bid_count_changed', {'round_id': round_id, 'bid_count': team_bid_count},
+              room=team_room(team_id))
+        _emit('bid_count_changed', {'round_id': round_id, 'total_bids': total_bids,
+                                    'teams_bid': teams_bid}, room=ADMIN_ROOM)
+
+    # ---- Round tiebreakers -------------------------------------------
+
+    @staticmethod
+    def tiebreaker_created(tiebreaker_id, round_id, team_ids):
+        payload = {'tiebreaker_id': tiebreaker_id, 'round_id': round_id,
+                   'redirect_to': f'/tiebreaker/{tiebreaker_id}'}
+        for team_id in set(team_ids):
+            _emit('tiebreaker_created', payload, room=team_room(team_id))
+        _emit('tiebreaker_created', payload, room=ADMIN_ROOM)
+
+    @staticmethod
+    def tiebreaker_updated(tiebreaker_id, teams_submitted, teams_total, resolved):
+        _emit('tiebreaker_updated', {
+            'tiebreaker_id': tiebreaker_id,
+            'teams_submitted': teams_submitted,
+            'teams_total': teams_total,
+            'resolved': resolved,
+        }, room=tiebreaker_room(tiebreaker_id))
+
+    # ---- Bulk rounds -------------------------------------------------
+
+    @staticmethod
+    def bulk_round_started(bulk_round):
+        _emit('bulk_round_started', {'bulk_round': {
+            'id': bulk_round.id,
+            'base_price': bulk_round.base_price,
+            'duration': bulk_round.duration,
+            'start_time': _isoformat(bulk_round.start_time),
+        }})
+
+    @staticmethod
+    def bulk_round_timer_updated(bulk_round):
+        _emit('bulk_round_timer_updated', {
+            'round_id': bulk_round.id,
+            'start_time': _isoformat(bulk_round.start_time),
+            'duration': bulk_round.duration,
+        }, room=bulk_round_room(bulk_round.id))
+
+    @staticmethod
+    def bulk_round_finalized(round_id, tiebreakers):
+        """Notify viewers of the round, and each tied team of its new tiebreakers"""
+        _emit('bulk_round_finalized', {'round_id': round_id}, room=bulk_round_room(round_id))
+        _emit('bulk_round_finalized', {'round_id': round_id,
+                                       'tiebreakers': len(tiebreakers)}, room=ADMIN_ROOM)
+        by_team = {}
+        for tiebreaker_id, team_ids in tiebreakers.items():
+            for team_id in team_ids:
+                by_team.setdefault(team_id, []).append(tiebreaker_id)
+        for team_id, tiebreaker_ids in by_team.items():
+            _emit('bulk_tiebreakers_created', {'round_id': round_id, 'tiebreaker_ids': tiebreaker_ids},
+                  room=team_room(team_id))
+
+    @staticmethod
+    def bulk_bid_count_changed(round_id, team_id, team_bid_count, total_bids):
+        _emit('bulk_bid_count_changed', {'round_id': round_id, 'bid_count': team_bid_count},
+              room=team_room(team_id))
+        _emit('bulk_bid_count_changed', {'round_id': round_id, 'total_bids': total_bids},
+              room=ADMIN_ROOM)
+
+    # ---- Bulk tiebreakers --------------------------------------------
+
+    @staticmethod
+    def bulk_tiebreaker_raised(tiebreaker_id, current_amount, leader_team_id, active_teams):
+        _emit('bulk_tiebreaker_raised', {
+            'tiebreaker_id': tiebreaker_id,
+            'current_amount': current_amount,
+            'leader_team_id': leader_team_id,
+            'active_teams': active_teams,
+        }, room=bulk_tiebreaker_room(tiebreaker_id))
+
+    @staticmethod
+    def bulk_tiebreaker_resolved(tiebreaker_id, winner_team_id):
+        _emit('bulk_tiebreaker_resolved', {'tiebreaker_id': tiebreaker_id,
+                                           'winner_team_id': winner_team_id},
+              room=bulk_tiebreaker_room(tiebreaker_id))
+
+    # ---- Teams -------------------------------------------------------
+
+    @staticmethod
+    def balances_changed(balances):
+        """balances: {team_id: new_balance}"""
+        for team_id, balance in balances.items():
+            _emit('balance_changed', {'team_id': team_id, 'balance': balance}, room=team_room(team_id))
@@ -0,0 +1,61 @@
+"""
+Remember-Me Tokens
+==================
+The ``remember_token`` cookie holds a signed, timestamped itsdangerous token
+carrying the user id and a token version.  ``check_remember_token`` runs on
+every anonymous request, so everything that can be rejected without the
+database is: a missing, tampered or expired cookie costs no query.
+
+Only a token that verifies is looked up, by primary key, and accepted if its
+version still matches ``User.remember_token``.  Logging out or changing the
+password clears that column, which revokes every outstanding cookie for the
+user.  After the first use the user is logged into the session, so later
+requests never see the cookie again until the session expires.
+"""
+
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from models import db, User
+
+COOKIE_NAME = 'remember_token'
+REMEMBER_DAYS = 30
+SALT = 'remember-me'
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=SALT)
+
+
+def issue_remember_token(user, days=REMEMBER_DAYS):
+    """Start a new token version for ``user`` and return the signed cookie value; the caller commits"""
+    user.remember_token = secrets.token_urlsafe(16)
+    user.token_expires_at = datetime.now(timezone.utc) + timedelta(days=days)
+    return _serializer().dumps({'uid': user.id, 'v': user.remember_token})
+
+
+def verify_remember_token(token, days=REMEMBER_DAYS):
+    """(user_id, version) from a valid, unexpired token, else None; never touches the database"""
+    try:
+        payload = _serializer().loads(token, max_age=days * 24 * 60 * 60)
+    except BadSignature:
+        # Also covers SignatureExpired and tokens issued before signing was introduced
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get('uid'), int) or not payload.get('v'):
+        return None
+    return payload['uid'], payload['v']
+
+
+def load_user_from_remember_token(token):
+    """The user a remember-me cookie belongs to, or None"""
+    verified = verify_remember_token(token)
+    if verified is None:
+        return None
+    user_id, version = verified
+    user = db.session.get(User, user_id)
+    if user is None or not user.remember_token or not secrets.compare_digest(user.remember_token, version):
+        return None
+    return user
@@ -0,0 +1,437 @@
+"""
+Result Documents
+================
+Compiled results of finished rounds and bulk rounds.
+
+A finished round can never change again, yet its result pages used to
+rebuild everything on each view: bid ladders by scanning every bid of the
+round once per player, winners through lazy ``player.team`` loads and the
+team's own outcomes through a ``Player`` lookup per bid.  Instead the round
+is compiled once into a JSON document in ``round_result_document``:
+
+* ``players``: every player of the round and every player bid on in it,
+  with the winner (the team that owned the player at compile time, if the
+  player belonged to the round), winning amount, tiebreaker flags and the
+  full bid ladder sorted highest first,
+* ``teams``: names of the teams that bid or won,
+* ``team_outcomes``: per team, its bid count, whether its bids counted
+  (regular rounds need exactly ``max_bids_per_team``), the players it won
+  and what it spent.
+
+Regular rounds are compiled when finalization completes them, bulk rounds
+once they are completed and their last tiebreaker has resolved.  Rounds that
+finished before this existed are compiled on their first read.  A document
+is written once and never rewritten; deleting the round deletes it.
+
+``round_results``, ``admin_round_detail``, ``admin_export_round``,
+``team_bids`` and the admin bulk round page render from ``CompiledResult``
+views of the document.  Because the content is fixed, pages carry an ETag
+and are revalidated (``304 Not Modified`` skips rendering) and the export
+is marked immutable.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from flask import Response, current_app, make_response, request, session
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+
+from models import (
+    db, Player, Team, Round, Bid, Tiebreaker, TeamTiebreaker,
+    BulkBidRound, BulkBid, BulkBidTiebreaker, TeamBulkTiebreaker, RoundResultDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_VERSION = 1
+
+# Pages also show live navigation, so browsers revalidate them; the export never changes
+PAGE_CACHE_CONTROL = 'private, no-cache'
+FILE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+RESULT_CACHE_CONTROLS = {PAGE_CACHE_CONTROL, FILE_CACHE_CONTROL}
+
+PLAYER_FIELDS = ('name', 'position', 'team_name', 'overall_rating', 'nationality', 'playing_style',
+                 'player_id', 'is_auction_eligible')
+
+
+def _timestamp(value):
+    return value.isoformat() if value else None
+
+
+def _player_entry(player):
+    entry = {'id': player.id}
+    entry.update({field: getattr(player, field) for field in PLAYER_FIELDS})
+    return entry
+
+
+def _finish(kind, round_info, teams, players, bids_by_team):
+    team_outcomes = {}
+    for team_id, count in bids_by_team.items():
+        team_outcomes[str(team_id)] = {'bid_count': count, 'won_player_ids': [], 'spent': 0}
+    for player in players:
+        winner = player['winner_team_id']
+        if winner is not None and player['won_by_bid']:
+            outcome = team_outcomes.setdefault(str(winner), {'bid_count': 0, 'won_player_ids': [], 'spent': 0})
+            outcome['won_player_ids'].append(player['id'])
+            outcome['spent'] += player['winning_bid'] or 0
+    return {
+        'version': DOCUMENT_VERSION,
+        'kind': kind,
+        'round': round_info,
+        'teams': {str(team_id): name for team_id, name in teams.items()},
+        'players': players,
+        'team_outcomes': team_outcomes,
+    }
+
+
+def build_round_document(round_):
+    """Compile a regular round's results from five queries (not stored)"""
+    round_id = round_.id
+    bids = db.session.execute(
+        select(Bid.team_id, Bid.player_id, Bid.amount, Bid.timestamp).where(Bid.round_id == round_id)
+    ).all()
+    players = db.session.execute(
+        select(Player.id, Player.round_id, Player.team_id, Player.acquisition_value,
+               *[getattr(Player, field) for field in PLAYER_FIELDS])
+        .where(or_(Player.round_id == round_id,
+                   Player.id.in_(select(Bid.player_id).where(Bid.round_id == round_id))))
+        .order_by(Player.id)
+    ).all()
+    tied = {}
+    for player_id, team_id in db.session.execute(
+        select(Tiebreaker.player_id, TeamTiebreaker.team_id)
+        .join(TeamTiebreaker, TeamTiebreaker.tiebreaker_id == Tiebreaker.id)
+        .where(Tiebreaker.round_id == round_id)
+    ):
+        tied.setdefault(player_id, set()).add(team_id)
+
+    ladders, bid_counts = {}, {}
+    for bid in sorted(bids, key=lambda bid: (-bid.amount, bid.timestamp or datetime.min)):
+        ladders.setdefault(bid.player_id, []).append(
+            {'team_id': bid.team_id, 'amount': bid.amount, 'timestamp': _timestamp(bid.timestamp)})
+        bid_counts[bid.team_id] = bid_counts.get(bid.team_id, 0) + 1
+
+    team_ids = set(bid_counts) | {player.team_id for player in players if player.team_id}
+    teams = dict(db.session.execute(select(Team.id, Team.name).where(Team.id.in_(team_ids))).all()) if team_ids else {}
+
+    entries = []
+    for player in players:
+        ladder = ladders.get(player.id, [])
+        winner = player.team_id if player.round_id == round_id else None
+        winning_bid = next((bid['amount'] for bid in ladder if bid['team_id'] == winner), None) if winner else None
+        entry = _player_entry(player)
+        entry.update({
+            'in_round': player.round_id == round_id,
+            'winner_team_id': winner,
+            'won_by_bid': winning_bid is not None,
+            'winning_bid': winning_bid if winning_bid is not None else (player.acquisition_value if winner else None),
+            'tiebreaker_team_ids': sorted(tied.get(player.id, ())),
+            'was_tiebreaker': player.id in tied,
+            'bids': ladder,
+        })
+        entries.append(entry)
+
+    round_info = {
+        'id': round_id, 'position': round_.position, 'max_bids_per_team': round_.max_bids_per_team,
+        'start_time': _timestamp(round_.start_time), 'end_time': _timestamp(round_.end_time),
+    }
+    document = _finish('round', round_info, teams, entries, bid_counts)
+    for team_id, outcome in document['team_outcomes'].items():
+        outcome['valid'] = outcome['bid_count'] == round_.max_bids_per_team
+    return document
+
+
+def build_bulk_round_document(bulk_round):
+    """Compile a bulk round's results from five queries (not stored)"""
+    round_id = bulk_round.id
+    bids = db.session.execute(
+        select(BulkBid.team_id, BulkBid.player_id, BulkBid.is_resolved, BulkBid.has_tie, BulkBid.timestamp)
+        .where(BulkBid.round_id == round_id).order_by(BulkBid.timestamp, BulkBid.id)
+    ).all()
+    players = db.session.execute(
+        select(Player.id, Player.team_id, Player.acquisition_value, *[getattr(Player, field) for field in PLAYER_FIELDS])
+        .where(Player.id.in_(select(BulkBid.player_id).where(BulkBid.round_id == round_id)))
+        .order_by(Player.id)
+    ).all()
+    tiebreakers = {}
+    for player_id, amount, winner, team_id, last_bid in db.session.execute(
+        select(BulkBidTiebreaker.player_id, BulkBidTiebreaker.current_amount, BulkBidTiebreaker.winner_team_id,
+               TeamBulkTiebreaker.team_id, TeamBulkTiebreaker.last_bid)
+        .join(TeamBulkTiebreaker, TeamBulkTiebreaker.tiebreaker_id == BulkBidTiebreaker.id)
+        .where(BulkBidTiebreaker.bulk_round_id == round_id)
+    ):
+        entry = tiebreakers.setdefault(player_id, {'amount': amount, 'winner': winner, 'teams': {}})
+        entry['teams'][team_id] = last_bid
+
+    ladders, bid_counts = {}, {}
+    for bid in bids:
+        ladders.setdefault(bid.player_id, []).append({
+            'team_id': bid.team_id, 'is_resolved': bool(bid.is_resolved), 'has_tie': bool(bid.has_tie),
+            'timestamp': _timestamp(bid.timestamp),
+        })
+        bid_counts[bid.team_id] = bid_counts.get(bid.team_id, 0) + 1
+
+    team_ids = set(bid_counts)
+    teams = dict(db.session.execute(select(Team.id, Team.name).where(Team.id.in_(team_ids))).all()) if team_ids else {}
+
+    entries = []
+    for player in players:
+        ladder = ladders.get(player.id, [])
+        # Allocated through this round when the owner was one of its bidders
+        winner = player.team_id if any(bid['team_id'] == player.team_id for bid in ladder) else None
+        tiebreaker = tiebreakers.get(player.id)
+        entry = _player_entry(player)
+        entry.update({
+            'in_round': True,
+            'winner_team_id': winner,
+            'won_by_bid': winner is not None,
+            'winning_bid': (player.acquisition_value or bulk_round.base_price) if winner else None,
+            'tiebreaker_team_ids': sorted(tiebreaker['teams']) if tiebreaker else [],
+            'was_tiebreaker': tiebreaker is not None,
+            'bids': ladder,
+        })
+        entries.append(entry)
+
+    round_info = {
+        'id': round_id, 'base_price': bulk_round.base_price, 'status': bulk_round.status,
+        'start_time': _timestamp(bulk_round.start_time), 'end_time': _timestamp(bulk_round.end_time),
+    }
+    return _finish('bulk', round_info, teams, entries, bid_counts)
+
+
+def _bulk_round_settled(bulk_round):
+    """Completed, every tiebreaker resolved and every bid processed"""
+    if bulk_round.is_active or bulk_round.status != 'completed':
+        return False
+    open_tiebreaker = db.session.execute(select(BulkBidTiebreaker.id).where(
+        BulkBidTiebreaker.bulk_round_id == bulk_round.id, BulkBidTiebreaker.resolved.is_(False)).limit(1)).first()
+    unprocessed = db.session.execute(select(BulkBid.id).where(
+        BulkBid.round_id == bulk_round.id, BulkBid.is_resolved.is_(False), BulkBid.has_tie.is_(False)).limit(1)).first()
+    return open_tiebreaker is None and unprocessed is None
+
+
+class CompiledResult:
+    """A result document with the views its pages render"""
+
+    def __init__(self, document, etag=None):
+        self.document = document
+        self.etag = etag
+        self.teams = {int(team_id): name for team_id, name in document['teams'].items()}
+        self.players = document['players']
+        for player in self.players:
+            player['team_id'] = player['winner_team_id']
+            player['acquisition_value'] = player['winning_bid']
+            for bid in player['bids']:
+                bid['timestamp'] = datetime.fromisoformat(bid['timestamp']) if bid['timestamp'] else None
+                bid['team'] = self.team(bid['team_id'])
+        self.players_by_id = {player['id']: player for player in self.players}
+
+    @property
+    def round(self):
+        return self.document['round']
+
+    def team(self, team_id):
+        if team_id is None:
+            return None
+        return {'id': team_id, 'name': self.teams.get(team_id, 'Unknown')}
+
+    def team_outcome(self, team_id):
+        return self.document['team_outcomes'].get(str(team_id))
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    def player_results(self):
+        """Players won in the round, for round_results"""
+        return [{
+            'player': player,
+            'winning_team': self.team(player['winner_team_id']),
+            'winning_bid': player['winning_bid'],
+            'all_bids': player['bids'],
+            'was_tiebreaker': player['was_tiebreaker'],
+        } for player in self.players if player['winner_team_id'] is not None]
+
+    def team_results(self, team_id):
+        """The team's bids in the round with what became of each, for round_results"""
+        results = []
+        for player in self.players:
+            bid = next((bid for bid in player['bids'] if bid['team_id'] == team_id), None)
+            if bid is None:
+                continue
+            winner = player['winner_team_id']
+            results.append({
+                'player': player,
+                'bid_amount': bid.get('amount'),
+                'result': 'won' if winner == team_id else 'lost',
+                'tied': team_id in player['tiebreaker_team_ids'],
+                'winning_team': self.teams.get(winner, 'Unknown') if winner is not None else 'Unknown',
+                'winning_amount': player['winning_bid'] if winner is not None else 0,
+                'timestamp': bid['timestamp'],
+            })
+        return results
+
+    def bids_by_player(self, in_round_only=True):
+        """Player id -> player, bids and winning bid, for the admin round pages"""
+        bids_by_player = {}
+        for player in self.players:
+            if in_round_only and not player['in_round']:
+                continue
+            winner = player['winner_team_id']
+            bids_by_player[player['id']] = {
+                'player': player,
+                'bids': player['bids'],
+                'winning_bid': next((bid for bid in player['bids'] if bid['team_id'] == winner), None)
+                if winner is not None else None,
+            }
+        return bids_by_player
+
+    def cancelled_teams(self):
+        """Teams whose bids did not count because they placed the wrong number"""
+        required = self.round.get('max_bids_per_team')
+        return [{
+            'team': self.team(int(team_id)),
+            'bid_count': outcome['bid_count'],
+            'required_count': required,
+        } for team_id, outcome in self.document['team_outcomes'].items()
+            if outcome['bid_count'] and not outcome.get('valid', True)]
+
+
+class ResultDocuments:
+    """Compiles, stores and reads result documents"""
+
+    # ------------------------------------------------------------------
+    # Compile
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compile_round(round_id):
+        """Store a finished round's document unless it already has one"""
+        round_ = db.session.get(Round, round_id)
+        if round_ is None or round_.is_active:
+            return False
+        return ResultDocuments._store(round_id=round_id, document=build_round_document(round_))
+
+    @staticmethod
+    def compile_bulk_round(bulk_round_id):
+        """Store a settled bulk round's document unless it already has one"""
+        bulk_round = db.session.get(BulkBidRound, bulk_round_id)
+        if bulk_round is None or not _bulk_round_settled(bulk_round):
+            return False
+        return ResultDocuments._store(bulk_round_id=bulk_round_id, document=build_bulk_round_document(bulk_round))
+
+    @staticmethod
+    def _store(document, round_id=None, bulk_round_id=None):
+        body = json.dumps(document, sort_keys=True, separators=(',', ':'))
+        etag = hashlib.sha256(body.encode()).hexdigest()[:32]
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(RoundResultDocument.__table__.insert().values(
+                    round_id=round_id, bulk_round_id=bulk_round_id, document=body, etag=etag,
+                    compiled_at=datetime.utcnow()))
+            return True
+        except IntegrityError:
+            # Compiled by another request first; the first document stands
+            return True
+        except Exception as e:
+            logger.error(f"Error compiling results for {'round' if round_id else 'bulk round'} "
+                         f"{round_id or bulk_round_id}: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_round(round_id):
+        """The finished round's compiled results, or None while it is active"""
+        return ResultDocuments.get_rounds([round_id]).get(round_id)
+
+    @staticmethod
+    def get_rounds(round_ids):
+        """Round id -> compiled results for the finished rounds among ``round_ids``"""
+        round_ids = list(set(round_ids))
+        if not round_ids:
+            return {}
+        rows = db.session.execute(select(
+            RoundResultDocument.round_id, RoundResultDocument.document, RoundResultDocument.etag
+        ).where(RoundResultDocument.round_id.in_(round_ids))).all()
+        results = {row.round_id: CompiledResult(json.loads(row.document), row.etag) for row in rows}
+
+        missing = [round_id for round_id in round_ids if round_id not in results]
+        if missing:
+            finished = db.session.execute(select(Round.id).where(
+                Round.id.in_(missing), Round.is_active.is_(False))).scalars().all()
+            for round_id in finished:
+                if ResultDocuments.compile_round(round_id):
+                    row = db.session.execute(select(RoundResultDocument.document, RoundResultDocument.etag).where(
+                        RoundResultDocument.round_id == round_id)).first()
+                    if row is not None:
+                        results[round_id] = CompiledResult(json.loads(row.document), row.etag)
+        return results
+
+    @staticmethod
+    def view_round(round_):
+        """Stored results of a finished round, else results built for this request only (no ETag)"""
+        results = None if round_.is_active else ResultDocuments.get_round(round_.id)
+        return results or CompiledResult(build_round_document(round_))
+
+    @staticmethod
+    def get_bulk_round(bulk_round_id):
+        """The settled bulk round's compiled results, or None until it settles"""
+        query = select(RoundResultDocument.document, RoundResultDocument.etag).where(
+            RoundResultDocument.bulk_round_id == bulk_round_id)
+        row = db.session.execute(query).first()
+        if row is None and ResultDocuments.compile_bulk_round(bulk_round_id):
+            row = db.session.execute(query).first()
+        return CompiledResult(json.loads(row.document), row.etag) if row is not None else None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def remove_round(round_id):
+        """Delete a round's document in the caller's transaction (before the round itself)"""
+        RoundResultDocument.query.filter_by(round_id=round_id).delete(synchronize_session=False)
+
+    @staticmethod
+    def remove_bulk_round(bulk_round_id):
+        """Delete a bulk round's document in the caller's transaction (before the round itself)"""
+        RoundResultDocument.query.filter_by(bulk_round_id=bulk_round_id).delete(synchronize_session=False)
+
+
+def templates_stamp(*names):
+    """Modification times of the templates a page renders, so a deploy changes its ETag"""
+    folder = os.path.join(current_app.root_path, current_app.template_folder)
+    stamp = []
+    for name in names + ('base.html',):
+        try:
+            stamp.append(os.path.getmtime(os.path.join(folder, name)))
+        except OSError:
+            stamp.append(None)
+    return stamp
+
+
+def conditional_page(etag_parts, render):
+    """Answer with ``304 Not Modified`` when the client already holds this version of a page.
+
+    ``etag_parts`` must cover everything the page shows (document ETags,
+    user, live navigation); ``render`` is only called on a miss.  Pages
+    with flash messages waiting are always rendered, and so is everything
+    when ``etag_parts`` is None (results that were not stored).
+    """
+    if etag_parts is None:
+        return make_response(render())
+    etag = hashlib.sha256(json.dumps(etag_parts, default=str).encode()).hexdigest()[:32]
+    if '_flashes' not in session and request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+    return response
@@ -0,0 +1,227 @@
+"""
+Round Finalizer
+===============
+Resumable finalization of regular rounds.
+
+Bids are allocated highest first, one player per team and one team per
+player, skipping teams whose squad is full.  A player with two or more bids
+at the same amount when that amount is reached is a tie and goes to a
+tiebreaker.
+
+Rather than stopping at the first tie and replaying every bid once it is
+resolved, a pass keeps walking past open ties.  A bid that involves an open
+tie's teams or player waits for it, and so does anything that bid could
+take; every other bid does not depend on the tie's outcome and is decided
+now.  Ties further down that no open tie can affect are therefore found in
+the same pass and opened together, so their teams answer in parallel.
+
+Progress is checkpointed in ``round_finalization``: the teams whose bids
+count (fixed by the first pass) and the allocations made so far.  When a
+tiebreaker resolves, its bids carry the new amounts and the next pass walks
+only the bids still undecided.  Each pass commits its allocations, new
+tiebreakers and checkpoint together.
+"""
+
+import json
+import logging
+from collections import namedtuple
+from datetime import datetime
+from itertools import groupby
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from config import Config
+from models import db, Bid, Player, Round, RoundFinalization, Team, TeamTiebreaker, Tiebreaker
+from team_rosters import TeamRosters
+
+logger = logging.getLogger(__name__)
+
+PlannedBid = namedtuple('PlannedBid', ['id', 'team_id', 'player_id', 'amount'])
+Tie = namedtuple('Tie', ['player_id', 'amount', 'team_ids'])
+PassPlan = namedtuple('PassPlan', ['allocations', 'ties', 'waiting'])
+PassResult = namedtuple('PassResult', ['allocations', 'new_tiebreakers', 'open_tiebreakers', 'completed', 'balances'])
+
+
+def plan_pass(bids, open_ties=()):
+    """Decide every bid whose outcome does not hang on an unresolved tie.
+
+    ``bids`` are the undecided ``PlannedBid`` rows and ``open_ties`` the
+    ``(player_id, team_ids)`` of unresolved tiebreakers.  Returns a
+    ``PassPlan`` of winning bids in allocation order, new ``Tie`` tuples and
+    the number of bids left waiting on a tie.
+    """
+    waiting_teams, waiting_players = set(), set()
+    for player_id, team_ids in open_ties:
+        waiting_players.add(player_id)
+        waiting_teams.update(team_ids)
+
+    taken_teams, taken_players = set(), set()
+    allocations, ties, waiting = [], [], 0
+    ordered = sorted(bids, key=lambda bid: (-bid.amount, bid.id))
+    for amount, group in groupby(ordered, key=lambda bid: bid.amount):
+        group = [bid for bid in group if bid.team_id not in taken_teams and bid.player_id not in taken_players]
+
+        # A bid touching a tie waits for it, and its own team and player then wait too
+        deferred = set()
+        changed = True
+        while changed:
+            changed = False
+            for bid in group:
+                if bid.id not in deferred and (bid.team_id in waiting_teams or bid.player_id in waiting_players):
+                    deferred.add(bid.id)
+                    waiting_teams.add(bid.team_id)
+                    waiting_players.add(bid.player_id)
+                    changed = True
+        waiting += len(deferred)
+
+        by_player = {}
+        for bid in group:
+            if bid.id not in deferred:
+                by_player.setdefault(bid.player_id, []).append(bid)
+        # Players in order of their earliest bid: a team allocated earlier in the group is done,
+        # and a team just put into a tie may still win it, so its other bids here wait
+        for player_id, player_bids in by_player.items():
+            player_bids = [bid for bid in player_bids if bid.team_id not in taken_teams]
+            if not player_bids:
+                continue
+            if any(bid.team_id in waiting_teams for bid in player_bids):
+                waiting += len(player_bids)
+                waiting_players.add(player_id)
+                waiting_teams.update(bid.team_id for bid in player_bids)
+            elif len(player_bids) > 1:
+                team_ids = [bid.team_id for bid in player_bids]
+                ties.append(Tie(player_id, amount, team_ids))
+                waiting_players.add(player_id)
+                waiting_teams.update(team_ids)
+            else:
+                bid = player_bids[0]
+                allocations.append(bid)
+                taken_teams.add(bid.team_id)
+                taken_players.add(player_id)
+    return PassPlan(allocations, ties, waiting)
+
+
+def _checkpoint(round_id):
+    """The round's checkpoint row, locked for this pass; None if another worker is creating it"""
+    query = RoundFinalization.query.filter_by(round_id=round_id).with_for_update()
+    state = query.first()
+    if state is not None:
+        return state
+
+    round = db.session.get(Round, round_id)
+    team_ids = [team_id for team_id, in db.session.query(Bid.team_id).filter(
+        Bid.round_id == round_id
+    ).group_by(Bid.team_id).having(func.count(Bid.id) == round.max_bids_per_team)]
+    state = RoundFinalization(round_id=round_id, team_ids=json.dumps(sorted(team_ids)), allocations='[]',
+                              resolved_tiebreakers=0, passes=0)
+    db.session.add(state)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return state
+
+
+def run_pass(round_id):
+    """Run one finalization pass for an active round and commit it.
+
+    Returns a ``PassResult``, or None when the round is not active or
+    another worker holds its checkpoint.
+    """
+    state = _checkpoint(round_id)
+    if state is None:
+        return None
+    round = Round.query.filter_by(id=round_id).populate_existing().first()
+    if round is None or not round.is_active:
+        db.session.rollback()
+        return None
+
+    tiebreakers = db.session.query(Tiebreaker.id, Tiebreaker.player_id, Tiebreaker.resolved).filter(
+        Tiebreaker.round_id == round_id
+    ).order_by(Tiebreaker.id).all()
+    open_ids = [tiebreaker.id for tiebreaker in tiebreakers if not tiebreaker.resolved]
+    resolved = len(tiebreakers) - len(open_ids)
+    if state.passes and open_ids and resolved == state.resolved_tiebreakers:
+        # No tiebreaker resolved since the last pass, so it would decide nothing new
+        db.session.rollback()
+        return PassResult([], [], open_ids, False, {})
+
+    open_ties = {}
+    if open_ids:
+        for tiebreaker_id, player_id, team_id in db.session.query(
+            Tiebreaker.id, Tiebreaker.player_id, TeamTiebreaker.team_id
+        ).join(TeamTiebreaker, TeamTiebreaker.tiebreaker_id == Tiebreaker.id).filter(Tiebreaker.id.in_(open_ids)):
+            open_ties.setdefault((tiebreaker_id, player_id), []).append(team_id)
+
+    allocated = json.loads(state.allocations)
+    taken_teams = {team_id for _, team_id, _ in allocated}
+    team_ids = [team_id for team_id in json.loads(state.team_ids) if team_id not in taken_teams]
+
+    bids = []
+    if team_ids:
+        squad_sizes = dict(db.session.query(Player.team_id, func.count(Player.id)).filter(
+            Player.team_id.in_(team_ids)
+        ).group_by(Player.team_id).all())
+        open_teams = {team_id for team_id in team_ids if squad_sizes.get(team_id, 0) < Config.MAX_PLAYERS_PER_TEAM}
+        # Players already on a team were taken by this round's earlier passes (or outside it)
+        bids = [
+            PlannedBid(*row) for row in db.session.query(Bid.id, Bid.team_id, Bid.player_id, Bid.amount).join(
+                Player, Player.id == Bid.player_id
+            ).filter(Bid.round_id == round_id, Bid.team_id.in_(open_teams), Player.team_id.is_(None))
+        ] if open_teams else []
+
+    plan = plan_pass(bids, [(player_id, teams) for (_, player_id), teams in open_ties.items()])
+
+    balances = {}
+    if plan.allocations:
+        teams = {team.id: team for team in Team.query.filter(Team.id.in_([bid.team_id for bid in plan.allocations]))}
+        players = {player.id: player for player in Player.query.filter(
+            Player.id.in_([bid.player_id for bid in plan.allocations]))}
+        for bid in plan.allocations:
+            team, player = teams[bid.team_id], players[bid.player_id]
+            team.balance -= bid.amount
+            player.team_id = team.id
+            player.acquisition_value = bid.amount  # Winning bid amount
+            balances[team.id] = team.balance
+            allocated.append([bid.player_id, bid.team_id, bid.amount])
+        TeamRosters.add_players([(bid.team_id, players[bid.player_id].position, bid.amount)
+                                 for bid in plan.allocations])
+
+    new_tiebreakers = []
+    for tie in plan.ties:
+        tiebreaker = Tiebreaker(round_id=round_id, player_id=tie.player_id, original_amount=tie.amount,
+                                resolved=False)
+        db.session.add(tiebreaker)
+        new_tiebreakers.append((tiebreaker, tie.team_ids))
+    if new_tiebreakers:
+        db.session.flush()
+        db.session.add_all([
+            TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=team_id, new_amount=None)
+            for tiebreaker, tie_team_ids in new_tiebreakers for team_id in tie_team_ids
+        ])
+
+    completed = not open_ties and not plan.ties and not plan.waiting
+    if completed:
+        round.is_active = False
+        round.status = "completed"
+        TeamRosters.close_round(round_id)
+    else:
+        round.status = "processing"
+
+    state.allocations = json.dumps(allocated)
+    state.resolved_tiebreakers = resolved
+    state.passes = (state.passes or 0) + 1
+    state.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    logger.info(f"Round {round_id} pass {state.passes}: {len(plan.allocations)} allocated, "
+                f"{len(plan.ties)} new ties, {plan.waiting} bids waiting")
+    return PassResult(
+        allocations=[(bid.team_id, bid.player_id, bid.amount) for bid in plan.allocations],
+        new_tiebreakers=[(tiebreaker.id, tie_team_ids) for tiebreaker, tie_team_ids in new_tiebreakers],
+        open_tiebreakers=open_ids + [tiebreaker.id for tiebreaker, _ in new_tiebreakers],
+        completed=completed,
+        balances=balances,
+    )
@@ -0,0 +1,182 @@
+"""
+Round Rollback
+==============
+Undo a finished round or bulk round: release the players it allocated,
+refund their teams and delete the round with its bids and tiebreakers.
+
+A player counts as allocated by the round when the round holds a bid on it
+from the team that owns it; that team gets the acquisition value back.  A
+regular round also releases every other player still tied to it (without a
+refund), as deleting it always has.
+
+The refunds come from one aggregate query per round, grouped by team and
+position, which is also the dry-run report.  The rollback then applies them
+with set-based statements in the caller's transaction: one ``UPDATE`` for
+the balances, one for the players and one ``DELETE`` per dependent table,
+whatever the number of players.  Nothing is committed here.
+"""
+
+import logging
+from collections import namedtuple
+
+from sqlalchemy import and_, case, delete, exists, func, select, text, update
+
+from models import (db, Bid, BulkBid, BulkBidRound, BulkBidTiebreaker, Player, Round, RoundFinalization,
+                    Team, TeamBulkTiebreaker, TeamPairResult, TeamTiebreaker, Tiebreaker)
+from bulk_round_counters import BulkRoundCounters
+from result_documents import ResultDocuments
+from team_rosters import TeamRosters
+
+logger = logging.getLogger(__name__)
+
+RollbackReport = namedtuple('RollbackReport', [
+    'released_players', 'refunded_amount', 'refunds', 'deleted_bids', 'deleted_tiebreakers',
+])
+
+# One (team, position) group of released players
+_Release = namedtuple('_Release', ['team_id', 'position', 'players', 'won', 'value', 'refund'])
+
+
+def _releases(players_filter, won):
+    """Released players grouped by team and position, with the refund each group is owed"""
+    refund = case((and_(won, Player.acquisition_value.isnot(None), Team.id.isnot(None)),
+                   Player.acquisition_value), else_=0)
+    rows = db.session.execute(select(
+        Player.team_id,
+        Player.position,
+        func.count(Player.id),
+        func.coalesce(func.sum(case((won, 1), else_=0)), 0),
+        func.coalesce(func.sum(func.coalesce(Player.acquisition_value, 0)), 0),
+        func.coalesce(func.sum(refund), 0),
+    ).outerjoin(Team, Team.id == Player.team_id).where(
+        players_filter, Player.team_id.isnot(None)
+    ).group_by(Player.team_id, Player.position)).all()
+    return [_Release(team_id, position, *map(int, counts)) for team_id, position, *counts in rows]
+
+
+def _report(releases, deleted_bids, deleted_tiebreakers):
+    refunds = {}
+    for release in releases:
+        if release.refund:
+            refunds[release.team_id] = refunds.get(release.team_id, 0) + release.refund
+    return RollbackReport(
+        released_players=sum(release.won for release in releases),
+        refunded_amount=sum(refunds.values()),
+        refunds=refunds,
+        deleted_bids=deleted_bids,
+        deleted_tiebreakers=deleted_tiebreakers,
+    )
+
+
+def _apply_releases(releases, players_filter, values):
+    """Refund the teams, uncount the players from their rosters and reset them"""
+    refunds = _report(releases, 0, 0).refunds
+    if refunds:
+        db.session.execute(text("UPDATE team SET balance = balance + :refund WHERE id = :team_id"),
+                           [{'team_id': team_id, 'refund': refund} for team_id, refund in refunds.items()])
+    TeamRosters.remove_players([(release.team_id, release.position, release.players, release.value, release.refund)
+                                for release in releases])
+    # Through the ORM so the availability index sees the players change
+    db.session.execute(update(Player).where(players_filter).values(**values),
+                       execution_options={'synchronize_session': False})
+
+
+def _count(model, condition):
+    return db.session.execute(select(func.count()).select_from(model).where(condition)).scalar()
+
+
+class RoundRollback:
+    """Reports on and performs round deletions"""
+
+    # ------------------------------------------------------------------
+    # Regular rounds
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _round_terms(round_id):
+        in_round = Player.round_id == round_id
+        won = exists().where(Bid.player_id == Player.id, Bid.round_id == round_id, Bid.team_id == Player.team_id)
+        return in_round, won
+
+    @staticmethod
+    def round_report(round_id):
+        """What deleting a round would release and refund, without writing"""
+        in_round, won = RoundRollback._round_terms(round_id)
+        return _report(_releases(in_round, won), _count(Bid, Bid.round_id == round_id),
+                       _count(Tiebreaker, Tiebreaker.round_id == round_id))
+
+    @staticmethod
+    def rollback_round(round_id):
+        """Delete a round in the caller's transaction; returns its ``RollbackReport``"""
+        round = db.session.get(Round, round_id)
+        in_round, won = RoundRollback._round_terms(round_id)
+        releases = _releases(in_round, won)
+        _apply_releases(releases, in_round, {'team_id': None, 'acquisition_value': None, 'round_id': None})
+
+        round_tiebreakers = select(Tiebreaker.id).where(Tiebreaker.round_id == round_id)
+        TeamRosters.remove_round_bids(round_id, round.is_active)
+        # Finalization checkpoints and head-to-head rows cascade on PostgreSQL but not on SQLite
+        _, deleted_tiebreakers, deleted_bids, _, _ = RoundRollback._delete(
+            delete(TeamTiebreaker).where(TeamTiebreaker.tiebreaker_id.in_(round_tiebreakers)),
+            delete(Tiebreaker).where(Tiebreaker.round_id == round_id),
+            delete(Bid).where(Bid.round_id == round_id),
+            delete(RoundFinalization).where(RoundFinalization.round_id == round_id),
+            delete(TeamPairResult).where(TeamPairResult.round_id == round_id),
+        )
+        ResultDocuments.remove_round(round_id)
+        RoundRollback._delete(delete(Round).where(Round.id == round_id))
+        db.session.expunge(round)
+
+        report = _report(releases, deleted_bids, deleted_tiebreakers)
+        logger.info(f"Round {round_id} rolled back: {report.released_players} players released, "
+                    f"{report.refunded_amount} refunded")
+        return report
+
+    # ------------------------------------------------------------------
+    # Bulk rounds
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bulk_allocated(round_id):
+        # A bulk round only releases the players it allocated; the IN narrows the scan to the round's players
+        round_players = select(BulkBid.player_id).where(BulkBid.round_id == round_id)
+        return and_(Player.id.in_(round_players),
+                    exists().where(BulkBid.player_id == Player.id, BulkBid.round_id == round_id,
+                                   BulkBid.team_id == Player.team_id))
+
+    @staticmethod
+    def bulk_round_report(round_id):
+        """What deleting a bulk round would release and refund, without writing"""
+        allocated = RoundRollback._bulk_allocated(round_id)
+        return _report(_releases(allocated, allocated), _count(BulkBid, BulkBid.round_id == round_id),
+                       _count(BulkBidTiebreaker, BulkBidTiebreaker.bulk_round_id == round_id))
+
+    @staticmethod
+    def rollback_bulk_round(round_id):
+        """Delete a bulk round in the caller's transaction; returns its ``RollbackReport``"""
+        bulk_round = db.session.get(BulkBidRound, round_id)
+        allocated = RoundRollback._bulk_allocated(round_id)
+        releases = _releases(allocated, allocated)
+        _apply_releases(releases, allocated, {'team_id': None, 'acquisition_value': None})
+
+        round_tiebreakers = select(BulkBidTiebreaker.id).where(BulkBidTiebreaker.bulk_round_id == round_id)
+        _, deleted_tiebreakers, deleted_bids = RoundRollback._delete(
+            delete(TeamBulkTiebreaker).where(TeamBulkTiebreaker.tiebreaker_id.in_(round_tiebreakers)),
+            delete(BulkBidTiebreaker).where(BulkBidTiebreaker.bulk_round_id == round_id),
+            delete(BulkBid).where(BulkBid.round_id == round_id),
+        )
+        BulkRoundCounters.remove_round(round_id)
+        ResultDocuments.remove_bulk_round(round_id)
+        RoundRollback._delete(delete(BulkBidRound).where(BulkBidRound.id == round_id))
+        db.session.expunge(bulk_round)
+
+        report = _report(releases, deleted_bids, deleted_tiebreakers)
+        logger.info(f"Bulk round {round_id} rolled back: {report.released_players} players released, "
+                    f"{report.refunded_amount} refunded")
+        return report
+
+    @staticmethod
+    def _delete(*statements):
+        """Run bulk DELETEs without touching the session; returns their row counts"""
+        return [db.session.execute(statement, execution_options={'synchronize_session': False}).rowcount
+                for statement in statements]
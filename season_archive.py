@@ -0,0 +1,236 @@
+"""
+Season Archive
+==============
+Freezes a completed season into a single compressed JSON snapshot (teams,
+rounds, bids, tiebreakers, acquisitions and the stats/leaderboards from
+``SeasonStatsStore``) stored in ``season_archive``.
+
+Completed seasons never change again, so the history pages read them from the
+snapshot instead of re-running joins against the live ``team``/``bid``/``player``
+tables.  Decoded snapshots are cached in-process keyed by checksum; an archive
+is only rewritten when ``archive_season(..., force=True)`` is used.
+"""
+
+import hashlib
+import json
+import logging
+import zlib
+from datetime import datetime
+
+from sqlalchemy import text, bindparam
+from models import db
+from season_stats import SeasonStatsStore, _json_default
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# season_id -> (checksum, snapshot)
+_snapshot_cache = {}
+
+
+def _parse_datetime(value):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _encode(snapshot):
+    raw = json.dumps(snapshot, default=_json_default, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return raw, zlib.compress(raw, 9), hashlib.sha256(raw).hexdigest()
+
+
+def _season_dict(season):
+    """Season row as a dict with its date columns as datetimes (JSON and SQLite give strings)"""
+    return {key: _parse_datetime(value) if key.endswith('_at') or key.endswith('_date') else value
+            for key, value in season.items()}
+
+
+def _decode(payload):
+    snapshot = json.loads(zlib.decompress(payload).decode('utf-8'))
+    snapshot['season'] = _season_dict(snapshot.get('season', {}))
+    return snapshot
+
+
+class SeasonArchiveStore:
+    """Builds, stores and reads completed-season snapshots"""
+
+    # ------------------------------------------------------------------
+    # Archiving
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def archive_season(season_id, force=False):
+        """Snapshot a completed season.
+
+        Returns False if the season is not completed, or is already archived
+        and ``force`` is not set.
+        """
+        try:
+            with db.engine.begin() as conn:
+                status = conn.execute(text("SELECT status FROM season WHERE id = :season_id"),
+                                      {'season_id': season_id}).scalar()
+                if status != 'completed':
+                    return False
+
+                exists = conn.execute(text("SELECT 1 FROM season_archive WHERE season_id = :season_id"),
+                                      {'season_id': season_id}).fetchone()
+                if exists and not force:
+                    return False
+
+            # Frozen stats first so the snapshot carries the final leaderboards
+            SeasonStatsStore.refresh_season(season_id, force=True)
+
+            with db.engine.begin() as conn:
+                snapshot = SeasonArchiveStore.build_snapshot(conn, season_id)
+                raw, payload, checksum = _encode(snapshot)
+                conn.execute(text("DELETE FROM season_archive WHERE season_id = :season_id"),
+                             {'season_id': season_id})
+                conn.execute(text("""
+                    INSERT INTO season_archive
+                        (season_id, format_version, payload, checksum, raw_size, compressed_size,
+                         team_count, round_count, bid_count, archived_at)
+                    VALUES (:season_id, :format_version, :payload, :checksum, :raw_size, :compressed_size,
+                            :team_count, :round_count, :bid_count, :archived_at)
+                """), {
+                    'season_id': season_id,
+                    'format_version': FORMAT_VERSION,
+                    'payload': payload,
+                    'checksum': checksum,
+                    'raw_size': len(raw),
+                    'compressed_size': len(payload),
+                    'team_count': len(snapshot['teams']),
+                    'round_count': len(snapshot['rounds']),
+                    'bid_count': len(snapshot['bids']),
+                    'archived_at': datetime.utcnow(),
+                })
+            _snapshot_cache.pop(season_id, None)
+            logger.info(f"Archived season {season_id}: {len(raw)} bytes -> {len(payload)} bytes")
+            return True
+        except Exception as e:
+            logger.error(f"Error archiving season {season_id}: {e}")
+            return False
+
+    @staticmethod
+    def build_snapshot(conn, season_id):
+        """Collect everything the history pages need about a season"""
+        params = {'season_id': season_id}
+
+        season_row = conn.execute(text("SELECT * FROM season WHERE id = :season_id"), params).fetchone()
+        season = dict(season_row._mapping)
+
+        overview = SeasonStatsStore.get_season_overview(conn, season_id)
+
+        teams = conn.execute(text("""
+            SELECT t.id, t.name, t.balance, t.is_continuing_team, u.username, t.team_lineage_id,
+                   COALESCE(ts.bid_count, 0), COALESCE(ts.bid_amount_total, 0),
+                   COALESCE(ts.players_acquired, 0), COALESCE(ts.total_spent, 0),
+                   COALESCE(ts.tiebreakers_involved, 0)
+            FROM team t
+            LEFT JOIN "user" u ON t.user_id = u.id
+            LEFT JOIN team_season_stats ts ON ts.team_id = t.id AND ts.season_id = :season_id
+            WHERE t.season_id = :season_id
+            ORDER BY t.name
+        """), params).fetchall()
+
+        rounds = SeasonStatsStore.get_season_rounds(conn, season_id)
+
+        bids = conn.execute(text("""
+            SELECT b.id, b.round_id, b.team_id, b.player_id, b.amount, b.timestamp
+            FROM bid b JOIN round r ON b.round_id = r.id
+            WHERE r.season_id = :season_id
+            ORDER BY b.round_id, b.id
+        """), params).fetchall()
+
+        tiebreakers = conn.execute(text("""
+            SELECT tb.id, tb.round_id, tb.player_id, tb.original_amount, tb.resolved, tb.timestamp
+            FROM tiebreaker tb JOIN round r ON tb.round_id = r.id
+            WHERE r.season_id = :season_id
+            ORDER BY tb.id
+        """), params).fetchall()
+        tiebreaker_teams = {}
+        for row in conn.execute(text("""
+            SELECT tt.tiebreaker_id, tt.team_id, tt.new_amount
+            FROM team_tiebreaker tt
+            JOIN tiebreaker tb ON tt.tiebreaker_id = tb.id
+            JOIN round r ON tb.round_id = r.id
+            WHERE r.season_id = :season_id
+        """), params):
+            tiebreaker_teams.setdefault(row[0], []).append([row[1], row[2]])
+
+        acquisitions = conn.execute(text("""
+            SELECT p.id, p.name, p.position, p.team_id, p.acquisition_value, p.round_id
+            FROM player p JOIN round r ON p.round_id = r.id
+            WHERE r.season_id = :season_id AND p.team_id IS NOT NULL
+            ORDER BY p.team_id, p.id
+        """), params).fetchall()
+
+        return {
+            'format_version': FORMAT_VERSION,
+            'season': season,
+            # Same column order as the get_season_statistics() database function
+            'stats': [season_id, season.get('name'), overview[0], overview[1], overview[2],
+                      overview[3], overview[4], overview[6]],
+            'overview': list(overview[:12]),
+            'teams': [list(row) for row in teams],
+            'rounds': [list(row) for row in rounds],
+            'bids': [list(row) for row in bids],
+            'tiebreakers': [list(row) + [tiebreaker_teams.get(row[0], [])] for row in tiebreakers],
+            'acquisitions': [list(row) for row in acquisitions],
+            'standings': {str(team_id): standing
+                          for team_id, standing in SeasonStatsStore.get_standings(conn, [season_id]).items()},
+            'leaderboards': SeasonStatsStore.get_leaderboards(conn, season_id),
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_snapshots(conn, season_ids=None):
+        """Decoded snapshots keyed by season id, using the in-process cache"""
+        query = "SELECT season_id, checksum FROM season_archive"
+        params = {}
+        if season_ids is not None:
+            if not season_ids:
+                return {}
+            query += " WHERE season_id IN :season_ids"
+            params['season_ids'] = list(season_ids)
+        stmt = text(query)
+        if season_ids is not None:
+            stmt = stmt.bindparams(bindparam('season_ids', expanding=True))
+        checksums = dict(conn.execute(stmt, params).fetchall())
+
+        stale = [sid for sid, checksum in checksums.items()
+                 if _snapshot_cache.get(sid, (None,))[0] != checksum]
+        if stale:
+            rows = conn.execute(text("""
+                SELECT season_id, checksum, payload FROM season_archive WHERE season_id IN :season_ids
+            """).bindparams(bindparam('season_ids', expanding=True)), {'season_ids': stale})
+            for sid, checksum, payload in rows:
+                _snapshot_cache[sid] = (checksum, _decode(payload))
+
+        return {sid: _snapshot_cache[sid][1] for sid in checksums if sid in _snapshot_cache}
+
+    @staticmethod
+    def get_snapshot(conn, season_id):
+        """Decoded snapshot for one season, or None if it has not been archived"""
+        return SeasonArchiveStore.get_snapshots(conn, [season_id]).get(season_id)
+
+    @staticmethod
+    def get_season_detail(conn, season_id):
+        """(season, stats, teams) rows shaped like history.season_detail's live queries,
+        or None when the season has not been archived.
+        """
+        snapshot = SeasonArchiveStore.get_snapshot(conn, season_id)
+        if snapshot is None:
+            return None
+        s = snapshot['season']
+        season = (s.get('id'), s.get('name'), s.get('short_name'), s.get('description'),
+                  s.get('is_active'), s.get('status'), s.get('season_start_date'),
+                  s.get('season_end_date'), s.get('team_limit'), s.get('max_committee_admins'))
+        teams = [tuple(team[:6]) for team in snapshot['teams']]
+        return season, tuple(snapshot['stats']), teams
@@ -26,7 +26,7 @@ class SeasonContext:
             # Query from database
             with db.engine.connect() as conn:
                 result = conn.execute(text("""
-                    SELECT id, name, short_name, is_active, status 
+                    SELECT id, name, short_name, is_active, status, updated_at
                     FROM season 
                     WHERE is_active = true 
                     ORDER BY created_at DESC 
@@ -40,7 +40,8 @@ class SeasonContext:
                         'name': row[1], 
                         'short_name': row[2],
                         'is_active': row[3],
-                        'status': row[4]
+                        'status': row[4],
+                        'updated_at': row[5]
                     }
                     
                     # Cache in Flask g for this request
@@ -0,0 +1,463 @@
+"""
+Season Statistics Store
+=======================
+Maintains summary rows keyed by season, team and round so the admin season
+pages and history analytics read a handful of rows instead of re-aggregating
+every bid on each page view.
+
+Rows are refreshed when a round finalizes (or is deleted) and frozen once the
+season is ``completed``.  Bids on rounds that are still active are excluded,
+matching what teams can see while bids are hidden.
+"""
+
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import text, bindparam
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Leaderboards computed at refresh time and served to season_player_stats.
+# Column order matches what the templates index into.
+LEADERBOARD_QUERIES = {
+    'top_bids': """
+        SELECT p.name as player_name, p.position, p.team_name as original_team,
+               b.amount, t.name as bidding_team, r.position as round_position
+        FROM bid b
+        JOIN player p ON b.player_id = p.id
+        JOIN team t ON b.team_id = t.id
+        JOIN round r ON b.round_id = r.id
+        WHERE r.season_id = :season_id AND r.is_active = false
+        ORDER BY b.amount DESC
+        LIMIT 10
+    """,
+    'golden_boot_candidates': """
+        SELECT p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
+               p.nationality, p.acquisition_value, p.finishing, p.offensive_awareness,
+               t.name as current_team, u.username as owner
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        JOIN team t ON p.team_id = t.id
+        JOIN "user" u ON t.user_id = u.id
+        WHERE r.season_id = :season_id AND p.finishing IS NOT NULL
+        ORDER BY p.finishing DESC, p.offensive_awareness DESC
+        LIMIT 20
+    """,
+    'golden_glove_candidates': """
+        SELECT p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
+               p.nationality, p.acquisition_value, p.defensive_awareness, p.physical_contact,
+               t.name as current_team, u.username as owner
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        JOIN team t ON p.team_id = t.id
+        JOIN "user" u ON t.user_id = u.id
+        WHERE r.season_id = :season_id AND p.position = 'GK'
+        ORDER BY p.overall_rating DESC, p.defensive_awareness DESC
+        LIMIT 10
+    """,
+    'golden_ball_candidates': """
+        SELECT p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
+               p.nationality, p.acquisition_value, p.playing_style,
+               t.name as current_team, u.username as owner,
+               p.offensive_awareness, p.ball_control, p.dribbling, p.finishing,
+               p.speed, p.physical_contact, p.defensive_awareness, p.tackling
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        JOIN team t ON p.team_id = t.id
+        JOIN "user" u ON t.user_id = u.id
+        WHERE r.season_id = :season_id
+        ORDER BY p.overall_rating DESC, p.acquisition_value DESC
+        LIMIT 50
+    """,
+    'expensive_signings': """
+        SELECT p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
+               p.nationality, p.acquisition_value, p.playing_style,
+               t.name as current_team, u.username as owner,
+               r.position as round_position
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        JOIN team t ON p.team_id = t.id
+        JOIN "user" u ON t.user_id = u.id
+        WHERE r.season_id = :season_id
+        ORDER BY p.acquisition_value DESC
+        LIMIT 20
+    """,
+    'value_signings': """
+        SELECT p.id, p.name, p.position, p.team_name as original_team, p.overall_rating,
+               p.nationality, p.acquisition_value, p.playing_style,
+               t.name as current_team, u.username as owner,
+               CASE WHEN p.acquisition_value > 0 THEN CAST(p.overall_rating AS FLOAT) / p.acquisition_value ELSE 0 END as value_ratio
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        JOIN team t ON p.team_id = t.id
+        JOIN "user" u ON t.user_id = u.id
+        WHERE r.season_id = :season_id AND p.acquisition_value > 0 AND p.overall_rating > 70
+        ORDER BY (CAST(p.overall_rating AS FLOAT) / p.acquisition_value) DESC, p.overall_rating DESC
+        LIMIT 20
+    """,
+    'position_breakdown': """
+        SELECT p.position,
+               COUNT(*) as player_count,
+               AVG(p.overall_rating) as avg_rating,
+               MAX(p.overall_rating) as max_rating,
+               MIN(p.overall_rating) as min_rating,
+               AVG(p.acquisition_value) as avg_cost,
+               MAX(p.acquisition_value) as max_cost,
+               SUM(p.acquisition_value) as total_spent
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        WHERE r.season_id = :season_id AND p.position IS NOT NULL
+        GROUP BY p.position
+        ORDER BY total_spent DESC
+    """,
+    'nationality_breakdown': """
+        SELECT COALESCE(p.nationality, 'Unknown') as nationality,
+               COUNT(*) as player_count,
+               AVG(p.overall_rating) as avg_rating,
+               SUM(p.acquisition_value) as total_spent,
+               AVG(p.acquisition_value) as avg_cost
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        WHERE r.season_id = :season_id
+        GROUP BY p.nationality
+        HAVING COUNT(*) >= 3
+        ORDER BY player_count DESC, total_spent DESC
+        LIMIT 20
+    """,
+    'player_attributes': """
+        SELECT p.id, p.name, p.position, p.overall_rating,
+               p.offensive_awareness, p.ball_control, p.dribbling, p.finishing,
+               p.speed, p.physical_contact, p.defensive_awareness, p.tackling,
+               t.name as current_team,
+               (COALESCE(p.offensive_awareness, 0) + COALESCE(p.ball_control, 0) +
+                COALESCE(p.dribbling, 0) + COALESCE(p.finishing, 0)) / 4.0 as technical_score,
+               (COALESCE(p.speed, 0) + COALESCE(p.physical_contact, 0) +
+                COALESCE(p.defensive_awareness, 0) + COALESCE(p.tackling, 0)) / 4.0 as physical_score
+        FROM player p
+        JOIN round r ON p.round_id = r.id
+        JOIN team t ON p.team_id = t.id
+        WHERE r.season_id = :season_id AND p.overall_rating > 75
+        ORDER BY p.overall_rating DESC
+        LIMIT 30
+    """,
+}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+class SeasonStatsStore:
+    """Refreshes and reads the season/team/round summary tables"""
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def refresh_round(round_id):
+        """Refresh stats after a round finalizes.
+
+        Recomputes the round's own row, the rows of teams that bid in it and
+        the season summary.  Safe to call more than once for the same round.
+        """
+        try:
+            with db.engine.begin() as conn:
+                row = conn.execute(text("SELECT season_id FROM round WHERE id = :round_id"),
+                                   {'round_id': round_id}).fetchone()
+                if not row or row[0] is None:
+                    return False
+                season_id = row[0]
+
+                if SeasonStatsStore._is_frozen(conn, season_id):
+                    return False
+
+                SeasonStatsStore._refresh_round_row(conn, round_id, season_id)
+                team_ids = [r[0] for r in conn.execute(text("""
+                    SELECT DISTINCT team_id FROM bid WHERE round_id = :round_id
+                    UNION
+                    SELECT DISTINCT team_id FROM player WHERE round_id = :round_id AND team_id IS NOT NULL
+                """), {'round_id': round_id})]
+                SeasonStatsStore._refresh_team_rows(conn, season_id, team_ids)
+                SeasonStatsStore._refresh_season_row(conn, season_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing stats for round {round_id}: {e}")
+            return False
+
+    @staticmethod
+    def remove_round(round_id, season_id):
+        """Drop a deleted round's row and rebuild the season's team and summary rows"""
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text("DELETE FROM round_stats_summary WHERE round_id = :round_id"),
+                             {'round_id': round_id})
+                if season_id is None or SeasonStatsStore._is_frozen(conn, season_id):
+                    return False
+                SeasonStatsStore._refresh_team_rows(conn, season_id)
+                SeasonStatsStore._refresh_season_row(conn, season_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error removing stats for round {round_id}: {e}")
+            return False
+
+    @staticmethod
+    def refresh_season(season_id, force=False):
+        """Rebuild every summary row for a season (backfill or repair)"""
+        try:
+            with db.engine.begin() as conn:
+                if force:
+                    conn.execute(text("""
+                        UPDATE season_stats_summary SET is_frozen = false WHERE season_id = :season_id
+                    """), {'season_id': season_id})
+                elif SeasonStatsStore._is_frozen(conn, season_id):
+                    return False
+
+                round_ids = [r[0] for r in conn.execute(text("""
+                    SELECT id FROM round WHERE season_id = :season_id AND is_active = false
+                """), {'season_id': season_id})]
+                for round_id in round_ids:
+                    SeasonStatsStore._refresh_round_row(conn, round_id, season_id)
+                SeasonStatsStore._refresh_team_rows(conn, season_id)
+                SeasonStatsStore._refresh_season_row(conn, season_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing stats for season {season_id}: {e}")
+            return False
+
+    @staticmethod
+    def _is_frozen(conn, season_id):
+        row = conn.execute(text("""
+            SELECT is_frozen FROM season_stats_summary WHERE season_id = :season_id
+        """), {'season_id': season_id}).fetchone()
+        return bool(row and row[0])
+
+    @staticmethod
+    def _refresh_round_row(conn, round_id, season_id):
+        now = datetime.utcnow()
+        conn.execute(text("DELETE FROM round_stats_summary WHERE round_id = :round_id"),
+                     {'round_id': round_id})
+        conn.execute(text("""
+            INSERT INTO round_stats_summary
+                (round_id, season_id, bid_count, participating_teams, players_bid_on, refreshed_at)
+            SELECT :round_id, :season_id, COUNT(*), COUNT(DISTINCT team_id), COUNT(DISTINCT player_id), :now
+            FROM bid WHERE round_id = :round_id
+        """), {'round_id': round_id, 'season_id': season_id, 'now': now})
+
+    @staticmethod
+    def _refresh_team_rows(conn, season_id, team_ids=None):
+        """Recompute team rows for a season in one set-based INSERT ... SELECT"""
+        params = {'season_id': season_id, 'now': datetime.utcnow()}
+        team_filter = ''
+        if team_ids is not None:
+            if not team_ids:
+                return
+            team_filter = 'AND t.id IN :team_ids'
+            params['team_ids'] = list(team_ids)
+
+        delete_stmt = text(f"""
+            DELETE FROM team_season_stats
+            WHERE season_id = :season_id
+              AND team_id IN (SELECT t.id FROM team t WHERE t.season_id = :season_id {team_filter})
+        """)
+        insert_stmt = text(f"""
+            INSERT INTO team_season_stats
+                (season_id, team_id, bid_count, bid_amount_total, max_bid, min_bid,
+                 rounds_participated, players_acquired, total_spent, tiebreakers_involved, refreshed_at)
+            SELECT :season_id, t.id,
+                   COALESCE(b.bid_count, 0), COALESCE(b.amount_total, 0),
+                   COALESCE(b.max_bid, 0), COALESCE(b.min_bid, 0), COALESCE(b.rounds, 0),
+                   COALESCE(p.players, 0), COALESCE(p.spent, 0), COALESCE(tb.tiebreakers, 0), :now
+            FROM team t
+            LEFT JOIN (
+                SELECT b.team_id, COUNT(*) as bid_count, SUM(b.amount) as amount_total,
+                       MAX(b.amount) as max_bid, MIN(b.amount) as min_bid,
+                       COUNT(DISTINCT b.round_id) as rounds
+                FROM bid b JOIN round r ON b.round_id = r.id
+                WHERE r.season_id = :season_id AND r.is_active = false
+                GROUP BY b.team_id
+            ) b ON b.team_id = t.id
+            LEFT JOIN (
+                SELECT p.team_id, COUNT(*) as players, SUM(p.acquisition_value) as spent
+                FROM player p JOIN round r ON p.round_id = r.id
+                WHERE r.season_id = :season_id
+                GROUP BY p.team_id
+            ) p ON p.team_id = t.id
+            LEFT JOIN (
+                SELECT tt.team_id, COUNT(*) as tiebreakers
+                FROM team_tiebreaker tt
+                JOIN tiebreaker tb ON tt.tiebreaker_id = tb.id
+                JOIN round r ON tb.round_id = r.id
+                WHERE r.season_id = :season_id
+                GROUP BY tt.team_id
+            ) tb ON tb.team_id = t.id
+            WHERE t.season_id = :season_id {team_filter}
+        """)
+        if team_ids is not None:
+            delete_stmt = delete_stmt.bindparams(bindparam('team_ids', expanding=True))
+            insert_stmt = insert_stmt.bindparams(bindparam('team_ids', expanding=True))
+        conn.execute(delete_stmt, params)
+        conn.execute(insert_stmt, params)
+
+    @staticmethod
+    def _refresh_season_row(conn, season_id):
+        status_row = conn.execute(text("SELECT status FROM season WHERE id = :season_id"),
+                                  {'season_id': season_id}).fetchone()
+        freeze = bool(status_row and status_row[0] == 'completed')
+
+        leaderboards = {}
+        for name, sql in LEADERBOARD_QUERIES.items():
+            rows = conn.execute(text(sql), {'season_id': season_id}).fetchall()
+            leaderboards[name] = [list(row) for row in rows]
+
+        conn.execute(text("DELETE FROM season_stats_summary WHERE season_id = :season_id"),
+                     {'season_id': season_id})
+        conn.execute(text("""
+            INSERT INTO season_stats_summary
+                (season_id, total_bids, teams_with_bids, players_bid_on, bid_amount_total,
+                 max_bid, min_bid, leaderboards, is_frozen, refreshed_at)
+            SELECT :season_id, COUNT(*), COUNT(DISTINCT b.team_id), COUNT(DISTINCT b.player_id),
+                   COALESCE(SUM(b.amount), 0), COALESCE(MAX(b.amount), 0), COALESCE(MIN(b.amount), 0),
+                   :leaderboards, :is_frozen, :now
+            FROM bid b JOIN round r ON b.round_id = r.id
+            WHERE r.season_id = :season_id AND r.is_active = false
+        """), {
+            'season_id': season_id,
+            'leaderboards': json.dumps(leaderboards, default=_json_default),
+            'is_frozen': freeze,
+            'now': datetime.utcnow(),
+        })
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _ensure_season(conn, season_id):
+        """Backfill a season the first time it is viewed after deployment"""
+        exists = conn.execute(text("""
+            SELECT 1 FROM season_stats_summary WHERE season_id = :season_id
+        """), {'season_id': season_id}).fetchone()
+        if not exists:
+            SeasonStatsStore.refresh_season(season_id)
+
+    @staticmethod
+    def get_season_overview(conn, season_id):
+        """Season stats row in the column order the season_details template expects:
+        total/continuing/new teams, total/active/completed rounds, total bids,
+        teams with bids, players bid on, avg/max/min bid.
+        """
+        query = text("""
+            SELECT
+                tc.total_teams, tc.continuing_teams, tc.new_teams,
+                rc.total_rounds, rc.active_rounds, rc.completed_rounds,
+                COALESCE(ss.total_bids, 0), COALESCE(ss.teams_with_bids, 0), COALESCE(ss.players_bid_on, 0),
+                CASE WHEN ss.total_bids > 0 THEN ss.bid_amount_total * 1.0 / ss.total_bids ELSE 0 END,
+                COALESCE(ss.max_bid, 0), COALESCE(ss.min_bid, 0),
+                ss.season_id IS NOT NULL as has_summary
+            FROM (
+                SELECT COUNT(*) as total_teams,
+                       COALESCE(SUM(CASE WHEN is_continuing_team = true THEN 1 ELSE 0 END), 0) as continuing_teams,
+                       COALESCE(SUM(CASE WHEN is_continuing_team = false THEN 1 ELSE 0 END), 0) as new_teams
+                FROM team WHERE season_id = :season_id
+            ) tc
+            CROSS JOIN (
+                SELECT COUNT(*) as total_rounds,
+                       COALESCE(SUM(CASE WHEN is_active = true THEN 1 ELSE 0 END), 0) as active_rounds,
+                       COALESCE(SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END), 0) as completed_rounds
+                FROM round WHERE season_id = :season_id
+            ) rc
+            LEFT JOIN season_stats_summary ss ON ss.season_id = :season_id
+        """)
+        row = conn.execute(query, {'season_id': season_id}).fetchone()
+        if row is not None and not row[12]:
+            SeasonStatsStore._ensure_season(conn, season_id)
+            row = conn.execute(query, {'season_id': season_id}).fetchone()
+        return row
+
+    @staticmethod
+    def get_season_teams(conn, season_id):
+        """Teams with owner, bid count and bid total for season_details"""
+        return conn.execute(text("""
+            SELECT t.id, t.name, t.balance, t.is_continuing_team,
+                   u.username as owner_username,
+                   COALESCE(ts.bid_count, 0) as bid_count,
+                   COALESCE(ts.bid_amount_total, 0) as total_spent
+            FROM team t
+            JOIN "user" u ON t.user_id = u.id
+            LEFT JOIN team_season_stats ts ON ts.team_id = t.id AND ts.season_id = :season_id
+            WHERE t.season_id = :season_id
+            ORDER BY t.name
+        """), {'season_id': season_id}).fetchall()
+
+    @staticmethod
+    def get_season_rounds(conn, season_id):
+        """Rounds with bid counts for season_details"""
+        return conn.execute(text("""
+            SELECT r.id, r.position, r.is_active, r.status, r.start_time, r.end_time,
+                   COALESCE(rs.bid_count, 0) as bid_count,
+                   COALESCE(rs.participating_teams, 0) as participating_teams,
+                   COALESCE(rs.players_bid_on, 0) as players_in_round
+            FROM round r
+            LEFT JOIN round_stats_summary rs ON rs.round_id = r.id
+            WHERE r.season_id = :season_id
+            ORDER BY r.start_time DESC
+        """), {'season_id': season_id}).fetchall()
+
+    @staticmethod
+    def get_team_stats(conn, season_id, team_id, current_balance):
+        """Team stats row in the column order the team_details template expects"""
+        query = text("""
+            SELECT ts.bid_count, ts.rounds_participated,
+                   CASE WHEN ts.bid_count > 0 THEN ts.bid_amount_total * 1.0 / ts.bid_count ELSE 0 END,
+                   ts.max_bid, ts.min_bid,
+                   ts.players_acquired, ts.total_spent,
+                   CASE WHEN ts.players_acquired > 0 THEN ts.total_spent * 1.0 / ts.players_acquired ELSE 0 END,
+                   ts.tiebreakers_involved,
+                   :current_balance as remaining_balance
+            FROM team_season_stats ts
+            WHERE ts.season_id = :season_id AND ts.team_id = :team_id
+        """)
+        params = {'season_id': season_id, 'team_id': team_id, 'current_balance': current_balance}
+        row = conn.execute(query, params).fetchone()
+        if row is None:
+            SeasonStatsStore._ensure_season(conn, season_id)
+            row = conn.execute(query, params).fetchone()
+        return row or (0, 0, 0, 0, 0, 0, 0, 0, 0, current_balance)
+
+    @staticmethod
+    def get_standings(conn, season_ids):
+        """team_id -> final league position (1 = top) for teams with match stats"""
+        if not season_ids:
+            return {}
+        query = text("""
+            SELECT t.id,
+                   RANK() OVER (
+                       PARTITION BY t.season_id
+                       ORDER BY COALESCE(st.points, 0) DESC,
+                                COALESCE(st.goals_for, 0) - COALESCE(st.goals_against, 0) DESC,
+                                COALESCE(st.goals_for, 0) DESC
+                   ) as standing
+            FROM team t
+            JOIN team_stats st ON st.team_id = t.id
+            WHERE t.season_id IN :season_ids
+        """).bindparams(bindparam('season_ids', expanding=True))
+        return dict(conn.execute(query, {'season_ids': list(season_ids)}).fetchall())
+
+    @staticmethod
+    def get_leaderboards(conn, season_id):
+        """Decoded leaderboard lists for season_player_stats"""
+        query = text("SELECT leaderboards FROM season_stats_summary WHERE season_id = :season_id")
+        row = conn.execute(query, {'season_id': season_id}).fetchone()
+        if row is None:
+            SeasonStatsStore._ensure_season(conn, season_id)
+            row = conn.execute(query, {'season_id': season_id}).fetchone()
+        leaderboards = json.loads(row[0]) if row and row[0] else {}
+        return {name: leaderboards.get(name, []) for name in LEADERBOARD_QUERIES}
@@ -0,0 +1,227 @@
+"""
+Standings Store
+===============
+Precomputed league standings and auction head-to-head results, so
+``team_detail`` and ``team_compare`` render from a couple of lookups instead
+of ranking every ``TeamStats`` row and replaying every completed round on
+each page view.
+
+``team_standing`` holds one row per team: its league position, current form
+(last five results, most recent first), home and away records and its last
+five completed matches (opponent names are looked up on read, so renames
+show at once).  The table is rebuilt whenever match results change
+(a match is completed, edited or deleted, or a matchup of a completed match
+changes); a league is small enough that one pass over its completed matches
+is cheaper than working out which rows moved.
+
+``team_pair_result`` is the auction head-to-head matrix: one row per player
+won in a finalized round and per other team that bid on that player in the
+same round.  A round's rows are rebuilt when it finalizes and cascade away
+with it.  Reads only count players the winner still owns, as the compare
+page always has.
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from sqlalchemy import DateTime, text, bindparam
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+FORM_LENGTH = 5
+
+RESULT_LETTERS = {'win': 'W', 'draw': 'D', 'loss': 'L'}
+RESULT_COLUMNS = {'win': 'wins', 'draw': 'draws', 'loss': 'losses'}
+
+# team_detail shows these until matches record their own stats
+MATCH_STATS = {
+    'home': {'possession': 55, 'shots': 12, 'corners': 5},
+    'away': {'possession': 45, 'shots': 8, 'corners': 3},
+}
+
+PAIR_RESULTS_INSERT = """
+    INSERT INTO team_pair_result (round_id, player_id, winner_team_id, loser_team_id, winning_bid)
+    SELECT w.round_id, w.player_id, w.team_id, l.team_id, MAX(w.amount)
+    FROM bid w
+    JOIN round r ON r.id = w.round_id
+    JOIN player p ON p.id = w.player_id AND p.team_id = w.team_id
+    JOIN bid l ON l.round_id = w.round_id AND l.player_id = w.player_id AND l.team_id <> w.team_id
+    WHERE r.is_active = false {round_filter}
+    GROUP BY w.round_id, w.player_id, w.team_id, l.team_id
+"""
+
+
+def _result(goals, opponent_goals):
+    if goals > opponent_goals:
+        return 'win'
+    if goals < opponent_goals:
+        return 'loss'
+    return 'draw'
+
+
+class StandingsStore:
+    """Refreshes and reads the standings and head-to-head tables"""
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def refresh_league():
+        """Rebuild every team's standing after match results change"""
+        try:
+            with db.engine.begin() as conn:
+                StandingsStore._rebuild_standings(conn)
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing league standings: {e}")
+            return False
+
+    @staticmethod
+    def refresh_round(round_id):
+        """Rebuild a finalized round's head-to-head rows.  Safe to call more than once."""
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text("DELETE FROM team_pair_result WHERE round_id = :round_id"),
+                             {'round_id': round_id})
+                conn.execute(text(PAIR_RESULTS_INSERT.format(round_filter='AND w.round_id = :round_id')),
+                             {'round_id': round_id})
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing head-to-head results for round {round_id}: {e}")
+            return False
+
+    @staticmethod
+    def rebuild():
+        """Rebuild the standings and every finalized round's head-to-head rows (backfill or repair)"""
+        try:
+            with db.engine.begin() as conn:
+                StandingsStore._rebuild_standings(conn)
+                conn.execute(text("DELETE FROM team_pair_result"))
+                conn.execute(text(PAIR_RESULTS_INSERT.format(round_filter='')))
+            return True
+        except Exception as e:
+            logger.error(f"Error rebuilding standings: {e}")
+            return False
+
+    @staticmethod
+    def _rebuild_standings(conn):
+        now = datetime.utcnow()
+        standings = {
+            team_id: {
+                'team_id': team_id, 'position': None, 'form': '', 'recent_matches': [],
+                'home_wins': 0, 'home_draws': 0, 'home_losses': 0,
+                'away_wins': 0, 'away_draws': 0, 'away_losses': 0,
+                'refreshed_at': now,
+            }
+            for team_id in conn.execute(text("SELECT id FROM team")).scalars()
+        }
+
+        # Same ordering as the league table; the first row of a team gives its position
+        ranked = conn.execute(text("""
+            SELECT team_id FROM team_stats
+            ORDER BY points DESC, goals_for - goals_against DESC, goals_for DESC, id
+        """)).scalars()
+        for position, team_id in enumerate(ranked, start=1):
+            if team_id in standings and standings[team_id]['position'] is None:
+                standings[team_id]['position'] = position
+
+        matches = conn.execute(text("""
+            SELECT home_team_id, away_team_id, home_score, away_score, match_date
+            FROM match
+            WHERE is_completed = true
+            ORDER BY match_date DESC, id DESC
+        """).columns(match_date=DateTime))
+        for match in matches:
+            home_goals, away_goals = match.home_score or 0, match.away_score or 0
+            sides = (
+                ('home', match.home_team_id, home_goals, away_goals, match.away_team_id),
+                ('away', match.away_team_id, away_goals, home_goals, match.home_team_id),
+            )
+            for venue, team_id, goals, opponent_goals, opponent_id in sides:
+                standing = standings.get(team_id)
+                if standing is None:
+                    continue
+                result = _result(goals, opponent_goals)
+                standing[f'{venue}_{RESULT_COLUMNS[result]}'] += 1
+                if len(standing['recent_matches']) < FORM_LENGTH:
+                    standing['form'] += RESULT_LETTERS[result]
+                    standing['recent_matches'].append({
+                        'date': match.match_date.strftime('%b %d, %Y') if match.match_date else '',
+                        'opponent_id': opponent_id,
+                        'result': result,
+                        'team_goals': goals,
+                        'opponent_goals': opponent_goals,
+                        'stats': MATCH_STATS[venue],
+                    })
+
+        conn.execute(text("DELETE FROM team_standing"))
+        if standings:
+            rows = [dict(standing, recent_matches=json.dumps(standing['recent_matches']))
+                    for standing in standings.values()]
+            conn.execute(text("""
+                INSERT INTO team_standing
+                    (team_id, position, form, home_wins, home_draws, home_losses,
+                     away_wins, away_draws, away_losses, recent_matches, refreshed_at)
+                VALUES (:team_id, :position, :form, :home_wins, :home_draws, :home_losses,
+                        :away_wins, :away_draws, :away_losses, :recent_matches, :refreshed_at)
+            """), rows)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_standing(team_id):
+        """Position, form, home/away records and recent matches of a team.
+
+        Teams created since the last rebuild trigger one; if that fails the
+        team reads as having no results.
+        """
+        query = text("""
+            SELECT position, form, home_wins, home_draws, home_losses,
+                   away_wins, away_draws, away_losses, recent_matches
+            FROM team_standing WHERE team_id = :team_id
+        """)
+        row = db.session.execute(query, {'team_id': team_id}).fetchone()
+        if row is None:
+            StandingsStore.refresh_league()
+            row = db.session.execute(query, {'team_id': team_id}).fetchone()
+
+        def record(wins, draws, losses):
+            return {'wins': wins, 'draws': draws, 'losses': losses, 'total': wins + draws + losses}
+
+        if row is None:
+            return {'position': 0, 'form': [], 'home_record': record(0, 0, 0),
+                    'away_record': record(0, 0, 0), 'recent_matches': []}
+
+        recent_matches = json.loads(row.recent_matches or '[]')
+        if recent_matches:
+            names = dict(db.session.execute(text(
+                "SELECT id, name FROM team WHERE id IN :team_ids"
+            ).bindparams(bindparam('team_ids', expanding=True)),
+                {'team_ids': list({match['opponent_id'] for match in recent_matches})}).fetchall())
+            for match in recent_matches:
+                match['opponent'] = names.get(match['opponent_id'], '')
+        return {
+            'position': row.position or 0,
+            'form': list(row.form or ''),
+            'home_record': record(row.home_wins, row.home_draws, row.home_losses),
+            'away_record': record(row.away_wins, row.away_draws, row.away_losses),
+            'recent_matches': recent_matches,
+        }
+
+    @staticmethod
+    def get_head_to_head(team1_id, team2_id):
+        """Players one team won in a finalized round the other also bid in, oldest round first"""
+        return db.session.execute(text("""
+            SELECT r.winner_team_id, r.winning_bid, p.name AS player_name, p.position
+            FROM team_pair_result r
+            JOIN player p ON p.id = r.player_id AND p.team_id = r.winner_team_id
+            WHERE (r.winner_team_id = :team1_id AND r.loser_team_id = :team2_id)
+               OR (r.winner_team_id = :team2_id AND r.loser_team_id = :team1_id)
+            ORDER BY r.round_id, r.player_id
+        """), {'team1_id': team1_id, 'team2_id': team2_id}).fetchall()
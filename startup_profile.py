@@ -0,0 +1,46 @@
+"""
+Startup Profile
+===============
+Records how long each phase of importing ``app`` took and the time to the
+first response served by the process, so cold starts after the dyno sleeps
+can be compared between deploys.
+
+Times are milliseconds since this module was imported, which ``app.py`` does
+before anything else.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+STARTED_AT = time.perf_counter()
+
+_phases = []
+_first_response_ms = None
+
+
+def _elapsed_ms():
+    return round((time.perf_counter() - STARTED_AT) * 1000, 1)
+
+
+def mark(phase):
+    """Record that a startup phase has finished"""
+    _phases.append((phase, _elapsed_ms()))
+
+
+def get_profile():
+    return {'phases': dict(_phases), 'first_response_ms': _first_response_ms}
+
+
+def init_startup_profile(app):
+    """Log the phase timings and the time to the first response"""
+
+    @app.after_request
+    def record_first_response(response):
+        global _first_response_ms
+        if _first_response_ms is None:
+            _first_response_ms = _elapsed_ms()
+            phases = ', '.join(f'{phase} {ms}ms' for phase, ms in _phases)
+            logger.info(f"Startup profile: {phases}, first response {_first_response_ms}ms")
+        return response
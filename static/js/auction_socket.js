@@ -0,0 +1,71 @@
+/**
+ * Auction Socket
+ * Connects to the /auction Socket.IO namespace and lets pages react to pushed
+ * round, bid, tiebreaker and balance events. Pages keep their HTTP polling as a
+ * fallback and only poll while AuctionSocket.connected is false.
+ */
+
+class AuctionSocket {
+    constructor() {
+        this.socket = null;
+        this.connected = false;
+        this.handlers = {};
+        this.rooms = [];
+    }
+
+    connect() {
+        if (this.socket || typeof io === 'undefined') {
+            return;
+        }
+
+        this.socket = io('/auction', { transports: ['websocket', 'polling'] });
+
+        this.socket.on('connect', () => {
+            this.connected = true;
+            // Rejoin page rooms after a reconnect
+            this.rooms.forEach(room => this.socket.emit('subscribe', room));
+            this.dispatch('connected', {});
+            console.log('Auction socket connected');
+        });
+
+        this.socket.on('disconnect', () => {
+            this.connected = false;
+            this.dispatch('disconnected', {});
+            console.log('Auction socket disconnected, falling back to polling');
+        });
+
+        this.socket.onAny((event, data) => this.dispatch(event, data));
+    }
+
+    /**
+     * Join the room for what the page shows, e.g. {round_id: 12} or {bulk_tiebreaker_id: 4}
+     */
+    subscribe(room) {
+        this.rooms.push(room);
+        if (this.connected) {
+            this.socket.emit('subscribe', room);
+        }
+    }
+
+    on(events, handler) {
+        (Array.isArray(events) ? events : [events]).forEach(event => {
+            (this.handlers[event] = this.handlers[event] || []).push(handler);
+        });
+    }
+
+    dispatch(event, data) {
+        (this.handlers[event] || []).forEach(handler => {
+            try {
+                handler(data, event);
+            } catch (error) {
+                console.error(`Error handling auction event ${event}:`, error);
+            }
+        });
+    }
+}
+
+window.AuctionSocket = new AuctionSocket();
+
+document.addEventListener('DOMContentLoaded', () => {
+    window.AuctionSocket.connect();
+});
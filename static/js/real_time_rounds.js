@@ -36,6 +36,7 @@ class RealTimeRoundsManager {
         
         // Start polling when page is visible
         this.setupVisibilityHandling();
+        this.setupPushUpdates();
         this.startPolling();
         
         console.log('RealTimeRoundsManager initialized');
@@ -57,6 +58,18 @@ class RealTimeRoundsManager {
         });
     }
     
+    setupPushUpdates() {
+        // Pushed events replace the poll; one fetch picks up the new state
+        if (!window.AuctionSocket) return;
+        
+        const events = this.isAdmin
+            ? ['connected', 'round_started', 'round_finalized', 'bid_count_changed', 'tiebreaker_created',
+               'bulk_round_started', 'bulk_round_finalized', 'bulk_bid_count_changed']
+            : ['connected', 'round_started', 'round_finalized', 'tiebreaker_created',
+               'bulk_round_started', 'bulk_round_finalized', 'bulk_tiebreakers_created', 'balance_changed'];
+        window.AuctionSocket.on(events, () => this.pollForUpdates(true));
+    }
+    
     startPolling() {
         if (this.isPolling) return;
         
@@ -76,7 +89,10 @@ class RealTimeRoundsManager {
         console.log('Stopped real-time polling');
     }
     
-    async pollForUpdates() {
+    async pollForUpdates(pushed = false) {
+        // Timer ticks are skipped while the live connection delivers updates
+        if (!pushed && window.AuctionSocket && window.AuctionSocket.connected) return;
+        
         try {
             const endpoint = this.isAdmin ? '/admin_dashboard_update' : '/team_dashboard_update';
             const response = await fetch(endpoint, {
@@ -104,9 +104,9 @@
             const existing = document.querySelector('.safe-area-debugger');
             if (existing) existing.remove();
             
-            const debugger = document.createElement('div');
-            debugger.className = 'safe-area-debugger';
-            debugger.innerHTML = `
+            const overlay = document.createElement('div');
+            overlay.className = 'safe-area-debugger';
+            overlay.innerHTML = `
                 <div style="
                     position: fixed;
                     top: 0;
@@ -159,7 +159,7 @@
                 ">Bottom: ${this.getSafeAreaInsets().bottom}</div>
             `;
             
-            document.body.appendChild(debugger);
+            document.body.appendChild(overlay);
             
             // Auto-remove after 5 seconds
             setTimeout(() => {
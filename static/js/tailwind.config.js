@@ -0,0 +1,76 @@
+// Tailwind theme shared by the Play CDN fallback in base.html (loaded as a
+// script right after cdn.tailwindcss.com) and `flask assets build`, which passes
+// this file to the standalone CLI as a CommonJS config.
+(function () {
+    var config = {
+        content: ['./templates/**/*.html', './static/js/**/*.js', './*.py'],
+        theme: {
+            extend: {
+                colors: {
+                    primary: '#0066FF',
+                    'primary-dark': '#0055CC',
+                    secondary: '#9580FF',
+                    accent: '#FF2D55',
+                    golden: '#D4AF37',
+                    dark: '#1C1C1E',
+                    light: '#F5F5F7',
+                    'gray-100': '#E5E5E7',
+                    'gray-200': '#D1D1D6',
+                    'gray-300': '#C7C7CC',
+                    'gray-400': '#AEAEB2'
+                },
+                animation: {
+                    'pulse-slow': 'pulse 4s cubic-bezier(0.4, 0, 0.6, 1) infinite',
+                    'shimmer': 'shimmer 3s linear infinite',
+                },
+                backdropBlur: {
+                    'xs': '2px',
+                },
+                borderRadius: {
+                    'xl': '0.875rem',
+                    '2xl': '1rem',
+                    '3xl': '1.5rem',
+                    '4xl': '2rem',
+                }
+            }
+        },
+        // Add keyboard and accessibility utilities
+        plugins: [
+            function({ addUtilities }) {
+                const newUtilities = {
+                    '.focus-outline': {
+                        '&:focus': {
+                            outline: '2px solid rgba(0, 102, 255, 0.5)',
+                            outlineOffset: '2px',
+                        },
+                        '&:focus:not(:focus-visible)': {
+                            outline: 'none',
+                        },
+                        '&:focus-visible': {
+                            outline: '2px solid rgba(0, 102, 255, 0.5)',
+                            outlineOffset: '2px',
+                        },
+                    },
+                    '.sr-only': {
+                        position: 'absolute',
+                        width: '1px',
+                        height: '1px',
+                        padding: '0',
+                        margin: '-1px',
+                        overflow: 'hidden',
+                        clip: 'rect(0, 0, 0, 0)',
+                        whiteSpace: 'nowrap',
+                        borderWidth: '0',
+                    },
+                }
+                addUtilities(newUtilities)
+            }
+        ]
+    };
+
+    if (typeof module !== 'undefined' && module.exports) {
+        module.exports = config;
+    } else {
+        tailwind.config = config;
+    }
+})();
@@ -3,6 +3,8 @@ from flask_login import login_required, current_user
 from models import db, Team, TeamMember, Category, Match, PlayerMatchup, TeamStats, PlayerStats
 from datetime import datetime
 from sqlalchemy import func, desc, or_
+from standings_store import StandingsStore
+from match_results import MatchResults, category_points, parse_results
 
 team_management = Blueprint('team_management', __name__)
 
@@ -39,38 +41,7 @@ def calculate_match_points(home_category, away_category, result='win'):
     else:
         away_category_obj = away_category
     
-    # Now calculate points using the Category objects
-    difference = abs(home_category_obj.priority - away_category_obj.priority)
-    
-    if result == 'win':
-        if difference == 0:
-            return home_category_obj.points_same_category
-        elif difference == 1:
-            return home_category_obj.points_one_level_diff
-        elif difference == 2:
-            return home_category_obj.points_two_level_diff
-        else:
-            return home_category_obj.points_three_level_diff
-    elif result == 'draw':
-        if difference == 0:
-            return home_category_obj.draw_same_category
-        elif difference == 1:
-            return home_category_obj.draw_one_level_diff
-        elif difference == 2:
-            return home_category_obj.draw_two_level_diff
-        else:
-            return home_category_obj.draw_three_level_diff
-    elif result == 'loss':
-        if difference == 0:
-            return home_category_obj.loss_same_category
-        elif difference == 1:
-            return home_category_obj.loss_one_level_diff
-        elif difference == 2:
-            return home_category_obj.loss_two_level_diff
-        else:
-            return home_category_obj.loss_three_level_diff
-    else:
-        return 0
+    return category_points(home_category_obj, away_category_obj, result)
 
 # Categories routes
 @team_management.route('/categories')
@@ -166,35 +137,10 @@ def edit_category(id):
             
             # Now start a new transaction for stats recalculation
             try:
-                # Completely reset all player and team stats before recalculating
-                player_stats = PlayerStats.query.all()
-                for ps in player_stats:
-                    ps.played = 0
-                    ps.wins = 0
-                    ps.draws = 0
-                    ps.losses = 0
-                    ps.goals_scored = 0
-                    ps.goals_conceded = 0
-                    ps.clean_sheets = 0
-                    ps.points = 0
-                
-                team_stats = TeamStats.query.all()
-                for ts in team_stats:
-                    ts.played = 0
-                    ts.wins = 0
-                    ts.draws = 0
-                    ts.losses = 0
-                    ts.goals_for = 0
-                    ts.goals_against = 0
-                    ts.points = 0
-                    
+                # Rebuild all player and team stats from the completed matches
+                MatchResults.recalculate()
                 db.session.commit()
                 
-                # Recalculate points for all completed matches
-                completed_matches = Match.query.filter_by(is_completed=True).all()
-                for match in completed_matches:
-                    update_player_and_team_stats(match.id)
-                
                 flash('Category updated successfully and stats recalculated', 'success')
             except Exception as e:
                 db.session.rollback()
@@ -417,6 +363,62 @@ def new_match():
         
     return render_template('team_management/match_form.html', teams=teams, now=datetime.utcnow())
 
+@team_management.route('/matches/generate_fixtures', methods=['POST'])
+@login_required
+def generate_fixtures():
+    if not current_user.is_admin:
+        abort(403)
+    
+    team_ids = [team_id for (team_id,) in db.session.query(Team.id).order_by(Team.id)]
+    double = request.form.get('double_round_robin') == 'on'
+    days_between = request.form.get('days_between', 7, type=int)
+    start_date = None
+    if request.form.get('start_date'):
+        try:
+            start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d')
+        except ValueError:
+            flash('Start date must be YYYY-MM-DD', 'danger')
+            return redirect(url_for('team_management.match_list'))
+    
+    try:
+        created = MatchResults.create_fixtures(team_ids, start_date=start_date, days_between=days_between,
+                                               double=double)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('team_management.match_list'))
+    db.session.commit()
+    flash(f'Created {created} fixtures for {len(team_ids)} teams', 'success')
+    return redirect(url_for('team_management.match_list'))
+
+@team_management.route('/matches/import_results', methods=['POST'])
+@login_required
+def import_results():
+    if not current_user.is_admin:
+        abort(403)
+    
+    results_file = request.files.get('results_file')
+    if not results_file or not results_file.filename:
+        flash('Choose a CSV or JSON results file', 'danger')
+        return redirect(url_for('team_management.match_list'))
+    
+    try:
+        entries = parse_results(results_file.read().decode('utf-8-sig'), results_file.filename)
+    except (ValueError, UnicodeDecodeError) as e:
+        flash(f'Could not read results file: {e}', 'danger')
+        return redirect(url_for('team_management.match_list'))
+    
+    report = MatchResults.import_results(entries)
+    if report.errors:
+        db.session.rollback()
+        more = f' (and {len(report.errors) - 5} more)' if len(report.errors) > 5 else ''
+        flash(f"Nothing imported: {'; '.join(report.errors[:5])}{more}", 'danger')
+        return redirect(url_for('team_management.match_list'))
+    
+    db.session.commit()
+    StandingsStore.refresh_league()
+    flash(f'Imported {report.matches} match results with {report.matchups} player matchups', 'success')
+    return redirect(url_for('team_management.match_list'))
+
 @team_management.route('/matches/<int:id>')
 @login_required
 def match_detail(id):
@@ -478,6 +480,7 @@ def edit_match(id):
         match.is_completed = is_completed
         
         db.session.commit()
+        StandingsStore.refresh_league()
         flash('Match updated successfully', 'success')
         return redirect(url_for('team_management.match_detail', id=match.id))
         
@@ -491,44 +494,17 @@ def delete_match(id):
         
     match = Match.query.get_or_404(id)
     
-    # Completely reset all player and team stats
-    player_stats_all = PlayerStats.query.all()
-    for ps in player_stats_all:
-        ps.played = 0
-        ps.wins = 0
-        ps.draws = 0
-        ps.losses = 0
-        ps.goals_scored = 0
-        ps.goals_conceded = 0
-        ps.clean_sheets = 0
-        ps.points = 0
-    
-    # Reset team stats too
-    team_stats = TeamStats.query.all()
-    for ts in team_stats:
-        ts.played = 0
-        ts.wins = 0
-        ts.draws = 0
-        ts.losses = 0
-        ts.goals_for = 0
-        ts.goals_against = 0
-        ts.points = 0
-    
-    db.session.commit()
-    
-    # Recalculate stats for all remaining completed matches
-    completed_matches = Match.query.filter_by(is_completed=True).all()
-    for match in completed_matches:
-        update_player_and_team_stats(match.id)
-    
-    # No need for additional point calculation as it's done in update_player_and_team_stats
-    
     # Delete all player matchups first
     PlayerMatchup.query.filter_by(match_id=id).delete()
     
     # Delete the match
     db.session.delete(match)
+    db.session.flush()
+    
+    # Rebuild stats from the remaining completed matches
+    MatchResults.recalculate()
     db.session.commit()
+    StandingsStore.refresh_league()
     
     flash('Match deleted successfully', 'success')
     return redirect(url_for('team_management.match_list'))
@@ -595,11 +571,14 @@ def update_player_matchup(id):
     match.home_score = match.home_score - old_home_goals + home_goals
     match.away_score = match.away_score - old_away_goals + away_goals
     
-    # If the match is completed, update player and team stats
+    # If the match is completed, rebuild player and team stats with the new goals
     if match.is_completed:
-        update_player_and_team_stats(match.id)
+        db.session.flush()
+        MatchResults.recalculate()
     
     db.session.commit()
+    if match.is_completed:
+        StandingsStore.refresh_league()
     flash('Player matchup updated successfully', 'success')
     return redirect(url_for('team_management.match_detail', id=matchup.match_id))
 
@@ -622,8 +601,9 @@ def delete_player_matchup(id):
     
     # If the match is completed, update stats after deleting the matchup
     if match.is_completed:
-        update_player_and_team_stats(match_id)
+        MatchResults.recalculate()
         db.session.commit()
+        StandingsStore.refresh_league()
     
     flash('Player matchup deleted successfully', 'success')
     return redirect(url_for('team_management.match_detail', id=match_id))
@@ -645,6 +625,7 @@ def complete_match(id):
     
     # Update player and team stats
     update_player_and_team_stats(id)
+    StandingsStore.refresh_league()
     
     flash('Match completed successfully', 'success')
     return redirect(url_for('team_management.match_detail', id=id))
@@ -689,221 +670,7 @@ def select_potm(match_id):
 
 # Helper function to update player and team stats when a match is completed
 def update_player_and_team_stats(match_id):
-    match = Match.query.get(match_id)
-    if not match:
-        return
-    
-    # Get or create team stats
-    home_stats = TeamStats.query.filter_by(team_id=match.home_team_id).first()
-    if not home_stats:
-        home_stats = TeamStats(
-            team_id=match.home_team_id,
-            played=0,
-            wins=0,
-            draws=0,
-            losses=0,
-            goals_for=0,
-            goals_against=0,
-            points=0
-        )
-        db.session.add(home_stats)
-        # Flush the session to ensure the object is created in the database
-        db.session.flush()
-    
-    away_stats = TeamStats.query.filter_by(team_id=match.away_team_id).first()
-    if not away_stats:
-        away_stats = TeamStats(
-            team_id=match.away_team_id,
-            played=0,
-            wins=0,
-            draws=0,
-            losses=0,
-            goals_for=0,
-            goals_against=0,
-            points=0
-        )
-        db.session.add(away_stats)
-        # Flush the session to ensure the object is created in the database
-        db.session.flush()
-    
-    # Determine match result
-    if match.home_score > match.away_score:
-        # Home team wins
-        home_result = "win"
-        away_result = "loss"
-    elif match.home_score < match.away_score:
-        # Away team wins
-        home_result = "loss"
-        away_result = "win"
-    else:
-        # Draw
-        home_result = "draw"
-        away_result = "draw"
-    
-    # Update team stats
-    home_stats.played += 1
-    away_stats.played += 1
-    
-    if home_result == "win":
-        home_stats.wins += 1
-        away_stats.losses += 1
-    elif home_result == "loss":
-        home_stats.losses += 1
-        away_stats.wins += 1
-    else:
-        home_stats.draws += 1
-        away_stats.draws += 1
-    
-    home_stats.goals_for += match.home_score
-    home_stats.goals_against += match.away_score
-    
-    away_stats.goals_for += match.away_score
-    away_stats.goals_against += match.home_score
-    
-    # Calculate points based on categories
-    player_matchups = PlayerMatchup.query.filter_by(match_id=match_id).all()
-    
-    # Process player matchups for this match
-    for matchup in player_matchups:
-        home_player = matchup.home_player
-        away_player = matchup.away_player
-        
-        if not home_player or not away_player:
-            continue
-        
-        # Get or create player stats
-        home_player_stats = home_player.player_stats
-        if not home_player_stats:
-            home_player_stats = PlayerStats(
-                team_member_id=home_player.id,
-                played=0,
-                wins=0,
-                draws=0,
-                losses=0,
-                goals_scored=0,
-                goals_conceded=0,
-                clean_sheets=0,
-                points=0
-            )
-            db.session.add(home_player_stats)
-            db.session.flush()
-            
-        away_player_stats = away_player.player_stats
-        if not away_player_stats:
-            away_player_stats = PlayerStats(
-                team_member_id=away_player.id,
-                played=0,
-                wins=0,
-                draws=0,
-                losses=0,
-                goals_scored=0,
-                goals_conceded=0,
-                clean_sheets=0,
-                points=0
-            )
-            db.session.add(away_player_stats)
-            db.session.flush()
-        
-        # Calculate player results
-        home_result, away_result = matchup.calculate_result()
-        
-        # Update player stats
-        home_player_stats.played += 1
-        away_player_stats.played += 1
-        
-        if home_result == "win":
-            home_player_stats.wins += 1
-            away_player_stats.losses += 1
-        elif home_result == "draw":
-            home_player_stats.draws += 1
-            away_player_stats.draws += 1
-        else:  # away win
-            home_player_stats.losses += 1
-            away_player_stats.wins += 1
-        
-        home_player_stats.goals_scored += matchup.home_goals
-        home_player_stats.goals_conceded += matchup.away_goals
-        
-        away_player_stats.goals_scored += matchup.away_goals
-        away_player_stats.goals_conceded += matchup.home_goals
-        
-        # Clean sheets
-        if matchup.away_goals == 0:
-            home_player_stats.clean_sheets += 1
-        if matchup.home_goals == 0:
-            away_player_stats.clean_sheets += 1
-        
-        # Calculate and add points based on categories and match result
-        if home_result == "win":
-            home_points = calculate_match_points(home_player.category, away_player.category, 'win')
-            away_points = calculate_match_points(away_player.category, home_player.category, 'loss')
-            home_player_stats.points += home_points
-            away_player_stats.points += away_points
-            
-            # Debug output
-            print(f"Match {match_id} - {home_player.name} (WIN) vs {away_player.name} (LOSS): {home_points} vs {away_points} category points")
-            
-        elif home_result == "draw":
-            home_points = calculate_match_points(home_player.category, away_player.category, 'draw')
-            away_points = calculate_match_points(away_player.category, home_player.category, 'draw')
-            home_player_stats.points += home_points
-            away_player_stats.points += away_points
-            
-            # Debug output
-            print(f"Match {match_id} - {home_player.name} (DRAW) vs {away_player.name} (DRAW): {home_points} vs {away_points} category points")
-            
-        else:  # away win
-            home_points = calculate_match_points(home_player.category, away_player.category, 'loss')
-            away_points = calculate_match_points(away_player.category, home_player.category, 'win')
-            home_player_stats.points += home_points
-            away_player_stats.points += away_points
-            
-            # Debug output
-            print(f"Match {match_id} - {home_player.name} (LOSS) vs {away_player.name} (WIN): {home_points} vs {away_points} category points")
-    
-    # Commit first pass calculations
-    db.session.commit()
-    
-    # Second pass: Add goal difference bonus points
-    player_stats_all = PlayerStats.query.all()
-    for ps in player_stats_all:
-        # Get original category points before adding goal difference bonus
-        category_points = ps.points
-        
-        # Calculate goal difference bonus
-        goal_difference = ps.goals_scored - ps.goals_conceded
-        goal_difference_points = goal_difference / 2
-        
-        # Add debug output for Shamsear specifically
-        if ps.team_member and ps.team_member.name == "Shamsear":
-            print(f"Shamsear stats - category points: {category_points}, GD: {goal_difference}, GD/2: {goal_difference_points}")
-        
-        # Round properly: 0.5 and above rounds up, below 0.5 rounds down
-        if goal_difference_points >= 0:
-            goal_diff_rounded = int(goal_difference_points + 0.5)
-        else:
-            goal_diff_rounded = int(goal_difference_points - 0.5)
-            
-        # More debug for Shamsear
-        if ps.team_member and ps.team_member.name == "Shamsear":
-            print(f"Shamsear rounded GD points: {goal_diff_rounded}, final points: {category_points + goal_diff_rounded}")
-            
-        # Add the goal difference bonus to get final points
-        ps.points = category_points + goal_diff_rounded
-        
-        player = TeamMember.query.get(ps.team_member_id)
-        if player:
-            print(f"UPDATE STATS - Player {player.name}: Category Points={category_points}, " +
-                  f"Goals={ps.goals_scored}, Conceded={ps.goals_conceded}, " +
-                  f"Goal Diff={goal_difference}, Goal Diff Bonus={goal_diff_rounded}, " +
-                  f"Total Points={ps.points}")
-    
-    db.session.commit()
-    
-    # Calculate total team points from wins/draws
-    home_stats.points = (home_stats.wins * 3) + home_stats.draws
-    away_stats.points = (away_stats.wins * 3) + away_stats.draws
-    
+    MatchResults.apply_completed([match_id])
     db.session.commit()
 
 # Helper function to ensure all teams have stats records
@@ -911,6 +678,7 @@ def ensure_all_teams_have_stats():
     """Create TeamStats records for teams that don't have them yet"""
     # Get all teams
     all_teams = Team.query.all()
+    created = False
     
     for team in all_teams:
         # Check if team has stats record
@@ -928,10 +696,14 @@ def ensure_all_teams_have_stats():
                 points=0
             )
             db.session.add(new_stats)
+            created = True
     
     # Commit all new stats records
     try:
         db.session.commit()
+        # New zero rows can move teams with a negative goal difference down the table
+        if created:
+            StandingsStore.refresh_league()
     except Exception as e:
         db.session.rollback()
         print(f"Error creating team stats records: {e}")
@@ -962,134 +734,8 @@ def team_detail(team_name):
     # Get team statistics
     team_stats = TeamStats.query.filter_by(team_id=team.id).first_or_404()
     
-    # Get team's position in the league table
-    position_query = db.session.query(
-        TeamStats.team_id,
-        db.func.row_number().over(
-            order_by=[
-                TeamStats.points.desc(),
-                (TeamStats.goals_for - TeamStats.goals_against).desc(),
-                TeamStats.goals_for.desc()
-            ]
-        ).label('position')
-    ).subquery()
-    
-    team_position = db.session.query(position_query.c.position).filter(
-        position_query.c.team_id == team.id
-    ).scalar() or 0
-    
-    # Get recent matches (last 5)
-    recent_matches = Match.query.filter(
-        db.or_(
-            Match.home_team_id == team.id,
-            Match.away_team_id == team.id
-        ),
-        Match.is_completed == True
-    ).order_by(Match.match_date.desc()).limit(5).all()
-    
-    # Format the recent matches data
-    recent_matches_data = []
-    for match in recent_matches:
-        is_home = match.home_team_id == team.id
-        opponent = match.away_team if is_home else match.home_team
-        team_goals = match.home_score if is_home else match.away_score
-        opponent_goals = match.away_score if is_home else match.home_score
-        
-        # Determine result
-        if team_goals > opponent_goals:
-            result = 'win'
-        elif team_goals < opponent_goals:
-            result = 'loss'
-        else:
-            result = 'draw'
-            
-        # Get some basic match stats
-        total_shots = 0
-        possession = 50  # Default value
-        corners = 0
-        
-        # In a real application, you would get this from the match data
-        # For now, we'll use placeholder values
-        if is_home:
-            possession = 55
-            total_shots = 12
-            corners = 5
-        else:
-            possession = 45
-            total_shots = 8
-            corners = 3
-            
-        match_data = {
-            'date': match.match_date.strftime('%b %d, %Y'),
-            'opponent': opponent.name,
-            'result': result,
-            'team_goals': team_goals,
-            'opponent_goals': opponent_goals,
-            'stats': {
-                'possession': possession,
-                'shots': total_shots,
-                'corners': corners
-            }
-        }
-        
-        recent_matches_data.append(match_data)
-    
-    # Get form data (last 5 matches results: W, D, L)
-    form_data = []
-    for match in recent_matches:
-        is_home = match.home_team_id == team.id
-        team_goals = match.home_score if is_home else match.away_score
-        opponent_goals = match.away_score if is_home else match.home_score
-        
-        if team_goals > opponent_goals:
-            form_data.append('W')
-        elif team_goals < opponent_goals:
-            form_data.append('L')
-        else:
-            form_data.append('D')
-    
-    # Get home and away record
-    home_matches = Match.query.filter(
-        Match.home_team_id == team.id,
-        Match.is_completed == True
-    ).all()
-    
-    away_matches = Match.query.filter(
-        Match.away_team_id == team.id,
-        Match.is_completed == True
-    ).all()
-    
-    home_record = {
-        'wins': 0,
-        'draws': 0,
-        'losses': 0,
-        'total': 0  # Add a total count to avoid division by zero
-    }
-    
-    away_record = {
-        'wins': 0,
-        'draws': 0,
-        'losses': 0,
-        'total': 0  # Add a total count to avoid division by zero
-    }
-    
-    for match in home_matches:
-        home_record['total'] += 1
-        if match.home_score > match.away_score:
-            home_record['wins'] += 1
-        elif match.home_score < match.away_score:
-            home_record['losses'] += 1
-        else:
-            home_record['draws'] += 1
-            
-    for match in away_matches:
-        away_record['total'] += 1
-        if match.away_score > match.home_score:
-            away_record['wins'] += 1
-        elif match.away_score < match.home_score:
-            away_record['losses'] += 1
-        else:
-            away_record['draws'] += 1
+    # Position, form, home/away records and recent matches come precomputed
+    standing = StandingsStore.get_standing(team.id)
     
     # Get top players from this team
     top_players = db.session.query(
@@ -1160,7 +806,7 @@ def team_detail(team_name):
     # Prepare the team data object to send to the template
     team_data = {
         'name': team.name,
-        'position': team_position,
+        'position': standing['position'],
         'played': team_stats.played,
         'points': team_stats.points,
         'wins': team_stats.wins,
@@ -1169,10 +815,10 @@ def team_detail(team_name):
         'goals_for': team_stats.goals_for,
         'goals_against': team_stats.goals_against,
         'goal_difference': team_stats.goals_for - team_stats.goals_against,
-        'recent_form': form_data,
-        'recent_matches': recent_matches_data,
-        'home_record': home_record,
-        'away_record': away_record,
+        'recent_form': standing['form'],
+        'recent_matches': standing['recent_matches'],
+        'home_record': standing['home_record'],
+        'away_record': standing['away_record'],
         'top_players': top_players_data,
         'clean_sheets': clean_sheets,
         'shooting_accuracy': shooting_accuracy,
@@ -1186,121 +832,7 @@ def team_detail(team_name):
 @team_management.route('/player_leaderboard')
 @login_required
 def player_leaderboard():
-    # First recalculate all player stats
-    player_stats = PlayerStats.query.all()
-    completed_matches = Match.query.filter_by(is_completed=True).all()
-    
-    # Reset all player stats to zero
-    for ps in player_stats:
-        ps.points = 0
-        ps.wins = 0
-        ps.draws = 0
-        ps.losses = 0
-        ps.goals_scored = 0
-        ps.goals_conceded = 0
-        ps.clean_sheets = 0
-        ps.played = 0
-    
-    db.session.commit()  # Commit the reset to ensure it takes effect
-    
-    # First pass: Recalculate basic stats and category points from completed matches
-    for match in completed_matches:
-        match_obj = Match.query.get(match.id)
-        if not match_obj:
-            continue
-            
-        # Process player matchups for this match
-        for matchup in match_obj.player_matchups:
-            home_player = matchup.home_player
-            away_player = matchup.away_player
-            
-            if not home_player or not away_player:
-                continue
-                
-            # Get player stats
-            home_player_stats = home_player.player_stats
-            away_player_stats = away_player.player_stats
-            
-            if not home_player_stats or not away_player_stats:
-                continue
-                
-            # Update played games
-            home_player_stats.played += 1
-            away_player_stats.played += 1
-            
-            # Update goals
-            home_player_stats.goals_scored += matchup.home_goals
-            home_player_stats.goals_conceded += matchup.away_goals
-            away_player_stats.goals_scored += matchup.away_goals
-            away_player_stats.goals_conceded += matchup.home_goals
-            
-            # Update clean sheets
-            if matchup.away_goals == 0:
-                home_player_stats.clean_sheets += 1
-            if matchup.home_goals == 0:
-                away_player_stats.clean_sheets += 1
-                
-            # Calculate result
-            home_result, away_result = matchup.calculate_result()
-            
-            # Update win/draw/loss counts
-            if home_result == "win":
-                home_player_stats.wins += 1
-                away_player_stats.losses += 1
-            elif home_result == "draw":
-                home_player_stats.draws += 1
-                away_player_stats.draws += 1
-            else:  # Away wins
-                home_player_stats.losses += 1
-                away_player_stats.wins += 1
-                
-            # Add category points
-            if home_result == "win":
-                home_points = calculate_match_points(home_player.category, away_player.category, 'win')
-                away_points = calculate_match_points(away_player.category, home_player.category, 'loss')
-                home_player_stats.points += home_points
-                away_player_stats.points += away_points
-            elif home_result == "draw":
-                home_points = calculate_match_points(home_player.category, away_player.category, 'draw')
-                away_points = calculate_match_points(away_player.category, home_player.category, 'draw')
-                home_player_stats.points += home_points
-                away_player_stats.points += away_points
-            else:  # Away wins
-                home_points = calculate_match_points(home_player.category, away_player.category, 'loss')
-                away_points = calculate_match_points(away_player.category, home_player.category, 'win')
-                home_player_stats.points += home_points
-                away_player_stats.points += away_points
-                
-    # Commit first pass calculations
-    db.session.commit()
-    
-    # Second pass: Add goal difference bonus points
-    for ps in player_stats:
-        # Get original category points before adding goal difference bonus
-        category_points = ps.points
-        
-        # Calculate goal difference bonus
-        goal_difference = ps.goals_scored - ps.goals_conceded
-        goal_difference_points = goal_difference / 2
-        
-        # Handle negative goal differences properly
-        if goal_difference_points >= 0:
-            goal_diff_rounded = int(goal_difference_points + 0.5)
-        else:
-            goal_diff_rounded = int(goal_difference_points - 0.5)
-            
-        # Add the goal difference bonus to get final points
-        ps.points = category_points + goal_diff_rounded
-        
-        # Debug output
-        player = TeamMember.query.get(ps.team_member_id)
-        if player:
-            print(f"PLAYER LEADERBOARD - {player.name}: Category Points={category_points}, " +
-                  f"Goals={ps.goals_scored}, Conceded={ps.goals_conceded}, " +
-                  f"Goal Diff={goal_difference}, Goal Diff Bonus={goal_diff_rounded}, " +
-                  f"Total Points={ps.points}")
-    
-    db.session.commit()
+    # Stats are kept current by every write path (completion, import, edits), so this only reads
     
     # Get all realplayers with their categories for the category-wise leaderboard section
     realplayers = db.session.query(
@@ -0,0 +1,329 @@
+"""
+Team Rosters
+============
+Denormalized squad and bid totals per team, so team listings read one row
+per team instead of loading every team's players and counting its bids.
+
+``team_roster_summary`` holds one row per team: player count, players per
+position, squad value (the players' acquisition values), total spent and
+the number of bids in active and in finished rounds.  Allocations, refunds,
+bid placement and deletion adjust the row in the same transaction as the
+change itself, and finalizing a round moves its bids from the active to the
+completed count.
+
+``total_spent`` is a ledger rather than a derived value: allocations add
+what the team was charged and refunds subtract what it got back, so an admin
+moving a player or editing an acquisition value changes the squad value but
+not the amount spent.  Every other column can be recomputed from the
+``player``, ``bid`` and ``round`` tables.
+
+Bulk deletes bypass the tracked paths; they mark rows stale and the next
+read rebuilds them (keeping ``total_spent``) on the primary, even when the
+listing itself is served from the read replica.  A missing row is built on
+first read, starting its ledger at the squad value, which is also what a
+backup restore falls back to.  ``check``
+compares the stored rows with the source tables; ``check_team_rosters.py``
+runs it from the command line and can repair what it finds.
+"""
+
+import json
+from datetime import datetime
+
+from sqlalchemy import text, bindparam
+
+from config import Config
+from db_routing import use_primary
+from models import db, Team, TeamRosterSummary, User
+
+DERIVED_FIELDS = ('player_count', 'position_counts', 'squad_value', 'active_bid_count', 'completed_bid_count')
+
+
+def _team_filter(column, team_ids):
+    """SQL condition restricting ``column`` to ``team_ids`` (None for every team)"""
+    return '' if team_ids is None else f'AND {column} IN :team_ids'
+
+
+def _bind(query, team_ids):
+    statement = text(query)
+    if team_ids is not None:
+        statement = statement.bindparams(bindparam('team_ids', expanding=True))
+    return statement
+
+
+class TeamRosters:
+    """Maintains, reads and checks the team roster summaries"""
+
+    # ------------------------------------------------------------------
+    # Writes (inside the caller's transaction)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def add_player(team_id, position, value, spent=None):
+        """Count a player joining a team; ``spent`` is what the team was charged (default: ``value``)"""
+        value = value or 0
+        TeamRosters._apply(team_id, players=1, position=position, value=value,
+                           spent=value if spent is None else spent)
+
+    @staticmethod
+    def add_players(allocations):
+        """Count several ``(team_id, position, value)`` allocations, each charged its value"""
+        TeamRosters._apply_many([{'team_id': team_id, 'players': 1, 'position': position, 'value': value or 0,
+                                  'spent': value or 0} for team_id, position, value in allocations])
+
+    @staticmethod
+    def remove_player(team_id, position, value, refunded=None):
+        """Count a player leaving a team; ``refunded`` is what the team got back (default: ``value``)"""
+        value = value or 0
+        TeamRosters._apply(team_id, players=-1, position=position, value=-value,
+                           spent=-(value if refunded is None else refunded))
+
+    @staticmethod
+    def remove_players(releases):
+        """Count several ``(team_id, position, players, value, refunded)`` groups of players leaving their teams"""
+        if releases:
+            TeamRosters._apply_many([{'team_id': team_id, 'players': -players, 'position': position,
+                                      'value': -(value or 0), 'spent': -(refunded or 0)}
+                                     for team_id, position, players, value, refunded in releases])
+
+    @staticmethod
+    def record_bid(team_id, delta):
+        """Count a bid placed (+1) or deleted (-1) in an active round"""
+        TeamRosters._apply(team_id, active=delta)
+
+    @staticmethod
+    def record_finished_bid(team_id, delta):
+        """Count a bid deleted (-1) from a finished round"""
+        TeamRosters._apply(team_id, completed=delta)
+
+    @staticmethod
+    def close_round(round_id):
+        """Move a finalized round's bids from the active to the completed counts"""
+        TeamRosters._shift_round_bids(round_id, active=-1, completed=1)
+
+    @staticmethod
+    def remove_round_bids(round_id, is_active):
+        """Uncount a round's bids before they are deleted"""
+        TeamRosters._shift_round_bids(round_id, active=-1 if is_active else 0, completed=0 if is_active else -1)
+
+    @staticmethod
+    def invalidate(team_ids=None):
+        """Mark some teams (or every team) for a rebuild on their next read"""
+        if team_ids is None:
+            db.session.execute(text("UPDATE team_roster_summary SET stale = true"))
+        elif team_ids:
+            db.session.execute(text("""
+                UPDATE team_roster_summary SET stale = true WHERE team_id IN :team_ids
+            """).bindparams(bindparam('team_ids', expanding=True)), {'team_ids': list(team_ids)})
+
+    @staticmethod
+    def reset():
+        """Drop every summary, ledgers included, so the next read starts afresh (after a restore)"""
+        db.session.execute(text("DELETE FROM team_roster_summary"))
+
+    @staticmethod
+    def remove_team(team_id):
+        """Drop a team's summary before the team itself is deleted"""
+        db.session.execute(text("DELETE FROM team_roster_summary WHERE team_id = :team_id"), {'team_id': team_id})
+
+    @staticmethod
+    def rebuild(team_ids=None):
+        """Recompute summaries from the players and bids tables, keeping each existing ledger"""
+        actual = TeamRosters._compute(team_ids)
+        params = {} if team_ids is None else {'team_ids': list(team_ids)}
+        spent = dict(db.session.execute(_bind(f"""
+            SELECT team_id, total_spent FROM team_roster_summary WHERE 1 = 1 {_team_filter('team_id', team_ids)}
+        """, team_ids), params).all())
+        db.session.execute(_bind(f"""
+            DELETE FROM team_roster_summary WHERE 1 = 1 {_team_filter('team_id', team_ids)}
+        """, team_ids), params)
+
+        now = datetime.utcnow()
+        rows = [
+            dict(summary, team_id=team_id, position_counts=json.dumps(summary['position_counts'], sort_keys=True),
+                 total_spent=spent.get(team_id, summary['squad_value']), now=now)
+            for team_id, summary in actual.items()
+        ]
+        if rows:
+            db.session.execute(text("""
+                INSERT INTO team_roster_summary
+                    (team_id, player_count, position_counts, squad_value, total_spent,
+                     active_bid_count, completed_bid_count, stale, updated_at)
+                VALUES (:team_id, :player_count, :position_counts, :squad_value, :total_spent,
+                        :active_bid_count, :completed_bid_count, false, :now)
+            """), rows)
+        return len(rows)
+
+    @staticmethod
+    def _apply(team_id, players=0, position=None, value=0, spent=0, active=0, completed=0):
+        """Add deltas to one team's row"""
+        TeamRosters._apply_many([{'team_id': team_id, 'players': players, 'position': position, 'value': value,
+                                  'spent': spent, 'active': active, 'completed': completed}])
+
+    @staticmethod
+    def _apply_many(changes):
+        """Add each change's deltas to its team's row (locking it); missing rows are built on their next read"""
+        now = datetime.utcnow()
+        rows = [dict({'players': 0, 'value': 0, 'spent': 0, 'active': 0, 'completed': 0}, **change, now=now)
+                for change in changes]
+        db.session.execute(text("""
+            UPDATE team_roster_summary
+            SET player_count = player_count + :players,
+                squad_value = squad_value + :value,
+                total_spent = total_spent + :spent,
+                active_bid_count = active_bid_count + :active,
+                completed_bid_count = completed_bid_count + :completed,
+                updated_at = :now
+            WHERE team_id = :team_id
+        """), rows)
+
+        moves = [row for row in rows if row['players'] and row.get('position') is not None]
+        if not moves:
+            return
+        counts = {team_id: json.loads(stored or '{}') for team_id, stored in db.session.execute(text("""
+            SELECT team_id, position_counts FROM team_roster_summary WHERE team_id IN :team_ids
+        """).bindparams(bindparam('team_ids', expanding=True)), {'team_ids': sorted({row['team_id'] for row in moves})})}
+        for row in moves:
+            team_counts = counts.get(row['team_id'])
+            if team_counts is not None:
+                team_counts[row['position']] = max(team_counts.get(row['position'], 0) + row['players'], 0)
+        if counts:
+            db.session.execute(text("""
+                UPDATE team_roster_summary SET position_counts = :counts WHERE team_id = :team_id
+            """), [{'team_id': team_id, 'counts': json.dumps(team_counts, sort_keys=True)}
+                   for team_id, team_counts in counts.items()])
+
+    @staticmethod
+    def _shift_round_bids(round_id, active, completed):
+        """Add each team's bid count in a round, times ``active``/``completed``, to its counters"""
+        db.session.execute(text("""
+            UPDATE team_roster_summary
+            SET active_bid_count = active_bid_count + :active * (
+                    SELECT COUNT(*) FROM bid WHERE bid.round_id = :round_id AND bid.team_id = team_roster_summary.team_id),
+                completed_bid_count = completed_bid_count + :completed * (
+                    SELECT COUNT(*) FROM bid WHERE bid.round_id = :round_id AND bid.team_id = team_roster_summary.team_id),
+                updated_at = :now
+            WHERE team_id IN (SELECT team_id FROM bid WHERE round_id = :round_id)
+        """), {'round_id': round_id, 'active': active, 'completed': completed, 'now': datetime.utcnow()})
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def team_rows(team_ids=None):
+        """Teams (by id) with their manager's username and roster summary, read in one query.
+
+        Missing or stale summaries are rebuilt first.  Each row is a dict with
+        ``team``, ``username``, ``has_user``, ``total_players``,
+        ``position_counts`` (every configured position), ``total_team_value``,
+        ``total_spent``, ``active_bids_count`` and ``completed_bids_count``.
+        """
+        query = db.session.query(Team, User.username, TeamRosterSummary).outerjoin(
+            User, User.id == Team.user_id
+        ).outerjoin(
+            TeamRosterSummary, TeamRosterSummary.team_id == Team.id
+        ).order_by(Team.id).populate_existing()
+        if team_ids is not None:
+            query = query.filter(Team.id.in_(team_ids))
+
+        rows = query.all()
+        outdated = [team.id for team, _, summary in rows if summary is None or summary.stale]
+        if outdated:
+            # The listing may be reading from the replica; the rebuild and the reads after it use the primary
+            use_primary()
+            TeamRosters.rebuild(outdated)
+            db.session.commit()
+            rows = query.all()
+
+        return [TeamRosters._row(team, username, summary) for team, username, summary in rows]
+
+    @staticmethod
+    def get(team_id):
+        """One team's row (see ``team_rows``), or None if the team does not exist"""
+        rows = TeamRosters.team_rows([team_id])
+        return rows[0] if rows else None
+
+    @staticmethod
+    def _row(team, username, summary):
+        counts = json.loads(summary.position_counts or '{}')
+        return {
+            'team': team,
+            'username': username or '',
+            'has_user': team.user_id is not None,
+            'total_players': summary.player_count,
+            'position_counts': {position: counts.get(position, 0) for position in Config.POSITIONS},
+            'total_team_value': summary.squad_value,
+            'total_spent': summary.total_spent,
+            'active_bids_count': summary.active_bid_count,
+            'completed_bids_count': summary.completed_bid_count,
+        }
+
+    # ------------------------------------------------------------------
+    # Consistency
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def check(team_ids=None):
+        """Compare stored summaries with the source tables.
+
+        Returns ``(team_id, field, stored, actual)`` for every difference in a
+        derived column; a team without a summary is reported once with field
+        None.  ``total_spent`` has no source to compare against and is not
+        checked.
+        """
+        actual = TeamRosters._compute(team_ids)
+        params = {} if team_ids is None else {'team_ids': list(team_ids)}
+        stored = {row.team_id: row for row in db.session.execute(_bind(f"""
+            SELECT team_id, player_count, position_counts, squad_value, active_bid_count, completed_bid_count
+            FROM team_roster_summary WHERE 1 = 1 {_team_filter('team_id', team_ids)}
+        """, team_ids), params)}
+
+        differences = []
+        for team_id, summary in sorted(actual.items()):
+            row = stored.get(team_id)
+            if row is None:
+                differences.append((team_id, None, None, summary))
+                continue
+            stored_counts = {position: count for position, count in json.loads(row.position_counts or '{}').items()
+                             if count}
+            for field in DERIVED_FIELDS:
+                value = stored_counts if field == 'position_counts' else getattr(row, field)
+                if value != summary[field]:
+                    differences.append((team_id, field, value, summary[field]))
+        return differences
+
+    @staticmethod
+    def _compute(team_ids=None):
+        """Derived columns per team, straight from the players, bids and rounds tables"""
+        params = {} if team_ids is None else {'team_ids': list(team_ids)}
+        summaries = {
+            team_id: {'player_count': 0, 'position_counts': {}, 'squad_value': 0,
+                      'active_bid_count': 0, 'completed_bid_count': 0}
+            for team_id in db.session.execute(_bind(f"""
+                SELECT id FROM team WHERE 1 = 1 {_team_filter('id', team_ids)}
+            """, team_ids), params).scalars()
+        }
+
+        for team_id, position, count, value in db.session.execute(_bind(f"""
+            SELECT team_id, position, COUNT(*), COALESCE(SUM(acquisition_value), 0)
+            FROM player WHERE team_id IS NOT NULL {_team_filter('team_id', team_ids)}
+            GROUP BY team_id, position
+        """, team_ids), params):
+            summary = summaries.get(team_id)
+            if summary is None:
+                continue
+            summary['player_count'] += count
+            summary['position_counts'][position] = count
+            summary['squad_value'] += value
+
+        for team_id, is_active, count in db.session.execute(_bind(f"""
+            SELECT b.team_id, r.is_active, COUNT(*)
+            FROM bid b JOIN round r ON r.id = b.round_id
+            WHERE 1 = 1 {_team_filter('b.team_id', team_ids)}
+            GROUP BY b.team_id, r.is_active
+        """, team_ids), params):
+            summary = summaries.get(team_id)
+            if summary is None:
+                continue
+            summary['active_bid_count' if is_active else 'completed_bid_count'] += count
+        return summaries
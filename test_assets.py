@@ -0,0 +1,108 @@
+"""Tests for the static asset pipeline: bundling order, url() rewriting, manifest fallback and precompressed serving."""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask, render_template_string
+
+import assets
+
+
+class TestAssetPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.static_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_dir)
+        files = {
+            'css/first.css': '/* comment */\n.a  >  .b {\n    content: "a  ;  b";\n    color: red;\n}\n',
+            'css/second.css': '.c .d { margin: 0 auto; }',
+            'js/one.js': '// setup\nfunction one() {\n    return 1;\n}\n',
+            'js/two.js': '/**\n * Docs\n */\nvar two = one() + 1',
+            'vendor/icons/css/icons.css': '@font-face{src:url(../fonts/icons.woff2) format("woff2")}',
+            'vendor/icons/fonts/icons.woff2': 'font-bytes',
+        }
+        for path, content in files.items():
+            target = os.path.join(self.static_dir, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'w') as f:
+                f.write(content)
+
+        bundles = {
+            'css/site.css': ['css/first.css', 'css/second.css'],
+            'js/site.js': ['js/one.js', 'js/two.js'],
+            'css/icons.css': ['vendor/icons/css/icons.css'],
+            'js/missing.js': ['vendor/missing.min.js'],
+        }
+        vendor = {'vendor/missing.min.js': 'https://cdn.example.com/missing.min.js'}
+        for name, value in (('STATIC_DIR', self.static_dir), ('BUNDLES', bundles), ('VENDOR', vendor)):
+            patcher = mock.patch.object(assets, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(assets.load_manifest)
+
+        self.app = Flask(__name__, static_folder=self.static_dir, static_url_path='/static')
+        assets.init_assets(self.app)
+
+    def build(self):
+        manifest = assets.build_assets(vendor=False)
+        assets.load_manifest()
+        return manifest
+
+    def read(self, path):
+        with open(os.path.join(self.static_dir, path)) as f:
+            return f.read()
+
+    def test_minify_css_keeps_strings_and_significant_spaces(self):
+        self.assertEqual(assets.minify_css('.a  >  .b {\n content: "a  ;  b";\n color: red;\n}\n.c .d{margin:0 auto}'),
+                         '.a>.b{content: "a  ;  b";color: red}.c .d{margin:0 auto}')
+
+    def test_build_bundles_in_order_and_rewrites_font_urls(self):
+        manifest = self.build()
+
+        self.assertNotIn('js/missing.js', manifest)
+        css = self.read(manifest['css/site.css'])
+        self.assertLess(css.index('.a>.b'), css.index('.c .d'))
+        self.assertEqual(self.read(manifest['js/site.js']), 'function one() {\nreturn 1;\n};\nvar two = one() + 1')
+
+        icons = self.read(manifest['css/icons.css'])
+        font = icons.split('url(')[1].split(')')[0]
+        self.assertRegex(font, r'^\.\./vendor/icons/fonts/icons\.[0-9a-f]{12}\.woff2$')
+        self.assertTrue(os.path.exists(os.path.join(self.static_dir, 'dist/css', font)))
+
+        with open(os.path.join(self.static_dir, manifest['css/site.css'] + '.gz'), 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()).decode(), css)
+        with open(os.path.join(self.static_dir, 'dist', assets.MANIFEST_NAME)) as f:
+            self.assertEqual(json.load(f), manifest)
+
+    def test_templates_fall_back_to_sources_without_a_build(self):
+        template = "{{ asset_urls('css/site.css') | join(',') }}|{{ asset_urls('js/missing.js') | join(',') }}"
+        with self.app.test_request_context():
+            self.assertEqual(render_template_string(template),
+                             '/static/css/first.css,/static/css/second.css|https://cdn.example.com/missing.min.js')
+            self.build()
+            built = render_template_string(template)
+        self.assertRegex(built, r'^/static/dist/css/site\.[0-9a-f]{12}\.css\|')
+
+    def test_dist_files_served_precompressed_and_immutable(self):
+        url = '/static/' + self.build()['js/site.js']
+        client = self.app.test_client()
+
+        compressed = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(compressed.mimetype, 'text/javascript')
+        self.assertEqual(compressed.headers['Cache-Control'], assets.IMMUTABLE_CACHE_CONTROL)
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertEqual(gzip.decompress(compressed.data).decode(), 'function one() {\nreturn 1;\n};\nvar two = one() + 1')
+
+        plain = client.get(url)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.headers['Cache-Control'], assets.IMMUTABLE_CACHE_CONTROL)
+
+
+if __name__ == '__main__':
+    unittest.main()
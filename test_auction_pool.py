@@ -0,0 +1,63 @@
+"""Tests for batch auction pool changes: rule parsing, preview against apply, and undo."""
+
+import json
+import unittest
+
+from models import db, Player, EligibilityChange
+from db_test_case import DatabaseTestCase
+from auction_pool import AuctionPool, parse_rule
+
+
+class TestAuctionPool(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        ratings = {'GK': [80, 75, None], 'CF': [90, 85, 70]}
+        for position, values in ratings.items():
+            for i, rating in enumerate(values):
+                db.session.add(Player(name=f'{position} {i}', position=position, overall_rating=rating,
+                                      is_auction_eligible=(position == 'GK' and i == 2)))
+        db.session.commit()
+
+    def eligible(self):
+        return sorted(p.name for p in Player.query.filter_by(is_auction_eligible=True))
+
+    def test_preview_matches_apply_for_top_per_position(self):
+        rule = parse_rule({'top_per_position': 2})
+        preview = AuctionPool.preview(rule, 'add')
+        self.assertEqual(preview['totals'], {'matched': 4, 'enabled': 4, 'disabled': 0, 'pool': 5})
+        self.assertEqual(preview['positions']['GK']['pool'], 3)
+
+        change = AuctionPool.apply(rule, 'add')
+        self.assertEqual(self.eligible(), ['CF 0', 'CF 1', 'GK 0', 'GK 1', 'GK 2'])
+        self.assertEqual(len(json.loads(change.enabled_ids)), 4)
+
+    def test_replace_and_undo(self):
+        first = AuctionPool.apply(parse_rule({'positions': ['CF']}), 'add')
+        rule = parse_rule({'min_rating': 80})
+        # The unrated keeper counts as not matched, so replace drops it
+        self.assertEqual(AuctionPool.preview(rule, 'replace')['totals'],
+                         {'matched': 3, 'enabled': 1, 'disabled': 2, 'pool': 3})
+
+        second = AuctionPool.apply(rule, 'replace')
+        self.assertEqual(self.eligible(), ['CF 0', 'CF 1', 'GK 0'])
+        with self.assertRaises(ValueError):
+            AuctionPool.undo(first.id)
+
+        AuctionPool.undo(second.id)
+        self.assertEqual(self.eligible(), ['CF 0', 'CF 1', 'CF 2', 'GK 2'])
+        self.assertIsNotNone(db.session.get(EligibilityChange, second.id).undone_at)
+        AuctionPool.undo(first.id)
+        self.assertEqual(self.eligible(), ['GK 2'])
+
+    def test_parse_rule_rejects_bad_rules(self):
+        for data in ({}, {'free_agents_only': False}, {'position': ['GK']}, {'positions': ['XX']},
+                     {'min_rating': 'high'}, {'top_per_position': 0}, ['GK']):
+            with self.assertRaises(ValueError):
+                parse_rule(data)
+        self.assertEqual(parse_rule({'player_ids': ['3', 1, 3]}).player_ids, [1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
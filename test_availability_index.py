@@ -0,0 +1,89 @@
+"""Tests for the player availability index: scopes, filters, version bumps and team marks."""
+
+import unittest
+
+from availability_index import (
+    MARK_BID, MARK_STARRED, PlayerAvailabilityIndex, init_availability_index, round_scope, team_marks,
+)
+from models import db, User, Team, Player, Round, Bid, StarredPlayer
+from db_test_case import DatabaseTestCase
+
+
+class TestPlayerAvailabilityIndex(DatabaseTestCase):
+
+    def create_app(self):
+        app = super().create_app()
+        init_availability_index(app)
+        return app
+
+    def setUp(self):
+        super().setUp()
+
+        user = User(username='team', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        self.team = Team(name='Team', balance=1000, user_id=user.id)
+        self.round = Round(position='CF', is_active=True)
+        db.session.add_all([self.team, self.round])
+        db.session.flush()
+        self.players = {
+            'striker': Player(name='Striker', position='CF', overall_rating=85, is_auction_eligible=True,
+                              round_id=self.round.id),
+            'winger': Player(name='Winger', position='LWF', overall_rating=90, is_auction_eligible=True),
+            'keeper': Player(name='Keeper', position='GK', overall_rating=80, is_auction_eligible=True,
+                             team_id=self.team.id),
+            'reserve': Player(name='Reserve', position='CF', overall_rating=70, is_auction_eligible=False),
+        }
+        db.session.add_all(self.players.values())
+        db.session.commit()
+        self.index = PlayerAvailabilityIndex()
+
+    def names(self, scope, **filters):
+        return [entry.name for entry in self.index.snapshot().players(scope, **filters)]
+
+    def test_scopes_and_filters(self):
+        self.assertEqual(self.names('eligible'), ['Winger', 'Striker', 'Keeper'])
+        self.assertEqual(self.names('available'), ['Winger', 'Striker'])
+        self.assertEqual(self.names(round_scope(self.round.id)), ['Striker'])
+        self.assertEqual(self.names('eligible', position='GK'), ['Keeper'])
+        self.assertEqual(self.names('available', search='wing'), ['Winger'])
+
+        page = self.index.snapshot().paginate('eligible', page=2, per_page=2)
+        self.assertEqual((page.total, page.pages, [entry.name for entry in page.items]), (3, 2, ['Keeper']))
+
+    def test_orm_writes_rebuild_the_snapshot(self):
+        snapshot = self.index.snapshot()
+        self.assertIs(self.index.snapshot(), snapshot)
+
+        self.players['striker'].team_id = self.team.id
+        db.session.commit()
+        self.assertEqual(self.names(round_scope(self.round.id)), [])
+
+        Player.query.filter_by(name='Reserve').update({'is_auction_eligible': True})
+        db.session.commit()
+        self.assertEqual(self.names('available'), ['Winger', 'Reserve'])
+        self.assertEqual(self.index.rebuilds, 3)
+
+    def test_uncommitted_writes_are_not_published(self):
+        self.index.snapshot()
+        self.players['winger'].team_id = self.team.id
+        db.session.flush()
+        self.assertEqual(self.names('available'), ['Striker'])
+
+        db.session.rollback()
+        self.assertEqual(self.names('available'), ['Winger', 'Striker'])
+
+    def test_team_marks(self):
+        striker, winger = self.players['striker'], self.players['winger']
+        bid = Bid(team_id=self.team.id, player_id=striker.id, round_id=self.round.id, amount=50)
+        db.session.add_all([bid, StarredPlayer(team_id=self.team.id, player_id=striker.id),
+                            StarredPlayer(team_id=self.team.id, player_id=winger.id)])
+        db.session.commit()
+
+        flags, bids = team_marks(self.team.id, round_ids=[self.round.id])
+        self.assertEqual(flags, {striker.id: MARK_BID | MARK_STARRED, winger.id: MARK_STARRED})
+        self.assertEqual(bids, {(self.round.id, striker.id): (bid.id, 50)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Tests for the benchmark harness statistics and baseline comparison."""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from benchmarks.harness import BenchmarkRecorder, QueryCounter, compare_to_baseline, percentile, refuse_to_seed
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Test cases for percentile maths and regression detection."""
+
+    def test_percentile_interpolates(self):
+        values = [10, 20, 30, 40, 50]
+        self.assertEqual(percentile(values, 50), 30)
+        self.assertEqual(percentile(values, 0), 10)
+        self.assertEqual(percentile(values, 100), 50)
+        self.assertAlmostEqual(percentile(values, 95), 48)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_recorder_summarises_queries_per_request(self):
+        counter = QueryCounter()
+        recorder = BenchmarkRecorder(counter)
+        for queries in (3, 5):
+            with recorder.measure('team_round'):
+                counter.count += queries
+        recorder.record_error('team_round', 500)
+
+        summary = recorder.summary()['team_round']
+        self.assertEqual(summary['requests'], 2)
+        self.assertEqual(summary['queries_per_request'], 4)
+        self.assertEqual(summary['max_queries'], 5)
+        self.assertEqual(summary['errors'], {500: 1})
+
+    def test_compare_flags_latency_and_query_regressions(self):
+        baseline = {'results': {
+            'team_round': {'p95_ms': 10.0, 'queries_per_request': 4},
+            'place_bid': {'p95_ms': 5.0, 'queries_per_request': 6},
+        }}
+        results = {
+            'team_round': {'p95_ms': 14.0, 'queries_per_request': 4},
+            'place_bid': {'p95_ms': 5.5, 'queries_per_request': 7},
+            'new_endpoint': {'p95_ms': 100.0, 'queries_per_request': 50},
+        }
+        regressions = compare_to_baseline(results, baseline, latency_tolerance=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('team_round: p95'))
+        self.assertTrue(regressions[1].startswith('place_bid: 7.0 queries'))
+
+    def test_compare_without_baseline(self):
+        self.assertEqual(compare_to_baseline({'x': {'p95_ms': 1, 'queries_per_request': 1}}, None), [])
+
+    def test_refuses_to_seed_real_databases(self):
+        self.assertFalse(refuse_to_seed('sqlite:///instance/benchmark.db'))
+        self.assertFalse(refuse_to_seed('postgresql://localhost/auction_bench'))
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertTrue(refuse_to_seed('postgresql://localhost/auction_db', '--force'))
+        self.assertIn('use --force to override', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Tests for the bulk round monitor counters: incremental updates, deltas and rebuilds."""
+
+import unittest
+
+from bulk_round_counters import BulkRoundCounters
+from models import db, User, Team, Player, BulkBidRound, BulkBid
+from db_test_case import DatabaseTestCase
+
+
+class TestBulkRoundCounters(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(3)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        self.players = [Player(name=f'Player {i}', position='CF') for i in range(3)]
+        self.round = BulkBidRound(is_active=True, status='active')
+        db.session.add_all(self.teams + self.players + [self.round])
+        db.session.flush()
+        BulkRoundCounters.start_round(self.round.id)
+        db.session.commit()
+
+    def place(self, team, player):
+        bid = BulkBid(team_id=team.id, player_id=player.id, round_id=self.round.id)
+        db.session.add(bid)
+        db.session.flush()
+        BulkRoundCounters.record_bid(self.round.id, player.id, team.id, 1)
+        db.session.commit()
+        return bid
+
+    def delete(self, bid):
+        db.session.delete(bid)
+        db.session.flush()
+        BulkRoundCounters.record_bid(self.round.id, bid.player_id, bid.team_id, -1)
+        db.session.commit()
+
+    def test_counters_follow_placed_and_deleted_bids(self):
+        self.place(self.teams[0], self.players[0])
+        contested = self.place(self.teams[1], self.players[0])
+        self.place(self.teams[0], self.players[1])
+        counters = BulkRoundCounters.changes(self.round.id)['counters']
+        self.assertEqual((counters['bids'], counters['players'], counters['teams']), (3, 2, 2))
+        self.assertEqual(counters['projected_tiebreakers'], 1)
+
+        self.delete(contested)
+        counters = BulkRoundCounters.changes(self.round.id)['counters']
+        self.assertEqual((counters['bids'], counters['players'], counters['teams']), (2, 2, 1))
+        self.assertEqual(counters['contested_players'], 0)
+
+    def test_delta_lists_only_changed_and_removed_rows(self):
+        self.place(self.teams[0], self.players[0])
+        removed = self.place(self.teams[1], self.players[1])
+        version = BulkRoundCounters.changes(self.round.id)['version']
+
+        self.place(self.teams[0], self.players[2])
+        self.delete(removed)
+        delta = BulkRoundCounters.changes(self.round.id, since=version)
+        self.assertFalse(delta['full'])
+        self.assertEqual([row.player_id for row in delta['players']], [self.players[2].id])
+        self.assertEqual(delta['removed_players'], [self.players[1].id])
+        self.assertEqual(delta['removed_teams'], [self.teams[1].id])
+        self.assertEqual([bid.player_id for bid in delta['team_bids'][self.teams[0].id]],
+                         [self.players[0].id, self.players[2].id])
+
+        self.assertEqual(BulkRoundCounters.changes(self.round.id, since=delta['version'])['players'], [])
+
+    def test_invalidated_round_is_rebuilt_as_a_full_snapshot(self):
+        self.place(self.teams[0], self.players[0])
+        version = BulkRoundCounters.changes(self.round.id)['version']
+
+        # A bid written behind the counters' back, as a bulk import would
+        db.session.add(BulkBid(team_id=self.teams[2].id, player_id=self.players[0].id, round_id=self.round.id))
+        BulkRoundCounters.invalidate(self.round.id)
+        db.session.commit()
+
+        snapshot = BulkRoundCounters.changes(self.round.id, since=version)
+        self.assertTrue(snapshot['full'])
+        self.assertGreater(snapshot['version'], version)
+        self.assertEqual(snapshot['counters']['bids'], 2)
+        self.assertEqual(snapshot['counters']['contested_players'], 1)
+        self.assertEqual([row.bid_count for row in snapshot['players']], [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for read-replica routing using two SQLite files as primary and replica."""
+
+import os
+import tempfile
+import unittest
+
+from flask import Flask, jsonify
+
+from sqlalchemy import text
+
+from models import db, Team
+from db_routing import REPLICA_BIND_KEY, init_db_routing, read_engine, use_primary
+
+
+class TestReadReplicaRouting(unittest.TestCase):
+    """The replica holds a differently named team so each response shows which database served it."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        primary = os.path.join(self.tmpdir.name, 'primary.db')
+        replica = os.path.join(self.tmpdir.name, 'replica.db')
+
+        self.app = Flask(__name__)
+        self.app.config['SECRET_KEY'] = 'test'
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{primary}'
+        self.app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND_KEY: f'sqlite:///{replica}'}
+        db.init_app(self.app)
+        init_db_routing(self.app)
+
+        with self.app.app_context():
+            db.create_all()
+            db.metadata.create_all(bind=db.engines[REPLICA_BIND_KEY])
+            db.session.add(Team(name='Primary FC'))
+            db.session.commit()
+            with db.engines[REPLICA_BIND_KEY].begin() as conn:
+                conn.execute(Team.__table__.insert(), {'name': 'Replica FC', 'balance': 15000})
+
+        def team_names():
+            return jsonify(names=[team.name for team in Team.query.order_by(Team.id).all()],
+                           raw_engine=read_engine().url.database.rsplit('/', 1)[-1])
+
+        def write_then_read():
+            db.session.add(Team(name='Written FC'))
+            db.session.flush()
+            return jsonify(names=[team.name for team in Team.query.order_by(Team.id).all()])
+
+        def rebuild_then_read():
+            db.session.execute(text("UPDATE team SET name = 'Rebuilt FC'"))
+            db.session.commit()
+            return jsonify(names=[team.name for team in Team.query.order_by(Team.id).all()])
+
+        def rebuild_on_read():
+            use_primary()
+            return team_names()
+
+        def place_bid():
+            return jsonify(success=True)
+
+        self.app.add_url_rule('/teams', 'all_teams', team_names)
+        self.app.add_url_rule('/dashboard', 'dashboard', team_names)
+        self.app.add_url_rule('/team_dashboard_update', 'team_dashboard_update', write_then_read)
+        self.app.add_url_rule('/admin_bulk_round_update', 'admin_bulk_round_update', rebuild_then_read)
+        self.app.add_url_rule('/admin_rounds_update', 'admin_rounds_update', rebuild_on_read)
+        self.app.add_url_rule('/place_bid', 'place_bid', place_bid, methods=['POST'])
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        # init_app registers an (empty) metadata for every bind on the shared db object
+        db.metadatas.pop(REPLICA_BIND_KEY, None)
+        self.tmpdir.cleanup()
+
+    def test_read_only_endpoint_uses_replica(self):
+        data = self.client.get('/teams').get_json()
+        self.assertEqual(data['names'], ['Replica FC'])
+        self.assertEqual(data['raw_engine'], 'replica.db')
+
+    def test_other_endpoints_use_primary(self):
+        data = self.client.get('/dashboard').get_json()
+        self.assertEqual(data['names'], ['Primary FC'])
+        self.assertEqual(data['raw_engine'], 'primary.db')
+
+    def test_flush_switches_request_to_primary(self):
+        data = self.client.get('/team_dashboard_update').get_json()
+        self.assertEqual(data['names'], ['Primary FC', 'Written FC'])
+
+    def test_raw_sql_writes_go_to_primary(self):
+        data = self.client.get('/admin_bulk_round_update').get_json()
+        self.assertEqual(data['names'], ['Rebuilt FC'])
+        with self.app.app_context():
+            with db.engines[REPLICA_BIND_KEY].connect() as conn:
+                self.assertEqual(conn.execute(text('SELECT name FROM team')).scalars().all(), ['Replica FC'])
+
+    def test_rebuild_on_read_switches_to_primary(self):
+        data = self.client.get('/admin_rounds_update').get_json()
+        self.assertEqual(data['names'], ['Primary FC'])
+        self.assertEqual(data['raw_engine'], 'primary.db')
+
+    def test_reads_stick_to_primary_after_own_write(self):
+        self.client.post('/place_bid')
+        self.assertEqual(self.client.get('/teams').get_json()['names'], ['Primary FC'])
+
+        other_user = self.app.test_client()
+        self.assertEqual(other_user.get('/teams').get_json()['names'], ['Replica FC'])
+
+
+if __name__ == '__main__':
+    unittest.main()
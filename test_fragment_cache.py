@@ -0,0 +1,64 @@
+"""Tests for the {% cache %} template tag: versioned hits, byte-bounded eviction and team versions."""
+
+import unittest
+
+from jinja2 import DictLoader, Environment
+
+from fragment_cache import FragmentCache, FragmentCacheExtension, cache_version
+from models import Team
+
+
+class TestFragmentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.env = Environment(autoescape=True, extensions=[FragmentCacheExtension], loader=DictLoader({
+            'badge.html': "{% cache ('badge', team_id), version %}<b>{{ name }}</b>{% endcache %}",
+        }))
+        self.env.globals['cache_version'] = cache_version
+        self.cache = FragmentCache(max_bytes=4096)
+        self.env.fragment_cache = self.cache
+
+    def render(self, **context):
+        return self.env.get_template('badge.html').render(**context)
+
+    def test_same_version_is_served_from_cache(self):
+        self.assertEqual(self.render(team_id=1, version=1, name='A & B'), '<b>A &amp; B</b>')
+        # The name changed without a version bump, so the cached fragment wins
+        self.assertEqual(self.render(team_id=1, version=1, name='Other'), '<b>A &amp; B</b>')
+
+        stats = self.cache.stats()['fragments']['badge']
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_new_version_replaces_entry(self):
+        self.render(team_id=1, version=1, name='Old')
+        self.assertEqual(self.render(team_id=1, version=2, name='New'), '<b>New</b>')
+        self.assertEqual(self.render(team_id=2, version=2, name='Second'), '<b>Second</b>')
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['fragments']['badge']['stale'], 1)
+
+    def test_least_recently_used_evicted_past_byte_limit(self):
+        self.cache.max_bytes = 300
+        for team_id in range(3):
+            self.render(team_id=team_id, version=1, name='x' * 60)
+        self.render(team_id=0, version=1, name='x' * 60)
+        self.render(team_id=3, version=1, name='x' * 60)
+
+        stats = self.cache.stats()
+        self.assertLessEqual(stats['bytes'], 300)
+        self.assertGreater(stats['evictions'], 0)
+        # Team 0 was used again, so team 1 went first
+        self.assertEqual(self.render(team_id=1, version=1, name='fresh'), '<b>fresh</b>')
+
+    def test_team_version_tracks_rendered_columns(self):
+        team = Team(id=1, name='Lions', balance=100, logo_url=None)
+        before = cache_version(team)
+        team.balance = 90
+        self.assertNotEqual(cache_version(team), before)
+        self.assertEqual(cache_version(None, {'id': 3, 'updated_at': 'x', 'status': 'active'}, 5),
+                         (None, (3, 'x', 'active'), 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
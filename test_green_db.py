@@ -0,0 +1,32 @@
+"""Tests for the DB_CONCURRENCY modes of the green psycopg2 wait callback."""
+
+import unittest
+
+import green_db
+
+
+@unittest.skipUnless(green_db.PSYCOPG2_AVAILABLE, 'psycopg2 is not installed')
+class TestGreenDb(unittest.TestCase):
+
+    def tearDown(self):
+        green_db.install('blocking')
+
+    def test_modes(self):
+        with self.assertRaises(ValueError):
+            green_db.install('threads')
+
+        self.assertFalse(green_db.install('blocking'))
+        self.assertFalse(green_db.is_green())
+        # Without monkey patched sockets (tests, flask run) auto leaves psycopg2 blocking
+        self.assertEqual(green_db.install('auto'), green_db.eventlet_active())
+
+        if green_db.EVENTLET_AVAILABLE:
+            self.assertTrue(green_db.install('green'))
+            self.assertTrue(green_db.get_status()['green'])
+        else:
+            with self.assertRaises(RuntimeError):
+                green_db.install('green')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for the team lineage index against an in-memory SQLite database."""
+
+import re
+import unittest
+from datetime import datetime
+
+from flask_login import LoginManager
+from jinja2 import ChoiceLoader, DictLoader
+from sqlalchemy import text
+
+from models import db, Season, Team, TeamStats, TeamLineageIndex, User
+from db_test_case import DatabaseTestCase
+from lineage_index import LineageIndex
+from registration_routes import registration_bp
+from season_archive import SeasonArchiveStore, _snapshot_cache
+from benchmarks.seed import seed_synthetic_season
+
+
+class TestLineageIndex(DatabaseTestCase):
+    """A lineage spanning an archived and a live season"""
+
+    def create_app(self):
+        app = super().create_app()
+        app.config['SECRET_KEY'] = 'test'
+        login_manager = LoginManager()
+        login_manager.init_app(app)
+        login_manager.user_loader(lambda user_id: db.session.get(User, int(user_id)))
+        app.register_blueprint(registration_bp)
+        app.add_url_rule('/dashboard', 'dashboard', lambda: '')
+        # The registration pages without the site chrome
+        app.jinja_env.loader = ChoiceLoader([DictLoader({'base.html': '{% block content %}{% endblock %}'}),
+                                             app.jinja_env.loader])
+        return app
+
+    def setUp(self):
+        super().setUp()
+        self.seeded = seed_synthetic_season(teams=4, players=120, rounds=4, bulk_rounds=1)
+        self.season_id = self.seeded['season_id']
+        _snapshot_cache.clear()
+
+        self.first_team_id = self.seeded['team_ids'][0]
+        db.session.execute(text("UPDATE team SET team_lineage_id = 'L1' WHERE id = :team_id"),
+                           {'team_id': self.first_team_id})
+        for points, team_id in enumerate(self.seeded['team_ids']):
+            db.session.add(TeamStats(team_id=team_id, played=3, points=points * 3))
+        # Season dates are added by the multi-season migration, not the model
+        for column in ('season_start_date', 'season_end_date', 'registration_deadline'):
+            db.session.execute(text(f"ALTER TABLE season ADD COLUMN {column} DATETIME"))
+        db.session.execute(text("UPDATE season SET season_start_date = :start, season_end_date = :end WHERE id = :id"),
+                           {'start': datetime(2024, 8, 1), 'end': datetime(2025, 5, 31), 'id': self.season_id})
+        Season.query.get(self.season_id).status = 'completed'
+        db.session.commit()
+        SeasonArchiveStore.archive_season(self.season_id)
+
+        self.next_season = Season(name='Next Season', short_name='NS', status='active')
+        db.session.add(self.next_season)
+        db.session.commit()
+
+    def _register_continuing_team(self):
+        team = Team(name='Continuing FC', season_id=self.next_season.id, user_id=self.seeded['user_ids'][0],
+                    team_lineage_id='L1', is_continuing_team=True)
+        db.session.add(team)
+        db.session.commit()
+        return team.id
+
+    def test_registration_extends_lineage(self):
+        team_id = self._register_continuing_team()
+        self.assertTrue(LineageIndex.record_registration(team_id))
+
+        with db.engine.connect() as conn:
+            history, stats = LineageIndex.get(conn, 'L1')
+        self.assertEqual([row[2] for row in history], [self.season_id, self.next_season.id])
+        self.assertEqual([row[0] for row in history], [self.first_team_id, team_id])
+        self.assertEqual(stats[0], 2)
+        self.assertEqual(TeamLineageIndex.query.get('L1').latest_team_id, team_id)
+
+    def test_standings_come_from_archived_snapshot(self):
+        with db.engine.connect() as conn:
+            history, stats = LineageIndex.get(conn, 'L1')
+        # First seeded team has the fewest points of four
+        self.assertEqual(history[0][7], 4)
+        self.assertEqual(stats[6], 4)
+
+    def test_unknown_lineage(self):
+        with db.engine.connect() as conn:
+            self.assertEqual(LineageIndex.get(conn, 'missing'), ([], None))
+
+    def test_team_lineage_history_uses_index(self):
+        self._register_continuing_team()
+        history = Team.query.get(self.first_team_id).get_lineage_history()
+        self.assertEqual([entry['season_name'] for entry in history],
+                         [Season.query.get(self.season_id).name, 'Next Season'])
+
+    def test_registration_success_shows_lineage(self):
+        team_id = self._register_continuing_team()
+        LineageIndex.record_registration(team_id)
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.seeded['user_ids'][0])
+
+        response = client.get(f'/registration/success/{team_id}')
+        self.assertEqual(response.status_code, 200)
+        html = response.get_data(as_text=True)
+        # The archived season's team started the lineage; only the new registration continues it
+        self.assertEqual(html.count('fas fa-star text-white'), 1)
+        self.assertEqual(html.count('fas fa-arrow-right text-white'), 1)
+        self.assertEqual(re.findall(r'whitespace-nowrap text-gray-500">\s*(\S+)\s*<', html), ['2024', 'Unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Tests for match results: round-robin fixtures, validated imports and set-based stats."""
+
+import json
+import unittest
+from collections import Counter
+
+from models import db, User, Team, TeamMember, Category, Match, PlayerMatchup, TeamStats, PlayerStats
+from db_test_case import DatabaseTestCase
+from match_results import MatchResults, parse_results, round_robin
+
+
+class TestMatchResults(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        red, blue = Category(name='red', color='red', priority=1), Category(name='blue', color='blue', priority=3)
+        users = [User(username=f'team{i}', password_hash='x') for i in range(4)]
+        db.session.add_all(users + [red, blue])
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        db.session.add_all(self.teams)
+        db.session.flush()
+        # Two members per team: "A<n>" is red, "B<n>" is blue
+        db.session.add_all([TeamMember(name=f'{letter}{i}', team_id=team.id, category_id=category.id)
+                            for i, team in enumerate(self.teams) for letter, category in (('A', red), ('B', blue))])
+        db.session.commit()
+        self.team_ids = [team.id for team in self.teams]
+
+    def season_results(self):
+        """A result for every fixture: both members of each team play, with goals from the round number"""
+        matches = Match.query.order_by(Match.round_number, Match.match_number).all()
+        index = {team_id: i for i, team_id in enumerate(self.team_ids)}
+        return [{
+            'round_number': match.round_number, 'match_number': match.match_number,
+            'matchups': [
+                {'home_player': f'A{index[match.home_team_id]}', 'away_player': f'B{index[match.away_team_id]}',
+                 'home_goals': match.round_number % 3, 'away_goals': 1},
+                {'home_player': f'B{index[match.home_team_id]}', 'away_player': f'A{index[match.away_team_id]}',
+                 'home_goals': 0, 'away_goals': match.match_number},
+            ],
+        } for match in matches]
+
+    def stats(self):
+        teams = {row.team_id: (row.played, row.wins, row.draws, row.losses, row.goals_for, row.goals_against,
+                               row.points) for row in TeamStats.query}
+        players = {row.team_member_id: (row.played, row.wins, row.draws, row.losses, row.goals_scored,
+                                        row.goals_conceded, row.clean_sheets, row.points) for row in PlayerStats.query}
+        return teams, players
+
+    def test_round_robin_meets_every_opponent_home_and_away(self):
+        rounds = round_robin([1, 2, 3, 4, 5], double=True)
+        self.assertEqual(len(rounds), 10)
+        pairs = Counter(pair for fixtures in rounds for pair in fixtures)
+        self.assertEqual(len(pairs), 20)
+        self.assertEqual(set(pairs.values()), {1})
+        for fixtures in rounds:
+            playing = [team for pair in fixtures for team in pair]
+            self.assertEqual(len(playing), len(set(playing)))
+
+        self.assertEqual(MatchResults.create_fixtures(self.team_ids), 12)
+        self.assertEqual(MatchResults.create_fixtures(self.team_ids, double=False), 6)
+        db.session.commit()
+        self.assertEqual(db.session.query(db.func.max(Match.round_number)).scalar(), 9)
+
+    def test_invalid_import_writes_nothing(self):
+        MatchResults.create_fixtures(self.team_ids)
+        db.session.commit()
+        entries = self.season_results()
+        entries[3]['matchups'][0]['home_player'] = 'Nobody'
+        entries[5]['matchups'][1]['away_goals'] = -2
+        entries.append({'round_number': 99, 'match_number': 1, 'matchups': []})
+
+        report = MatchResults.import_results(entries)
+        self.assertEqual(len(report.errors), 3)
+        self.assertIn('Round 99 match 1: no such match', report.errors)
+        db.session.rollback()
+        self.assertEqual((PlayerMatchup.query.count(), Match.query.filter_by(is_completed=True).count(),
+                          TeamStats.query.count()), (0, 0, 0))
+
+    def test_import_matches_per_match_completion_and_recalculation(self):
+        MatchResults.create_fixtures(self.team_ids)
+        db.session.commit()
+        csv_rows = ['round_number,match_number,home_player,away_player,home_goals,away_goals']
+        for entry in self.season_results():
+            for matchup in entry['matchups']:
+                csv_rows.append(','.join(str(value) for value in (
+                    entry['round_number'], entry['match_number'], matchup['home_player'], matchup['away_player'],
+                    matchup['home_goals'], matchup['away_goals'])))
+        entries = parse_results('\n'.join(csv_rows), 'season.csv')
+        self.assertEqual(len(entries), len(parse_results(json.dumps({'matches': self.season_results()}))))
+
+        report = MatchResults.import_results(entries)
+        db.session.commit()
+        self.assertEqual((report.matches, report.matchups, report.errors), (12, 24, []))
+        imported = self.stats()
+
+        # The same results rebuilt from scratch, then applied one match at a time
+        MatchResults.recalculate()
+        db.session.commit()
+        self.assertEqual(self.stats(), imported)
+        TeamStats.query.delete()
+        PlayerStats.query.delete()
+        for match_id in [match.id for match in Match.query.order_by(Match.id)]:
+            MatchResults.apply_completed([match_id])
+        db.session.commit()
+        self.assertEqual(self.stats(), imported)
+
+        teams, players = imported
+        self.assertEqual(sum(row[0] for row in teams.values()), 24)
+        for played, wins, draws, losses, *_rest, points in teams.values():
+            self.assertEqual((played, points), (wins + draws + losses, wins * 3 + draws))
+        # Every member plays once in each of their team's six matches
+        self.assertEqual({row[0] for row in players.values()}, {6})
+        self.assertEqual(Match.query.filter_by(is_completed=True).count(), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Tests for the CPU offload pools and the jobs they run."""
+
+import unittest
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import offload
+from cpu_jobs import HEADER_FORMAT, Sheet, build_workbook, encode_event, improve_accessibility
+
+
+class TestOffload(unittest.TestCase):
+
+    def setUp(self):
+        offload.configure('on', processes=1, threads=1)
+
+    def tearDown(self):
+        offload.process_pool.close()
+        offload.configure('auto')
+
+    def test_jobs_match_inline_results(self):
+        html = '<html><body><img src="logo.png"><div class="container"><button><svg></svg></button></div></body></html>'
+        sheets = [Sheet('Players', [{'Name': 'A', 'Rating': 80}, {'Name': 'B', 'Rating': 90}],
+                        sort_by='Rating', ascending=False, header_format=HEADER_FORMAT),
+                  Sheet('Empty', [])]
+
+        self.assertEqual(offload.run_in_process(improve_accessibility, html), improve_accessibility(html))
+        self.assertEqual(offload.run_in_process(encode_event, {'b': 1, 'a': [2]}), encode_event({'b': 1, 'a': [2]}))
+        self.assertTrue(offload.run_in_process(build_workbook, sheets).startswith(b'PK'))
+        password_hash = offload.run_in_thread(generate_password_hash, 'secret')
+        self.assertTrue(offload.run_in_thread(check_password_hash, password_hash, 'secret'))
+
+        # Errors come back as the job's own exception and the worker is reused
+        with self.assertRaises(TypeError):
+            offload.run_in_process(build_workbook, None)
+        self.assertEqual(offload.run_in_process(encode_event, [])[1], '[]')
+
+        stats = offload.get_stats()
+        self.assertEqual((stats['process']['jobs'], stats['process']['errors'], stats['process']['queued']), (5, 1, 0))
+        self.assertEqual(stats['thread']['jobs'], 2)
+
+    def test_disabled_runs_inline(self):
+        offload.configure('off')
+        jobs = offload.get_stats()['process']['jobs']
+        self.assertEqual(offload.run_in_process(encode_event, {})[1], '{}')
+        self.assertEqual(offload.get_stats()['process']['jobs'], jobs)
+        with self.assertRaises(ValueError):
+            offload.configure('sometimes')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests for page queries: the combined round header, dialect variants and per-query timings."""
+
+import unittest
+
+from sqlalchemy import event
+
+from models import db, User, Team, Player, Round, Season, Bid, Tiebreaker, TeamTiebreaker
+from db_test_case import DatabaseTestCase
+from page_queries import PageQueries, QueryTimings, ROUND_INFO_COLUMNS
+
+
+class TestPageQueries(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.season = Season(name='Season 1', short_name='S1', is_active=True)
+        users = [User(username=f'team{i}', password_hash='x') for i in range(2)]
+        db.session.add_all(users + [self.season])
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id, season_id=self.season.id)
+                      for i, user in enumerate(users)]
+        self.round = Round(position='CF', is_active=False, status='completed', season_id=self.season.id)
+        db.session.add_all(self.teams + [self.round])
+        db.session.flush()
+
+        a, b = self.teams
+        players = [Player(name=f'Player {i}', position='CF', round_id=self.round.id) for i in range(2)]
+        db.session.add_all(players)
+        db.session.flush()
+        players[0].team_id, players[0].acquisition_value = a.id, 120
+        db.session.add_all([
+            Bid(team_id=a.id, player_id=players[0].id, round_id=self.round.id, amount=120),
+            Bid(team_id=b.id, player_id=players[0].id, round_id=self.round.id, amount=90),
+            Bid(team_id=a.id, player_id=players[1].id, round_id=self.round.id, amount=60),
+            Bid(team_id=b.id, player_id=players[1].id, round_id=self.round.id, amount=60),
+        ])
+        tiebreaker = Tiebreaker(round_id=self.round.id, player_id=players[1].id, original_amount=60)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add_all([TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=team.id) for team in self.teams])
+        db.session.commit()
+
+    def test_round_page_runs_on_one_connection(self):
+        round_id, season_id = self.round.id, self.season.id
+        db.session.remove()
+        checkouts = []
+        on_checkout = lambda *args: checkouts.append(1)
+        event.listen(db.engine, 'checkout', on_checkout)
+        timings = QueryTimings()
+        try:
+            with PageQueries.open() as q:
+                q.timings = timings
+                header = q.one('admin.round_header', round_id=round_id, season_id=season_id)
+                tiebreakers = q.all('admin.round_tiebreakers', round_id=round_id)
+                team_bids = q.all('admin.round_team_bids', round_id=round_id, season_id=season_id)
+                missing = q.one('admin.round_header', round_id=round_id, season_id=season_id + 1)
+        finally:
+            event.remove(db.engine, 'checkout', on_checkout)
+        self.assertEqual(len(checkouts), 1)
+
+        round_info, round_stats = header[:ROUND_INFO_COLUMNS], header[ROUND_INFO_COLUMNS:]
+        self.assertEqual((round_info[1], round_info[8]), ('CF', 'Season 1'))
+        # total bids, teams, players bid on, ..., tiebreakers, players acquired, total spent
+        self.assertEqual(tuple(round_stats[:3]) + tuple(round_stats[6:]), (4, 2, 2, 1, 2, 120))
+        self.assertEqual((tiebreakers[0].teams_count, sorted(tiebreakers[0].team_names.split(', '))),
+                         (2, ['Team 0', 'Team 1']))
+        self.assertEqual([(row.team_name, row.players_won) for row in team_bids], [('Team 0', 1), ('Team 1', 0)])
+        self.assertIsNone(missing)
+
+        stats = timings.stats()
+        self.assertEqual(stats['admin.round_header']['calls'], 2)
+        self.assertEqual(set(stats), {'admin.round_header', 'admin.round_tiebreakers', 'admin.round_team_bids'})
+
+
+if __name__ == '__main__':
+    unittest.main()
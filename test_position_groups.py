@@ -0,0 +1,93 @@
+"""Tests for the k-way position group partitioner: balance, group sizes, preview and bulk writes."""
+
+import random
+import unittest
+
+from sqlalchemy import event
+
+from models import db, Player
+from db_test_case import DatabaseTestCase
+from position_groups import apply_position_groups, partition, plan_position_groups
+
+
+class TestPartition(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.ratings = [rng.randint(60, 99) for _ in range(301)]
+        self.attributes = [[rng.randint(40, 99) for _ in range(4)] for _ in range(301)]
+
+    def group_sums(self, assignment, k, values):
+        sums = [0] * k
+        for group, value in zip(assignment, values):
+            sums[group] += value
+        return sums
+
+    def test_groups_are_equal_sized_and_balanced(self):
+        for k in (2, 3, 4):
+            assignment = partition(self.ratings, self.attributes, k)
+            sizes = self.group_sums(assignment, k, [1] * len(self.ratings))
+            self.assertLessEqual(max(sizes) - min(sizes), 1)
+            rating_sums = self.group_sums(assignment, k, self.ratings)
+            self.assertLessEqual(max(rating_sums) - min(rating_sums), 5)
+
+    def test_beats_snake_on_secondary_attributes(self):
+        order = sorted(range(len(self.ratings)), key=lambda i: -self.ratings[i])
+        snake = [0] * len(self.ratings)
+        for position, index in enumerate(order):
+            snake[index] = 0 if position % 4 in (0, 3) else 1
+        assignment = partition(self.ratings, self.attributes, 2)
+
+        def attribute_spread(groups):
+            spread = 0
+            for column in range(4):
+                sums = self.group_sums(groups, 2, [row[column] for row in self.attributes])
+                spread += abs(sums[0] - sums[1])
+            return spread
+
+        self.assertLess(attribute_spread(assignment), attribute_spread(snake))
+
+    def test_missing_values_are_tolerated(self):
+        ratings = [None, 80, 75, None, 90, 60]
+        attributes = [[None] * 3, [50, None, 60], [70, 70, 70], [None, 40, 50], [80, 80, None], [60, 60, 60]]
+        self.assertEqual(sorted(partition(ratings, attributes, 2).tolist()), [0, 0, 0, 1, 1, 1])
+
+
+class TestPositionGroupPlans(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(3)
+        db.session.add_all([
+            Player(name=f'{position} {i}', position=position, overall_rating=rng.randint(60, 99),
+                   speed=rng.randint(40, 99), is_auction_eligible=i != 0)
+            for position in ('CB', 'GK') for i in range(21)
+        ])
+        db.session.commit()
+
+    def test_preview_uses_configured_groups_without_writing(self):
+        plan = plan_position_groups(['CB', 'GK'])
+        self.assertEqual([group['name'] for group in plan['CB']['groups']], ['CB-1', 'CB-2'])
+        self.assertTrue(all(group['configured'] for group in plan['CB']['groups']))
+        self.assertFalse(any(group['configured'] for group in plan['GK']['groups']))
+        self.assertEqual(plan['CB']['players'], 20)
+        self.assertEqual(Player.query.filter(Player.position_group.isnot(None)).count(), 0)
+
+    def test_apply_writes_one_update_per_group(self):
+        plan = plan_position_groups(['CB', 'GK'], groups=3)
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            apply_position_groups(plan)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        self.assertEqual(len([s for s in statements if s.startswith('UPDATE player')]), 6)
+        sizes = [Player.query.filter_by(position_group=f'CB-{n}').count() for n in (1, 2, 3)]
+        self.assertEqual(sorted(sizes), [6, 7, 7])
+        self.assertIsNone(Player.query.filter_by(name='CB 0').one().position_group)
+
+
+if __name__ == '__main__':
+    unittest.main()
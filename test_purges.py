@@ -0,0 +1,98 @@
+"""Tests for purges: chunked player purge jobs and set-based team and user deletion."""
+
+import unittest
+
+from models import db, User, Team, Player, Round, Bid, StarredPlayer, Tiebreaker, TeamTiebreaker
+from models import BulkBidRound, BulkBid, PasswordResetRequest, PurgeJob
+from db_test_case import DatabaseTestCase
+import purges
+from purges import Purges
+from team_rosters import TeamRosters
+
+
+class TestPurges(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        self.round = Round(position='CF', is_active=False, status='completed')
+        self.bulk_round = BulkBidRound(is_active=False, status='completed', base_price=10)
+        db.session.add_all(self.teams + [self.round, self.bulk_round])
+        db.session.commit()
+
+    def seed_players(self, count):
+        """``count`` players, each with a bid from both teams, a bulk bid and a star from team 0"""
+        a, b = self.teams
+        db.session.execute(Player.__table__.insert(), [
+            {'id': i, 'name': f'Player {i}', 'position': 'GK' if i % 2 else 'CF', 'overall_rating': i % 100,
+             'team_id': a.id if i % 10 == 0 else None}
+            for i in range(1, count + 1)
+        ])
+        db.session.execute(Bid.__table__.insert(), [
+            {'team_id': team.id, 'player_id': i, 'round_id': self.round.id, 'amount': 10}
+            for i in range(1, count + 1) for team in (a, b)
+        ])
+        db.session.execute(BulkBid.__table__.insert(), [
+            {'team_id': b.id, 'player_id': i, 'round_id': self.bulk_round.id} for i in range(1, count + 1)
+        ])
+        db.session.execute(StarredPlayer.__table__.insert(), [
+            {'team_id': a.id, 'player_id': i} for i in range(1, count + 1)
+        ])
+        tiebreaker = Tiebreaker(round_id=self.round.id, player_id=1, original_amount=10, resolved=True)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add(TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=a.id))
+        db.session.commit()
+
+    def test_purge_of_50k_players_runs_in_chunks(self):
+        self.seed_players(50000)
+        TeamRosters.team_rows()
+        commits = []
+        original = purges._pause
+        purges._pause = lambda: commits.append(db.session.get(PurgeJob, job.id).deleted)
+        try:
+            job = Purges.start_players({'all': True})
+            self.assertEqual((job.status, job.total), ('queued', 50000))
+            job = Purges.run(job.id)
+        finally:
+            purges._pause = original
+
+        self.assertEqual((job.status, job.deleted), ('completed', 50000))
+        self.assertEqual(commits[:2], [purges.CHUNK_SIZE, 2 * purges.CHUNK_SIZE])
+        self.assertEqual(len(commits), 50000 // purges.CHUNK_SIZE)
+        for model in (Player, Bid, BulkBid, StarredPlayer, Tiebreaker, TeamTiebreaker):
+            self.assertEqual(model.query.count(), 0, model.__name__)
+        self.assertEqual(TeamRosters.get(self.teams[0].id)['total_players'], 0)
+
+    def test_filtered_purge_keeps_the_other_players(self):
+        self.seed_players(200)
+        job = Purges.run(Purges.start_players({'position': 'GK', 'min_rating': 50}).id)
+        self.assertEqual((job.status, job.deleted, job.total), ('completed', 50, 50))
+        self.assertEqual(Player.query.count(), 150)
+        self.assertEqual(Bid.query.count(), 300)
+        self.assertEqual(Player.query.filter(Player.position == 'GK', Player.overall_rating >= 50).count(), 0)
+        with self.assertRaises(ValueError):
+            Purges.start_players({})
+
+    def test_deleting_a_user_takes_their_team_and_its_rows(self):
+        self.seed_players(20)
+        a_id, b_id, user_id = self.teams[0].id, self.teams[1].id, self.teams[0].user_id
+        db.session.add(PasswordResetRequest(user_id=user_id, reason='forgot'))
+        db.session.commit()
+
+        Purges.delete_user(user_id)
+        db.session.commit()
+        self.assertIsNone(db.session.get(User, user_id))
+        self.assertEqual([team.id for team in Team.query], [b_id])
+        self.assertEqual(Player.query.filter(Player.team_id.isnot(None)).count(), 0)
+        self.assertEqual((Bid.query.filter_by(team_id=a_id).count(), Bid.query.count()), (0, 20))
+        self.assertEqual((StarredPlayer.query.count(), TeamTiebreaker.query.count(),
+                          PasswordResetRequest.query.count()), (0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for the /auction Socket.IO namespace: authentication, rooms and once-per-room delivery."""
+
+import unittest
+
+from flask import Flask
+from flask_login import LoginManager
+
+from models import db, User, Team, Tiebreaker, TeamTiebreaker
+from realtime import NAMESPACE, RealtimeEvents, init_realtime, socketio
+
+
+class TestAuctionNamespace(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SECRET_KEY'] = 'test'
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        db.init_app(self.app)
+        login_manager = LoginManager()
+        login_manager.init_app(self.app)
+        login_manager.user_loader(lambda user_id: db.session.get(User, int(user_id)))
+        init_realtime(self.app)
+
+        with self.app.app_context():
+            db.create_all()
+            admin = User(username='admin', email='admin@test', is_admin=True)
+            users = [User(username=f'team{i}', email=f'team{i}@test') for i in range(3)]
+            for user in [admin] + users:
+                user.set_password('password')
+            db.session.add_all([admin] + users)
+            db.session.flush()
+            teams = [Team(name=f'Team {i}', user_id=user.id) for i, user in enumerate(users)]
+            db.session.add_all(teams)
+            db.session.flush()
+            tiebreaker = Tiebreaker(round_id=1, player_id=1, original_amount=100)
+            db.session.add(tiebreaker)
+            db.session.flush()
+            db.session.add_all([TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=team.id)
+                                for team in teams[:2]])
+            db.session.commit()
+            self.admin_id = admin.id
+            self.user_ids = [user.id for user in users]
+            self.team_ids = [team.id for team in teams]
+            self.tiebreaker_id = tiebreaker.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def connect(self, user_id=None):
+        client = self.app.test_client()
+        if user_id is not None:
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+        sock = socketio.test_client(self.app, namespace=NAMESPACE, flask_test_client=client)
+        self.addCleanup(lambda: sock.is_connected(NAMESPACE) and sock.disconnect(namespace=NAMESPACE))
+        return sock
+
+    def received(self, sock):
+        return [(message['name'], message['args'][0]) for message in sock.get_received(NAMESPACE)]
+
+    def test_anonymous_connection_rejected(self):
+        self.assertFalse(self.connect().is_connected(NAMESPACE))
+
+    def test_tiebreaker_room_limited_to_participants(self):
+        insider, outsider, admin = self.connect(self.user_ids[0]), self.connect(self.user_ids[2]), self.connect(self.admin_id)
+        room = {'tiebreaker_id': self.tiebreaker_id}
+        self.assertTrue(insider.emit('subscribe', room, namespace=NAMESPACE, callback=True)['ok'])
+        self.assertFalse(outsider.emit('subscribe', room, namespace=NAMESPACE, callback=True)['ok'])
+        self.assertTrue(admin.emit('subscribe', room, namespace=NAMESPACE, callback=True)['ok'])
+
+        with self.app.app_context():
+            RealtimeEvents.tiebreaker_updated(self.tiebreaker_id, 1, 2, False)
+
+        self.assertEqual([name for name, _ in self.received(insider)], ['tiebreaker_updated'])
+        self.assertEqual(self.received(outsider), [])
+
+    def test_bid_counts_only_reach_own_team_and_admins(self):
+        bidder, rival, admin = self.connect(self.user_ids[0]), self.connect(self.user_ids[1]), self.connect(self.admin_id)
+
+        with self.app.app_context():
+            RealtimeEvents.bid_count_changed(7, self.team_ids[0], 2, 9, 4)
+
+        self.assertEqual(self.received(bidder), [('bid_count_changed', {'round_id': 7, 'bid_count': 2})])
+        self.assertEqual(self.received(rival), [])
+        self.assertEqual(self.received(admin),
+                         [('bid_count_changed', {'round_id': 7, 'total_bids': 9, 'teams_bid': 4})])
+
+    def test_round_finalized_delivered_once_per_subscriber(self):
+        viewer = self.connect(self.user_ids[0])
+        viewer.emit('subscribe', {'round_id': 5}, namespace=NAMESPACE)
+        viewer.emit('subscribe', {'round_id': 5}, namespace=NAMESPACE)
+        bystander = self.connect(self.user_ids[1])
+
+        with self.app.app_context():
+            RealtimeEvents.round_finalized(5, 'success')
+
+        events = self.received(viewer)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][1]['redirect_to'], '/round_results/5')
+        self.assertEqual(self.received(bystander), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
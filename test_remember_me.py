@@ -0,0 +1,66 @@
+"""Tests for signed remember-me tokens: verification without queries, expiry and revocation."""
+
+import unittest
+from unittest import mock
+
+from sqlalchemy import event
+
+from models import db, User
+from db_test_case import DatabaseTestCase
+from remember_me import issue_remember_token, load_user_from_remember_token, verify_remember_token
+
+
+class TestRememberMeTokens(DatabaseTestCase):
+
+    def create_app(self):
+        app = super().create_app()
+        app.config['SECRET_KEY'] = 'test'
+        return app
+
+    def setUp(self):
+        super().setUp()
+        self.user = User(username='team', email='team@test')
+        self.user.set_password('password')
+        db.session.add(self.user)
+        db.session.commit()
+        self.user_id = self.user.id
+        self.token = issue_remember_token(self.user)
+        db.session.commit()
+        db.session.expunge_all()
+
+    def count_queries(self, func, *args):
+        statements = []
+        listener = lambda *a: statements.append(a[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            result = func(*args)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return result, len(statements)
+
+    def test_valid_token_loads_user_with_one_lookup(self):
+        user, queries = self.count_queries(load_user_from_remember_token, self.token)
+        self.assertEqual(user.id, self.user_id)
+        self.assertEqual(queries, 1)
+
+    def test_forged_and_legacy_tokens_rejected_without_queries(self):
+        for token in (self.token[:-2] + 'xx', 'legacy-random-token-from-the-old-scheme'):
+            user, queries = self.count_queries(load_user_from_remember_token, token)
+            self.assertIsNone(user)
+            self.assertEqual(queries, 0)
+
+    def test_expired_token_rejected(self):
+        with mock.patch('itsdangerous.timed.time.time', return_value=0):
+            expired = issue_remember_token(db.session.get(User, self.user_id))
+        self.assertIsNone(verify_remember_token(expired))
+
+    def test_clearing_the_version_revokes_outstanding_tokens(self):
+        user = db.session.get(User, self.user_id)
+        user.clear_remember_token()
+        db.session.commit()
+        self.assertIsNotNone(verify_remember_token(self.token))
+        self.assertIsNone(load_user_from_remember_token(self.token))
+
+
+if __name__ == '__main__':
+    unittest.main()
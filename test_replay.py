@@ -0,0 +1,74 @@
+"""Tests for the auction replay harness: rewinding finished rounds and diffing outcomes."""
+
+import unittest
+
+from benchmarks.replay import capture_outcome, diff_outcomes, rewind
+from models import db, User, Team, Player, Round, Bid, Tiebreaker, TeamTiebreaker
+from db_test_case import DatabaseTestCase
+
+
+class TestAuctionReplay(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        self.round = Round(position='CF', is_active=False, status='completed', max_bids_per_team=1)
+        db.session.add_all(self.teams + [self.round])
+        db.session.flush()
+        self.player = Player(name='Striker', position='CF', round_id=self.round.id)
+        db.session.add(self.player)
+        db.session.flush()
+
+        # Both teams tied on 100, then team 0 won the tiebreaker with 150
+        db.session.add_all([
+            Bid(team_id=self.teams[0].id, player_id=self.player.id, round_id=self.round.id, amount=150),
+            Bid(team_id=self.teams[1].id, player_id=self.player.id, round_id=self.round.id, amount=140),
+        ])
+        tiebreaker = Tiebreaker(round_id=self.round.id, player_id=self.player.id, original_amount=100, resolved=True)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add_all([
+            TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=self.teams[0].id, new_amount=150),
+            TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=self.teams[1].id, new_amount=140),
+        ])
+        self.player.team_id = self.teams[0].id
+        self.player.acquisition_value = 150
+        self.teams[0].balance = 850
+        db.session.commit()
+
+    def test_capture_attributes_allocation_to_round(self):
+        outcome = capture_outcome()
+        self.assertEqual(outcome['finished'], [('round', self.round.id)])
+        self.assertEqual(outcome['allocations'][self.player.id], (self.teams[0].id, 150, ('round', self.round.id)))
+        self.assertEqual(outcome['tiebreakers'][(self.round.id, self.player.id)][0]['original_amount'], 100)
+
+    def test_rewind_refunds_and_restores_tied_bids(self):
+        rewind(capture_outcome())
+        db.session.expire_all()
+
+        self.assertIsNone(self.player.team_id)
+        self.assertEqual(self.teams[0].balance, 1000)
+        self.assertEqual((self.round.is_active, self.round.status), (False, 'pending'))
+        self.assertEqual({bid.amount for bid in Bid.query}, {100})
+        self.assertEqual(Tiebreaker.query.count(), 0)
+        self.assertEqual(TeamTiebreaker.query.count(), 0)
+
+    def test_diff_reports_changed_allocation_and_balance(self):
+        recorded = capture_outcome()
+        self.assertEqual(sum(map(len, diff_outcomes(recorded, recorded).values())), 0)
+
+        self.player.team_id = self.teams[1].id
+        self.teams[1].balance = 860
+        db.session.commit()
+        differences = diff_outcomes(recorded, capture_outcome())
+        self.assertEqual(len(differences['allocations']), 1)
+        self.assertEqual(len(differences['balances']), 1)
+        self.assertIn(f'team {self.teams[0].id} for 150 in round {self.round.id}', differences['allocations'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
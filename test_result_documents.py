@@ -0,0 +1,122 @@
+"""Tests for compiled round results: contents, immutability, bulk settlement and conditional pages."""
+
+import unittest
+
+from models import db, User, Team, Player, Round, Bid, Tiebreaker, TeamTiebreaker
+from models import BulkBidRound, BulkBid, BulkBidTiebreaker, TeamBulkTiebreaker
+from db_test_case import DatabaseTestCase
+from result_documents import ResultDocuments, conditional_page, PAGE_CACHE_CONTROL
+
+
+class TestResultDocuments(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(3)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        db.session.add_all(self.teams)
+        db.session.flush()
+
+    def finished_round(self):
+        a, b, c = self.teams
+        round_ = Round(position='CF', is_active=True, max_bids_per_team=2)
+        players = [Player(name=f'Player {i}', position='CF', round=round_) for i in range(3)]
+        db.session.add_all(players + [round_])
+        db.session.flush()
+        # a and b tied on player 0 (b won the tiebreaker); c placed one bid too few
+        bids = [(a, 0, 110), (b, 0, 120), (a, 1, 50), (b, 1, 40), (c, 2, 30)]
+        db.session.add_all([Bid(team_id=team.id, player_id=players[index].id, round_id=round_.id, amount=amount)
+                            for team, index, amount in bids])
+        tiebreaker = Tiebreaker(round_id=round_.id, player_id=players[0].id, original_amount=100, resolved=True)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add_all([TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=team.id, new_amount=amount)
+                            for team, amount in ((a, 110), (b, 120))])
+        players[0].team_id, players[0].acquisition_value = b.id, 120
+        players[1].team_id, players[1].acquisition_value = a.id, 50
+        round_.is_active = False
+        db.session.commit()
+        return round_, players
+
+    def test_round_document_is_compiled_once(self):
+        a, b, c = self.teams
+        round_, players = self.finished_round()
+        self.assertTrue(ResultDocuments.compile_round(round_.id))
+        results = ResultDocuments.get_round(round_.id)
+
+        winners = {r['player']['name']: (r['winning_team']['name'], r['winning_bid'], r['was_tiebreaker'])
+                   for r in results.player_results()}
+        self.assertEqual(winners, {'Player 0': ('Team 1', 120, True), 'Player 1': ('Team 0', 50, False)})
+        self.assertEqual([bid['amount'] for bid in results.bids_by_player()[players[0].id]['bids']], [120, 110])
+        self.assertEqual([(r['player']['name'], r['result'], r['tied']) for r in results.team_results(a.id)],
+                         [('Player 0', 'lost', True), ('Player 1', 'won', False)])
+        self.assertEqual([(t['team']['name'], t['bid_count']) for t in results.cancelled_teams()], [('Team 2', 1)])
+
+        # Later changes do not rewrite the finished round's results
+        players[1].team_id = None
+        c.name = 'Renamed'
+        db.session.commit()
+        ResultDocuments.compile_round(round_.id)
+        again = ResultDocuments.get_round(round_.id)
+        self.assertEqual(again.etag, results.etag)
+        self.assertEqual(again.players_by_id[players[1].id]['winner_team_id'], a.id)
+
+    def test_active_rounds_are_never_stored(self):
+        round_ = Round(position='CF', is_active=True, max_bids_per_team=1)
+        db.session.add(round_)
+        db.session.commit()
+        self.assertFalse(ResultDocuments.compile_round(round_.id))
+        self.assertIsNone(ResultDocuments.get_round(round_.id))
+        self.assertIsNone(ResultDocuments.view_round(round_).etag)
+
+    def test_bulk_round_compiles_once_settled(self):
+        a, b, c = self.teams
+        bulk_round = BulkBidRound(is_active=False, status='completed', base_price=10)
+        players = [Player(name=f'Bulk {i}', position='CF') for i in range(2)]
+        db.session.add_all(players + [bulk_round])
+        db.session.flush()
+        db.session.add_all([
+            BulkBid(team_id=a.id, player_id=players[0].id, round_id=bulk_round.id, is_resolved=True),
+            BulkBid(team_id=a.id, player_id=players[1].id, round_id=bulk_round.id, has_tie=True),
+            BulkBid(team_id=b.id, player_id=players[1].id, round_id=bulk_round.id, has_tie=True),
+        ])
+        tiebreaker = BulkBidTiebreaker(bulk_round_id=bulk_round.id, player_id=players[1].id, current_amount=10)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add_all([TeamBulkTiebreaker(tiebreaker_id=tiebreaker.id, team_id=team.id) for team in (a, b)])
+        players[0].team_id, players[0].acquisition_value = a.id, 10
+        db.session.commit()
+        self.assertIsNone(ResultDocuments.get_bulk_round(bulk_round.id))
+
+        tiebreaker.resolved, tiebreaker.winner_team_id = True, b.id
+        players[1].team_id, players[1].acquisition_value = b.id, 35
+        db.session.commit()
+        results = ResultDocuments.get_bulk_round(bulk_round.id)
+        self.assertEqual({p['name']: (p['winner_team_id'], p['winning_bid'], p['was_tiebreaker']) for p in results.players},
+                         {'Bulk 0': (a.id, 10, False), 'Bulk 1': (b.id, 35, True)})
+        self.assertEqual(results.team_outcome(b.id)['spent'], 35)
+
+    def test_conditional_page_answers_304_for_a_known_version(self):
+        rendered = []
+
+        def render():
+            rendered.append(True)
+            return 'page'
+
+        with self.app.test_request_context('/'):
+            first = conditional_page(['doc', 1], render)
+        etag = first.get_etag()[0]
+        with self.app.test_request_context('/', headers={'If-None-Match': f'"{etag}"'}):
+            second = conditional_page(['doc', 1], render)
+        with self.app.test_request_context('/', headers={'If-None-Match': f'"{etag}"'}):
+            third = conditional_page(['doc', 2], render)
+        self.assertEqual((first.status_code, second.status_code, third.status_code), (200, 304, 200))
+        self.assertEqual(len(rendered), 2)
+        self.assertEqual(second.headers['Cache-Control'], PAGE_CACHE_CONTROL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Tests for the resumable round finalizer: parallel tie detection and checkpointed passes."""
+
+import unittest
+
+from models import db, User, Team, Player, Round, Bid, Tiebreaker, RoundFinalization
+from db_test_case import DatabaseTestCase
+from round_finalizer import PlannedBid, plan_pass, run_pass
+
+
+class TestPlanPass(unittest.TestCase):
+
+    def test_independent_ties_open_together(self):
+        bids = [
+            PlannedBid(1, 'a', 'p', 100), PlannedBid(2, 'b', 'p', 100),  # tie on p
+            PlannedBid(3, 'c', 'q', 90), PlannedBid(4, 'd', 'q', 90),    # tie on q
+            PlannedBid(5, 'e', 'r', 80),
+            PlannedBid(6, 'a', 's', 70),                                 # a may still win p
+            PlannedBid(7, 'f', 's', 60),                                 # s waits on a
+        ]
+        plan = plan_pass(bids)
+        self.assertEqual([(tie.player_id, tie.team_ids) for tie in plan.ties], [('p', ['a', 'b']), ('q', ['c', 'd'])])
+        self.assertEqual([bid.id for bid in plan.allocations], [5])
+        self.assertEqual(plan.waiting, 2)
+
+    def test_open_ties_hold_back_their_teams_and_players(self):
+        bids = [PlannedBid(1, 'a', 'q', 50), PlannedBid(2, 'c', 'p', 40), PlannedBid(3, 'd', 'r', 30)]
+        plan = plan_pass(bids, open_ties=[('p', ['a', 'b'])])
+        self.assertEqual([bid.id for bid in plan.allocations], [3])
+        self.assertEqual(plan.ties, [])
+        self.assertEqual(plan.waiting, 2)
+
+    def test_same_amount_on_different_players_is_not_a_tie(self):
+        plan = plan_pass([PlannedBid(1, 'a', 'p', 100), PlannedBid(2, 'b', 'q', 100)])
+        self.assertEqual([bid.id for bid in plan.allocations], [1, 2])
+        self.assertEqual(plan.ties, [])
+
+    def test_team_wins_one_player_per_amount_group(self):
+        # Team 1's two bids at 60 (a tiebreaker amount can equal another bid): it gets player 10 only
+        plan = plan_pass([PlannedBid(1, 1, 10, 60), PlannedBid(2, 2, 10, 55), PlannedBid(3, 1, 11, 60)])
+        self.assertEqual([bid.id for bid in plan.allocations], [1])
+
+        # A team tied earlier in the group keeps its other bid at that amount waiting
+        plan = plan_pass([PlannedBid(1, 'a', 'p', 100), PlannedBid(2, 'b', 'p', 100), PlannedBid(3, 'a', 'q', 100),
+                          PlannedBid(4, 'c', 'q', 90)])
+        self.assertEqual(plan.ties, [('p', 100, ['a', 'b'])])
+        self.assertEqual(plan.allocations, [])
+        self.assertEqual(plan.waiting, 2)
+
+
+class TestRunPass(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(4)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        self.round = Round(position='CF', is_active=True, max_bids_per_team=2)
+        self.players = [Player(name=f'Player {i}', position='CF') for i in range(6)]
+        db.session.add_all(self.teams + self.players + [self.round])
+        db.session.flush()
+
+        # Teams 0/1 tie on player 0 and teams 2/3 on player 1; everyone has a fallback
+        a, b, c, d = self.teams
+        p = self.players
+        bids = [(a, p[0], 100), (b, p[0], 100), (c, p[1], 90), (d, p[1], 90),
+                (a, p[2], 50), (b, p[3], 40), (c, p[4], 30), (d, p[5], 20)]
+        db.session.add_all([Bid(team_id=team.id, player_id=player.id, round_id=self.round.id, amount=amount)
+                            for team, player, amount in bids])
+        db.session.commit()
+
+    def resolve(self, tiebreaker_id, amounts):
+        tiebreaker = db.session.get(Tiebreaker, tiebreaker_id)
+        tiebreaker.resolved = True
+        for team, amount in amounts:
+            Bid.query.filter_by(round_id=self.round.id, player_id=tiebreaker.player_id, team_id=team.id).update(
+                {'amount': amount})
+        db.session.commit()
+
+    def test_resumes_from_checkpoint_without_charging_twice(self):
+        a, b, c, d = self.teams
+        first = run_pass(self.round.id)
+        self.assertEqual(len(first.new_tiebreakers), 2)
+        self.assertEqual(first.allocations, [])
+        self.assertEqual(self.round.status, 'processing')
+
+        # Nothing resolved yet: the next call only reports what is open
+        again = run_pass(self.round.id)
+        self.assertEqual(again.open_tiebreakers, first.open_tiebreakers)
+        self.assertEqual(db.session.get(RoundFinalization, self.round.id).passes, 1)
+
+        tie_p0, tie_p1 = [tiebreaker_id for tiebreaker_id, _ in first.new_tiebreakers]
+        self.resolve(tie_p0, [(a, 110), (b, 120)])
+        second = run_pass(self.round.id)
+        self.assertEqual(second.allocations, [(b.id, self.players[0].id, 120), (a.id, self.players[2].id, 50)])
+        self.assertFalse(second.completed)
+
+        self.resolve(tie_p1, [(c, 95), (d, 91)])
+        third = run_pass(self.round.id)
+        self.assertTrue(third.completed)
+        self.assertEqual(third.allocations, [(c.id, self.players[1].id, 95), (d.id, self.players[5].id, 20)])
+
+        self.assertFalse(self.round.is_active)
+        self.assertEqual([team.balance for team in self.teams], [950, 880, 905, 980])
+        self.assertIsNone(run_pass(self.round.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests for round rollback: dry-run reports, refunds, roster summaries and dependent rows."""
+
+import unittest
+
+from models import db, User, Team, Player, Round, Bid, RoundFinalization, Tiebreaker, TeamTiebreaker
+from models import BulkBidRound, BulkBid, BulkBidTiebreaker, TeamBulkTiebreaker
+from db_test_case import DatabaseTestCase
+from round_finalizer import run_pass
+from round_rollback import RoundRollback
+from team_rosters import TeamRosters
+
+
+class TestRoundRollback(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        db.session.add_all(self.teams)
+        db.session.commit()
+        TeamRosters.team_rows()
+
+    def test_round_rollback_refunds_and_matches_the_dry_run(self):
+        a, b = self.teams
+        round_ = Round(position='CF', is_active=True, max_bids_per_team=2)
+        players = [Player(name=f'Player {i}', position='CF', round=round_) for i in range(3)]
+        db.session.add_all(players + [round_])
+        db.session.flush()
+        for team, index, amount in ((a, 0, 120), (b, 0, 90), (b, 1, 60), (a, 1, 50)):
+            db.session.add(Bid(team_id=team.id, player_id=players[index].id, round_id=round_.id, amount=amount))
+            TeamRosters.record_bid(team.id, 1)
+        db.session.commit()
+        self.assertTrue(run_pass(round_.id).completed)
+        tiebreaker = Tiebreaker(round_id=round_.id, player_id=players[2].id, original_amount=10, resolved=True)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add(TeamTiebreaker(tiebreaker_id=tiebreaker.id, team_id=a.id))
+        db.session.commit()
+
+        report = RoundRollback.round_report(round_.id)
+        self.assertEqual((report.released_players, report.refunded_amount, report.refunds),
+                         (2, 180, {a.id: 120, b.id: 60}))
+        self.assertEqual((report.deleted_bids, report.deleted_tiebreakers), (4, 1))
+        self.assertEqual(db.session.get(Team, a.id).balance, 880)
+
+        self.assertEqual(RoundRollback.rollback_round(round_.id), report)
+        db.session.commit()
+        self.assertEqual([team.balance for team in Team.query.order_by(Team.id)], [1000, 1000])
+        self.assertEqual(Player.query.filter(Player.team_id.isnot(None) | Player.round_id.isnot(None)).count(), 0)
+        self.assertEqual((Round.query.count(), Bid.query.count(), TeamTiebreaker.query.count(),
+                          RoundFinalization.query.count()), (0, 0, 0, 0))
+        self.assertEqual(TeamRosters.check(), [])
+        self.assertEqual(TeamRosters.get(a.id)['total_spent'], 0)
+
+    def test_bulk_round_rollback_releases_only_its_allocations(self):
+        a, b = self.teams
+        bulk_round = BulkBidRound(is_active=False, status='completed', base_price=10)
+        won, tied, elsewhere = [Player(name=f'Bulk {i}', position='GK') for i in range(3)]
+        db.session.add_all([bulk_round, won, tied, elsewhere])
+        db.session.flush()
+        won.team_id, won.acquisition_value = a.id, 10
+        tied.team_id, tied.acquisition_value = b.id, 40
+        elsewhere.team_id, elsewhere.acquisition_value = b.id, 25
+        db.session.add_all([
+            BulkBid(team_id=a.id, player_id=won.id, round_id=bulk_round.id, is_resolved=True),
+            BulkBid(team_id=a.id, player_id=tied.id, round_id=bulk_round.id, has_tie=True),
+            BulkBid(team_id=b.id, player_id=tied.id, round_id=bulk_round.id, has_tie=True),
+            BulkBid(team_id=a.id, player_id=elsewhere.id, round_id=bulk_round.id),
+        ])
+        tiebreaker = BulkBidTiebreaker(bulk_round_id=bulk_round.id, player_id=tied.id, current_amount=40,
+                                       resolved=True, winner_team_id=b.id)
+        db.session.add(tiebreaker)
+        db.session.flush()
+        db.session.add_all([TeamBulkTiebreaker(tiebreaker_id=tiebreaker.id, team_id=team.id) for team in (a, b)])
+        TeamRosters.rebuild()
+        db.session.commit()
+
+        report = RoundRollback.rollback_bulk_round(bulk_round.id)
+        db.session.commit()
+        self.assertEqual((report.released_players, report.refunds, report.deleted_bids, report.deleted_tiebreakers),
+                         (2, {a.id: 10, b.id: 40}, 4, 1))
+        self.assertEqual([team.balance for team in Team.query.order_by(Team.id)], [1010, 1040])
+        self.assertEqual([p.team_id for p in Player.query.order_by(Player.id)], [None, None, b.id])
+        self.assertEqual((BulkBidRound.query.count(), BulkBid.query.count(), TeamBulkTiebreaker.query.count()),
+                         (0, 0, 0))
+        self.assertEqual(TeamRosters.check(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
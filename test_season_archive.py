@@ -0,0 +1,67 @@
+"""Tests for completed-season snapshots against an in-memory SQLite database."""
+
+import unittest
+
+from sqlalchemy import text
+
+from models import db, Season, SeasonArchive
+from db_test_case import DatabaseTestCase
+from season_archive import SeasonArchiveStore, _snapshot_cache
+from benchmarks.seed import seed_synthetic_season
+
+
+class TestSeasonArchiveStore(DatabaseTestCase):
+    """Snapshots must reproduce the live data and survive later live changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.seeded = seed_synthetic_season(teams=4, players=120, rounds=4, bulk_rounds=1)
+        self.season_id = self.seeded['season_id']
+        _snapshot_cache.clear()
+
+    def _complete_season(self):
+        Season.query.get(self.season_id).status = 'completed'
+        db.session.commit()
+
+    def test_only_completed_seasons_are_archived(self):
+        self.assertFalse(SeasonArchiveStore.archive_season(self.season_id))
+        self._complete_season()
+        self.assertTrue(SeasonArchiveStore.archive_season(self.season_id))
+        self.assertFalse(SeasonArchiveStore.archive_season(self.season_id))
+
+        archive = SeasonArchive.query.get(self.season_id)
+        self.assertEqual(archive.team_count, 4)
+        self.assertEqual(archive.round_count, 4)
+        self.assertLess(archive.compressed_size, archive.raw_size)
+
+    def test_snapshot_matches_live_tables(self):
+        self._complete_season()
+        SeasonArchiveStore.archive_season(self.season_id)
+
+        with db.engine.connect() as conn:
+            season, stats, teams = SeasonArchiveStore.get_season_detail(conn, self.season_id)
+            snapshot = SeasonArchiveStore.get_snapshot(conn, self.season_id)
+            live_bids = conn.execute(text("""
+                SELECT COUNT(*) FROM bid b JOIN round r ON b.round_id = r.id WHERE r.season_id = :season_id
+            """), {'season_id': self.season_id}).scalar()
+
+        self.assertEqual(season[0], self.season_id)
+        self.assertEqual(season[5], 'completed')
+        self.assertEqual(stats[2], 4)
+        self.assertEqual(len(teams), 4)
+        self.assertEqual(len(snapshot['bids']), live_bids)
+        self.assertTrue(snapshot['leaderboards']['top_bids'])
+
+    def test_history_reads_do_not_follow_live_changes(self):
+        self._complete_season()
+        SeasonArchiveStore.archive_season(self.season_id)
+        db.session.execute(text("UPDATE team SET name = name || ' (renamed)'"))
+        db.session.commit()
+
+        with db.engine.connect() as conn:
+            _, _, teams = SeasonArchiveStore.get_season_detail(conn, self.season_id)
+        self.assertFalse(any(team[1].endswith('(renamed)') for team in teams))
+
+
+if __name__ == '__main__':
+    unittest.main()
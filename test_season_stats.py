@@ -0,0 +1,81 @@
+"""Tests for the season statistics store against an in-memory SQLite database."""
+
+import unittest
+
+from sqlalchemy import text
+
+from models import db, Season, Round
+from db_test_case import DatabaseTestCase
+from season_stats import SeasonStatsStore
+from benchmarks.seed import seed_synthetic_season
+
+
+class TestSeasonStatsStore(DatabaseTestCase):
+    """Summary rows must match the live aggregates they replace."""
+
+    def setUp(self):
+        super().setUp()
+        self.seeded = seed_synthetic_season(teams=4, players=120, rounds=4, bulk_rounds=1)
+        self.season_id = self.seeded['season_id']
+
+    def _live_bid_totals(self, conn):
+        return conn.execute(text("""
+            SELECT COUNT(*), COUNT(DISTINCT b.team_id), MAX(b.amount), MIN(b.amount)
+            FROM bid b JOIN round r ON b.round_id = r.id
+            WHERE r.season_id = :season_id AND r.is_active = false
+        """), {'season_id': self.season_id}).fetchone()
+
+    def test_overview_backfills_and_matches_live_aggregates(self):
+        with db.engine.connect() as conn:
+            overview = SeasonStatsStore.get_season_overview(conn, self.season_id)
+            live = self._live_bid_totals(conn)
+
+        self.assertEqual(overview[0], 4)  # total teams
+        self.assertEqual(overview[3], 4)  # total rounds
+        self.assertEqual(overview[4], 1)  # active rounds
+        self.assertEqual((overview[6], overview[7], overview[10], overview[11]), tuple(live))
+
+    def test_team_and_round_rows(self):
+        SeasonStatsStore.refresh_season(self.season_id)
+        team_id = self.seeded['team_ids'][0]
+        with db.engine.connect() as conn:
+            stats = SeasonStatsStore.get_team_stats(conn, self.season_id, team_id, 1234)
+            live_bids = conn.execute(text("""
+                SELECT COUNT(*) FROM bid b JOIN round r ON b.round_id = r.id
+                WHERE b.team_id = :team_id AND r.season_id = :season_id AND r.is_active = false
+            """), {'team_id': team_id, 'season_id': self.season_id}).scalar()
+            rounds = SeasonStatsStore.get_season_rounds(conn, self.season_id)
+
+        self.assertEqual(stats[0], live_bids)
+        self.assertEqual(stats[9], 1234)
+        active = [r for r in rounds if r[0] == self.seeded['active_round_id']][0]
+        self.assertEqual(active[6], 0)  # active rounds are not summarised yet
+
+    def test_refresh_round_picks_up_finalized_round(self):
+        SeasonStatsStore.refresh_season(self.season_id)
+        round_id = self.seeded['active_round_id']
+        db.session.execute(text("""
+            INSERT INTO bid (team_id, player_id, round_id, amount, is_hidden)
+            VALUES (:team_id, :player_id, :round_id, 999, 1)
+        """), {'team_id': self.seeded['team_ids'][0],
+               'player_id': self.seeded['available_player_ids'][0], 'round_id': round_id})
+        Round.query.get(round_id).is_active = False
+        db.session.commit()
+
+        self.assertTrue(SeasonStatsStore.refresh_round(round_id))
+        with db.engine.connect() as conn:
+            overview = SeasonStatsStore.get_season_overview(conn, self.season_id)
+        self.assertEqual(overview[10], 999)
+
+    def test_completed_season_is_frozen(self):
+        Season.query.get(self.season_id).status = 'completed'
+        db.session.commit()
+        self.assertTrue(SeasonStatsStore.refresh_season(self.season_id))
+        self.assertFalse(SeasonStatsStore.refresh_round(self.seeded['completed_round_ids'][0]))
+        with db.engine.connect() as conn:
+            leaderboards = SeasonStatsStore.get_leaderboards(conn, self.season_id)
+        self.assertTrue(leaderboards['top_bids'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests for the standings store: league positions, form, records and auction head-to-head rows."""
+
+import unittest
+from datetime import datetime
+
+from models import db, User, Team, TeamStats, Match, Player, Round, Bid
+from db_test_case import DatabaseTestCase
+from standings_store import StandingsStore
+
+
+class TestStandingsStore(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(3)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        db.session.add_all(self.teams)
+        db.session.flush()
+        a, b, c = (team.id for team in self.teams)
+
+        # a beats b at home, draws away at c; b beats c
+        results = [(a, b, 2, 0, 1), (c, a, 1, 1, 2), (b, c, 3, 1, 3)]
+        db.session.add_all([
+            Match(home_team_id=home, away_team_id=away, home_score=home_goals, away_score=away_goals,
+                  match_date=datetime(2026, 1, day), round_number=day, match_number=1, is_completed=True)
+            for home, away, home_goals, away_goals, day in results
+        ])
+        db.session.add(Match(home_team_id=b, away_team_id=a, home_score=5, away_score=0,
+                             round_number=4, match_number=1, is_completed=False))
+        db.session.add_all([
+            TeamStats(team_id=a, played=2, wins=1, draws=1, losses=0, goals_for=3, goals_against=1, points=4),
+            TeamStats(team_id=b, played=2, wins=1, draws=0, losses=1, goals_for=3, goals_against=3, points=3),
+            TeamStats(team_id=c, played=2, wins=0, draws=1, losses=1, goals_for=2, goals_against=4, points=1),
+        ])
+        db.session.commit()
+
+    def test_standing_is_built_on_first_read(self):
+        a, b, c = self.teams
+        standing = StandingsStore.get_standing(a.id)
+        self.assertEqual(standing['position'], 1)
+        self.assertEqual(standing['form'], ['D', 'W'])
+        self.assertEqual(standing['home_record'], {'wins': 1, 'draws': 0, 'losses': 0, 'total': 1})
+        self.assertEqual(standing['away_record'], {'wins': 0, 'draws': 1, 'losses': 0, 'total': 1})
+        self.assertEqual([m['opponent'] for m in standing['recent_matches']], ['Team 2', 'Team 1'])
+        self.assertEqual(StandingsStore.get_standing(c.id)['position'], 3)
+
+        c.name = 'Renamed'
+        db.session.commit()
+        self.assertEqual(StandingsStore.get_standing(a.id)['recent_matches'][0]['opponent'], 'Renamed')
+
+    def test_refresh_follows_results(self):
+        a, b, c = self.teams
+        StandingsStore.refresh_league()
+        TeamStats.query.filter_by(team_id=b.id).update({'points': 7})
+        match = Match.query.filter_by(is_completed=False).one()
+        match.is_completed = True
+        db.session.commit()
+
+        StandingsStore.refresh_league()
+        self.assertEqual(StandingsStore.get_standing(b.id)['position'], 1)
+        self.assertEqual(StandingsStore.get_standing(a.id)['form'], ['L', 'D', 'W'])
+
+    def test_head_to_head_counts_players_the_winner_still_owns(self):
+        a, b, c = self.teams
+        round_ = Round(position='CF', is_active=True)
+        players = [Player(name=f'Player {i}', position='CF') for i in range(3)]
+        db.session.add_all(players + [round_])
+        db.session.flush()
+        bids = [(a, 0, 50), (b, 0, 40), (b, 1, 60), (a, 1, 30), (c, 1, 20), (a, 2, 10), (b, 2, 5)]
+        db.session.add_all([Bid(team_id=team.id, player_id=players[index].id, round_id=round_.id, amount=amount)
+                            for team, index, amount in bids])
+        players[0].team_id, players[1].team_id = a.id, b.id
+        round_.is_active = False
+        db.session.commit()
+        StandingsStore.refresh_round(round_.id)
+
+        results = StandingsStore.get_head_to_head(a.id, b.id)
+        self.assertEqual([(r.player_name, r.winner_team_id, r.winning_bid) for r in results],
+                         [('Player 0', a.id, 50), ('Player 1', b.id, 60)])
+        self.assertEqual(len(StandingsStore.get_head_to_head(b.id, c.id)), 1)
+
+        players[0].team_id = None
+        db.session.commit()
+        self.assertEqual(len(StandingsStore.get_head_to_head(a.id, b.id)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
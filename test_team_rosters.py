@@ -0,0 +1,75 @@
+"""Tests for the team roster summaries: lazy builds, transactional deltas and the consistency check."""
+
+import unittest
+
+from models import db, User, Team, Player, Round, Bid
+from db_test_case import DatabaseTestCase
+from round_finalizer import run_pass
+from team_rosters import TeamRosters
+
+
+class TestTeamRosters(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        users = [User(username=f'team{i}', password_hash='x') for i in range(2)]
+        db.session.add_all(users)
+        db.session.flush()
+        self.teams = [Team(name=f'Team {i}', balance=1000, user_id=user.id) for i, user in enumerate(users)]
+        db.session.add_all(self.teams)
+        db.session.flush()
+        db.session.add(Player(name='Keeper', position='GK', team_id=self.teams[0].id, acquisition_value=70))
+        db.session.commit()
+
+    def test_rows_are_built_on_first_read(self):
+        first, second = TeamRosters.team_rows()
+        self.assertEqual((first['team'].name, first['username'], first['total_players']), ('Team 0', 'team0', 1))
+        self.assertEqual((first['position_counts']['GK'], first['position_counts']['CF']), (1, 0))
+        self.assertEqual((first['total_team_value'], first['total_spent']), (70, 70))
+        self.assertEqual(second['total_players'], 0)
+        self.assertEqual(TeamRosters.check(), [])
+
+    def test_bids_and_allocations_keep_the_summary_current(self):
+        a, b = self.teams
+        TeamRosters.team_rows()
+        round_ = Round(position='CF', is_active=True, max_bids_per_team=1)
+        player = Player(name='Striker', position='CF')
+        db.session.add_all([round_, player])
+        db.session.flush()
+        for team, amount in ((a, 120), (b, 90)):
+            db.session.add(Bid(team_id=team.id, player_id=player.id, round_id=round_.id, amount=amount))
+            TeamRosters.record_bid(team.id, 1)
+        db.session.commit()
+        self.assertEqual(TeamRosters.get(b.id)['active_bids_count'], 1)
+
+        self.assertTrue(run_pass(round_.id).completed)
+        row = TeamRosters.get(a.id)
+        self.assertEqual((row['total_players'], row['position_counts']['CF'], row['total_team_value']), (2, 1, 190))
+        self.assertEqual((row['active_bids_count'], row['completed_bids_count']), (0, 1))
+        self.assertEqual(TeamRosters.check(), [])
+
+        # A refund takes the player off the ledger; an admin move does not touch it
+        TeamRosters.remove_player(a.id, 'CF', 120)
+        TeamRosters.add_player(b.id, 'CF', 120, spent=0)
+        db.session.commit()
+        self.assertEqual((TeamRosters.get(a.id)['total_spent'], TeamRosters.get(b.id)['total_spent']), (70, 0))
+
+    def test_check_reports_drift_and_rebuild_keeps_the_ledger(self):
+        a, _ = self.teams
+        TeamRosters.team_rows()
+        TeamRosters.add_player(a.id, 'CB', 40)
+        db.session.commit()
+
+        differences = {field: (stored, actual) for _, field, stored, actual in TeamRosters.check([a.id])}
+        self.assertEqual(differences['player_count'], (2, 1))
+        self.assertEqual(differences['position_counts'], ({'CB': 1, 'GK': 1}, {'GK': 1}))
+
+        TeamRosters.rebuild([a.id])
+        db.session.commit()
+        self.assertEqual(TeamRosters.check(), [])
+        self.assertEqual(TeamRosters.get(a.id)['total_spent'], 110)
+
+
+if __name__ == '__main__':
+    unittest.main()
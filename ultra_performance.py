@@ -182,18 +182,10 @@ def apply_ultra_performance_to_routes(app, db):
     # Import models here to avoid circular imports
     from models import Player, Team, User, Round, Bid
     
-    # Pre-warm connections on startup
-    with app.app_context():
-        ConnectionPoolOptimizer.warm_connections(db, 10)
-    
     @app.before_request
     def before_request_optimization():
         """Pre-request optimizations"""
         g.request_start_time = time.time()
-        
-        # Set connection to read-only for GET requests
-        if request.method == 'GET':
-            g.read_only = True
     
     @app.after_request
     def after_request_optimization(response):
@@ -202,8 +194,8 @@ def apply_ultra_performance_to_routes(app, db):
             elapsed = time.time() - g.request_start_time
             response.headers['X-Response-Time-Ms'] = str(int(elapsed * 1000))
         
-        # Add cache headers for static content
-        if request.path.startswith('/static/'):
+        # Add cache headers for static content (fingerprinted files already say immutable)
+        if request.path.startswith('/static/') and 'immutable' not in response.headers.get('Cache-Control', ''):
             response.headers['Cache-Control'] = 'public, max-age=31536000'
         
         # Enable compression hint
@@ -264,48 +256,19 @@ def apply_ultra_performance_to_routes(app, db):
 def optimize_database_queries(db):
     """Apply database-level query optimizations"""
     
-    # Create materialized views for complex queries
-    materialized_views = [
-        """
-        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_team_stats AS
-        SELECT 
-            t.id as team_id,
-            t.name as team_name,
-            t.balance,
-            COUNT(p.id) as player_count,
-            AVG(p.overall_rating) as avg_rating,
-            MAX(p.overall_rating) as max_rating,
-            MIN(p.overall_rating) as min_rating,
-            STRING_AGG(p.position, ',') as positions
-        FROM team t
-        LEFT JOIN player p ON t.id = p.team_id
-        GROUP BY t.id, t.name, t.balance
-        """,
-        
-        """
-        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_player_rankings AS
-        SELECT 
-            p.id,
-            p.name,
-            p.position,
-            p.overall_rating,
-            p.team_id,
-            t.name as team_name,
-            RANK() OVER (ORDER BY p.overall_rating DESC) as overall_rank,
-            RANK() OVER (PARTITION BY p.position ORDER BY p.overall_rating DESC) as position_rank
-        FROM player p
-        LEFT JOIN team t ON p.team_id = t.id
-        """
-    ]
+    # mv_team_stats / mv_player_rankings were never refreshed or read; season
+    # aggregates now live in the season stats store (season_stats.py), so
+    # remove the stale views instead of recreating them on every boot.
+    obsolete_views = ['mv_team_stats', 'mv_player_rankings']
     
     try:
         with db.engine.connect() as conn:
-            for view_sql in materialized_views:
+            for view_name in obsolete_views:
                 try:
-                    conn.execute(text(view_sql))
+                    conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view_name}"))
                     conn.commit()
                 except Exception as e:
-                    print(f"Could not create materialized view: {e}")
+                    print(f"Could not drop materialized view {view_name}: {e}")
     except Exception as e:
         print(f"Could not optimize database queries: {e}")
 
@@ -333,25 +296,17 @@ def install_ultra_performance(app, db):
     # 1. Apply route optimizations
     apply_ultra_performance_to_routes(app, db)
     
-    # 2. Optimize database queries
-    with app.app_context():
-        optimize_database_queries(db)
-    
-    # 3. Enable query result caching
+    # 2. Enable query result caching
     enable_query_result_caching(app, db)
     
-    # 4. Use fast JSON encoder
+    # 3. Use fast JSON encoder
     app.json_encoder = FastJSONEncoder
     
-    # 5. Pre-warm connections
-    with app.app_context():
-        ConnectionPoolOptimizer.warm_connections(db, 5)
+    # Database DDL runs in the release step (flask prepare-db), and the pool
+    # opens connections on demand, so a cold start never waits on the database.
     
     print("⚡ Ultra Performance Optimizations Installed!")
     print("   • In-memory caching enabled (60s TTL)")
-    print("   • Query optimization active")
-    print("   • Connection pool pre-warmed")
-    print("   • Materialized views created")
     print("   • Fast JSON serialization enabled")
     
     return True
\ No newline at end of file